@@ -0,0 +1,136 @@
+"""
+Compares the classification of functionality changes in change_detection with the previous
+quadratic implementation on large specs.
+
+Builds specs with many functional requirements, applies typical spec edits to them (reordering,
+inserting and removing functionalities, editing them) and classifies the changes with both
+implementations, checking that they produce the same results.
+
+Usage:
+    python -m benchmarks.change_detection_benchmark [--functionalities 1000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import change_detection  # noqa: E402
+
+
+def _classify_changes_quadratic(old_frs: list[str], new_frs: list[str]):
+    """The previous implementation of change_detection._classify_changes."""
+    matched_old: set[int] = set()
+    matched_new: set[int] = set()
+
+    for i in range(min(len(old_frs), len(new_frs))):
+        if old_frs[i] == new_frs[i]:
+            matched_old.add(i)
+            matched_new.add(i)
+
+    content_matches: list[tuple[int, int]] = []
+    for old_idx in range(len(old_frs)):
+        if old_idx in matched_old:
+            continue
+        for new_idx in range(len(new_frs)):
+            if new_idx in matched_new:
+                continue
+            if old_frs[old_idx] == new_frs[new_idx]:
+                content_matches.append((old_idx, new_idx))
+                matched_old.add(old_idx)
+                matched_new.add(new_idx)
+                break
+
+    moves: list[tuple[int, int]] = []
+    if content_matches and _has_relative_order_change_quadratic(content_matches):
+        moves = content_matches
+
+    edits: list[int] = []
+    for i in range(min(len(old_frs), len(new_frs))):
+        if i not in matched_old and i not in matched_new:
+            edits.append(i)
+            matched_old.add(i)
+            matched_new.add(i)
+
+    removed = [i for i in range(len(old_frs)) if i not in matched_old]
+    added = [i for i in range(len(new_frs)) if i not in matched_new]
+
+    return moves, edits, removed, added
+
+
+def _has_relative_order_change_quadratic(matches: list[tuple[int, int]]) -> bool:
+    if len(matches) <= 1:
+        return False
+    sorted_by_old = sorted(matches, key=lambda m: m[0])
+    new_indices = [m[1] for m in sorted_by_old]
+    for i in range(len(new_indices) - 1):
+        if new_indices[i] > new_indices[i + 1]:
+            return True
+    return False
+
+
+def _create_functionality(index: int) -> str:
+    return (
+        f"- :User: should be able to manage the :Resource{index}: entities. Every :Resource{index}: "
+        f"has a name, a description and a list of tags, and is validated before it is stored.\n"
+        f"  - Acceptance test: creating a :Resource{index}: with an empty name is rejected."
+    )
+
+
+def _create_scenarios(functionalities: int) -> dict[str, tuple[list[str], list[str]]]:
+    rng = random.Random(0)
+    old_frs = [_create_functionality(i) for i in range(functionalities)]
+
+    inserted_at_start = ["- A new first functionality."] + old_frs
+
+    removed_in_the_middle = old_frs[: functionalities // 2] + old_frs[functionalities // 2 + 1 :]
+
+    edited = list(old_frs)
+    for i in rng.sample(range(functionalities), functionalities // 10):
+        edited[i] += " Edited."
+
+    shuffled = list(old_frs)
+    rng.shuffle(shuffled)
+
+    moved_to_the_end = old_frs[1:] + old_frs[:1]
+
+    return {
+        "insert at start": (old_frs, inserted_at_start),
+        "remove in middle": (old_frs, removed_in_the_middle),
+        "edit 10%": (old_frs, edited),
+        "move to end": (old_frs, moved_to_the_end),
+        "shuffle": (old_frs, shuffled),
+    }
+
+
+def _time(classify, old_frs: list[str], new_frs: list[str], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        classify(old_frs, new_frs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functionalities", type=int, default=1000, help="Number of functional requirements.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per implementation.")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<18} {'quadratic (ms)':>15} {'indexed (ms)':>13} {'speedup':>8}")
+    for scenario, (old_frs, new_frs) in _create_scenarios(args.functionalities).items():
+        expected = _classify_changes_quadratic(old_frs, new_frs)
+        if change_detection._classify_changes(old_frs, new_frs) != expected:
+            raise SystemExit(f"The classifications of the '{scenario}' scenario differ.")
+
+        quadratic = _time(_classify_changes_quadratic, old_frs, new_frs, args.repeat)
+        indexed = _time(change_detection._classify_changes, old_frs, new_frs, args.repeat)
+        print(f"{scenario:<18} {quadratic * 1000:>15.2f} {indexed * 1000:>13.2f} {quadratic / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares the git access backends of git_utils on a repository with many rendered functionalities.
+
+Builds a throwaway repository with one finished-functionality commit per FRID and then runs the
+per-functionality git workload of a render (dirty check, checkpoint lookups, reading the files of the
+previous functionality and diffing against it) with each backend.
+
+Usage:
+    python -m benchmarks.git_backend_benchmark [--commits 200] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import git_utils  # noqa: E402
+
+MODULE_NAME = "benchmark_module"
+
+
+def _create_repo(repo_path: str, commits: int) -> None:
+    git_utils.init_git_repo(repo_path, MODULE_NAME)
+    for frid in range(1, commits + 1):
+        with open(os.path.join(repo_path, f"module_{frid % 20}.py"), "a", encoding="utf-8") as f:
+            f.write(f"def functionality_{frid}():\n    return {frid}\n\n")
+        git_utils.add_all_files_and_commit(
+            repo_path,
+            git_utils.FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format(frid),
+            MODULE_NAME,
+            str(frid),
+        )
+
+
+def _run_workload(repo_path: str, commits: int) -> None:
+    for frid in range(2, commits + 1):
+        previous_frid = str(frid - 1)
+        git_utils.is_dirty(repo_path)
+        git_utils.has_commit_for_frid(repo_path, previous_frid, MODULE_NAME)
+        git_utils.get_last_rendered_functionality(repo_path)
+        git_utils.read_files_at_frid(repo_path, previous_frid)
+        git_utils.diff(repo_path, previous_frid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commits", type=int, default=200, help="Number of rendered functionalities (commits).")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per backend.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = os.path.join(temp_dir, "code")
+        print(f"Creating repository with {args.commits} commits...")
+        _create_repo(repo_path, args.commits)
+
+        results = {}
+        for backend in git_utils.GIT_BACKENDS:
+            git_utils.set_git_backend(backend)
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                _run_workload(repo_path, args.commits)
+                timings.append(time.perf_counter() - start)
+            git_utils.close_repo_handles()
+            results[backend] = min(timings)
+
+        baseline = results[git_utils.GIT_BACKEND_GITPYTHON]
+        print(f"{'backend':<12} {'best (s)':>10} {'per FRID (ms)':>14} {'speedup':>8}")
+        for backend, elapsed in results.items():
+            per_frid_ms = elapsed / (args.commits - 1) * 1000
+            print(f"{backend:<12} {elapsed:>10.3f} {per_frid_ms:>14.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compares staging the whole working tree with staging only the paths written by the render.
+
+Builds a throwaway repository with a large working tree and then commits a few changed files per functionality,
+once with `git add -A` (no changed paths) and once with the changed paths reported by the render. Only the first
+targeted commit of the run checks `git status`, after that git_utils knows the working tree.
+
+Usage:
+    python -m benchmarks.git_staging_benchmark [--files 20000] [--commits 50] [--changed-files 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import git_utils  # noqa: E402
+
+MODULE_NAME = "benchmark_module"
+FILES_PER_FOLDER = 100
+
+
+def _file_path(number: int) -> str:
+    return os.path.join(f"package_{number // FILES_PER_FOLDER}", f"module_{number}.py")
+
+
+def _create_repo(repo_path: str, files: int) -> None:
+    git_utils.init_git_repo(repo_path, MODULE_NAME)
+    for number in range(files):
+        path = os.path.join(repo_path, _file_path(number))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"def function_{number}():\n    return {number}\n")
+    git_utils.add_all_files_and_commit(repo_path, "Initial files", MODULE_NAME)
+
+
+def _run_commits(repo_path: str, files: int, commits: int, changed_files: int, targeted: bool) -> float:
+    git_utils.forget_worktrees()
+    elapsed = 0.0
+    for commit in range(commits):
+        changed_paths = [
+            _file_path((commit * changed_files + offset) * 7919 % files) for offset in range(changed_files)
+        ]
+        for changed_path in changed_paths:
+            with open(os.path.join(repo_path, changed_path), "a", encoding="utf-8") as f:
+                f.write(f"# commit {commit}\n")
+
+        start = time.perf_counter()
+        git_utils.add_all_files_and_commit(
+            repo_path,
+            git_utils.FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format(commit + 1),
+            MODULE_NAME,
+            str(commit + 1),
+            changed_paths=changed_paths if targeted else None,
+        )
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20000, help="Number of files in the working tree.")
+    parser.add_argument("--commits", type=int, default=50, help="Number of commits per staging mode.")
+    parser.add_argument("--changed-files", type=int, default=3, help="Number of files changed per commit.")
+    args = parser.parse_args()
+
+    git_utils.set_git_backend(git_utils.GIT_BACKEND_PERSISTENT)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = os.path.join(temp_dir, "code")
+        print(f"Creating repository with {args.files} files...")
+        _create_repo(repo_path, args.files)
+
+        results = {}
+        for name, targeted in [("add -A", False), ("targeted", True)]:
+            results[name] = _run_commits(repo_path, args.files, args.commits, args.changed_files, targeted)
+        git_utils.close_repo_handles()
+
+    baseline = results["add -A"]
+    print(f"{'staging':<10} {'total (s)':>10} {'per commit (ms)':>16} {'speedup':>8}")
+    for name, elapsed in results.items():
+        print(f"{name:<10} {elapsed:>10.3f} {elapsed / args.commits * 1000:>16.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compares the construction time of the render state machine with and without the graph (diagram) support.
+
+A render state machine is created for every rendered module, so this is paid once per module. Only
+--render-machine-graph needs the graph machine.
+
+Usage:
+    python -m benchmarks.render_machine_benchmark [--modules 50] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import cast
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from render_machine.code_renderer import create_machine  # noqa: E402
+from render_machine.render_context import RenderContext  # noqa: E402
+from render_machine.state_machine_config import StateMachineConfig, States  # noqa: E402
+
+
+class _RenderContextCallbacks:
+    """Stands in for the render context when the states and transitions are configured."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _Model:
+    pass
+
+
+def _create_machines(render_machine_graph: bool, modules: int) -> None:
+    state_machine_config = StateMachineConfig()
+    for _ in range(modules):
+        callbacks = cast(RenderContext, _RenderContextCallbacks())
+        create_machine(
+            render_machine_graph,
+            model=_Model(),
+            states=state_machine_config.get_states(callbacks),
+            transitions=state_machine_config.get_transitions(callbacks),
+            initial=States.RENDER_INITIALISED.value,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", type=int, default=50, help="Number of state machines (modules) to create.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per machine type.")
+    args = parser.parse_args()
+
+    results = {}
+    for name, render_machine_graph in [("graph", True), ("plain", False)]:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            _create_machines(render_machine_graph, args.modules)
+            timings.append(time.perf_counter() - start)
+        results[name] = min(timings)
+
+    baseline = results["graph"]
+    print(f"{'machine':<8} {'best (s)':>10} {'per module (ms)':>16} {'speedup':>8}")
+    for name, elapsed in results.items():
+        per_module_ms = elapsed / args.modules * 1000
+        print(f"{name:<8} {elapsed:>10.3f} {per_module_ms:>16.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Compares the cost of the TUI's progress timers with a timer per substate line and with the shared ticker of the app.
+
+Shows a deep tree of substates, as the conformance tests of a large spec do, in a headless TUI and lets their timers
+run. Counts the screen updates (frames) and layouts they cause and the time spent in them, and the CPU time of the
+whole process.
+
+Usage:
+    python -m benchmarks.tui_ticker_benchmark [--substates 200] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from textual.app import App  # noqa: E402
+from textual.containers import Horizontal, VerticalScroll  # noqa: E402
+from textual.screen import Screen  # noqa: E402
+from textual.timer import Timer  # noqa: E402
+from textual.widgets import Static  # noqa: E402
+
+from plain2code_utils import format_duration_hms  # noqa: E402
+from tui.components import ProgressItem, SubstateLine  # noqa: E402
+
+CHILDREN_PER_TEST = 3
+
+CSS = """
+SubstateLine, _TimerPerWidgetSubstateLine {
+    height: auto;
+    padding: 0 1;
+}
+"""
+
+
+class _TimerPerWidgetSubstateLine(Horizontal):
+    """The previous implementation of SubstateLine, with an interval timer of its own."""
+
+    def __init__(self, text: str, indent: str, progress_status: str, **kwargs):
+        super().__init__(**kwargs)
+        self.text = text
+        self.indent = indent
+        self._line_widget: Static | None = None
+        self._timer: Timer | None = None
+        self._seconds_elapsed = 0
+
+    def compose(self):
+        self._line_widget = Static(self._format_line(), classes="substate-line-text")
+        yield self._line_widget
+
+    def on_mount(self) -> None:
+        self._timer = self.set_interval(1, self._add_second)
+
+    def _add_second(self) -> None:
+        self._seconds_elapsed += 1
+        if self._line_widget:
+            self._line_widget.update(self._format_line())
+
+    def _format_line(self) -> str:
+        return f"{self.indent}  └ {self.text} [#888888]({format_duration_hms(self._seconds_elapsed)})[/#888888]"
+
+
+class _SubstatesApp(App):
+    CSS = CSS
+
+    def __init__(self, line_class: type, substates: int):
+        super().__init__()
+        self.line_class = line_class
+        self.substates = substates
+
+    def compose(self):
+        with VerticalScroll():
+            for number in range(self.substates):
+                if number % (CHILDREN_PER_TEST + 1) == 0:
+                    text, indent = f"Running conformance test {number // (CHILDREN_PER_TEST + 1)}", ""
+                else:
+                    text, indent = "Fixing the conformance test", "    " * (number % (CHILDREN_PER_TEST + 1))
+                yield self.line_class(text, indent, ProgressItem.PROCESSING)
+
+
+class _FrameStats:
+    """Counts the frames and layouts of the screens and the time spent in them."""
+
+    def __init__(self):
+        self.frames = 0
+        self.layouts = 0
+        self.seconds = 0.0
+
+    def _measure(self, method, counter: str):
+        def _measured(screen, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(screen, *args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+                setattr(self, counter, getattr(self, counter) + 1)
+
+        return _measured
+
+    def patch(self) -> None:
+        self._compositor_refresh = Screen._compositor_refresh
+        self._refresh_layout = Screen._refresh_layout
+        Screen._compositor_refresh = self._measure(self._compositor_refresh, "frames")
+        Screen._refresh_layout = self._measure(self._refresh_layout, "layouts")
+
+    def unpatch(self) -> None:
+        Screen._compositor_refresh = self._compositor_refresh
+        Screen._refresh_layout = self._refresh_layout
+
+
+async def _run(line_class: type, substates: int, seconds: float) -> tuple[_FrameStats, float]:
+    app = _SubstatesApp(line_class, substates)
+    async with app.run_test(size=(120, 50)) as pilot:
+        await pilot.pause()
+        stats = _FrameStats()
+        stats.patch()
+        try:
+            start_cpu = time.process_time()
+            await asyncio.sleep(seconds)
+            cpu_seconds = time.process_time() - start_cpu
+        finally:
+            stats.unpatch()
+    return stats, cpu_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--substates", type=int, default=200, help="Number of substate lines shown.")
+    parser.add_argument("--seconds", type=float, default=5, help="How long the timers run for each implementation.")
+    args = parser.parse_args()
+
+    print(f"{'timers':<12} {'frames/s':>9} {'layouts/s':>10} {'frame ms/s':>11} {'cpu %':>7}")
+    for name, line_class in [("per widget", _TimerPerWidgetSubstateLine), ("ticker", SubstateLine)]:
+        stats, cpu_seconds = asyncio.run(_run(line_class, args.substates, args.seconds))
+        print(
+            f"{name:<12} {stats.frames / args.seconds:>9.1f} {stats.layouts / args.seconds:>10.1f} "
+            f"{stats.seconds / args.seconds * 1000:>11.1f} {cpu_seconds / args.seconds * 100:>6.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Literal
 
@@ -132,40 +133,51 @@ def _detect_module_changes(module: "PlainModule") -> list[FunctionalityChange]:
 def _classify_changes(
     old_frs: list[str], new_frs: list[str]
 ) -> tuple[list[tuple[int, int]], list[int], list[int], list[int]]:
-    matched_old: set[int] = set()
-    matched_new: set[int] = set()
+    """Classify the differences between two FR lists in linear time.
 
-    for i in range(min(len(old_frs), len(new_frs))):
+    FRs unchanged at their position are matched first. Every other old FR is then matched, in
+    order, with the first unmatched new FR of the same content, looked up in an index of the
+    unmatched new FRs by content. The content matches are moves when their relative order
+    changed; unmatched FRs at a common position are edits and the rest are removals/additions.
+    """
+    common_length = min(len(old_frs), len(new_frs))
+    matched_old = [False] * len(old_frs)
+    matched_new = [False] * len(new_frs)
+
+    for i in range(common_length):
         if old_frs[i] == new_frs[i]:
-            matched_old.add(i)
-            matched_new.add(i)
+            matched_old[i] = True
+            matched_new[i] = True
+
+    unmatched_new_by_content: dict[str, deque[int]] = {}
+    for new_idx, fr in enumerate(new_frs):
+        if not matched_new[new_idx]:
+            unmatched_new_by_content.setdefault(fr, deque()).append(new_idx)
 
     content_matches: list[tuple[int, int]] = []
-    for old_idx in range(len(old_frs)):
-        if old_idx in matched_old:
+    for old_idx, fr in enumerate(old_frs):
+        if matched_old[old_idx]:
             continue
-        for new_idx in range(len(new_frs)):
-            if new_idx in matched_new:
-                continue
-            if old_frs[old_idx] == new_frs[new_idx]:
-                content_matches.append((old_idx, new_idx))
-                matched_old.add(old_idx)
-                matched_new.add(new_idx)
-                break
+        new_indices = unmatched_new_by_content.get(fr)
+        if new_indices:
+            new_idx = new_indices.popleft()
+            content_matches.append((old_idx, new_idx))
+            matched_old[old_idx] = True
+            matched_new[new_idx] = True
 
     moves: list[tuple[int, int]] = []
     if content_matches and _has_relative_order_change(content_matches):
         moves = content_matches
 
     edits: list[int] = []
-    for i in range(min(len(old_frs), len(new_frs))):
-        if i not in matched_old and i not in matched_new:
+    for i in range(common_length):
+        if not matched_old[i] and not matched_new[i]:
             edits.append(i)
-            matched_old.add(i)
-            matched_new.add(i)
+            matched_old[i] = True
+            matched_new[i] = True
 
-    removed = [i for i in range(len(old_frs)) if i not in matched_old]
-    added = [i for i in range(len(new_frs)) if i not in matched_new]
+    removed = [i for i, matched in enumerate(matched_old) if not matched]
+    added = [i for i, matched in enumerate(matched_new) if not matched]
 
     return moves, edits, removed, added
 
@@ -173,17 +185,11 @@ def _classify_changes(
 def _has_relative_order_change(matches: list[tuple[int, int]]) -> bool:
     """Check if content matches represent a true reorder (relative order changed).
 
-    If all matches preserve relative order (sorted by old_idx gives same ordering
-    as sorted by new_idx), it's just a positional shift from insertions/removals.
+    If all matches preserve relative order (the new indices increase along with the old
+    ones), it's just a positional shift from insertions/removals. The matches are produced
+    in increasing old index order, so a single pass over them suffices.
     """
-    if len(matches) <= 1:
-        return False
-    sorted_by_old = sorted(matches, key=lambda m: m[0])
-    new_indices = [m[1] for m in sorted_by_old]
-    for i in range(len(new_indices) - 1):
-        if new_indices[i] > new_indices[i + 1]:
-            return True
-    return False
+    return any(matches[i][1] > matches[i + 1][1] for i in range(len(matches) - 1))
 
 
 def _frid_from_index(index: int) -> str:
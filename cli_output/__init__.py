@@ -1,7 +1,9 @@
 """CLI output formatting for non-interactive display."""
 
+from cli_output.batch_summary import print_batch_summary
 from cli_output.dry_run import print_dry_run_output
+from cli_output.profile_summary import print_profile_summary
 from cli_output.render_summary import print_exit_summary
 from cli_output.status import print_status
 
-__all__ = ["print_dry_run_output", "print_exit_summary", "print_status"]
+__all__ = ["print_batch_summary", "print_dry_run_output", "print_exit_summary", "print_profile_summary", "print_status"]
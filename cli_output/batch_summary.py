@@ -0,0 +1,53 @@
+"""Consolidated summary display for `codeplain batch`."""
+
+from typing import TYPE_CHECKING
+
+from plain2code_console import console
+from plain2code_utils import format_duration_hms
+
+if TYPE_CHECKING:
+    from plain2code_batch import BatchResult
+
+SECONDS_PER_HOUR = 3600
+
+STATUS_MARKUP = {
+    "succeeded": "[#79FC96]✓",
+    "failed": "[#FF6B6B]✗",
+    "cancelled": "[#FFFFFF]—",
+}
+
+
+def print_batch_summary(result: "BatchResult") -> None:
+    """Print the outcome of every render of the batch and the throughput of the whole batch."""
+    console.quiet = False
+
+    msg = "\n[#FFFFFF]batch summary\n\n"
+    for spec in result.specs:
+        run_state = spec.run_state
+        functionalities = run_state.rendered_functionalities if run_state is not None else 0
+        msg += (
+            f"  {STATUS_MARKUP[spec.status]} [#FFFFFF]{spec.name}  "
+            f"[#8E8F91]functionalities [#FFFFFF]{functionalities}  "
+            f"[#8E8F91]duration [#FFFFFF]{format_duration_hms(spec.duration_seconds)}\n"
+        )
+        if spec.error_message:
+            msg += f"      [#FF6B6B]{spec.error_message}\n"
+        if spec.args is not None and run_state is not None:
+            msg += f"      [#8E8F91]render id {run_state.render_id}  log {spec.args.log_file_name}\n"
+
+    succeeded = sum(spec.status == "succeeded" for spec in result.specs)
+    functionalities = sum(spec.run_state.rendered_functionalities for spec in result.specs if spec.run_state)
+    api_requests = sum(spec.run_state.call_count for spec in result.specs if spec.run_state)
+    hours = max(result.duration_seconds, 1) / SECONDS_PER_HOUR
+    msg += (
+        f"\n  [#8E8F91]specs\t\t\t[#FFFFFF]{succeeded}/{len(result.specs)} succeeded\n"
+        f"  [#8E8F91]wall time\t\t\t[#FFFFFF]{format_duration_hms(result.duration_seconds)}\n"
+        f"  [#8E8F91]throughput\t\t\t[#FFFFFF]{succeeded / hours:.1f} specs/h, "
+        f"{functionalities / hours:.1f} functionalities/h\n"
+        f"  [#8E8F91]api requests\t\t\t[#FFFFFF]{api_requests} "
+        f"(waited {format_duration_hms(result.api_request_wait_seconds)} for a free slot)\n"
+        f"  [#8E8F91]test scripts waited\t\t[#FFFFFF]{format_duration_hms(result.script_wait_seconds)} "
+        "for a free slot\n"
+    )
+    console.print(msg)
+    console.quiet = True
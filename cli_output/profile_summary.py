@@ -0,0 +1,28 @@
+"""Per-functionality flame summary display for the --profile flag."""
+
+from plain2code_console import console
+from plain2code_profiler import FridFlameSummary
+
+
+def print_profile_summary(flame_summary: list[FridFlameSummary], trace_path: str) -> None:
+    """Print where the render spent its time, per functionality, after the TUI exits (terminal restored)."""
+    console.quiet = False
+
+    msg = "\n[#FFFFFF]render profile\n\n"
+    for frid_flame_summary in flame_summary:
+        functionality = (
+            f"functionality {frid_flame_summary.frid}"
+            if frid_flame_summary.frid is not None
+            else "outside functionalities"
+        )
+        msg += f"  [#FFFFFF]{functionality}  [#8E8F91]{frid_flame_summary.total_seconds:.2f}s\n"
+        for entry in frid_flame_summary.entries:
+            indent = "  " * len(entry.path)
+            msg += (
+                f"  {indent}[#FFFFFF]{entry.path[-1]}  [#8E8F91]{entry.total_seconds:.2f}s "
+                f"(self {entry.self_seconds:.2f}s)\n"
+            )
+        msg += "\n"
+    msg += f"  [#8E8F91]trace:\t[#FFFFFF]{trace_path}\n"
+    console.print(msg)
+    console.quiet = True
@@ -1,3 +1,4 @@
+import threading
 import time
 from typing import Optional
 
@@ -5,8 +6,11 @@ import requests
 from requests.exceptions import ConnectionError, RequestException, Timeout
 
 import plain2code_exceptions
+from concurrency_limit import ConcurrencyLimit
 from plain2code_console import RETRY_COLOR
+from plain2code_profiler import profiled
 from plain2code_state import RunState
+from run_control import RunControl
 
 MAX_RETRIES = 4
 RETRY_DELAY = 3
@@ -26,12 +30,30 @@ ERROR_CODE_EXCEPTIONS = {
     "InternalServerError": plain2code_exceptions.InternalServerError,
 }
 
+# Limits the API requests in flight across all renders of the process (see `codeplain batch`)
+api_request_limit = ConcurrencyLimit()
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """The HTTP session shared by the API clients of the process, so that the connections to the API are reused."""
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
 
 class CodeplainAPI:
 
-    def __init__(self, api_key, console):
+    def __init__(self, api_key, console, run_control: Optional[RunControl] = None):
         self.api_key = api_key
         self.console = console
+        # Cancelling the render on the run control abandons the requests in flight and the waits between retries
+        self.run_control = run_control
 
     @property
     def api_url(self):
@@ -73,7 +95,10 @@ class CodeplainAPI:
                     f"Retrying in {retry_delay} seconds...",
                     color=RETRY_COLOR,
                 )
-            time.sleep(retry_delay)
+            if self.run_control is None:
+                time.sleep(retry_delay)
+            elif self.run_control.wait_for_cancel(retry_delay):
+                raise plain2code_exceptions.RenderCancelledError()
             # Exponential backoff
             return retry_delay * 2
         else:
@@ -117,6 +142,7 @@ class CodeplainAPI:
         exception_class = ERROR_CODE_EXCEPTIONS[error_code]
         raise exception_class(message)
 
+    @profiled("api", name=lambda endpoint_url, **_: endpoint_url.rsplit("/", 1)[-1])
     def post_request(
         self,
         endpoint_url,
@@ -134,7 +160,13 @@ class CodeplainAPI:
 
         for attempt in range(num_retries + 1):
             try:
-                response = requests.post(endpoint_url, headers=headers, json=payload)
+                with api_request_limit.slot(self.run_control):
+                    if self.run_control is None:
+                        response = _get_session().post(endpoint_url, headers=headers, json=payload)
+                    else:
+                        response = self.run_control.call(
+                            _get_session().post, endpoint_url, headers=headers, json=payload
+                        )
 
                 try:
                     response_json = response.json()
@@ -148,6 +180,8 @@ class CodeplainAPI:
                 response.raise_for_status()
                 return response_json
 
+            except plain2code_exceptions.RenderCancelledError:
+                raise
             except Exception as e:
                 # For other errors, check if they should be retried
                 if response_json is not None and "error_code" in response_json:
@@ -0,0 +1,66 @@
+"""Process-wide limits on how many operations of a kind run at the same time (see `codeplain batch`)."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
+
+if TYPE_CHECKING:
+    from run_control import RunControl
+
+
+class ConcurrencyLimit:
+    """
+    Limits how many blocks run at the same time. Without a limit (the default), a block runs right away.
+
+    The limit is set before the blocks it applies to start and is not changed while they run.
+    """
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self._condition = threading.Condition()
+        self._running = 0
+        self._waited_ns = 0
+
+    def set_limit(self, limit: Optional[int]) -> None:
+        if limit is not None and limit < 1:
+            raise ValueError(f"The concurrency limit must be at least 1, got {limit}.")
+        with self._condition:
+            self.limit = limit
+            self._waited_ns = 0
+            self._condition.notify_all()
+
+    @property
+    def waited_seconds(self) -> float:
+        """Time the blocks spent waiting for a free slot since the limit was set, summed over all blocks."""
+        with self._condition:
+            return self._waited_ns / 1e9
+
+    def _wake_up_waiting_blocks(self) -> None:
+        with self._condition:
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, run_control: Optional["RunControl"] = None) -> Iterator[None]:
+        """Run the block once a slot is free. Raises RenderCancelledError if the render is cancelled while waiting."""
+        if self.limit is None:
+            yield
+            return
+
+        start_ns = time.perf_counter_ns()
+        with self._condition:
+            if self._running >= self.limit and run_control is not None:
+                with run_control.on_cancel(self._wake_up_waiting_blocks):
+                    while self._running >= self.limit and not run_control.cancelled:
+                        self._condition.wait()
+                run_control.raise_if_cancelled()
+            else:
+                self._condition.wait_for(lambda: self._running < self.limit)
+            self._running += 1
+            self._waited_ns += time.perf_counter_ns() - start_ns
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                self._condition.notify()
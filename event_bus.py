@@ -1,7 +1,15 @@
-from collections import defaultdict
-from typing import Any, Callable, Type
+import logging
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Hashable, Optional, Type
 
-from plain2code_events import BaseEvent
+from plain2code_events import BaseEvent, LogMessageEmitted, TestScriptOutputEmitted
+
+# Events queued for a subscriber of the AsyncEventBus that has not processed them yet
+DEFAULT_MAX_QUEUED_EVENTS = 1000
+
+logger = logging.getLogger(__name__)
 
 
 class EventBus:
@@ -16,3 +24,190 @@ class EventBus:
         """Publishes an event to all registered listeners."""
         for listener in self._listeners[type(event)]:
             listener(event)
+
+
+def coalesce_test_script_outputs(
+    pending: TestScriptOutputEmitted, event: TestScriptOutputEmitted
+) -> Optional[TestScriptOutputEmitted]:
+    if (pending.script_type, pending.frid, pending.module) != (event.script_type, event.frid, event.module):
+        return None
+    return replace(pending, lines=pending.lines + event.lines)
+
+
+# How an event is merged into the event of the same type queued right before it, if the subscriber has not processed
+# that one yet. A policy returns None if the events cannot be merged. The RenderStateUpdated events are never merged,
+# since the subscribers react to every transition between the states.
+DEFAULT_COALESCE_POLICIES: dict[Type[BaseEvent], Callable[[Any, Any], Optional[BaseEvent]]] = {
+    TestScriptOutputEmitted: coalesce_test_script_outputs,
+}
+# Events that are dropped when the queue of a subscriber is full. For other events, the publisher waits for room.
+DEFAULT_DROPPABLE_EVENT_TYPES: tuple[Type[BaseEvent], ...] = (LogMessageEmitted,)
+
+
+@dataclass
+class SubscriberMetrics:
+    published: int = 0
+    delivered: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    # Times a publisher waited for room in the full queue of the subscriber
+    blocked: int = 0
+    failed: int = 0
+    queued: int = 0
+    max_queued: int = 0
+
+
+class _Subscriber:
+    """The listeners of a subscriber, with the queue of the events they have not processed yet and its thread."""
+
+    def __init__(self, name: str, event_bus: "AsyncEventBus"):
+        self.name = name
+        self.listeners: defaultdict[Type[BaseEvent], list[Callable[[Any], None]]] = defaultdict(list)
+        self.metrics = SubscriberMetrics()
+        self._event_bus = event_bus
+        self._condition = threading.Condition()
+        self._queue: deque[BaseEvent] = deque()
+        self._dispatching = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._dispatch, name=f"event-bus-{name}", daemon=True)
+        self._thread.start()
+
+    def put(self, event: BaseEvent) -> None:
+        event_bus = self._event_bus
+        with self._condition:
+            if self._closed:
+                return
+            self.metrics.published += 1
+            coalesce = event_bus.coalesce_policies.get(type(event))
+            if coalesce is not None and self._queue and type(self._queue[-1]) is type(event):
+                coalesced_event = coalesce(self._queue[-1], event)
+                if coalesced_event is not None:
+                    self._queue[-1] = coalesced_event
+                    self.metrics.coalesced += 1
+                    return
+
+            if len(self._queue) >= event_bus.max_queued_events:
+                if isinstance(event, event_bus.droppable_event_types):
+                    self.metrics.dropped += 1
+                    return
+                if threading.current_thread() is self._thread:
+                    # A listener publishing to its own subscriber would wait for itself
+                    self.metrics.dropped += 1
+                    return
+                self.metrics.blocked += 1
+                self._condition.wait_for(lambda: len(self._queue) < event_bus.max_queued_events or self._closed)
+                if self._closed:
+                    return
+
+            self._queue.append(event)
+            self.metrics.queued = len(self._queue)
+            self.metrics.max_queued = max(self.metrics.max_queued, self.metrics.queued)
+            self._condition.notify_all()
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                self._dispatching = False
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                event = self._queue.popleft()
+                self.metrics.queued = len(self._queue)
+                self._dispatching = True
+                self._condition.notify_all()
+
+            failed = 0
+            for listener in self.listeners[type(event)]:
+                try:
+                    listener(event)
+                except Exception:
+                    failed += 1
+                    logger.debug(f"Listener of subscriber {self.name} failed on {type(event).__name__}", exc_info=True)
+            with self._condition:
+                self.metrics.delivered += 1
+                self.metrics.failed += failed
+
+    def get_metrics(self) -> SubscriberMetrics:
+        with self._condition:
+            return replace(self.metrics)
+
+    def wait_until_delivered(self, timeout: Optional[float]) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._dispatching, timeout)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class AsyncEventBus(EventBus):
+    """
+    Event bus whose listeners run in a dispatch thread per subscriber, so a slow listener does not hold up the
+    publisher (the render).
+
+    The listeners registered for the same subscriber receive the events in the order they were published. The events
+    a subscriber has not processed yet wait in its queue of at most max_queued_events. An event is merged into the
+    queued event of the same type right before it if there is a coalesce policy for its type. When the queue is full,
+    droppable events are dropped and the publisher of any other event waits until there is room. The metrics of each
+    subscriber count the events that were queued, coalesced and dropped.
+    """
+
+    def __init__(
+        self,
+        max_queued_events: int = DEFAULT_MAX_QUEUED_EVENTS,
+        coalesce_policies: Optional[dict[Type[BaseEvent], Callable[[Any, Any], Optional[BaseEvent]]]] = None,
+        droppable_event_types: tuple[Type[BaseEvent], ...] = DEFAULT_DROPPABLE_EVENT_TYPES,
+    ):
+        super().__init__()
+        self.max_queued_events = max_queued_events
+        self.coalesce_policies = DEFAULT_COALESCE_POLICIES if coalesce_policies is None else coalesce_policies
+        self.droppable_event_types = droppable_event_types
+        self._lock = threading.Lock()
+        self._subscribers: dict[Hashable, _Subscriber] = {}
+
+    def subscribe(
+        self, event_type: Type[BaseEvent], listener: Callable[[Any], None], subscriber: Optional[Hashable] = None
+    ):
+        """
+        Registers a listener for a specific event type.
+
+        The listener belongs to the given subscriber. By default, the methods of an object belong to the object, so its
+        methods see its events in order, and any other listener is a subscriber of its own.
+        """
+        if subscriber is None:
+            subscriber = getattr(listener, "__self__", listener)
+        with self._lock:
+            if subscriber not in self._subscribers:
+                name = getattr(subscriber, "__qualname__", None) or type(subscriber).__name__
+                if any(existing.name == name for existing in self._subscribers.values()):
+                    name = f"{name}-{len(self._subscribers)}"
+                self._subscribers[subscriber] = _Subscriber(name, self)
+            self._subscribers[subscriber].listeners[event_type].append(listener)
+            self._listeners[event_type].append(listener)
+
+    def publish(self, event: BaseEvent):
+        """Queues the event for the subscribers with listeners for its type."""
+        with self._lock:
+            subscribers = [subscriber for subscriber in self._subscribers.values() if subscriber.listeners[type(event)]]
+        for subscriber in subscribers:
+            subscriber.put(event)
+
+    def get_metrics(self) -> dict[str, SubscriberMetrics]:
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        return {subscriber.name: subscriber.get_metrics() for subscriber in subscribers}
+
+    def wait_until_delivered(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the subscribers processed the queued events, and return whether they did within the timeout."""
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        return all(subscriber.wait_until_delivered(timeout) for subscriber in subscribers)
+
+    def close(self) -> None:
+        """Stop dispatching. The events that are still queued are not delivered."""
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for subscriber in subscribers:
+            subscriber.close()
@@ -1,7 +1,10 @@
 import os
 import shutil
 import stat
+import threading
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 from liquid2 import Environment, FileSystemLoader, StrictUndefined
 from liquid2.exceptions import UndefinedError
@@ -10,6 +13,7 @@ import plain_spec
 from plain2code_console import console
 from plain2code_exceptions import UnsupportedBase64Content, UnsupportedResourceType
 from plain2code_nodes import Plain2CodeIncludeTag, Plain2CodeLoaderMixin
+from plain2code_profiler import profiled
 from plain2code_utils import find_large_base64_blob
 from plain_modules import CODEPLAIN_MEMORY_SUBFOLDER, CODEPLAIN_METADATA_FOLDER
 
@@ -49,12 +53,16 @@ FILE_EXTENSION_MAPPING = {
 
 SYSTEM_FOLDERS = [".git", CODEPLAIN_METADATA_FOLDER, CODEPLAIN_MEMORY_SUBFOLDER]
 
+# The paths looked up by open_from and the templates loader of the current thread (see record_looked_up_paths)
+_looked_up_paths = threading.local()
+
 
 def is_system_folder_path(file_path: str) -> bool:
     parts = Path(file_path).parts
     return bool(parts) and parts[0] in SYSTEM_FOLDERS
 
 
+@profiled("file")
 def list_all_text_files(directory):
     all_files = []
     for root, dirs, files in os.walk(directory, topdown=True):
@@ -129,6 +137,7 @@ def add_current_path_if_no_path(filename):
     return filename
 
 
+@profiled("file")
 def get_existing_files_content(build_folder, existing_files):
     existing_files_content = {}
     for file_name in existing_files:
@@ -142,6 +151,7 @@ def get_existing_files_content(build_folder, existing_files):
     return existing_files_content
 
 
+@profiled("file")
 def store_response_files(target_folder, response_files, existing_files):
     for file_name in response_files:
         full_file_name = os.path.join(target_folder, file_name)
@@ -167,9 +177,34 @@ def store_response_files(target_folder, response_files, existing_files):
     return existing_files
 
 
+@contextmanager
+def record_looked_up_paths() -> Iterator[set[str]]:
+    """
+    Collect the paths of the files that open_from and the templates loader look up in the block, found or not.
+
+    What is read in the block depends only on these files, so it is still up to date if none of them changed.
+    """
+    outer_paths = getattr(_looked_up_paths, "paths", None)
+    paths: set[str] = set()
+    _looked_up_paths.paths = paths
+    try:
+        yield paths
+    finally:
+        _looked_up_paths.paths = outer_paths
+        if outer_paths is not None:
+            outer_paths.update(paths)
+
+
+def _record_looked_up_path(path) -> None:
+    paths = getattr(_looked_up_paths, "paths", None)
+    if paths is not None:
+        paths.add(os.path.abspath(path))
+
+
 def open_from(dirs, file_name):
     for dir in dirs:
         full_file_name = os.path.join(dir, file_name)
+        _record_looked_up_path(full_file_name)
         if not os.path.isfile(full_file_name):
             continue
 
@@ -228,6 +263,8 @@ class TrackingFileSystemLoader(Plain2CodeLoaderMixin, FileSystemLoader):
         self.loaded_templates = {}
 
     def get_source(self, environment, template_name, **kwargs):
+        for search_path in self.search_path:
+            _record_looked_up_path(os.path.join(search_path, template_name))
         source = super().get_source(environment, template_name, **kwargs)
         self.loaded_templates[template_name] = source.source
         return source
@@ -262,6 +299,7 @@ def update_build_folder_with_rendered_files(build_folder, existing_files, respon
     return existing_files, changed_files
 
 
+@profiled("file")
 def copy_folder_content(source_folder, destination_folder, ignore_folders=None):
     """
     Recursively copy all files and folders from source_folder to destination_folder.
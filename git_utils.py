@@ -1,12 +1,17 @@
 import os
 import re
+import shutil
+import tempfile
+import threading
 from configparser import NoOptionError, NoSectionError
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
 
 from git import Repo
+from git.exc import GitCommandError
 
 import file_utils
 from plain2code_exceptions import InvalidGitRepositoryError
+from plain2code_profiler import profiled
 
 FUNCTIONAL_REQUIREMENT_IMPLEMENTED_COMMIT_MESSAGE = "[Codeplain] Implemented code and unit tests for functionality {}"
 REFACTORED_CODE_COMMIT_MESSAGE = "[Codeplain] Refactored code after implementing functionality {}"
@@ -25,6 +30,49 @@ RENDERED_FRID_MESSAGE = "Changes related to functionality ID (FRID): {}"
 MODULE_NAME_MESSAGE = "Module name: {}"
 RENDER_ID_MESSAGE = "Render ID: {}"
 
+# Git access backends. The GitPython backend opens a new repository handle (and thereby new git
+# processes) on every call. The persistent backend keeps one handle per repository, so its
+# long-lived `git cat-file --batch` processes serve all object reads of a render.
+GIT_BACKEND_GITPYTHON = "gitpython"
+GIT_BACKEND_PERSISTENT = "persistent"
+GIT_BACKENDS = [GIT_BACKEND_GITPYTHON, GIT_BACKEND_PERSISTENT]
+
+# Kinds of checkpoint commits tracked by the commit index
+COMMIT_KIND_INITIAL = "initial"
+COMMIT_KIND_BASE_FOLDER = "base_folder"
+COMMIT_KIND_IMPLEMENTED = "implemented"
+COMMIT_KIND_REFACTORED = "refactored"
+COMMIT_KIND_CONFORMANCE_TESTS_PASSED = "conformance_tests_passed"
+COMMIT_KIND_FINISHED = "finished"
+
+# Record/field separators for the single `git log` pass that builds the commit index
+_LOG_RECORD_SEPARATOR = "\x1e"
+_LOG_FIELD_SEPARATOR = "\x00"
+_LOG_FORMAT = "%x1e%H%x00%B"
+
+# Wildcard used as the frid/module part of an index key to match any frid/module
+_ANY = object()
+
+
+def _message_regex(message_template: str) -> re.Pattern:
+    """Turns a commit message template with a single `{}` placeholder into a regex capturing the frid."""
+    prefix, suffix = message_template.split("{}")
+    return re.compile(re.escape(prefix) + r"(\S+)" + re.escape(suffix))
+
+
+_FRID_COMMIT_KIND_PATTERNS = [
+    (COMMIT_KIND_FINISHED, _message_regex(FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE)),
+    (COMMIT_KIND_REFACTORED, _message_regex(REFACTORED_CODE_COMMIT_MESSAGE)),
+    (COMMIT_KIND_IMPLEMENTED, _message_regex(FUNCTIONAL_REQUIREMENT_IMPLEMENTED_COMMIT_MESSAGE)),
+]
+_FIXED_COMMIT_KIND_MESSAGES = [
+    (COMMIT_KIND_CONFORMANCE_TESTS_PASSED, CONFORMANCE_TESTS_PASSED_COMMIT_MESSAGE),
+    (COMMIT_KIND_BASE_FOLDER, BASE_FOLDER_COMMIT_MESSAGE),
+    (COMMIT_KIND_INITIAL, INITIAL_COMMIT_MESSAGE),
+]
+_RENDERED_FRID_REGEX = re.compile(re.escape(RENDERED_FRID_MESSAGE.format("")) + r"(\S+)")
+_MODULE_NAME_REGEX = re.compile(r"Module name:\s*(\S+)")
+
 
 def _get_full_commit_message(message, module_name, frid, render_id) -> str:
     full_message = message
@@ -60,6 +108,294 @@ def _ensure_git_config(repo: Repo) -> None:
             writer.set_value("user", "email", "codeplain@localhost")
 
 
+_git_backend = GIT_BACKEND_GITPYTHON
+_repo_handles: dict[str, tuple[tuple[int, int], Repo]] = {}
+_repo_handles_lock = threading.Lock()
+
+
+def set_git_backend(backend: str) -> None:
+    """Selects the git access backend (one of GIT_BACKENDS) used by all functions of this module."""
+    global _git_backend
+
+    if backend not in GIT_BACKENDS:
+        raise ValueError(f"Unknown git backend: {backend}. Supported backends: {', '.join(GIT_BACKENDS)}")
+    if backend != GIT_BACKEND_PERSISTENT:
+        close_repo_handles()
+    _git_backend = backend
+
+
+def close_repo_handles() -> None:
+    """Closes all repository handles (and their git processes) kept by the persistent backend."""
+    with _repo_handles_lock:
+        for _, repo in _repo_handles.values():
+            repo.close()
+        _repo_handles.clear()
+
+
+def _forget_repo(repo_path: Union[str, os.PathLike]) -> None:
+    """Closes the persistent handle of a repository that is about to be deleted or re-initialized."""
+    with _repo_handles_lock:
+        handle = _repo_handles.pop(os.path.realpath(repo_path), None)
+    if handle is not None:
+        handle[1].close()
+
+
+def _open_repo(repo_path: Union[str, os.PathLike]) -> Repo:
+    """
+    Returns a repository handle for the given path.
+
+    With the persistent backend the handle is reused for as long as the `.git` folder stays the same
+    (same device and inode), so a repository deleted and re-created in place gets a fresh handle.
+    """
+    if _git_backend != GIT_BACKEND_PERSISTENT:
+        return Repo(repo_path)
+
+    key = os.path.realpath(repo_path)
+    try:
+        git_dir_stat = os.stat(os.path.join(key, ".git"))
+    except OSError:
+        # Let GitPython raise its usual error for a missing path or repository
+        return Repo(repo_path)
+    identity = (git_dir_stat.st_dev, git_dir_stat.st_ino)
+
+    with _repo_handles_lock:
+        handle = _repo_handles.get(key)
+        if handle is not None and handle[0] == identity:
+            return handle[1]
+        if handle is not None:
+            handle[1].close()
+
+        repo = Repo(key)
+        _repo_handles[key] = (identity, repo)
+        return repo
+
+
+def _classify_commit_message(message: str) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Classifies a commit message into (kind, frid, module name).
+
+    Kind is None for commits that are not checkpoints (e.g. ad-hoc commits). Frid-specific
+    checkpoints take the frid from the message itself, the others from the FRID trailer.
+    """
+    module_match = _MODULE_NAME_REGEX.search(message)
+    module_name = module_match.group(1) if module_match else None
+
+    for kind, pattern in _FRID_COMMIT_KIND_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return kind, match.group(1), module_name
+
+    for kind, kind_message in _FIXED_COMMIT_KIND_MESSAGES:
+        if kind_message in message:
+            frid_match = _RENDERED_FRID_REGEX.search(message)
+            return kind, frid_match.group(1) if frid_match else None, module_name
+
+    return None, None, module_name
+
+
+class _CommitIndex:
+    """
+    Index of the checkpoint commits of a single branch of a repository.
+
+    Maps (commit kind, frid, module name) to the latest commit of that kind, where the frid and the
+    module name can also be `_ANY`. Commits are kept in history order (oldest first) so the index can be
+    truncated in memory when the branch is reset to one of the indexed commits.
+    """
+
+    def __init__(self, branch: str):
+        self.branch = branch
+        self.head: Optional[str] = None
+        self.commits: list[tuple[str, str]] = []
+        self.positions: dict[str, int] = {}
+        self.latest: dict[tuple, int] = {}
+
+    def append(self, sha: str, message: str) -> None:
+        position = len(self.commits)
+        self.commits.append((sha, message))
+        self.positions[sha] = position
+        self.head = sha
+
+        kind, frid, module_name = _classify_commit_message(message)
+        if kind is None:
+            return
+        for frid_key in (frid, _ANY):
+            for module_key in (module_name, _ANY):
+                self.latest[(kind, frid_key, module_key)] = position
+
+    def truncate(self, sha: str) -> None:
+        """Drops all commits after the given (indexed) commit."""
+        commits = self.commits[: self.positions[sha] + 1]
+        self.commits = []
+        self.positions = {}
+        self.latest = {}
+        for commit_sha, message in commits:
+            self.append(commit_sha, message)
+
+    def find(self, kind: str, frid=_ANY, module_name=_ANY) -> tuple[str, Optional[str]]:
+        """Returns (sha, message) of the latest commit matching the key, or ("", None) if there is none."""
+        position = self.latest.get((kind, frid, module_name))
+        if position is None:
+            return "", None
+        return self.commits[position]
+
+    def is_before(self, first_sha: str, second_sha: str) -> bool:
+        return self.positions[first_sha] <= self.positions[second_sha]
+
+
+# HEAD and index of each repository at the point where git_utils last left its working tree without unknown changes.
+# While both stay there, the paths reported by the caller are all that changed and can be staged on their own.
+_clean_worktree_states: dict[str, tuple[str, Optional[tuple[int, int]]]] = {}
+_clean_worktree_states_lock = threading.Lock()
+
+
+def _get_worktree_state(repo: Repo) -> tuple[str, Optional[tuple[int, int]]]:
+    """HEAD of the repository and the mtime and size of its index, which any git command staging files rewrites."""
+    try:
+        index_stat = os.stat(repo.index.path)
+    except FileNotFoundError:
+        return repo.head.commit.hexsha, None
+    return repo.head.commit.hexsha, (index_stat.st_mtime_ns, index_stat.st_size)
+
+
+def _mark_worktree_clean(repo: Repo) -> None:
+    with _clean_worktree_states_lock:
+        _clean_worktree_states[os.path.realpath(repo.working_dir)] = _get_worktree_state(repo)
+
+
+def _forget_worktree(repo: Repo) -> None:
+    with _clean_worktree_states_lock:
+        _clean_worktree_states.pop(os.path.realpath(repo.working_dir), None)
+
+
+def forget_worktrees() -> None:
+    """
+    Forgets the state of all working trees, so that changes made outside of this process since are staged too.
+
+    A long-lived process (see plain2code_server) calls this before each render.
+    """
+    with _clean_worktree_states_lock:
+        _clean_worktree_states.clear()
+
+
+def _get_status_paths(repo: Repo) -> set[str]:
+    """Returns the paths with uncommitted changes, untracked files included and ignored files excluded."""
+    status = repo.git.status("--porcelain", "-z", "--untracked-files=all", strip_newline_in_stdout=False)
+    paths = set()
+    entries = iter(status.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        paths.add(os.path.normpath(entry[3:]))
+        if entry[0] in "RC":
+            # Renames and copies are followed by their source path
+            paths.add(os.path.normpath(next(entries)))
+    return paths
+
+
+def _has_external_changes(repo: Repo, changed_paths: Iterable[str]) -> bool:
+    """
+    Checks if files outside of the given paths may have changed since git_utils last knew the working tree.
+
+    While HEAD and the index are where git_utils left them, the given paths are trusted without looking at the
+    working tree. Otherwise (first commit after forget_worktrees, a commit, reset or checkout made outside of
+    git_utils, ...) `git status` tells once whether files outside of the given paths changed.
+    """
+    with _clean_worktree_states_lock:
+        clean_state = _clean_worktree_states.get(os.path.realpath(repo.working_dir))
+    if clean_state is not None and clean_state == _get_worktree_state(repo):
+        return False
+    reported_paths = {os.path.normpath(path) for path in changed_paths}
+    return not _get_status_paths(repo) <= reported_paths
+
+
+def _stage_changes(repo: Repo, changed_paths: Optional[Iterable[str]], intent_to_add: bool = False) -> None:
+    """
+    Stages the changes of the working tree (or only records intent to add untracked files).
+
+    If `changed_paths` is given and there are no external changes, only those paths are staged, so git doesn't
+    need to stat and walk the untouched part of the working tree. Otherwise all files are added.
+    """
+    add_flag = "-N" if intent_to_add else "-A"
+    if changed_paths is not None:
+        changed_paths = list(changed_paths)
+    if changed_paths is None or _has_external_changes(repo, changed_paths):
+        repo.git.add(add_flag, ".")
+        return
+
+    existing_paths = []
+    deleted_paths = []
+    for path in sorted(set(changed_paths)):
+        if os.path.lexists(os.path.join(repo.working_dir, path)):
+            existing_paths.append(path)
+        else:
+            deleted_paths.append(path)
+
+    if existing_paths:
+        try:
+            repo.git.add(add_flag, "--", *existing_paths, env={"GIT_LITERAL_PATHSPECS": "1"})
+        except GitCommandError as e:
+            # Like `git add .`, skip ignored files. git still stages the other paths but exits with status 1.
+            if e.status != 1 or "ignored by one of your .gitignore files" not in str(e.stderr):
+                raise
+    if deleted_paths and not intent_to_add:
+        repo.git.rm("--cached", "--ignore-unmatch", "-q", "--", *deleted_paths, env={"GIT_LITERAL_PATHSPECS": "1"})
+    # Only the reported paths were staged, so the working tree still has no unknown changes
+    _mark_worktree_clean(repo)
+
+
+_commit_indexes: dict[str, _CommitIndex] = {}
+_commit_indexes_lock = threading.Lock()
+
+
+def _build_commit_index(repo: Repo, branch: str) -> _CommitIndex:
+    index = _CommitIndex(branch)
+    log_output = repo.git.log(branch, "--reverse", f"--format={_LOG_FORMAT}", strip_newline_in_stdout=False)
+    for record in log_output.split(_LOG_RECORD_SEPARATOR):
+        if not record:
+            continue
+        sha, message = record.split(_LOG_FIELD_SEPARATOR, 1)
+        index.append(sha, message)
+    return index
+
+
+def _get_commit_index(repo: Repo) -> _CommitIndex:
+    """
+    Returns the commit index of the active branch, validated against the current HEAD.
+
+    The index is built with a single `git log` pass and cached per repository. If HEAD was reset to an
+    indexed commit the cached index is truncated, otherwise (new commits made outside of this module,
+    re-initialized repository, different branch) it is rebuilt.
+    """
+    branch = repo.active_branch.name
+    head = repo.head.commit.hexsha
+    key = os.path.realpath(repo.working_dir)
+
+    with _commit_indexes_lock:
+        index = _commit_indexes.get(key)
+        if index is not None and index.branch == branch:
+            if index.head == head:
+                return index
+            if head in index.positions:
+                index.truncate(head)
+                return index
+
+        index = _build_commit_index(repo, branch)
+        _commit_indexes[key] = index
+        return index
+
+
+def _record_commit(repo: Repo, previous_head: str, message: str) -> None:
+    """Appends a commit just made on top of `previous_head` to the cached commit index, if it is up to date."""
+    key = os.path.realpath(repo.working_dir)
+    with _commit_indexes_lock:
+        index = _commit_indexes.get(key)
+        if index is None or index.head != previous_head:
+            return
+        # git stores the message with trailing whitespace stripped and a final newline
+        index.append(repo.head.commit.hexsha, message.rstrip() + "\n")
+
+
+@profiled("git")
 def init_git_repo(
     path_to_repo: Union[str, os.PathLike],
     module_name: Optional[str] = None,
@@ -70,6 +406,7 @@ def init_git_repo(
     If folder does not exist, it creates it.
     If the folder already exists, it deletes the content of the folder.
     """
+    _forget_repo(path_to_repo)
     if os.path.isdir(path_to_repo):
         file_utils.delete_files_and_subfolders(path_to_repo)
     else:
@@ -81,59 +418,105 @@ def init_git_repo(
     repo.git.commit(
         "--allow-empty", "-m", _get_full_commit_message(INITIAL_COMMIT_MESSAGE, module_name, None, render_id)
     )
+    _mark_worktree_clean(repo)
 
     return repo
 
 
+@profiled("git")
 def clone_repo(
     source_repo_path: str,
     new_repo_path: str,
     module_name: Optional[str] = None,
     render_id: Optional[str] = None,
 ) -> Repo:
+    _forget_repo(new_repo_path)
     repo = Repo.clone_from(source_repo_path, new_repo_path)
 
     repo.git.commit(
         "--allow-empty", "-m", _get_full_commit_message(INITIAL_COMMIT_MESSAGE, module_name, None, render_id)
     )
+    _mark_worktree_clean(repo)
 
 
+@profiled("git")
 def is_dirty(repo_path: Union[str, os.PathLike]) -> bool:
     """Checks if the repository is dirty."""
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
     return repo.is_dirty(untracked_files=True)
 
 
+@profiled("git")
+def get_working_tree_sha(repo_path: Union[str, os.PathLike]) -> str:
+    """
+    Returns the SHA of the git tree the working tree would be committed as, including uncommitted and untracked
+    (but not ignored) files.
+
+    The tree is written through a copy of the index, so neither the index nor HEAD of the repository change.
+    Starting from a copy keeps git's stat cache, so only modified files are hashed again.
+    """
+    repo = _open_repo(repo_path)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = os.path.join(temp_dir, "index")
+        if os.path.exists(repo.index.path):
+            shutil.copyfile(repo.index.path, index_path)
+        env = {"GIT_INDEX_FILE": index_path}
+        repo.git.add("-A", ".", env=env)
+        return repo.git.write_tree(env=env)
+
+
+@profiled("git")
+def get_head_sha(repo_path: Union[str, os.PathLike]) -> Optional[str]:
+    """Returns the SHA of HEAD, or None if there is no repository at repo_path or it has no commits yet."""
+    if not os.path.isdir(os.path.join(repo_path, ".git")):
+        return None
+    try:
+        return _open_repo(repo_path).head.commit.hexsha
+    except ValueError:
+        return None
+
+
+@profiled("git")
 def add_all_files_and_commit(
     repo_path: Union[str, os.PathLike],
     commit_message: str,
     module_name: Optional[str] = None,
     frid: Optional[str] = None,
     render_id: Optional[str] = None,
+    changed_paths: Optional[Iterable[str]] = None,
 ) -> Repo:
-    """Adds all files to the git repository and commits them."""
-    repo = Repo(repo_path)
-    repo.git.add(".")
+    """
+    Adds all files to the git repository and commits them.
+
+    If `changed_paths` (paths relative to the repository root that were written or deleted since the last
+    commit) is given, only those paths are staged unless changes made outside of git_utils are detected.
+    """
+    repo = _open_repo(repo_path)
+    _stage_changes(repo, changed_paths)
 
     message = _get_full_commit_message(commit_message, module_name, frid, render_id)
+    previous_head = repo.head.commit.hexsha
 
-    # Check if there are any changes to commit
-    if not repo.is_dirty(untracked_files=True):
-        repo.git.commit("--allow-empty", "-m", message)
-    else:
-        repo.git.commit("-m", message)
+    # --allow-empty keeps a checkpoint commit even if there is nothing to commit
+    repo.git.commit("--allow-empty", "-m", message)
+
+    _record_commit(repo, previous_head, message)
+    _mark_worktree_clean(repo)
 
     return repo
 
 
+@profiled("git")
 def revert_changes(repo_path: Union[str, os.PathLike]) -> Repo:
     """Reverts all changes made since the last commit."""
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
     repo.git.reset("--hard")
     repo.git.clean("-xdf")
+    _mark_worktree_clean(repo)
     return repo
 
 
+@profiled("git")
 def revert_to_commit_with_frid(repo_path: Union[str, os.PathLike], frid: Optional[str] = None) -> Repo:
     """
     Finds commit with given frid mentioned in the commit message and reverts the branch to it.
@@ -144,7 +527,7 @@ def revert_to_commit_with_frid(repo_path: Union[str, os.PathLike], frid: Optiona
     It is expected that the repo has at least one commit related to provided frid if frid is not None.
     In case the frid related commit is not found, an exception is raised.
     """
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
 
     commit = _get_commit(repo, frid)
 
@@ -153,9 +536,11 @@ def revert_to_commit_with_frid(repo_path: Union[str, os.PathLike], frid: Optiona
 
     repo.git.reset("--hard", commit)
     repo.git.clean("-xdf")
+    _mark_worktree_clean(repo)
     return repo
 
 
+@profiled("git")
 def checkout_commit_with_frid(repo_path: Union[str, os.PathLike], frid: Optional[str] = None) -> Repo:
     """
     Finds commit with given frid mentioned in the commit message and checks out that commit.
@@ -166,7 +551,7 @@ def checkout_commit_with_frid(repo_path: Union[str, os.PathLike], frid: Optional
     It is expected that the repo has at least one commit related to provided frid if frid is not None.
     In case the frid related commit is not found, an exception is raised.
     """
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
 
     commit = _get_commit(repo, frid)
 
@@ -174,9 +559,11 @@ def checkout_commit_with_frid(repo_path: Union[str, os.PathLike], frid: Optional
         raise InvalidGitRepositoryError("Git repository is in an invalid state. Relevant commit could not be found.")
 
     repo.git.checkout(commit)
+    _forget_worktree(repo)
     return repo
 
 
+@profiled("git")
 def checkout_previous_branch(repo_path: Union[str, os.PathLike]) -> Repo:
     """
     Checks out the previous branch using 'git checkout -'.
@@ -187,11 +574,45 @@ def checkout_previous_branch(repo_path: Union[str, os.PathLike]) -> Repo:
     Returns:
         Repo: The git repository object
     """
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
     repo.git.checkout("-")
+    _forget_worktree(repo)
     return repo
 
 
+@profiled("git")
+def read_files_at_frid(repo_path: Union[str, os.PathLike], frid: Optional[str] = None) -> dict[str, str]:
+    """
+    Reads the text files committed for the given frid without touching the working tree.
+
+    The commit is resolved the same way as in `checkout_commit_with_frid`. Files in system folders,
+    binary files and files that are not valid UTF-8 are skipped, mirroring `file_utils.list_all_text_files`.
+
+    Returns:
+        dict: Dictionary with file names (relative to the repository root) as keys and their content as values
+    """
+    repo = _open_repo(repo_path)
+
+    commit = _get_commit(repo, frid)
+    if not commit:
+        raise InvalidGitRepositoryError("Git repository is in an invalid state. Relevant commit could not be found.")
+
+    files_content = {}
+    for item in repo.commit(commit).tree.traverse(
+        # System folders are skipped at any depth, as os.walk prunes them in list_all_text_files
+        prune=lambda item, _depth: item.type == "tree"
+        and item.name in file_utils.SYSTEM_FOLDERS
+    ):
+        if item.type != "blob" or any(item.path.endswith(ending) for ending in file_utils.BINARY_FILE_EXTENSIONS):
+            continue
+        try:
+            files_content[os.path.normpath(item.path)] = item.data_stream.read().decode("utf-8")
+        except UnicodeDecodeError:
+            continue
+
+    return files_content
+
+
 def _get_diff_dict(diff_output: str) -> dict:
     diff_dict = {}
     current_file = None
@@ -241,7 +662,12 @@ def _get_diff_dict(diff_output: str) -> dict:
     return diff_dict
 
 
-def diff(repo_path: Union[str, os.PathLike], previous_frid: str = None) -> dict:
+@profiled("git")
+def diff(
+    repo_path: Union[str, os.PathLike],
+    previous_frid: str = None,
+    changed_paths: Optional[Iterable[str]] = None,
+) -> dict:
     """
     Get the git diff between the current code state and the previous frid using git's native diff command.
     If previous_frid is not provided, we try to find the commit related to the copy of the base folder.
@@ -251,16 +677,18 @@ def diff(repo_path: Union[str, os.PathLike], previous_frid: str = None) -> dict:
     Args:
         repo_path (str | os.PathLike): Path to the git repository
         previous_frid (str): functionality ID (FRID) of the previous commit
+        changed_paths (Iterable[str] | None): paths written or deleted since the last commit. If given, only
+            these are added to the index (unless changes made outside of git_utils are detected).
 
     Returns:
         dict: Dictionary with file names as keys and their clean diff strings as values
     """
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
 
     commit = _get_commit(repo, previous_frid)
 
     # Add all files to the index to get a clean diff
-    repo.git.add("-N", ".")
+    _stage_changes(repo, changed_paths, intent_to_add=True)
 
     # Get the raw git diff output, excluding .pyc files
     diff_output = repo.git.diff(commit, "--text", ":!*.pyc")
@@ -278,9 +706,11 @@ def _get_commit(repo: Repo, frid: Optional[str]) -> str:
             raise InvalidGitRepositoryError(f"No commit with frid {frid} found.")
         return commit_with_frid
 
+    index = _get_commit_index(repo)
     base_folder_commit = _get_base_folder_commit(repo)
     initial_commit = _get_initial_commit(repo)
-    if base_folder_commit and repo.is_ancestor(repo.commit(initial_commit), repo.commit(base_folder_commit)):
+    # Rendered repositories have linear history, so ancestry follows the position in the index
+    if base_folder_commit and index.is_before(initial_commit, base_folder_commit):
         return base_folder_commit
     return initial_commit
 
@@ -298,58 +728,43 @@ def _get_commit_with_frid(repo: Repo, frid: str, module_name: Optional[str] = No
     Returns:
         str: Commit SHA if found, empty string otherwise
     """
-    commit_message_pattern = FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format(frid)
-
-    # If no module name filtering is needed, use the original logic
-    if not module_name:
-        return _get_commit_with_message(repo, commit_message_pattern)
-
-    # Use multiple grep patterns with --all-match for AND condition
-    escaped_frid_message = commit_message_pattern.replace("[", "\\[").replace("]", "\\]")
-    module_name_pattern = MODULE_NAME_MESSAGE.format(module_name)
-    escaped_module_message = module_name_pattern.replace("[", "\\[").replace("]", "\\]")
-
-    return repo.git.rev_list(
-        repo.active_branch.name,
-        "--grep",
-        escaped_frid_message,
-        "--grep",
-        escaped_module_message,
-        "--all-match",
-        "-n",
-        "1",
-    )
+    sha, _ = _get_commit_index(repo).find(COMMIT_KIND_FINISHED, frid, module_name or _ANY)
+    return sha
 
 
 def has_commit_for_frid(repo_path: Union[str, os.PathLike], frid: str, module_name: Optional[str] = None) -> bool:
-    return bool(_get_commit_with_frid(Repo(repo_path), frid, module_name))
+    return bool(_get_commit_with_frid(_open_repo(repo_path), frid, module_name))
 
 
 def _get_base_folder_commit(repo: Repo) -> str:
     """Finds commit related to copy of the base folder."""
-    return _get_commit_with_message(repo, BASE_FOLDER_COMMIT_MESSAGE)
+    return _get_commit_of_kind(repo, COMMIT_KIND_BASE_FOLDER)
 
 
 def _get_initial_commit(repo: Repo) -> str:
     """Finds initial commit."""
-    return _get_commit_with_message(repo, INITIAL_COMMIT_MESSAGE)
+    return _get_commit_of_kind(repo, COMMIT_KIND_INITIAL)
 
 
-def _get_commit_with_message(repo: Repo, message: str) -> str:
-    """Finds commit with given message."""
-    escaped_message = message.replace("[", "\\[").replace("]", "\\]")
+def _get_commit_of_kind(repo: Repo, kind: str, frid=_ANY) -> str:
+    """Finds the latest commit of the given kind (optionally for the given frid)."""
+    sha, _ = _get_commit_index(repo).find(kind, frid)
+    return sha
 
-    return repo.git.rev_list(repo.active_branch.name, "--grep", escaped_message, "-n", "1")
+
+def _get_implementation_commit(repo: Repo, frid: str) -> str:
+    """Finds the refactored code commit for the frid, falling back to the implemented code commit."""
+    implementation_commit = _get_commit_of_kind(repo, COMMIT_KIND_REFACTORED, frid)
+    if not implementation_commit:
+        implementation_commit = _get_commit_of_kind(repo, COMMIT_KIND_IMPLEMENTED, frid)
+    return implementation_commit
 
 
+@profiled("git")
 def get_implementation_code_diff(repo_path: Union[str, os.PathLike], frid: str, previous_frid: str) -> dict:
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
 
-    implementation_commit = _get_commit_with_message(repo, REFACTORED_CODE_COMMIT_MESSAGE.format(frid))
-    if not implementation_commit:
-        implementation_commit = _get_commit_with_message(
-            repo, FUNCTIONAL_REQUIREMENT_IMPLEMENTED_COMMIT_MESSAGE.format(frid)
-        )
+    implementation_commit = _get_implementation_commit(repo, frid)
 
     previous_frid_commit = _get_commit(repo, previous_frid)
 
@@ -362,18 +777,13 @@ def get_implementation_code_diff(repo_path: Union[str, os.PathLike], frid: str,
     return _get_diff_dict(diff_output)
 
 
+@profiled("git")
 def get_fixed_implementation_code_diff(repo_path: Union[str, os.PathLike], frid: str) -> dict:
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
 
-    implementation_commit = _get_commit_with_message(repo, REFACTORED_CODE_COMMIT_MESSAGE.format(frid))
-    if not implementation_commit:
-        implementation_commit = _get_commit_with_message(
-            repo, FUNCTIONAL_REQUIREMENT_IMPLEMENTED_COMMIT_MESSAGE.format(frid)
-        )
+    implementation_commit = _get_implementation_commit(repo, frid)
 
-    conformance_tests_passed_commit = _get_commit_with_message(
-        repo, CONFORMANCE_TESTS_PASSED_COMMIT_MESSAGE.format(frid)
-    )
+    conformance_tests_passed_commit = _get_commit_of_kind(repo, COMMIT_KIND_CONFORMANCE_TESTS_PASSED, frid)
     if not conformance_tests_passed_commit:
         return None
 
@@ -396,7 +806,7 @@ def get_repo_info(repo_path: Union[str, os.PathLike]) -> dict:
       - is_dirty: boolean (includes untracked files)
       - remotes: dict mapping remote name to list of URLs
     """
-    repo = Repo(repo_path)
+    repo = _open_repo(repo_path)
 
     info = {"path": os.path.abspath(repo_path)}
 
@@ -429,23 +839,15 @@ def get_last_rendered_functionality(repo_path: Union[str, os.PathLike]) -> tuple
     if not os.path.exists(repo_path):
         return None, None
 
-    repo = Repo(repo_path)
-    grep_pattern = FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format(".*")
-    grep_pattern = grep_pattern.replace("[", "\\[").replace("]", "\\]")
-    commit_sha = repo.git.rev_list(repo.active_branch.name, "--grep", grep_pattern, "-n", "1")
+    index = _get_commit_index(_open_repo(repo_path))
+    _, commit_message = index.find(COMMIT_KIND_FINISHED)
 
-    if not commit_sha:
+    if commit_message is None:
         # Repo was interrupted during the first functionality, fallback to initial commit and provide only module name
-        grep_pattern = INITIAL_COMMIT_MESSAGE
-        grep_pattern = grep_pattern.replace("[", "\\[").replace("]", "\\]")
-        commit_sha = repo.git.rev_list(repo.active_branch.name, "--grep", grep_pattern, "-n", "1")
-        if not commit_sha:
+        _, commit_message = index.find(COMMIT_KIND_INITIAL)
+        if commit_message is None:
             raise InvalidGitRepositoryError("Git repository is in an invalid state. Initial commit could not be found.")
 
-        commit_message = repo.commit(commit_sha).message
-        if isinstance(commit_message, bytes):
-            commit_message = commit_message.decode("utf-8")
-
         match = re.search(r"Module name:\s*(\S+)\n", commit_message)
         if not match:
             raise InvalidGitRepositoryError(
@@ -455,10 +857,6 @@ def get_last_rendered_functionality(repo_path: Union[str, os.PathLike]) -> tuple
         module_name = match.group(1)
         return module_name, None
 
-    commit_message = repo.commit(commit_sha).message
-    if isinstance(commit_message, bytes):
-        commit_message = commit_message.decode("utf-8")
-
     match = re.search(r"FRID\):(\S+) fully implemented", commit_message)
     if not match:
         raise InvalidGitRepositoryError(
@@ -1,5 +1,10 @@
 import json
 import os
+import re
+import tempfile
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Optional
 
 import file_utils
 from plain2code_console import console
@@ -8,24 +13,230 @@ from render_machine.render_context import RenderContext
 
 CONFORMANCE_TESTS_SUCCESS_EXIT_CODE = 0
 CONFORMANCE_TEST_MEMORY_SUBFOLDER = "conformance_test_memory"
+CONFORMANCE_TEST_MEMORY_INDEX_FILE_NAME = "conformance_test_memory_index.jsonl"
+RESOLVED_MEMORY_STATUS = "RESOLVED"
 
+# At most this many memory files, with at most this many characters in total, are sent with a request
+MAX_RELEVANT_MEMORY_FILES = 10
+MAX_RELEVANT_MEMORY_SIZE = 60_000
+MAX_MEMORY_KEYWORDS = 20
 
-class MemoryManager:
+# Relevance scores of a memory for the functionality a request is made for
+SAME_FRID_SCORE = 100
+RELATED_FRID_SCORE = 20
+SAME_MODULE_SCORE = 10
+
+_KEYWORD_PATTERN = re.compile(r"[a-z][a-z0-9_]{3,}")
+_IGNORED_KEYWORDS = {
+    "after",
+    "also",
+    "been",
+    "before",
+    "does",
+    "false",
+    "from",
+    "have",
+    "into",
+    "none",
+    "null",
+    "should",
+    "test",
+    "tests",
+    "that",
+    "the",
+    "their",
+    "then",
+    "there",
+    "this",
+    "true",
+    "when",
+    "which",
+    "with",
+}
+_FRID_FIELD_NAMES = ["frid", "functional_requirement_id"]
+_MODULE_FIELD_NAMES = ["module", "module_name"]
+
+
+def _get_words(text: str) -> list[str]:
+    return [word for word in _KEYWORD_PATTERN.findall(text.lower()) if word not in _IGNORED_KEYWORDS]
+
+
+def _get_string_values(value) -> list[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        return [string for item in value.values() for string in _get_string_values(item)]
+    if isinstance(value, list):
+        return [string for item in value for string in _get_string_values(item)]
+    return []
+
+
+def _is_related_frid(frid: str, other_frid: str) -> bool:
+    return frid.startswith(other_frid + ".") or other_frid.startswith(frid + ".")
+
+
+@dataclass
+class MemoryIndexEntry:
+    file_name: str
+    mtime_ns: int
+    size: int
+    is_valid: bool
+    frid: Optional[str] = None
+    module: Optional[str] = None
+    resolution_status: Optional[str] = None
+    keywords: list[str] = field(default_factory=list)
+
+    def get_relevance(self, frid: Optional[str], module_name: Optional[str], keywords: set[str]) -> int:
+        relevance = len(keywords.intersection(self.keywords))
+        if module_name is not None and self.module is not None and self.module != module_name:
+            return relevance
+        if module_name is not None and self.module == module_name:
+            relevance += SAME_MODULE_SCORE
+        if frid is not None and self.frid is not None:
+            if self.frid == frid:
+                relevance += SAME_FRID_SCORE
+            elif _is_related_frid(frid, self.frid):
+                relevance += RELATED_FRID_SCORE
+        return relevance
+
+
+class ConformanceTestMemoryIndex:
+    """
+    Index of the conformance test memory files of a module, stored as a JSON Lines file next to them.
+
+    The index keeps the FRID, module, resolution status and keywords of every memory file, so that memory files are
+    only parsed again when they change and requests only get the memories relevant to their functionality.
+    """
+
+    def __init__(self, memory_folder: str):
+        self.memory_path = os.path.join(memory_folder, CONFORMANCE_TEST_MEMORY_SUBFOLDER)
+        self.index_file_path = os.path.join(memory_folder, CONFORMANCE_TEST_MEMORY_INDEX_FILE_NAME)
+        self._entries: Optional[dict[str, MemoryIndexEntry]] = None
+
+    def _load(self) -> dict[str, MemoryIndexEntry]:
+        entries: dict[str, MemoryIndexEntry] = {}
+        if not os.path.exists(self.index_file_path):
+            return entries
+
+        with open(self.index_file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = MemoryIndexEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    # An index written by another version, the files are indexed again
+                    continue
+                entries[entry.file_name] = entry
+        return entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_file_path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            mode="w", encoding="utf-8", dir=os.path.dirname(self.index_file_path), delete=False, suffix=".tmp"
+        ) as temp_file:
+            for entry in self._entries.values():
+                temp_file.write(json.dumps(asdict(entry)) + "\n")
+        os.replace(temp_file.name, self.index_file_path)
 
-    @staticmethod
-    def fetch_memory_files(memory_folder: str) -> tuple[list[str], dict[str, str]]:
-        """Fetch memory files from memory_folder/conformance_test_memory."""
-        memory_path = os.path.join(memory_folder, CONFORMANCE_TEST_MEMORY_SUBFOLDER)
-        if not os.path.exists(memory_path):
-            return [], {}
-        memory_files = file_utils.list_all_text_files(memory_path)
-        memory_files_content = file_utils.get_existing_files_content(memory_path, memory_files)
-        console.debug(f"Loaded {len(memory_files_content)} memory files.")
-        return memory_files, memory_files_content
+    def _index_file(self, file_name: str, stat: os.stat_result) -> MemoryIndexEntry:
+        entry = MemoryIndexEntry(file_name=file_name, mtime_ns=stat.st_mtime_ns, size=stat.st_size, is_valid=False)
+        try:
+            with open(os.path.join(self.memory_path, file_name), "r", encoding="utf-8") as f:
+                content = json.load(f)
+        except (ValueError, OSError):
+            return entry
+
+        previous_entry = self._entries.get(file_name)
+        if isinstance(content, dict):
+            entry.frid = next((str(content[name]) for name in _FRID_FIELD_NAMES if content.get(name)), None)
+            entry.module = next((str(content[name]) for name in _MODULE_FIELD_NAMES if content.get(name)), None)
+            entry.resolution_status = content.get("resolution_status")
+        if previous_entry is not None:
+            # The memory may not name the functionality it was created for, but the index remembers it
+            entry.frid = entry.frid or previous_entry.frid
+            entry.module = entry.module or previous_entry.module
+
+        entry.is_valid = True
+        entry.keywords = [
+            word
+            for word, _ in Counter(_get_words(" ".join(_get_string_values(content)))).most_common(MAX_MEMORY_KEYWORDS)
+        ]
+        return entry
+
+    def refresh(self) -> dict[str, MemoryIndexEntry]:
+        """Bring the index up to date with the memory files, parsing only the files that changed."""
+        if self._entries is None:
+            self._entries = self._load()
+
+        changed = False
+        current_entries: dict[str, MemoryIndexEntry] = {}
+        if os.path.isdir(self.memory_path):
+            for root, dirs, files in os.walk(self.memory_path):
+                dirs[:] = [d for d in dirs if d not in file_utils.SYSTEM_FOLDERS]
+                for name in files:
+                    if any(name.endswith(ending) for ending in file_utils.BINARY_FILE_EXTENSIONS):
+                        continue
+                    file_path = os.path.join(root, name)
+                    file_name = os.path.relpath(file_path, self.memory_path)
+                    stat = os.stat(file_path)
+                    entry = self._entries.get(file_name)
+                    if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+                        entry = self._index_file(file_name, stat)
+                        changed = True
+                    current_entries[file_name] = entry
+
+        changed = changed or current_entries.keys() != self._entries.keys()
+        self._entries = current_entries
+        if changed:
+            self._save()
+        return self._entries
+
+    def set_origin(self, file_names: list[str], frid: Optional[str], module_name: Optional[str]):
+        """Record the functionality the memory files were created for, unless the memories name it themselves."""
+        entries = self.refresh()
+        for file_name in file_names:
+            entry = entries.get(file_name)
+            if entry is not None:
+                entry.frid = entry.frid or frid
+                entry.module = entry.module or module_name
+        self._save()
+
+    def get_relevant_file_names(self, frid: Optional[str], module_name: Optional[str], text: str = "") -> list[str]:
+        """Names of the memory files relevant to the functionality, the most relevant first."""
+        keywords = set(_get_words(text))
+        scored_entries = []
+        for entry in self.refresh().values():
+            if not entry.is_valid:
+                continue
+            relevance = entry.get_relevance(frid, module_name, keywords)
+            if relevance > 0:
+                scored_entries.append((relevance, entry.mtime_ns, entry))
+        scored_entries.sort(key=lambda scored_entry: (scored_entry[0], scored_entry[1]), reverse=True)
+
+        file_names = []
+        total_size = 0
+        for _, _, entry in scored_entries[:MAX_RELEVANT_MEMORY_FILES]:
+            if total_size + entry.size > MAX_RELEVANT_MEMORY_SIZE and file_names:
+                break
+            file_names.append(entry.file_name)
+            total_size += entry.size
+        return file_names
+
+
+class MemoryManager:
 
     def __init__(self, codeplain_api, memory_folder: str):
         self.codeplain_api = codeplain_api
         self.memory_folder = memory_folder
+        self.memory_index = ConformanceTestMemoryIndex(memory_folder)
+
+    def fetch_relevant_memory_files(
+        self, frid: Optional[str], module_name: Optional[str], text: str = ""
+    ) -> dict[str, str]:
+        """Fetch the memory files relevant to the functionality and text, ranked and capped."""
+        file_names = self.memory_index.get_relevant_file_names(frid, module_name, text)
+        memory_files_content = file_utils.get_existing_files_content(self.memory_index.memory_path, file_names)
+        console.debug(f"Loaded {len(memory_files_content)} relevant memory files.")
+        return memory_files_content
 
     def create_conformance_tests_memory(
         self, render_context: RenderContext, exit_code: int, conformance_tests_issue: str
@@ -71,7 +282,9 @@ class MemoryManager:
         existing_files, existing_files_content = ImplementationCodeHelpers.fetch_existing_files(
             render_context.build_folder
         )
-        memory_files, memory_files_content = MemoryManager.fetch_memory_files(self.memory_folder)
+        memory_files_content = self.fetch_relevant_memory_files(
+            current_conformance_tests_issue_frid, current_conformance_tests_issue_module, conformance_tests_issue
+        )
 
         conformance_tests_folder_name = (
             render_context.conformance_tests_running_context.get_current_conformance_test_folder_name()
@@ -106,27 +319,28 @@ class MemoryManager:
         )
         if len(response_files) > 0:
             memory_folder_path = os.path.join(self.memory_folder, CONFORMANCE_TEST_MEMORY_SUBFOLDER)
-            file_utils.store_response_files(memory_folder_path, response_files, memory_files)
+            file_utils.store_response_files(memory_folder_path, response_files, list(self.memory_index.refresh()))
+            self.memory_index.set_origin(
+                [file_name for file_name, content in response_files.items() if content is not None],
+                current_conformance_tests_issue_frid,
+                current_conformance_tests_issue_module,
+            )
 
     def delete_unresolved_memory_files(self):
         """Delete memory files whose resolution_status is not 'RESOLVED'."""
-        memory_path = os.path.join(self.memory_folder, CONFORMANCE_TEST_MEMORY_SUBFOLDER)
-        if not os.path.exists(memory_path):
-            return
+        memory_path = self.memory_index.memory_path
+        for file_name, entry in self.memory_index.refresh().items():
+            if entry.is_valid and entry.resolution_status == RESOLVED_MEMORY_STATUS:
+                continue
 
-        memory_files = file_utils.list_all_text_files(memory_path)
-        for file_name in memory_files:
-            file_path = os.path.join(memory_path, file_name)
-            try:
-                with open(file_path, "r") as f:
-                    content = json.load(f)
-                if content.get("resolution_status") == "RESOLVED":
-                    continue
-                else:
-                    os.remove(file_path)
-            except (json.JSONDecodeError, OSError):
+            if not entry.is_valid:
                 # Not a valid JSON file, unlikely to be a valid memory file, delete it
                 console.error(f"Memory file is not a valid JSON file: {file_name}. Deleting it.")
-                os.remove(file_path)
+            try:
+                os.remove(os.path.join(memory_path, file_name))
+            except OSError:
+                continue
 
             console.debug(f"Deleted temporary memory file: {file_name}")
+
+        self.memory_index.refresh()
@@ -1,17 +1,19 @@
 import argparse
-import threading
 
 from event_bus import EventBus
 from memory_management import MemoryManager
 from partial_rendering import RenderChoice
 from plain2code_console import console
 from plain2code_events import RenderCompleted, RenderFailed
+from plain2code_profiler import profiler
 from plain2code_state import RunState
 from plain_modules import PlainModule
 from render_machine.code_renderer import CodeRenderer
+from render_machine.render_checkpoint import RenderCheckpoint
 from render_machine.render_context import RenderContext
 from render_machine.render_types import RenderError
 from render_machine.states import States
+from run_control import RunControl
 
 
 class ModuleRenderer:
@@ -24,8 +26,8 @@ class ModuleRenderer:
         args: argparse.Namespace,
         run_state: RunState,
         event_bus: EventBus,
-        stop_event: threading.Event | None = None,
-        enter_pause_event: threading.Event | None = None,
+        run_control: RunControl | None = None,
+        render_checkpoint: RenderCheckpoint | None = None,
     ):
         self.codeplainAPI = codeplainAPI
         self.plain_module = plain_module
@@ -34,8 +36,8 @@ class ModuleRenderer:
         self.args = args
         self.run_state = run_state
         self.event_bus = event_bus
-        self.stop_event = stop_event
-        self.enter_pause_event = enter_pause_event
+        self.run_control = run_control
+        self.render_checkpoint = render_checkpoint
 
     def _build_render_context_for_module(
         self,
@@ -61,8 +63,10 @@ class ModuleRenderer:
             run_state=self.run_state,
             event_bus=self.event_bus,
             test_script_timeout=self.args.test_script_timeout,
-            stop_event=self.stop_event,
-            enter_pause_event=self.enter_pause_event,
+            regression_workers=self.args.regression_workers,
+            use_test_cache=not self.args.no_test_cache,
+            reuse_prepared_environment=self.args.reuse_prepared_environment,
+            run_control=self.run_control,
         )
 
     def _render_module(
@@ -79,6 +83,11 @@ class ModuleRenderer:
             and self.render_choice.module.module_name == plain_module.module_name
         )
 
+        is_render_checkpoint_module = (
+            self.render_checkpoint is not None
+            and self.render_checkpoint.plain_module.module_name == plain_module.module_name
+        )
+
         if is_render_choice_module:
             render_range = self.render_choice.render_range
 
@@ -86,7 +95,12 @@ class ModuleRenderer:
             plain_module.ensure_previous_frid_commits_exist(render_range, self.args.render_conformance_tests)
 
         has_any_required_module_changed = False
-        if not self.args.render_machine_graph and plain_module.required_modules and not is_render_choice_module:
+        if (
+            not self.args.render_machine_graph
+            and plain_module.required_modules
+            and not is_render_choice_module
+            and not is_render_checkpoint_module
+        ):
             console.debug(f"Analyzing required modules of module {plain_module.module_name}...")
             for required_module in plain_module.required_modules:
                 has_module_changed, rendering_failed = self._render_module(
@@ -108,6 +122,7 @@ class ModuleRenderer:
             and not plain_module.has_plain_spec_changed()
             and not plain_module.has_required_modules_code_changed()
             and not is_render_choice_module
+            and not is_render_checkpoint_module
         ):
             return False, False
 
@@ -127,12 +142,18 @@ class ModuleRenderer:
             render_range,
         )
 
-        code_renderer = CodeRenderer(render_context)
+        code_renderer = CodeRenderer(render_context, self.args.render_machine_graph)
         if self.args.render_machine_graph:
             code_renderer.generate_render_machine_graph()
             return True, False
 
-        code_renderer.run()
+        with profiler.span(plain_module.module_name, "module"):
+            if is_render_checkpoint_module:
+                code_renderer.run(self.render_checkpoint)
+            else:
+                code_renderer.run()
+        # Conformance tests definitions changed after the last commit point are written out as well
+        code_renderer.render_context.conformance_tests.flush()
         if code_renderer.render_context.state == States.RENDER_FAILED.value:
             error_message = RenderError.get_display_message(
                 code_renderer.render_context.previous_action_payload,
@@ -12,11 +12,12 @@ from liquid2.exceptions import TemplateNotFoundError
 
 import codeplain_REST_api as codeplain_api
 import file_utils
+import git_utils
 import plain_file
 import plain_modules
 import plain_spec
-from cli_output import print_dry_run_output, print_exit_summary, print_status
-from event_bus import EventBus
+from cli_output import print_dry_run_output, print_exit_summary, print_profile_summary, print_status
+from event_bus import AsyncEventBus, EventBus
 from module_renderer import ModuleRenderer
 from partial_rendering import get_plain_module_render_state, get_render_choices
 from plain2code_arguments import parse_arguments
@@ -38,6 +39,7 @@ from plain2code_exceptions import (
     OutdatedClientVersion,
     PlainSyntaxError,
     RenderCancelledError,
+    RenderCheckpointError,
     RenderingCreditBalanceTooLow,
     UnsupportedBase64Content,
     UnsupportedResourceType,
@@ -50,14 +52,20 @@ from plain2code_logger import (
     LoggingHandler,
     dump_crash_logs,
 )
+from plain2code_profiler import profiler
 from plain2code_state import RunState
 from plain2code_telemetry import capture_crash, initialize_telemetry
+from render_machine import script_output_store
+from render_machine.render_checkpoint import find_render_checkpoint
+from run_control import RunControl
 from system_config import system_config
 from tui.plain2code_tui import Plain2CodeTUI
 from tui.plain_module_render_choice_tui import PlainModuleRenderChoiceTUI
 
 DEFAULT_TEMPLATE_DIRS = "standard_template_library"
 RENDER_THREAD_SHUTDOWN_TIMEOUT = 0.7
+SERVE_COMMAND = "serve"
+BATCH_COMMAND = "batch"
 
 # Exceptions that represent expected, user-facing error conditions. They are
 # reported to the user directly and must never be sent to Sentry as crashes.
@@ -81,6 +89,7 @@ EXPECTED_EXCEPTIONS = (
     UnsupportedBase64Content,
     GitNotInstalledError,
     InvalidModuleArchiveError,
+    RenderCheckpointError,
     SystemExit,
 )
 
@@ -196,22 +205,23 @@ def render(  # noqa: C901
     run_state: RunState,
     event_bus: EventBus,
     default_log_level: str = "INFO",
+    run_control: Optional[RunControl] = None,
 ):
     # Compute render range from either --render-range or --render-from
     render_range = None
     if args.render_range or args.render_from:
         render_range = plain_spec.compute_render_range(args, plain_module.plain_source)
 
-    codeplainAPI = codeplain_api.CodeplainAPI(args.api_key, console)
+    if run_control is None:
+        run_control = RunControl()
+        signal.signal(signal.SIGTERM, lambda _signum, _frame: run_control.cancel())
+
+    codeplainAPI = codeplain_api.CodeplainAPI(args.api_key, console, run_control)
     assert args.api is not None and args.api != "", "API URL is required"
     codeplainAPI.api_url = args.api
 
     run_state.user_email = _check_connection(codeplainAPI)
 
-    stop_event = threading.Event()
-    enter_pause_event = threading.Event()
-    signal.signal(signal.SIGTERM, lambda _signum, _frame: stop_event.set())
-
     warn_if_acceptance_tests_without_conformance_script(plain_module, args)
 
     # A built module can be distributed as a "<module>.module" zip archive instead of an unpacked directory.
@@ -229,8 +239,12 @@ def render(  # noqa: C901
     for module in plain_module.all_required_modules + [plain_module]:
         module.reconcile_metadata_with_git()
 
+    render_checkpoint = None
+    if args.resume:
+        render_checkpoint = find_render_checkpoint(plain_module)
+
     render_choice = None
-    if render_range is None:
+    if render_range is None and render_checkpoint is None:
         plain_module_render_state = get_plain_module_render_state(plain_module, args.render_conformance_tests)
         if plain_module_render_state is not None:
             render_choices = get_render_choices(plain_module, plain_module_render_state, args.force_render)
@@ -276,8 +290,8 @@ def render(  # noqa: C901
         args,
         run_state,
         event_bus,
-        stop_event=stop_event,
-        enter_pause_event=enter_pause_event,
+        run_control=run_control,
+        render_checkpoint=render_checkpoint,
     )
 
     render_error: list[Exception] = []
@@ -310,27 +324,53 @@ def render(  # noqa: C901
             conformance_tests_script=args.conformance_tests_script,
             prepare_environment_script=args.prepare_environment_script,
             state_machine_version=system_config.client_version,
-            enter_pause_event=enter_pause_event,
+            run_control=run_control,
             on_cancel=run_state.set_render_cancelled,
             default_log_level=default_log_level,
+            log_history=args.tui_log_history,
             css_path="styles.css",
         )
         app.run()
 
-        stop_event.set()
+        run_control.cancel()
         render_thread.join(timeout=RENDER_THREAD_SHUTDOWN_TIMEOUT)
 
     if render_error:
         raise render_error[0]
 
 
-def main():  # noqa: C901
+def main():
     if sys.platform == "win32":
         sys.stdout.reconfigure(encoding="utf-8", errors="replace")
         sys.stderr.reconfigure(encoding="utf-8", errors="replace")
 
+    if sys.argv[1:2] == [SERVE_COMMAND]:
+        # Imported here, because the server runs the jobs with run()
+        import plain2code_server
+
+        plain2code_server.serve(sys.argv[2:])
+        return
+
+    if sys.argv[1:2] == [BATCH_COMMAND]:
+        # Imported here, because the batch renders the specs with render()
+        import plain2code_batch
+
+        plain2code_batch.batch(sys.argv[2:])
+        return
+
     args = parse_arguments()
+    try:
+        run(args)
+    finally:
+        git_utils.close_repo_handles()
 
+
+def run(args, event_bus: Optional[EventBus] = None, run_control: Optional[RunControl] = None):  # noqa: C901
+    """
+    Run the command of the parsed arguments: print the version, the account status or the plain source, or render the
+    plain file. The render events are published on the given event bus, if there is one, and the render is cancelled
+    through the given run control, if there is one.
+    """
     # Handle --version flag before any other initialization
     if args.version:
         console.print(f"codeplain version {system_config.client_version}")
@@ -386,7 +426,9 @@ def main():  # noqa: C901
         warn_if_acceptance_tests_without_conformance_script(plain_module, args)
         return
 
-    event_bus = EventBus()
+    if event_bus is None:
+        # The TUI processes the render events in its own threads, so that a slow update never holds up the render
+        event_bus = EventBus() if args.headless else AsyncEventBus()
 
     if not args.api:
         args.api = "https://api.codeplain.ai"
@@ -401,16 +443,21 @@ def main():  # noqa: C901
 
     initialize_telemetry()
 
+    git_utils.set_git_backend(args.git_backend)
+
     exc_info = None
     error_message = None
 
+    if args.profile:
+        profiler.start()
+
     try:
         # Validate API key is present
         if not args.api_key:
             raise MissingAPIKey(
                 "Your API key is required. Please set the CODEPLAIN_API_KEY environment variable or provide it with the --api-key argument.\n"
             )
-        render(plain_module, args, run_state, event_bus, default_log_level)
+        render(plain_module, args, run_state, event_bus, default_log_level, run_control)
     except BaseException as e:
         if isinstance(e, KeyboardInterrupt):
             error_message = "Keyboard interrupt"
@@ -420,14 +467,25 @@ def main():  # noqa: C901
             if not isinstance(e, EXPECTED_EXCEPTIONS):
                 exc_info = sys.exc_info()
     finally:
+        if isinstance(event_bus, AsyncEventBus):
+            event_bus.close()
+            for subscriber, metrics in event_bus.get_metrics().items():
+                logging.getLogger(LOGGER_NAME).debug(f"Render events of {subscriber}: {metrics}")
         if exc_info:
-            dump_crash_logs(args, run_state)
+            if dump_crash_logs(args, run_state):
+                script_output_store.append_latest_outputs_to_crash_log(
+                    args.log_file_name, run_state.script_output_folders
+                )
             capture_crash(exc_info, run_state, args)
         print_exit_summary(
             run_state,
             args.filename,
             error_message=error_message,
         )
+        if args.profile:
+            profiler.stop()
+            profiler.write_trace(args.profile)
+            print_profile_summary(profiler.get_flame_summary(), args.profile)
         # Remove any scratch extractions created for archive-only ("<module>.module") modules.
         for module in plain_module.all_required_modules + [plain_module]:
             module.cleanup_scratch()
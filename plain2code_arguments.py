@@ -12,8 +12,6 @@ from plain2code_read_config import get_args_from_config
 # "default" (neither -- the argparse default was used).
 ARGUMENT_SOURCES = "argument_sources"
 
-CODEPLAIN_API_KEY = os.getenv("CODEPLAIN_API_KEY")
-
 
 DEFAULT_BUILD_FOLDER = "plain_modules"
 DEFAULT_BUILD_DEST = "dist"
@@ -24,6 +22,12 @@ CONFORMANCE_TESTS_SCRIPT_NAME = "conformance_tests_script"
 DEFAULT_LOG_FILE_NAME = "codeplain.log"
 PREPARE_ENVIRONMENT_SCRIPT_NAME = "prepare_environment_script"
 
+# Mirrors git_utils.GIT_BACKENDS (not imported here so argument parsing does not require git)
+GIT_BACKEND_CHOICES = ["gitpython", "persistent"]
+DEFAULT_GIT_BACKEND = "gitpython"
+# Log records kept by the log view of the TUI, the oldest ones are dropped first
+DEFAULT_TUI_LOG_HISTORY = 10000
+
 
 def _resolve_path_arg(
     arg_name: str,
@@ -87,6 +91,17 @@ def frid_string(s):
     return s
 
 
+def positive_int(s):
+    """Validate that the string is a positive integer."""
+    try:
+        value = int(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError("The value must be a positive integer.")
+    if value < 1:
+        raise argparse.ArgumentTypeError("The value must be a positive integer.")
+    return value
+
+
 def frid_range_string(s):
     """Validate that the string contains two frids separated by comma."""
     if not s:
@@ -285,6 +300,14 @@ def create_parser():
         help="Continue generation starting from this specific functionality (e.g. `2`). "
         "The functionality with this ID will be included in the output. The functionality ID must match one of the functionalities in your plain file.",
     )
+    _add_arg(
+        render_range_group,
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Resume an interrupted render from the state it was interrupted in. The render can only be resumed if the "
+        "plain files and the generated code and conformance tests have not changed since.",
+    )
 
     _add_arg(
         parser,
@@ -298,7 +321,9 @@ def create_parser():
         parser,
         "--unittests-script",
         type=str,
-        help="Shell script to run unit tests on generated code. Receives the module's code folder path as its first argument (e.g. `plain_modules/module_name/code`).",
+        help="Shell script to run unit tests on generated code. Receives the module's code folder path as its first argument (e.g. `plain_modules/module_name/code`). "
+        "A script containing `codeplain-test-runner: persistent` in its first lines is started once as a persistent test runner "
+        "and reused for every test run (see test_scripts/persistent_test_runner_python.py).",
     )
     _add_arg(
         parser,
@@ -306,14 +331,18 @@ def create_parser():
         type=str,
         help="Path to conformance tests shell script. Every conformance test script should accept two arguments: "
         "1) Path to a folder (e.g. `plain_modules/module_name/code`) containing generated source code, "
-        "2) Path to a subfolder of the module's tests folder (e.g. `plain_modules/module_name/tests/subfoldername`) containing test files.",
+        "2) Path to a subfolder of the module's tests folder (e.g. `plain_modules/module_name/tests/subfoldername`) containing test files. "
+        "Like the unit tests script, it can be a persistent test runner.",
     )
 
     _add_arg(
         parser,
         "--prepare-environment-script",
         type=str,
-        help="Path to a shell script that prepares the testing environment. The script should accept the source code folder path as its first argument.",
+        help="Path to a shell script that prepares the testing environment. The script should accept the source code folder path as its first argument. "
+        "The script, the unit tests script and the conformance tests scripts get a directory for the prepared "
+        "environment in the CODEPLAIN_PREPARED_ENVIRONMENT_DIR environment variable when "
+        "--reuse-prepared-environment is given.",
     )
 
     _add_arg(
@@ -324,6 +353,51 @@ def create_parser():
         help="Timeout for test scripts in seconds. If not provided, the default timeout of 120 seconds is used.",
     )
 
+    _add_arg(
+        parser,
+        "--regression-workers",
+        type=positive_int,
+        default=1,
+        help="Number of conformance test folders of earlier functionalities (and required modules) to run in parallel "
+        "during regression testing. Each worker runs the conformance tests script against its own snapshot of the "
+        "build folder, so the script must tolerate concurrent runs. Defaults to 1 (sequential regression testing).",
+    )
+
+    _add_arg(
+        parser,
+        "--no-test-cache",
+        action="store_true",
+        default=False,
+        help="Always execute the unit tests and conformance tests scripts. By default a test script that already "
+        "passed (or failed) against the same implementation code, test files, script and environment is not run "
+        "again, its cached result is used instead.",
+    )
+
+    _add_arg(
+        parser,
+        "--reuse-prepared-environment",
+        action="store_true",
+        default=False,
+        help="Skip the testing environment preparation script while the dependency manifests of the build folder "
+        "(package.json, requirements.txt, go.mod, ...) do not change, and reuse the environment it prepared in "
+        "CODEPLAIN_PREPARED_ENVIRONMENT_DIR instead. Only use it with preparation scripts that install the "
+        "dependencies into that directory and do not build or copy the code, as the code changes between "
+        "preparations. The test scripts get the directory too, e.g. run_unittests_react.sh installs the Node "
+        "modules there once per version of the dependency manifests. Ignored with --no-test-cache.",
+    )
+
+    _add_arg(
+        parser,
+        "--git-backend",
+        type=str,
+        choices=GIT_BACKEND_CHOICES,
+        default=DEFAULT_GIT_BACKEND,
+        help="Backend used to access the git repositories of the rendered modules. "
+        "`gitpython` opens the repository anew for every git operation. "
+        "`persistent` keeps one repository handle (with long-lived git processes for object reads) per repository "
+        f"for the whole render. Defaults to `{DEFAULT_GIT_BACKEND}`.",
+    )
+
     _add_arg(
         parser,
         "--api",
@@ -336,7 +410,8 @@ def create_parser():
         parser,
         "--api-key",
         type=str,
-        default=CODEPLAIN_API_KEY,
+        # Read when the parser is created, the server (see plain2code_server) runs with the environment of each job
+        default=os.getenv("CODEPLAIN_API_KEY"),
         help="API key used to access the API. If not provided, the `CODEPLAIN_API_KEY` environment variable is used.",
     )
     _add_arg(
@@ -409,6 +484,16 @@ def create_parser():
         default=False,
         help="If set, render the state machine graph.",
     )
+    _add_arg(
+        parser,
+        "--profile",
+        type=str,
+        default=None,
+        help="Profile the render and write the time spent in every render step, API call, git operation, file scan "
+        "and script run to this file as a Chrome trace (viewable in chrome://tracing or https://ui.perfetto.dev). A "
+        "summary of the time spent per functionality is printed at the end of the render.",
+        path=True,
+    )
 
     _add_arg(
         parser,
@@ -428,6 +513,15 @@ def create_parser():
         "All logs are written to the log file.",
     )
 
+    _add_arg(
+        parser,
+        "--tui-log-history",
+        type=positive_int,
+        default=DEFAULT_TUI_LOG_HISTORY,
+        help="Number of the latest log records kept in the log view of the TUI. Older records are dropped from the "
+        f"view, the log file keeps all of them. Defaults to {DEFAULT_TUI_LOG_HISTORY}.",
+    )
+
     parser.add_argument(
         "--status",
         action="store_true",
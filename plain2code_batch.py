@@ -0,0 +1,309 @@
+"""Render many independent plain projects concurrently in one process (`codeplain batch MANIFEST`).
+
+The manifest is a YAML file with the plain2code command line of every spec to render:
+
+    specs:
+      - hello_world/hello_world.plain
+      - billing/billing.plain --render-from 3
+      - [inventory/inventory.plain, --unittests-script, inventory/run_unittests.sh]
+
+The command lines are run like `codeplain <command line>` from the manifest's directory, in headless mode. The specs
+are parsed one after another up front and then rendered concurrently, sharing the connections to the API, the git
+repository handles and the persistent test runners. Limits on the renders running at the same time, on the API
+requests in flight and on the test scripts running at the same time apply to the whole batch. The log of every
+spec is written to its own log file (--log-file-name of its command line). A summary of all renders, with the
+throughput of the batch, is printed at the end.
+"""
+
+import argparse
+import logging
+import os
+import shlex
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional
+
+import yaml
+
+import codeplain_REST_api as codeplain_api
+import file_utils
+import git_utils
+import plain_modules
+from cli_output import print_batch_summary
+from event_bus import EventBus
+from plain2code import DEFAULT_TEMPLATE_DIRS, EXPECTED_EXCEPTIONS, render
+from plain2code_arguments import parse_arguments
+from plain2code_console import console
+from plain2code_exceptions import InvalidBatchManifestError, MissingAPIKey, RenderCancelledError
+from plain2code_logger import LOGGER_NAME, ElapsedTimeFormatter, RenderLogFilter, current_render_id
+from plain2code_state import RunState
+from plain2code_telemetry import capture_crash, initialize_telemetry
+from render_machine import render_utils
+from run_control import RunControl
+
+DEFAULT_MAX_RENDERS = 4
+
+SPEC_SUCCEEDED = "succeeded"
+SPEC_FAILED = "failed"
+SPEC_CANCELLED = "cancelled"
+
+
+@dataclass
+class BatchSpec:
+    """A spec of the batch: its command line, its parsed arguments and module, and the outcome of its render."""
+
+    command_line: list[str]
+    args: Optional[argparse.Namespace] = None
+    plain_module: Optional[plain_modules.PlainModule] = None
+    run_state: Optional[RunState] = None
+    status: Optional[str] = None
+    error_message: Optional[str] = None
+    duration_seconds: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.args.filename if self.args is not None else " ".join(self.command_line)
+
+
+@dataclass
+class BatchResult:
+    specs: list[BatchSpec]
+    duration_seconds: float
+    api_request_wait_seconds: float
+    script_wait_seconds: float
+
+
+def load_manifest(manifest_path: str) -> list[list[str]]:
+    """Return the command lines of the specs in the manifest, in their order."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = yaml.safe_load(f)
+    except yaml.YAMLError as e:
+        raise InvalidBatchManifestError(f"The batch manifest {manifest_path} is not valid YAML: {e}")
+
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("specs"), list) or not manifest["specs"]:
+        raise InvalidBatchManifestError(f"The batch manifest {manifest_path} must have a non-empty list of specs.")
+
+    command_lines = []
+    for entry in manifest["specs"]:
+        if isinstance(entry, str):
+            command_lines.append(shlex.split(entry))
+        elif isinstance(entry, list) and all(isinstance(argument, str) for argument in entry):
+            command_lines.append(entry)
+        else:
+            raise InvalidBatchManifestError(
+                f"Invalid spec in the batch manifest {manifest_path}: {entry!r}. A spec is a command line, "
+                "either as a string or as a list of arguments."
+            )
+    return command_lines
+
+
+def prepare_specs(command_lines: list[list[str]]) -> list[BatchSpec]:
+    """
+    Parse the arguments and the plain files of the specs.
+
+    The plain files are parsed here, one after another, because the markdown parser is not thread-safe. A spec that
+    cannot be parsed is marked as failed and is not rendered.
+    """
+    specs = []
+    log_file_names: dict[str, str] = {}
+    for command_line in command_lines:
+        spec = BatchSpec(command_line)
+        specs.append(spec)
+        try:
+            spec.args = parse_arguments(command_line)
+        except SystemExit:
+            # argparse has already printed why
+            spec.status = SPEC_FAILED
+            spec.error_message = f"Invalid command line: {' '.join(command_line)}"
+            continue
+
+        # There is no terminal for the TUI, the log file is the only output of the spec's render
+        spec.args.headless = True
+        if not spec.args.api:
+            spec.args.api = "https://api.codeplain.ai"
+
+        log_file_name = os.path.abspath(spec.args.log_file_name)
+        if log_file_name in log_file_names:
+            raise InvalidBatchManifestError(
+                f"The specs {log_file_names[log_file_name]} and {spec.args.filename} log to the same file "
+                f"{log_file_name}. Please give one of them another --log-file-name."
+            )
+        log_file_names[log_file_name] = spec.args.filename
+
+        try:
+            template_dirs = file_utils.get_template_directories(
+                spec.args.filename, spec.args.template_dir, DEFAULT_TEMPLATE_DIRS
+            )
+            spec.plain_module = plain_modules.PlainModule(
+                os.path.basename(spec.args.filename), spec.args.build_folder, template_dirs
+            )
+        except Exception as e:
+            spec.status = SPEC_FAILED
+            spec.error_message = str(e) or repr(e)
+    return specs
+
+
+def _create_spec_log_handler(spec: BatchSpec, run_state: RunState) -> logging.Handler:
+    handler = logging.FileHandler(spec.args.log_file_name, mode="w", encoding="utf-8")
+    handler.setFormatter(ElapsedTimeFormatter(run_state))
+    handler.setLevel(logging.DEBUG if spec.args.verbose else logging.INFO)
+    handler.addFilter(RenderLogFilter(run_state.render_id))
+    return handler
+
+
+def render_spec(spec: BatchSpec, run_control: RunControl) -> None:
+    """Render the spec in headless mode, logging to its own log file, and record the outcome on the spec."""
+    plain_module = spec.plain_module
+    assert plain_module is not None  # Only the specs whose module was loaded are rendered
+    run_state = spec.run_state = RunState(spec_filename=spec.args.filename, replay_with=spec.args.replay_with)
+    current_render_id.set(run_state.render_id)
+    logger = logging.getLogger(LOGGER_NAME)
+    log_handler = _create_spec_log_handler(spec, run_state)
+    logger.addHandler(log_handler)
+
+    start_time = time.monotonic()
+    try:
+        if not spec.args.api_key:
+            raise MissingAPIKey(
+                "Your API key is required. Please set the CODEPLAIN_API_KEY environment variable or provide it with "
+                "the --api-key argument."
+            )
+        render(plain_module, spec.args, run_state, EventBus(), run_control=run_control)
+    except RenderCancelledError:
+        run_state.set_render_cancelled()
+    except Exception as e:
+        spec.error_message = str(e) or repr(e)
+        logger.error(f"Render failed: {spec.error_message}")
+        if not isinstance(e, EXPECTED_EXCEPTIONS):
+            capture_crash(sys.exc_info(), run_state, spec.args)
+    finally:
+        spec.duration_seconds = time.monotonic() - start_time
+        for module in plain_module.all_required_modules + [plain_module]:
+            module.cleanup_scratch()
+        logger.removeHandler(log_handler)
+        log_handler.close()
+
+    if run_state.render_succeeded:
+        spec.status = SPEC_SUCCEEDED
+    elif run_state.render_cancelled or run_control.cancelled:
+        spec.status = SPEC_CANCELLED
+    else:
+        spec.status = SPEC_FAILED
+
+
+def run_batch(
+    specs: list[BatchSpec],
+    max_renders: int = DEFAULT_MAX_RENDERS,
+    max_api_requests: Optional[int] = None,
+    max_test_scripts: Optional[int] = None,
+    run_control: Optional[RunControl] = None,
+) -> BatchResult:
+    """Render the prepared specs concurrently, at most max_renders at the same time."""
+    if run_control is None:
+        run_control = RunControl()
+    # Capture all logs, the log handlers of the specs filter the levels
+    logging.getLogger(LOGGER_NAME).setLevel(logging.DEBUG)
+    logging.getLogger("git").setLevel(logging.WARNING)
+    logging.getLogger("transitions").setLevel(logging.ERROR)
+    codeplain_api.api_request_limit.set_limit(max_api_requests)
+    render_utils.script_limit.set_limit(max_test_scripts)
+
+    start_time = time.monotonic()
+    try:
+        pending_specs = [spec for spec in specs if spec.status is None]
+        with ThreadPoolExecutor(max_workers=max_renders, thread_name_prefix="batch") as executor:
+            futures = {executor.submit(render_spec, spec, run_control): spec for spec in pending_specs}
+            try:
+                for future in as_completed(futures):
+                    future.result()
+                    spec = futures[future]
+                    print(f"[{spec.status}] {spec.name} ({spec.duration_seconds:.0f}s)", flush=True)
+            except KeyboardInterrupt:
+                run_control.cancel()
+                for future in futures:
+                    future.cancel()
+                print("Cancelling the renders of the batch...", flush=True)
+        for spec in pending_specs:
+            if spec.status is None:
+                spec.status = SPEC_CANCELLED
+
+        return BatchResult(
+            specs=specs,
+            duration_seconds=time.monotonic() - start_time,
+            api_request_wait_seconds=codeplain_api.api_request_limit.waited_seconds,
+            script_wait_seconds=render_utils.script_limit.waited_seconds,
+        )
+    finally:
+        codeplain_api.api_request_limit.set_limit(None)
+        render_utils.script_limit.set_limit(None)
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def batch(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="codeplain batch",
+        description="Render the specs listed in a manifest concurrently in one process (see plain2code_batch).",
+    )
+    parser.add_argument("manifest", help="YAML file with the plain2code command line of every spec to render.")
+    parser.add_argument(
+        "--max-renders",
+        type=_positive_int,
+        default=DEFAULT_MAX_RENDERS,
+        help=f"Maximum number of specs rendered at the same time. Defaults to {DEFAULT_MAX_RENDERS}.",
+    )
+    parser.add_argument(
+        "--max-api-requests",
+        type=_positive_int,
+        default=None,
+        help="Maximum number of API requests in flight across all renders. Unlimited by default.",
+    )
+    parser.add_argument(
+        "--max-test-scripts",
+        type=_positive_int,
+        default=None,
+        help="Maximum number of test scripts running at the same time across all renders. Unlimited by default.",
+    )
+    parser.add_argument(
+        "--git-backend",
+        choices=git_utils.GIT_BACKENDS,
+        default=git_utils.GIT_BACKEND_PERSISTENT,
+        help="Git access backend shared by all renders. Defaults to the persistent repository handles.",
+    )
+    args = parser.parse_args(argv)
+
+    manifest_path = os.path.abspath(args.manifest)
+    try:
+        command_lines = load_manifest(manifest_path)
+        # The command lines are relative to the manifest, and the test scripts run in the working directory
+        os.chdir(os.path.dirname(manifest_path))
+        specs = prepare_specs(command_lines)
+    except (InvalidBatchManifestError, OSError) as e:
+        console.error(f"Error: {e}")
+        sys.exit(1)
+
+    initialize_telemetry()
+    git_utils.set_git_backend(args.git_backend)
+
+    run_control = RunControl()
+    signal.signal(signal.SIGTERM, lambda _signum, _frame: run_control.cancel())
+
+    # The renders log to their own log files instead
+    console.quiet = True
+    try:
+        result = run_batch(specs, args.max_renders, args.max_api_requests, args.max_test_scripts, run_control)
+    finally:
+        git_utils.close_repo_handles()
+    print_batch_summary(result)
+
+    if any(spec.status != SPEC_SUCCEEDED for spec in specs):
+        sys.exit(1)
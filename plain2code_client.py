@@ -0,0 +1,126 @@
+"""Thin client of the plain2code server (see plain2code_server).
+
+Submits the plain2code command line as a job to a running server and prints what the server streams back. It only
+uses the standard library, so it starts without the import time of plain2code itself.
+
+Usage:
+    codeplain-client [--socket PATH | --port PORT [--token-file PATH]] [--json] <plain2code arguments>
+
+The jobs are sent and their messages streamed back as JSON lines. A job is a JSON object with the "argv", "cwd" and
+"env" of the client. A server listening on a port only runs jobs with the "token" it wrote to its token file, which
+only the user running the server can read. The server answers with messages of these types:
+    output  text the command printed ("text")
+    log     a log record of the render ("level", "message")
+    event   an event of the render ("event" is the event type, "data" its fields)
+    exit    the end of the job ("code" is the exit code of the command)
+The job is cancelled when the client closes the connection before the exit message, e.g. on Ctrl+C.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any, Iterator, Optional
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".codeplain", "plain2code.sock")
+DEFAULT_TOKEN_PATH = os.path.join(os.path.expanduser("~"), ".codeplain", "plain2code_server.token")
+SERVER_HOST = "127.0.0.1"
+
+OUTPUT_MESSAGE = "output"
+LOG_MESSAGE = "log"
+EVENT_MESSAGE = "event"
+EXIT_MESSAGE = "exit"
+
+
+def connect(socket_path: Optional[str] = None, port: Optional[int] = None) -> socket.socket:
+    """Connect to the server on localhost:port if a port is given, otherwise on the UNIX socket."""
+    if port is not None:
+        return socket.create_connection((SERVER_HOST, port))
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path or DEFAULT_SOCKET_PATH)
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+
+def send_message(connection_file, message: dict[str, Any]) -> None:
+    connection_file.write(json.dumps(message, default=str).encode("utf-8") + b"\n")
+    connection_file.flush()
+
+
+def read_messages(connection_file) -> Iterator[dict[str, Any]]:
+    for line in connection_file:
+        yield json.loads(line)
+
+
+def read_token(token_path: Optional[str] = None) -> str:
+    with open(token_path or DEFAULT_TOKEN_PATH, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def submit_job(
+    argv: list[str], socket_path: Optional[str] = None, port: Optional[int] = None, token_path: Optional[str] = None
+) -> Iterator[dict[str, Any]]:
+    """Submit a job with the working directory and the environment of this process and yield the server's messages."""
+    job: dict[str, Any] = {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+    if port is not None:
+        job["token"] = read_token(token_path)
+    with connect(socket_path, port) as connection, connection.makefile("rwb") as connection_file:
+        send_message(connection_file, job)
+        yield from read_messages(connection_file)
+
+
+def _print_message(message: dict[str, Any]) -> None:
+    if message["type"] == OUTPUT_MESSAGE:
+        sys.stdout.write(message["text"])
+        sys.stdout.flush()
+    elif message["type"] == LOG_MESSAGE:
+        print(message["message"], flush=True)
+    elif message["type"] == EVENT_MESSAGE and message["event"] == "RenderStateUpdated":
+        print(f"[{message['data']['state']}]", flush=True)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Submit a plain2code command to a running plain2code server and stream its output.",
+        usage="%(prog)s [--socket PATH | --port PORT [--token-file PATH]] [--json] <plain2code arguments>",
+    )
+    address_group = parser.add_mutually_exclusive_group()
+    address_group.add_argument(
+        "--socket", default=None, help=f"UNIX socket of the server (default: {DEFAULT_SOCKET_PATH})."
+    )
+    address_group.add_argument("--port", type=int, default=None, help="Port of a server listening on localhost.")
+    parser.add_argument(
+        "--token-file",
+        default=None,
+        help=f"Token file of the server listening on --port (default: {DEFAULT_TOKEN_PATH}).",
+    )
+    parser.add_argument("--json", action="store_true", default=False, help="Print the server's messages as JSON lines.")
+    args, plain2code_argv = parser.parse_known_args(argv)
+
+    exit_code = 1
+    # Closing the connection cancels the job on the server
+    messages = submit_job(plain2code_argv, args.socket, args.port, args.token_file)
+    try:
+        for message in messages:
+            if args.json:
+                print(json.dumps(message), flush=True)
+            else:
+                _print_message(message)
+            if message["type"] == EXIT_MESSAGE:
+                exit_code = message["code"]
+    except OSError as e:
+        print(f"Could not connect to the plain2code server ({e}). Start it with `codeplain serve`.", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("Cancelled the job.", file=sys.stderr)
+    finally:
+        messages.close()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
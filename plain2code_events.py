@@ -1,11 +1,11 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, fields, replace
+from typing import Any, Optional
 
 from render_machine.render_types import (
-    ConformanceTestsRunningContext,
-    FridContext,
-    ScriptExecutionHistory,
-    UnitTestsRunningContext,
+    ConformanceTestsRunningContextSnapshot,
+    FridContextSnapshot,
+    ScriptExecutionHistorySnapshot,
+    UnitTestsRunningContextSnapshot,
 )
 
 
@@ -15,13 +15,28 @@ class BaseEvent:
     pass
 
 
-@dataclass
+@dataclass(frozen=True)
 class RenderContextSnapshot:
-    frid_context: Optional[FridContext]
-    conformance_tests_running_context: Optional[ConformanceTestsRunningContext]
-    unit_tests_running_context: Optional[UnitTestsRunningContext]
-    script_execution_history: Optional[ScriptExecutionHistory]
-    module_name: str
+    """
+    Immutable view of the render context. Snapshots taken one after another share the parts that did not change.
+    """
+
+    frid_context: Optional[FridContextSnapshot] = None
+    conformance_tests_running_context: Optional[ConformanceTestsRunningContextSnapshot] = None
+    unit_tests_running_context: Optional[UnitTestsRunningContextSnapshot] = None
+    script_execution_history: Optional[ScriptExecutionHistorySnapshot] = None
+    module_name: Optional[str] = None
+
+    def get_changes(self, previous: Optional["RenderContextSnapshot"]) -> dict[str, Any]:
+        """The fields of this snapshot that differ from the previous snapshot (all of them if there is none)."""
+        return {
+            snapshot_field.name: getattr(self, snapshot_field.name)
+            for snapshot_field in fields(self)
+            if previous is None or getattr(self, snapshot_field.name) is not getattr(previous, snapshot_field.name)
+        }
+
+    def apply(self, changes: dict[str, Any]) -> "RenderContextSnapshot":
+        return replace(self, **changes)
 
 
 @dataclass
@@ -47,11 +62,22 @@ class LogMessageEmitted(BaseEvent):
     log_color: Optional[str] = None  # Color for the message (e.g. "#FFB454"); the file log stays plain text
 
 
+@dataclass
+class TestScriptOutputEmitted(BaseEvent):
+    """Event emitted with the output lines a running test script has written since the previous event."""
+
+    script_type: str  # e.g., "Unit Tests", "Conformance Tests"
+    frid: Optional[str]
+    module: Optional[str]
+    lines: list[str]
+
+
 @dataclass
 class RenderStateUpdated(BaseEvent):
     state: str
     previous_state: Optional[str]
-    snapshot: RenderContextSnapshot
+    # Fields of the RenderContextSnapshot that changed since the previous RenderStateUpdated of the module
+    changes: dict[str, Any]
 
 
 @dataclass
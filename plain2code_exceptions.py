@@ -125,3 +125,22 @@ class InvalidModuleArchiveError(Exception):
     directory, detached HEAD, or an unsafe member path)."""
 
     pass
+
+
+class PersistentTestRunnerError(Exception):
+    """Raised when a persistent test runner cannot be started or stops responding."""
+
+    pass
+
+
+class RenderCheckpointError(Exception):
+    """Raised when an interrupted render cannot be resumed from its checkpoint (e.g. none was saved, or the specs or
+    the git repositories changed since)."""
+
+    pass
+
+
+class InvalidBatchManifestError(Exception):
+    """Raised when the manifest of `codeplain batch` cannot be read or lists invalid specs."""
+
+    pass
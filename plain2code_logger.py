@@ -1,4 +1,6 @@
+import contextvars
 import logging
+from typing import Optional
 
 from event_bus import EventBus
 from plain2code_events import LogMessageEmitted
@@ -13,6 +15,11 @@ LOGGER_NAME = "codeplain"
 # same message twice: once in plain text (from lastResort) and once styled (from rich).
 logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
 
+# The render the code running in the current context works on. Renders that share the process (see `codeplain batch`)
+# route their log records to their own log with RenderLogFilter. Threads started by a render run in a copy of its
+# context (contextvars.copy_context()).
+current_render_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_render_id", default=None)
+
 FILE_LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
 FILE_LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
@@ -63,6 +70,17 @@ class ElapsedTimeFormatter(logging.Formatter):
         return super().format(record)
 
 
+class RenderLogFilter(logging.Filter):
+    """Lets through only the log records emitted in the context of the given render (see current_render_id)."""
+
+    def __init__(self, render_id: str):
+        super().__init__()
+        self.render_id = render_id
+
+    def filter(self, record):
+        return current_render_id.get() == self.render_id
+
+
 class LoggingHandler(logging.Handler):
     def __init__(self, event_bus: EventBus, run_state: RunState):
         super().__init__()
@@ -119,10 +137,10 @@ class CrashLogHandler(logging.Handler):
             return False
 
 
-def dump_crash_logs(args, run_state: RunState, formatter=None):
-    """Dump buffered logs to file if CrashLogHandler is present."""
+def dump_crash_logs(args, run_state: RunState, formatter=None) -> bool:
+    """Dump buffered logs to file if CrashLogHandler is present. Returns whether the crash log was written."""
     if args.log_to_file:
-        return
+        return False
 
     if formatter is None:
         formatter = IndentedFormatter(FILE_LOG_FORMAT, datefmt=FILE_LOG_DATE_FORMAT, indent=len("YYYY-MM-DD HH:MM:SS "))
@@ -131,4 +149,5 @@ def dump_crash_logs(args, run_state: RunState, formatter=None):
     crash_handler = next((h for h in root_logger.handlers if isinstance(h, CrashLogHandler)), None)
 
     if crash_handler and args.filename:
-        crash_handler.dump_to_file(args.log_file_name, formatter)
+        return crash_handler.dump_to_file(args.log_file_name, formatter)
+    return False
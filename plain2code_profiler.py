@@ -0,0 +1,195 @@
+"""Opt-in profiling of the render (see --profile).
+
+While the profiler is started, the render records nested spans for every render machine action, API call, git
+operation, file scan and script run. The spans are written as a Chrome trace (viewable in chrome://tracing or
+https://ui.perfetto.dev) and summarized per functionality as a flame summary. When the profiler is not started,
+a span is a shared no-op context manager, so the instrumentation costs a single attribute check.
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, Union
+
+# Spans that are shorter than this share of a functionality's time are left out of the flame summary
+MIN_FLAME_SUMMARY_SHARE = 0.01
+
+_DISABLED_SPAN = nullcontext()
+
+
+@dataclass
+class _OpenSpan:
+    name: str
+    children_duration_ns: int = 0
+
+
+@dataclass
+class FlameSummaryEntry:
+    """A call path (the names of the nested spans) with its total time and the time spent outside of its children."""
+
+    path: tuple[str, ...]
+    total_seconds: float
+    self_seconds: float
+
+
+@dataclass
+class FridFlameSummary:
+    frid: Optional[str]
+    total_seconds: float
+    entries: list[FlameSummaryEntry] = field(default_factory=list)
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        # The functionality the spans that start now are attributed to
+        self.current_frid: Optional[str] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._start_ns = 0
+        self._trace_events: list[dict] = []
+        self._self_durations_ns: dict[Optional[str], dict[tuple[str, ...], int]] = {}
+
+    def start(self) -> None:
+        with self._lock:
+            self._start_ns = time.perf_counter_ns()
+            self._trace_events = []
+            self._self_durations_ns = defaultdict(lambda: defaultdict(int))
+            self.current_frid = None
+            self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, category: str, **args: Any):
+        """Return a context manager that records the time spent in it as a span nested in the enclosing spans."""
+        if not self.enabled:
+            return _DISABLED_SPAN
+        return self._record_span(name, category, args)
+
+    @contextmanager
+    def _record_span(self, name: str, category: str, args: dict[str, Any]) -> Iterator[None]:
+        open_spans = getattr(self._local, "open_spans", None)
+        if open_spans is None:
+            open_spans = self._local.open_spans = []
+        path = tuple(open_span.name for open_span in open_spans) + (name,)
+        open_span = _OpenSpan(name)
+        open_spans.append(open_span)
+        frid = self.current_frid
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration_ns = time.perf_counter_ns() - start_ns
+            open_spans.pop()
+            if open_spans:
+                open_spans[-1].children_duration_ns += duration_ns
+
+            trace_event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start_ns - self._start_ns) / 1000,
+                "dur": duration_ns / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {"frid": frid, **{key: str(value) for key, value in args.items()}},
+            }
+            with self._lock:
+                if self.enabled:
+                    self._trace_events.append(trace_event)
+                    self._self_durations_ns[frid][path] += duration_ns - open_span.children_duration_ns
+
+    def write_trace(self, path: str) -> None:
+        """Write the recorded spans in the Chrome trace event format."""
+        with self._lock:
+            trace_events = list(self._trace_events)
+
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        metadata_events = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread_names[tid]}}
+            for tid in sorted({trace_event["tid"] for trace_event in trace_events})
+            if tid in thread_names
+        ]
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata_events + trace_events, "displayTimeUnit": "ms"}, f)
+
+    def get_flame_summary(self) -> list[FridFlameSummary]:
+        """
+        Summarize the recorded spans per functionality, in the order the functionalities were rendered.
+
+        The entries of a functionality are in depth-first order, the children of a path ordered by their total time.
+        """
+        with self._lock:
+            self_durations_ns = {frid: dict(durations) for frid, durations in self._self_durations_ns.items()}
+
+        flame_summary = []
+        for frid, durations in self_durations_ns.items():
+            total_durations_ns: dict[tuple[str, ...], int] = defaultdict(int)
+            for path, self_duration_ns in durations.items():
+                for depth in range(1, len(path) + 1):
+                    total_durations_ns[path[:depth]] += self_duration_ns
+
+            children = defaultdict(list)
+            for path in total_durations_ns:
+                children[path[:-1]].append(path)
+
+            total_ns = sum(durations.values())
+            frid_flame_summary = FridFlameSummary(frid=frid, total_seconds=total_ns / 1e9)
+            pending_paths = sorted(children[()], key=lambda path: total_durations_ns[path])
+            while pending_paths:
+                path = pending_paths.pop()
+                if total_durations_ns[path] < total_ns * MIN_FLAME_SUMMARY_SHARE:
+                    continue
+                frid_flame_summary.entries.append(
+                    FlameSummaryEntry(
+                        path=path,
+                        total_seconds=total_durations_ns[path] / 1e9,
+                        self_seconds=durations.get(path, 0) / 1e9,
+                    )
+                )
+                pending_paths.extend(sorted(children[path], key=lambda child: total_durations_ns[child]))
+            flame_summary.append(frid_flame_summary)
+
+        return flame_summary
+
+
+def profiled(category: str, name: Union[str, Callable[..., str], None] = None):
+    """
+    Record every call of the decorated function as a span.
+
+    The span is named after the function, unless a name or a function that names it from the call's arguments (passed
+    as keyword arguments) is given.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+
+            if name is None:
+                span_name = func.__name__
+            elif callable(name):
+                span_name = name(**signature.bind(*args, **kwargs).arguments)
+            else:
+                span_name = name
+            with profiler.span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+profiler = Profiler()
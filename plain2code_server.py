@@ -0,0 +1,301 @@
+"""Long-lived plain2code process that runs jobs submitted by the thin client (see plain2code_client).
+
+`codeplain serve` starts the server on a UNIX socket (or on a localhost port). Only the user running the server can
+connect to the socket. A server on a port writes a random token to a file only that user can read, and runs only the
+jobs sent with it. Every job is a plain2code command line
+(a render, a dry run, the account status, ...) that is run like `codeplain <arguments>` in the working directory and
+the environment of the client, in headless mode. What the command prints, its log records and its render events are
+streamed back to the client.
+
+The server keeps what does not need to be loaded again between jobs: the imported modules, the parsed plain files
+(parsed again only when one of their files changed), the git repository handles, the connections to the API and
+the persistent test runners. Jobs are run one at a time, in the order they are submitted, because a render uses
+process-wide state (the working directory, the environment, the console). A job is cancelled when its client
+disconnects (e.g. on Ctrl+C), so that it does not hold up the jobs submitted after it.
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import threading
+from typing import Any, Callable, Optional, cast
+
+import git_utils
+import plain2code
+import plain_file
+from event_bus import EventBus
+from plain2code_arguments import parse_arguments
+from plain2code_client import (
+    DEFAULT_SOCKET_PATH,
+    DEFAULT_TOKEN_PATH,
+    EVENT_MESSAGE,
+    EXIT_MESSAGE,
+    LOG_MESSAGE,
+    OUTPUT_MESSAGE,
+    SERVER_HOST,
+    read_messages,
+    send_message,
+)
+from plain2code_console import console
+from plain2code_events import BaseEvent
+from plain2code_logger import LOGGER_NAME
+from run_control import RunControl
+
+
+class _JobConnection:
+    """
+    Sends the messages of a job to its client. Once the client disconnects, the job is cancelled and its messages are
+    dropped.
+    """
+
+    def __init__(self, connection_file, run_control: RunControl):
+        self._connection_file = connection_file
+        self._run_control = run_control
+        self._lock = threading.Lock()
+        self.connected = True
+
+    def send(self, message: dict[str, Any]) -> None:
+        with self._lock:
+            if not self.connected:
+                return
+            try:
+                send_message(self._connection_file, message)
+                return
+            except OSError:
+                self.connected = False
+        self._run_control.cancel()
+
+    def _disconnected(self) -> None:
+        with self._lock:
+            self.connected = False
+        self._run_control.cancel()
+
+    def watch(self, connection: socket.socket) -> None:
+        """
+        Cancel the job as soon as the client closes the connection, also while the job does not send anything.
+
+        The client sends nothing after the job, so the end of the connection is the only thing there is to read.
+        Shutting down the reading side of the connection stops watching it.
+        """
+
+        def _watch() -> None:
+            with contextlib.suppress(OSError):
+                while connection.recv(4096):
+                    pass
+            self._disconnected()
+
+        threading.Thread(target=_watch, daemon=True).start()
+
+
+class _OutputStream(io.TextIOBase):
+    """Stands in for stdout and stderr during a job, sending what is written to the client."""
+
+    def __init__(self, send: Callable[[dict[str, Any]], None]):
+        self._send = send
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self._send({"type": OUTPUT_MESSAGE, "text": text})
+        return len(text)
+
+
+class _LogStreamHandler(logging.Handler):
+    """Sends the log records the console does not print (e.g. in headless mode) to the client."""
+
+    def __init__(self, send: Callable[[dict[str, Any]], None], level: int):
+        super().__init__(level)
+        self._send = send
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not console.quiet:
+            return
+        self._send({"type": LOG_MESSAGE, "level": record.levelname, "message": record.getMessage()})
+
+
+def _encode_event(event: BaseEvent) -> dict[str, Any]:
+    # All events are dataclasses
+    return {"type": EVENT_MESSAGE, "event": type(event).__name__, "data": dataclasses.asdict(cast(Any, event))}
+
+
+def _get_event_types(event_type: type = BaseEvent) -> list[type]:
+    event_types = []
+    for subclass in event_type.__subclasses__():
+        event_types.append(subclass)
+        event_types.extend(_get_event_types(subclass))
+    return event_types
+
+
+@contextlib.contextmanager
+def _job_environment(cwd: str, env: dict[str, str]):
+    """Run the block in the working directory and with the environment variables of the job."""
+    previous_cwd = os.getcwd()
+    previous_env = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        os.chdir(cwd)
+        yield
+    finally:
+        os.chdir(previous_cwd)
+        os.environ.clear()
+        os.environ.update(previous_env)
+
+
+def run_job(
+    job: dict[str, Any], send: Callable[[dict[str, Any]], None], run_control: Optional[RunControl] = None
+) -> int:
+    """
+    Run a job like `codeplain <job argv>` and return its exit code. The job's messages are passed to send, and its
+    render is cancelled through run_control.
+    """
+    event_bus = EventBus()
+    for event_type in _get_event_types():
+        event_bus.subscribe(event_type, lambda event: send(_encode_event(event)))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    job_handlers = list(logger.handlers)
+    output_stream = _OutputStream(send)
+    # Files and repositories may have been changed by other processes since the previous job
+    git_utils.forget_worktrees()
+
+    try:
+        with (
+            _job_environment(job["cwd"], job["env"]),
+            contextlib.redirect_stdout(output_stream),
+            contextlib.redirect_stderr(output_stream),
+        ):
+            args = parse_arguments(job["argv"])
+            # There is no terminal for the TUI, the client shows the job's output instead
+            args.headless = True
+            logger.addHandler(_LogStreamHandler(send, logging.DEBUG if args.verbose else logging.INFO))
+            plain2code.run(args, event_bus, run_control)
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else int(e.code is not None)
+    except Exception as e:
+        send({"type": OUTPUT_MESSAGE, "text": f"Error: {str(e) or repr(e)}\n"})
+        return 1
+    finally:
+        # Remove the handlers added by the job (including its log file), the next job adds its own
+        for handler in list(logger.handlers):
+            if handler not in job_handlers:
+                logger.removeHandler(handler)
+                handler.close()
+        console.quiet = False
+
+
+class _JobRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        job = next(read_messages(self.rfile), None)
+        if job is None:
+            return
+
+        run_control = RunControl()
+        job_connection = _JobConnection(self.wfile, run_control)
+        if isinstance(self.server, _TCPJobServer) and not self.server.is_valid_token(job.get("token")):
+            job_connection.send({"type": OUTPUT_MESSAGE, "text": "Error: Invalid plain2code server token.\n"})
+            job_connection.send({"type": EXIT_MESSAGE, "code": 1})
+            return
+
+        job_connection.watch(self.request)
+        exit_code = run_job(job, job_connection.send, run_control)
+        job_connection.send({"type": EXIT_MESSAGE, "code": exit_code})
+        with contextlib.suppress(OSError):
+            self.request.shutdown(socket.SHUT_RD)
+
+
+class _UnixJobServer(socketserver.UnixStreamServer):
+    @property
+    def socket_path(self) -> str:
+        return cast(str, self.server_address)
+
+    def server_bind(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+        # A socket left behind by a server that did not stop cleanly
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.socket_path)
+        super().server_bind()
+        # Only the user running the server can submit jobs
+        os.chmod(self.socket_path, 0o600)
+
+    def server_close(self) -> None:
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.socket_path)
+
+
+class _TCPJobServer(socketserver.TCPServer):
+    """
+    Any local user can connect to a port, so only the jobs sent with the token of the server are run. The token is
+    written to a file only the user running the server can read.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(self, port: int, token_path: str):
+        self.token_path = token_path
+        self._token = secrets.token_hex(16)
+        super().__init__((SERVER_HOST, port), _JobRequestHandler)
+        os.makedirs(os.path.dirname(os.path.abspath(token_path)), exist_ok=True)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(token_path)
+        with os.fdopen(os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as f:
+            f.write(self._token)
+
+    def is_valid_token(self, token: Any) -> bool:
+        return isinstance(token, str) and secrets.compare_digest(token, self._token)
+
+    def server_close(self) -> None:
+        super().server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.token_path)
+
+
+def create_server(
+    socket_path: Optional[str] = None, port: Optional[int] = None, token_path: Optional[str] = None
+) -> socketserver.BaseServer:
+    """Create a server listening on localhost:port if a port is given, otherwise on the UNIX socket."""
+    if port is not None:
+        return _TCPJobServer(port, token_path or DEFAULT_TOKEN_PATH)
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError("UNIX sockets are not supported on this platform. Please use --port instead.")
+    return _UnixJobServer(socket_path or DEFAULT_SOCKET_PATH, _JobRequestHandler)
+
+
+def serve(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="codeplain serve",
+        description="Run a long-lived plain2code server that runs the jobs submitted with plain2code_client.",
+    )
+    address_group = parser.add_mutually_exclusive_group()
+    address_group.add_argument(
+        "--socket", default=None, help=f"UNIX socket to listen on (default: {DEFAULT_SOCKET_PATH})."
+    )
+    address_group.add_argument("--port", type=int, default=None, help="Listen on this localhost port instead.")
+    parser.add_argument(
+        "--token-file",
+        default=None,
+        help="File the token of the server listening on --port is written to, for the clients to read "
+        f"(default: {DEFAULT_TOKEN_PATH}).",
+    )
+    args = parser.parse_args(argv)
+
+    plain_file.plain_file_parse_cache.enabled = True
+    server = create_server(args.socket, args.port, args.token_file)
+    console.info(f"plain2code server listening on {server.server_address}. Press Ctrl+C to stop it.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        git_utils.close_repo_handles()
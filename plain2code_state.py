@@ -27,6 +27,8 @@ class RunState:
         self.current_module: Optional[str] = None
         self.current_frid: Optional[str] = None
         self.current_render_state: Optional[str] = None
+        # Script output store folders of the modules rendered so far, for the crash log
+        self.script_output_folders: list[str] = []
         self.user_email: Optional[str] = None
 
     def increment_call_count(self):
@@ -1,5 +1,7 @@
+import copy
 import io
 import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Sequence, cast
@@ -752,7 +754,14 @@ def process_exported_definitions(plain_source: dict, exported_definitions: list[
                 plain_source[plain_spec.DEFINITIONS].children.append(exported_definition)
 
 
-def plain_file_parser(  # noqa: C901
+def plain_file_parser(
+    plain_source_file_name: str,
+    template_dirs: list[str],
+) -> tuple[str, dict, list[str]]:
+    return plain_file_parse_cache.parse(plain_source_file_name, template_dirs)
+
+
+def _parse_plain_source_file(  # noqa: C901
     plain_source_file_name: str,
     template_dirs: list[str],
 ) -> tuple[str, dict, list[str]]:
@@ -836,3 +845,59 @@ def plain_file_parser(  # noqa: C901
         concept_utils.sort_definitions(marshalled_plain_source[plain_spec.DEFINITIONS])
 
     return module_name, marshalled_plain_source, plain_file_parse_result.required_modules
+
+
+def _get_files_signature(paths: Iterable[str]) -> tuple:
+    signature: list[tuple[str, int | None, int | None]] = []
+    for path in sorted(paths):
+        try:
+            path_stat = os.stat(path)
+            signature.append((path, path_stat.st_mtime_ns, path_stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+@dataclass
+class _CachedParse:
+    files_signature: tuple
+    result: tuple[str, dict, list[str]]
+
+
+class PlainFileParseCache:
+    """
+    Keeps the parsed plain files of a long-lived process (see plain2code_server), so that a plain file is parsed again
+    only if one of the files looked up while parsing it (its plain files and templates, found or not) changed.
+
+    The cache is disabled by default, a single render parses every plain file once.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._cached_parses: dict[tuple[str, tuple[str, ...]], _CachedParse] = {}
+
+    def parse(self, plain_source_file_name: str, template_dirs: list[str]) -> tuple[str, dict, list[str]]:
+        if not self.enabled:
+            return _parse_plain_source_file(plain_source_file_name, template_dirs)
+
+        key = (plain_source_file_name, tuple(os.path.abspath(folder) for folder in template_dirs))
+        with self._lock:
+            cached_parse = self._cached_parses.get(key)
+        if cached_parse is not None and cached_parse.files_signature == _get_files_signature(
+            path for path, _, _ in cached_parse.files_signature
+        ):
+            return copy.deepcopy(cached_parse.result)
+
+        with file_utils.record_looked_up_paths() as looked_up_paths:
+            result = _parse_plain_source_file(plain_source_file_name, template_dirs)
+        with self._lock:
+            self._cached_parses[key] = _CachedParse(_get_files_signature(looked_up_paths), copy.deepcopy(result))
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cached_parses.clear()
+
+
+plain_file_parse_cache = PlainFileParseCache()
@@ -1,6 +1,5 @@
 from typing import Any
 
-import file_utils
 import git_utils
 import plain_spec
 from plain2code_console import console
@@ -25,10 +24,7 @@ class AnalyzeSpecificationAmbiguity(BaseAction):
             )
 
         previous_frid = plain_spec.get_previous_frid(render_context.plain_source_tree, render_context.frid_context.frid)
-        git_utils.checkout_commit_with_frid(render_context.build_folder, previous_frid)
-        existing_files = file_utils.list_all_text_files(render_context.build_folder)
-        existing_files_content = file_utils.get_existing_files_content(render_context.build_folder, existing_files)
-        git_utils.checkout_previous_branch(render_context.build_folder)
+        existing_files_content = git_utils.read_files_at_frid(render_context.build_folder, previous_frid)
         implementation_code_diff = ImplementationCodeHelpers.get_implementation_code_diff(
             render_context.build_folder, render_context.frid_context.frid, previous_frid
         )
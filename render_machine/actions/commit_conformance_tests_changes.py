@@ -23,7 +23,9 @@ class CommitConformanceTestsChanges(BaseAction):
                 render_context.module_name,
                 render_context.frid_context.frid,
                 render_context.run_state.render_id,
+                changed_paths=render_context.build_folder_changed_paths,
             )
+            render_context.build_folder_changed_paths.clear()
             implementation_updated = True
 
         functional_requirement_text = render_context.frid_context.specifications[plain_spec.FUNCTIONAL_REQUIREMENTS][-1]
@@ -39,6 +41,7 @@ class CommitConformanceTestsChanges(BaseAction):
                 render_context.conformance_tests_running_context.current_testing_module_name
             ),
         )
+        render_context.conformance_tests.flush()
         git_utils.add_all_files_and_commit(
             render_context.conformance_tests.get_module_conformance_tests_folder(render_context.module_name),
             formatted_conformance_commit_msg,
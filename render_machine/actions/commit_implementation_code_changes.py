@@ -18,6 +18,8 @@ class CommitImplementationCodeChanges(BaseAction):
             render_context.module_name,
             render_context.frid_context.frid,
             render_context.run_state.render_id,
+            changed_paths=render_context.build_folder_changed_paths,
         )
+        render_context.build_folder_changed_paths.clear()
 
         return self.SUCCESSFUL_OUTCOME, None
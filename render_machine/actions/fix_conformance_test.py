@@ -3,7 +3,6 @@ from typing import Any
 import diff_utils
 import file_utils
 import plain_spec
-from memory_management import MemoryManager
 from plain2code_console import RETRY_COLOR, console
 from plain2code_exceptions import InternalClientError
 from render_machine.actions.base_action import BaseAction
@@ -67,7 +66,11 @@ class FixConformanceTest(BaseAction):
         existing_files, existing_files_content = ImplementationCodeHelpers.fetch_existing_files(
             render_context.build_folder
         )
-        _, memory_files_content = MemoryManager.fetch_memory_files(render_context.memory_manager.memory_folder)
+        memory_files_content = render_context.memory_manager.fetch_relevant_memory_files(
+            render_context.conformance_tests_running_context.current_testing_frid,
+            render_context.conformance_tests_running_context.current_testing_module_name,
+            previous_conformance_tests_issue,
+        )
         (
             existing_conformance_test_files,
             existing_conformance_test_files_content,
@@ -78,7 +81,10 @@ class FixConformanceTest(BaseAction):
             render_context.conformance_tests_running_context.get_current_conformance_test_folder_name(),
         )
         previous_frid_code_diff = ImplementationCodeHelpers.get_code_diff(
-            render_context.build_folder, render_context.plain_source_tree, render_context.frid_context.frid
+            render_context.build_folder,
+            render_context.plain_source_tree,
+            render_context.frid_context.frid,
+            render_context.build_folder_changed_paths,
         )
 
         conflicting_module_name = render_context.conformance_tests_running_context.conflicting_module_name
@@ -165,6 +171,7 @@ class FixConformanceTest(BaseAction):
         else:
             if len(response_files) > 0:
                 file_utils.store_response_files(render_context.build_folder, response_files, existing_files)
+                render_context.record_build_folder_changes(response_files.keys())
                 code_diff_files_content = diff_utils.get_code_diff(response_files, existing_files_content)
                 render_context.conformance_tests_running_context.code_diff_files = code_diff_files_content
                 console.print_files(
@@ -48,6 +48,7 @@ class FixUnitTests(BaseAction):
         )
 
         render_context.unit_tests_running_context.changed_files.update(changed_files)
+        render_context.record_build_folder_changes(changed_files)
 
         console.print_files("Files fixed:", render_context.build_folder, response_files, style=console.OUTPUT_STYLE)
 
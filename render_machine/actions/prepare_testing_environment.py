@@ -18,6 +18,31 @@ class PrepareTestingEnvironment(BaseAction):
         ):
             return self.SUCCESSFUL_OUTCOME, None
 
+        environment_cache = render_context.prepared_environment_cache
+        environment_key = None
+        if environment_cache.enabled:
+            render_context.update_prepared_environment()
+            environment_key = render_context.prepared_environment_key
+
+        render_context.script_execution_history.latest_testing_environment_output_cached = (
+            environment_key is not None and environment_cache.is_prepared(environment_key)
+        )
+        if render_context.script_execution_history.latest_testing_environment_output_cached:
+            # The dependencies have not changed since the environment was prepared, so it can be reused as it is
+            render_context.conformance_tests_running_context.should_prepare_testing_environment = False
+            render_context.script_execution_history.latest_testing_environment_output_path = (
+                render_utils.report_cached_script_result(
+                    render_context.prepare_environment_script,
+                    f"The testing environment in {render_context.prepared_environment_dir} is already prepared "
+                    "for the dependency manifests of the build folder.",
+                    0,
+                    "Testing Environment Preparation",
+                    output_store=render_context.script_output_store,
+                )
+            )
+            render_context.script_execution_history.should_update_script_outputs = True
+            return self.SUCCESSFUL_OUTCOME, None
+
         console.info(
             f"Running testing environment preparation script {render_context.prepare_environment_script} for build folder {render_context.build_folder}."
         )
@@ -26,13 +51,18 @@ class PrepareTestingEnvironment(BaseAction):
             [render_context.build_folder],
             "Testing Environment Preparation",
             timeout=render_context.test_script_timeout,
-            stop_event=render_context.stop_event,
+            run_control=render_context.run_control,
+            event_bus=render_context.event_bus,
+            env=render_context.get_test_script_env(),
+            output_store=render_context.script_output_store,
         )
 
         render_context.conformance_tests_running_context.should_prepare_testing_environment = False
         render_context.script_execution_history.latest_testing_environment_output_path = preparation_temp_file_path
         render_context.script_execution_history.should_update_script_outputs = True
         if exit_code == 0:
+            if environment_key is not None:
+                environment_cache.mark_prepared(environment_key)
             return self.SUCCESSFUL_OUTCOME, None
         else:
             return (
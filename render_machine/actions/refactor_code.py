@@ -56,6 +56,7 @@ class RefactorCode(BaseAction):
             return self.NO_FILES_REFACTORED_OUTCOME, None
 
         file_utils.store_response_files(render_context.build_folder, response_files, existing_files)
+        render_context.record_build_folder_changes(response_files.keys())
 
         console.print_files(
             "Files refactored:", render_context.build_folder, response_files, style=console.OUTPUT_STYLE
@@ -2,7 +2,6 @@ from typing import Any
 
 import file_utils
 import render_machine.render_utils as render_utils
-from memory_management import MemoryManager
 from plain2code_console import RETRY_COLOR, console
 from plain2code_exceptions import FunctionalRequirementTooComplex
 from render_machine.actions.base_action import BaseAction
@@ -37,7 +36,11 @@ class RenderFunctionalRequirement(BaseAction):
         existing_files, existing_files_content = ImplementationCodeHelpers.fetch_existing_files(
             render_context.build_folder
         )
-        _, memory_files_content = MemoryManager.fetch_memory_files(render_context.memory_manager.memory_folder)
+        memory_files_content = render_context.memory_manager.fetch_relevant_memory_files(
+            render_context.frid_context.frid,
+            render_context.module_name,
+            render_context.frid_context.functional_requirement_text,
+        )
 
         msg = "-------------------------------------\n"
         msg += f"Module: {render_context.module_name}\n"
@@ -83,6 +86,7 @@ class RenderFunctionalRequirement(BaseAction):
             render_context.build_folder, existing_files, response_files
         )
         render_context.frid_context.changed_files.update(changed_files)
+        render_context.record_build_folder_changes(changed_files)
 
         console.print_files(
             "Files generated or updated:",
@@ -1,9 +1,13 @@
 import os
-from typing import Any
+from typing import Any, Optional
 
+import git_utils
+import render_machine.parallel_regression as parallel_regression
 import render_machine.render_utils as render_utils
 from plain2code_console import console
+from render_machine import test_failure_extraction, test_results_cache
 from render_machine.actions.base_action import BaseAction
+from render_machine.parallel_regression import RegressionTest
 from render_machine.render_context import RenderContext
 from render_machine.render_types import RenderError
 
@@ -18,37 +22,67 @@ class RunConformanceTests(BaseAction):
 
     def execute(self, render_context: RenderContext, _previous_action_payload: Any | None):
         conformance_tests_script = os.path.normpath(render_context.conformance_tests_script)
+        current_testing_module_name = render_context.conformance_tests_running_context.current_testing_module_name
+        current_testing_frid = render_context.conformance_tests_running_context.current_testing_frid
+        current_test = (current_testing_module_name, current_testing_frid)
+        conformance_tests_folder_name = self._get_conformance_tests_folder_name(
+            render_context,
+            current_testing_module_name,
+            render_context.conformance_tests_running_context.get_current_conformance_test_folder_name(),
+        )
 
-        if render_context.module_name == render_context.conformance_tests_running_context.current_testing_module_name:
-            conformance_tests_folder_name = (
-                render_context.conformance_tests_running_context.get_current_conformance_test_folder_name()
+        cache_key = self._get_cache_key(render_context, conformance_tests_script, conformance_tests_folder_name)
+        cached_result = render_context.test_results_cache.get(cache_key) if cache_key is not None else None
+        if cached_result is not None:
+            exit_code, conformance_tests_issue = cached_result.exit_code, cached_result.output
+            conformance_tests_temp_log_file_path = render_utils.report_cached_script_result(
+                conformance_tests_script,
+                conformance_tests_issue,
+                exit_code,
+                "Conformance Tests",
+                frid=current_testing_frid,
+                module=current_testing_module_name,
+                output_store=render_context.script_output_store,
             )
         else:
-            [conformance_tests_folder_name, _] = (
-                render_context.conformance_tests.get_source_conformance_test_folder_name(
-                    render_context.module_name,
-                    render_context.required_modules,
-                    render_context.conformance_tests_running_context.current_testing_module_name,
-                    render_context.conformance_tests_running_context.get_current_conformance_test_folder_name(),
+            if (
+                render_context.should_run_regression_tests_in_parallel()
+                and current_test not in render_context.regression_test_results
+            ):
+                self._run_regression_tests_in_parallel(render_context, conformance_tests_script)
+
+            if current_test in render_context.regression_test_results:
+                exit_code, conformance_tests_issue, conformance_tests_temp_log_file_path = (
+                    render_context.regression_test_results.pop(current_test)
+                )
+                if exit_code != 0:
+                    # The implementation code is about to change, so the results of the later tests no longer apply.
+                    render_context.regression_test_results.clear()
+            else:
+                console.info(
+                    f"Running conformance tests script {conformance_tests_script} "
+                    + f"for {conformance_tests_folder_name} ("
+                    + f"functionality {current_testing_frid} "
+                    + f"in module {current_testing_module_name}"
+                    + ")."
+                )
+                exit_code, conformance_tests_issue, conformance_tests_temp_log_file_path = render_utils.execute_script(
+                    conformance_tests_script,
+                    [render_context.build_folder, conformance_tests_folder_name],
+                    "Conformance Tests",
+                    frid=current_testing_frid,
+                    module=current_testing_module_name,
+                    timeout=render_context.test_script_timeout,
+                    run_control=render_context.run_control,
+                    event_bus=render_context.event_bus,
+                    env=render_context.get_test_script_env(),
+                    output_store=render_context.script_output_store,
                 )
-            )
 
-        console.info(
-            f"Running conformance tests script {conformance_tests_script} "
-            + f"for {conformance_tests_folder_name} ("
-            + f"functionality {render_context.conformance_tests_running_context.current_testing_frid} "
-            + f"in module {render_context.conformance_tests_running_context.current_testing_module_name}"
-            + ")."
-        )
-        exit_code, conformance_tests_issue, conformance_tests_temp_log_file_path = render_utils.execute_script(
-            conformance_tests_script,
-            [render_context.build_folder, conformance_tests_folder_name],
-            "Conformance Tests",
-            frid=render_context.conformance_tests_running_context.current_testing_frid,
-            module=render_context.conformance_tests_running_context.current_testing_module_name,
-            timeout=render_context.test_script_timeout,
-            stop_event=render_context.stop_event,
-        )
+            if cache_key is not None:
+                render_context.test_results_cache.put(cache_key, exit_code, conformance_tests_issue)
+
+        render_context.script_execution_history.latest_conformance_test_output_cached = cached_result is not None
         render_context.script_execution_history.latest_conformance_test_output_path = (
             conformance_tests_temp_log_file_path
         )
@@ -80,4 +114,82 @@ class RunConformanceTests(BaseAction):
                 ).to_payload(),
             )
 
-        return self.FAILED_OUTCOME, {"previous_conformance_tests_issue": conformance_tests_issue}
+        # The full output stays in the conformance tests output file, the fix only needs the failures
+        return self.FAILED_OUTCOME, {
+            "previous_conformance_tests_issue": test_failure_extraction.extract_test_failures(conformance_tests_issue)
+        }
+
+    @staticmethod
+    def _get_conformance_tests_folder_name(
+        render_context: RenderContext, testing_module_name: str, conformance_tests_folder_name: str
+    ) -> str:
+        if render_context.module_name == testing_module_name:
+            return conformance_tests_folder_name
+
+        [source_conformance_tests_folder_name, _] = (
+            render_context.conformance_tests.get_source_conformance_test_folder_name(
+                render_context.module_name,
+                render_context.required_modules,
+                testing_module_name,
+                conformance_tests_folder_name,
+            )
+        )
+        return source_conformance_tests_folder_name
+
+    @staticmethod
+    def _get_cache_key(
+        render_context: RenderContext,
+        conformance_tests_script: str,
+        conformance_tests_folder_name: str,
+        build_tree_sha: Optional[str] = None,
+    ) -> Optional[str]:
+        if not render_context.test_results_cache.enabled:
+            return None
+
+        if build_tree_sha is None:
+            build_tree_sha = git_utils.get_working_tree_sha(render_context.build_folder)
+        return test_results_cache.get_conformance_tests_cache_key(
+            build_tree_sha,
+            conformance_tests_folder_name,
+            conformance_tests_script,
+            render_context.get_test_environment_fingerprint(),
+        )
+
+    def _run_regression_tests_in_parallel(self, render_context: RenderContext, conformance_tests_script: str):
+        build_tree_sha = None
+        if render_context.test_results_cache.enabled:
+            build_tree_sha = git_utils.get_working_tree_sha(render_context.build_folder)
+
+        regression_tests = []
+        for module_name, frid, folder_name in render_context.get_pending_regression_tests():
+            conformance_tests_folder_name = self._get_conformance_tests_folder_name(
+                render_context, module_name, folder_name
+            )
+            cache_key = self._get_cache_key(
+                render_context, conformance_tests_script, conformance_tests_folder_name, build_tree_sha
+            )
+            cached_result = render_context.test_results_cache.get(cache_key) if cache_key is not None else None
+            if cached_result is None:
+                regression_tests.append(RegressionTest(module_name, frid, conformance_tests_folder_name))
+            elif cached_result.exit_code != 0:
+                # The regression walk stops at this cached failure, the tests after it are not needed yet
+                break
+
+        if len(regression_tests) == 0:
+            return
+
+        console.info(
+            f"Running conformance tests script {conformance_tests_script} for {len(regression_tests)} earlier "
+            f"functionalities using {min(render_context.regression_workers, len(regression_tests))} parallel workers."
+        )
+        render_context.regression_test_results = parallel_regression.run_regression_tests(
+            conformance_tests_script,
+            render_context.build_folder,
+            regression_tests,
+            render_context.regression_workers,
+            timeout=render_context.test_script_timeout,
+            run_control=render_context.run_control,
+            event_bus=render_context.event_bus,
+            env=render_context.get_test_script_env(),
+            output_store=render_context.script_output_store,
+        )
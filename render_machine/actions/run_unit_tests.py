@@ -1,8 +1,10 @@
 import os
 from typing import Any
 
+import git_utils
 import render_machine.render_utils as render_utils
 from plain2code_console import console
+from render_machine import test_failure_extraction, test_results_cache
 from render_machine.actions.base_action import BaseAction
 from render_machine.render_context import RenderContext
 from render_machine.render_types import RenderError
@@ -17,18 +19,46 @@ class RunUnitTests(BaseAction):
 
     def execute(self, render_context: RenderContext, _previous_action_payload: Any | None):
         unittests_script = os.path.normpath(render_context.unittests_script)
+        # The unit tests run before the testing environment is prepared, and after changes of the dependencies
+        render_context.update_prepared_environment()
 
-        console.info(
-            f"Running unit tests script {unittests_script}. (attempt: {render_context.unit_tests_running_context.fix_attempts + 1})"
-        )
-        exit_code, unittests_issue, unittests_temp_log_file_path = render_utils.execute_script(
-            unittests_script,
-            [render_context.build_folder],
-            "Unit Tests",
-            timeout=render_context.test_script_timeout,
-            stop_event=render_context.stop_event,
-        )
+        cache_key = None
+        if render_context.test_results_cache.enabled:
+            cache_key = test_results_cache.get_unit_tests_cache_key(
+                git_utils.get_working_tree_sha(render_context.build_folder),
+                unittests_script,
+                render_context.get_test_environment_fingerprint(),
+            )
+
+        cached_result = render_context.test_results_cache.get(cache_key) if cache_key is not None else None
+        if cached_result is not None:
+            # The cached output is passed on like a fresh one, so FixUnitTests still gets the failure text
+            exit_code, unittests_issue = cached_result.exit_code, cached_result.output
+            unittests_temp_log_file_path = render_utils.report_cached_script_result(
+                unittests_script,
+                unittests_issue,
+                exit_code,
+                "Unit Tests",
+                output_store=render_context.script_output_store,
+            )
+        else:
+            console.info(
+                f"Running unit tests script {unittests_script}. (attempt: {render_context.unit_tests_running_context.fix_attempts + 1})"
+            )
+            exit_code, unittests_issue, unittests_temp_log_file_path = render_utils.execute_script(
+                unittests_script,
+                [render_context.build_folder],
+                "Unit Tests",
+                timeout=render_context.test_script_timeout,
+                run_control=render_context.run_control,
+                event_bus=render_context.event_bus,
+                env=render_context.get_test_script_env(),
+                output_store=render_context.script_output_store,
+            )
+            if cache_key is not None:
+                render_context.test_results_cache.put(cache_key, exit_code, unittests_issue)
 
+        render_context.script_execution_history.latest_unit_test_output_cached = cached_result is not None
         render_context.script_execution_history.latest_unit_test_output_path = unittests_temp_log_file_path
         render_context.script_execution_history.should_update_script_outputs = True
         if exit_code == 0:
@@ -47,4 +77,7 @@ class RunUnitTests(BaseAction):
                 ).to_payload(),
             )
         else:
-            return self.FAILED_OUTCOME, {"previous_unittests_issue": unittests_issue}
+            # The full output stays in the unit tests output file, the fix only needs the failures
+            return self.FAILED_OUTCOME, {
+                "previous_unittests_issue": test_failure_extraction.extract_test_failures(unittests_issue)
+            }
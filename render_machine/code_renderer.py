@@ -1,8 +1,8 @@
-import time
-from copy import deepcopy
+from typing import Optional
 
-from transitions.extensions.diagrams import HierarchicalGraphMachine
+from transitions.extensions.nesting import HierarchicalMachine
 
+from plain2code_console import console
 from plain2code_events import (
     RenderModuleCompleted,
     RenderModuleFailed,
@@ -10,16 +10,29 @@ from plain2code_events import (
     RenderPaused,
     RenderStateUpdated,
 )
+from plain2code_profiler import profiler
+from render_machine import render_checkpoint
 from render_machine.render_context import RenderContext
 from render_machine.state_machine_config import StateMachineConfig, States
 
-PAUSE_POLL_INTERVAL_SECONDS = 1
+
+def create_machine(render_machine_graph: bool, **kwargs) -> HierarchicalMachine:
+    """
+    Create the render state machine. The graph machine, which sets up the diagram backend for every machine, is only
+    loaded when the diagram of the state machine is requested.
+    """
+    if not render_machine_graph:
+        return HierarchicalMachine(**kwargs)
+
+    from transitions.extensions.diagrams import HierarchicalGraphMachine
+
+    return HierarchicalGraphMachine(**kwargs)
 
 
 class CodeRenderer:
     """Main code renderer class that orchestrates the code generation workflow using a hierarchical state machine."""
 
-    def __init__(self, render_context: RenderContext):
+    def __init__(self, render_context: RenderContext, render_machine_graph: bool = False):
         self.render_context = render_context
         self.state_machine_config = StateMachineConfig()
 
@@ -27,7 +40,8 @@ class CodeRenderer:
         states = self.state_machine_config.get_states(self.render_context)
         transitions = self.state_machine_config.get_transitions(self.render_context)
 
-        self.machine = HierarchicalGraphMachine(
+        self.machine = create_machine(
+            render_machine_graph,
             model=self.render_context,
             states=states,
             transitions=transitions,
@@ -39,39 +53,62 @@ class CodeRenderer:
         self.action_map = self.state_machine_config.get_action_map()
         self.action_result_triggers_map = self.state_machine_config.get_action_result_triggers_map()
 
-    def run(self):
-        """Execute the main rendering workflow."""
+    def run(self, checkpoint: Optional[render_checkpoint.RenderCheckpoint] = None):
+        """
+        Execute the main rendering workflow.
+
+        The state of the render machine is saved to a checkpoint at every state transition. If a checkpoint is given,
+        the workflow resumes from it instead of starting from the beginning.
+        """
         self.render_context.event_bus.publish(RenderModuleStarted(module_name=self.render_context.module_name))
         self.render_context.run_state.current_module = self.render_context.module_name
         previous_action_payload = None
         previous_state = None
+        previous_snapshot = None
+        module_hashes = self.render_context.plain_module.get_hashes()
+
+        if checkpoint is not None:
+            console.info(
+                f"Resuming the render of module {self.render_context.module_name} in state {checkpoint.state}."
+            )
+            previous_action_payload = render_checkpoint.restore_checkpoint(self.render_context, checkpoint)
 
         while True:
-            if self.render_context.enter_pause_event.is_set():
+            run_control = self.render_context.run_control
+            run_control.raise_if_cancelled()
+            if run_control.pause_requested:
                 self.render_context.event_bus.publish(RenderPaused())
 
-                # don't take sleep time into account for render time
+                # don't take the paused time into account for render time
                 self.render_context.run_state.add_to_render_time()
-                while self.render_context.enter_pause_event.is_set():
-                    time.sleep(PAUSE_POLL_INTERVAL_SECONDS)
+                run_control.wait_while_paused()
                 self.render_context.run_state.set_last_render_start_timestamp()
 
+            snapshot = self.render_context.create_snapshot(previous_snapshot)
             self.render_context.event_bus.publish(
                 RenderStateUpdated(
                     state=self.render_context.state,
                     previous_state=previous_state,
-                    snapshot=self.render_context.create_snapshot(),
+                    changes=snapshot.get_changes(previous_snapshot),
                 )
             )
-            previous_state = deepcopy(self.render_context.state)
+            previous_snapshot = snapshot
+            previous_state = self.render_context.state
             self.render_context.run_state.current_render_state = self.render_context.state
             self.render_context.script_execution_history.should_update_script_outputs = False
 
             self.render_context.previous_action_payload = previous_action_payload
-
-            outcome, previous_action_payload = self.action_map[self.render_context.state].execute(
-                self.render_context, previous_action_payload
-            )
+            if self.render_context.state != States.RENDER_FAILED.value:
+                # A failed render resumes from the state it failed in
+                render_checkpoint.save_checkpoint(self.render_context, previous_action_payload, module_hashes)
+
+            action = self.action_map[self.render_context.state]
+            frid_context = self.render_context.frid_context
+            profiler.current_frid = frid_context.frid if frid_context is not None else None
+            with profiler.span(
+                type(action).__name__, "action", state=self.render_context.state, module=self.render_context.module_name
+            ):
+                outcome, previous_action_payload = action.execute(self.render_context, previous_action_payload)
 
             if self.render_context.state == States.RENDER_FAILED.value:
                 self.render_context.last_error_message = previous_action_payload
@@ -79,6 +116,7 @@ class CodeRenderer:
                 break
 
             if self.render_context.state == States.RENDER_COMPLETED.value:
+                render_checkpoint.delete_checkpoint(self.render_context.plain_module)
                 self.render_context.event_bus.publish(
                     RenderModuleCompleted(module_name=self.render_context.module_name)
                 )
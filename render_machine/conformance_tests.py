@@ -1,5 +1,8 @@
+import copy
 import json
 import os
+import tempfile
+from dataclasses import dataclass
 from typing import Callable, Optional
 
 import file_utils
@@ -10,8 +13,33 @@ from plain_modules import PlainModule, get_module_tests_folder
 CONFORMANCE_TESTS_DEFINITION_FILE_NAME = "conformance_tests.json"
 
 
+@dataclass
+class _CachedDefinition:
+    module_name: str
+    # Conformance tests definition with folder names resolved to absolute paths
+    conformance_tests_json: dict
+    # Modification time and size of the definition file the definition was read from, None if it was not read from
+    # a file or if the file did not exist
+    file_signature: Optional[tuple[int, int]]
+    dirty: bool = False
+
+
+def _get_file_signature(path: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 class ConformanceTests:
-    """Manages the state of conformance tests."""
+    """
+    Manages the state of conformance tests.
+
+    Conformance tests definitions are kept in memory per definition file. A definition is read from its file again only
+    when the file changes on disk (e.g. when git reverts it), and changes to it are written to the file only when
+    flush is called.
+    """
 
     def __init__(
         self,
@@ -25,6 +53,9 @@ class ConformanceTests:
         # archive-only ("<module>.module") required module resolve to its scratch extraction
         # instead of the (non-existent) default plain_modules/<module>/tests path.
         self._resolve_module_tests_folder = resolve_module_tests_folder
+        self._definitions: dict[str, _CachedDefinition] = {}
+        # Folder names per tests folder, with the modification time of the tests folder they were listed at
+        self._folder_names: dict[str, tuple[int, list[str]]] = {}
 
     def get_module_conformance_tests_folder(self, module_name: str) -> str:
         if self._resolve_module_tests_folder is not None:
@@ -63,37 +94,91 @@ class ConformanceTests:
             serializable[frid] = entry
         return serializable
 
+    def _get_definition(self, module_name: str) -> _CachedDefinition:
+        definition_file_name = self._get_full_conformance_tests_definition_file_name(module_name)
+        definition = self._definitions.get(definition_file_name)
+        if definition is not None and definition.dirty:
+            return definition
+
+        file_signature = _get_file_signature(definition_file_name)
+        if definition is None or definition.file_signature != file_signature:
+            try:
+                with open(definition_file_name, "r") as f:
+                    conformance_tests_json = self._resolve_folder_names(module_name, json.load(f))
+            except FileNotFoundError:
+                conformance_tests_json = {}
+                file_signature = None
+            definition = _CachedDefinition(module_name, conformance_tests_json, file_signature)
+            self._definitions[definition_file_name] = definition
+        return definition
+
     def get_conformance_tests_json(self, module_name: str) -> dict:
-        try:
-            with open(self._get_full_conformance_tests_definition_file_name(module_name), "r") as f:
-                conformance_tests_json = json.load(f)
-        except FileNotFoundError:
-            return {}
-        return self._resolve_folder_names(module_name, conformance_tests_json)
+        # Callers change the returned definition, so they get their own copy of it
+        return copy.deepcopy(self._get_definition(module_name).conformance_tests_json)
+
+    def is_stored_conformance_tests_json(self, module_name: str, conformance_tests_json: dict) -> bool:
+        """Whether conformance_tests_json is the definition stored in the module's definition file."""
+        definition = self._get_definition(module_name)
+        return not definition.dirty and definition.conformance_tests_json == conformance_tests_json
+
+    def get_conformance_test_folder_names_by_frid(self, module_name: str) -> dict[str, str]:
+        """The resolved conformance tests folder of every FRID with conformance tests, in the definition's order."""
+        return {
+            frid: entry["folder_name"]
+            for frid, entry in self._get_definition(module_name).conformance_tests_json.items()
+            if isinstance(entry, dict) and "folder_name" in entry
+        }
 
     def dump_conformance_tests_json(self, module_name: str, conformance_tests_json: dict) -> None:
-        """Dump the conformance tests definition to the file. Folder names are stored relative to the
+        """Store the conformance tests definition in memory. It is written to the file by the next flush."""
+        if not os.path.exists(self.get_module_conformance_tests_folder(module_name)):
+            return
+
+        definition_file_name = self._get_full_conformance_tests_definition_file_name(module_name)
+        definition = self._definitions.get(definition_file_name)
+        self._definitions[definition_file_name] = _CachedDefinition(
+            module_name,
+            copy.deepcopy(conformance_tests_json),
+            definition.file_signature if definition is not None else None,
+            dirty=True,
+        )
+
+    def flush(self) -> None:
+        """Write the changed conformance tests definitions to their files. Folder names are stored relative to the
         module's tests folder so the definition is portable and works from a scratch extraction."""
-        if os.path.exists(self.get_module_conformance_tests_folder(module_name)):
-            console.debug(
-                f"Storing conformance tests definition to {self._get_full_conformance_tests_definition_file_name(module_name)}"
-            )
-            serializable = self._relativize_folder_names(module_name, conformance_tests_json)
-            with open(self._get_full_conformance_tests_definition_file_name(module_name), "w") as f:
-                json.dump(serializable, f, indent=4)
+        for definition_file_name, definition in self._definitions.items():
+            if not definition.dirty:
+                continue
+
+            console.debug(f"Storing conformance tests definition to {definition_file_name}")
+            tests_folder = os.path.dirname(definition_file_name)
+            serializable = self._relativize_folder_names(definition.module_name, definition.conformance_tests_json)
+            with tempfile.NamedTemporaryFile(
+                mode="w", dir=tests_folder, delete=False, suffix=".tmp", prefix=".conformance_tests"
+            ) as temp_file:
+                json.dump(serializable, temp_file, indent=4)
+            os.replace(temp_file.name, definition_file_name)
+
+            definition.file_signature = _get_file_signature(definition_file_name)
+            definition.dirty = False
 
     def fetch_existing_conformance_test_folder_names(self, module_name: str) -> list[str]:
-        if os.path.isdir(self.get_module_conformance_tests_folder(module_name)):
-            existing_folder_names = file_utils.list_folders_in_directory(
-                self.get_module_conformance_tests_folder(module_name)
-            )
+        tests_folder = self.get_module_conformance_tests_folder(module_name)
+        try:
+            tests_folder_mtime = os.stat(tests_folder).st_mtime_ns
+        except OSError:
+            # This happens if we're rendering the first FRID (without previously created conformance tests)
+            return []
+
+        cached_folder_names = self._folder_names.get(tests_folder)
+        if cached_folder_names is None or cached_folder_names[0] != tests_folder_mtime:
+            existing_folder_names = file_utils.list_folders_in_directory(tests_folder)
             # Remove hidden folders (those starting with '.')
             existing_folder_names = [folder for folder in existing_folder_names if not folder.startswith(".")]
-        else:
-            # This happens if we're rendering the first FRID (without previously created conformance tests)
-            existing_folder_names = []
+            cached_folder_names = (tests_folder_mtime, existing_folder_names)
+            self._folder_names[tests_folder] = cached_folder_names
 
-        return existing_folder_names
+        return list(cached_folder_names[1])
 
     def get_source_conformance_test_folder_name(
         self,
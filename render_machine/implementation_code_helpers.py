@@ -30,10 +30,11 @@ class ImplementationCodeHelpers:
         return code_diff
 
     @staticmethod
-    def get_code_diff(build_folder: str, plain_source_tree: dict, frid: str):
+    def get_code_diff(build_folder: str, plain_source_tree: dict, frid: str, changed_paths=None):
         previous_frid_code_diff = git_utils.diff(
             build_folder,
             plain_spec.get_previous_frid(plain_source_tree, frid),
+            changed_paths,
         )
 
         return ImplementationCodeHelpers.remove_system_folder_paths_from_code_diff(previous_frid_code_diff)
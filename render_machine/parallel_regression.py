@@ -0,0 +1,117 @@
+import contextvars
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import render_machine.render_utils as render_utils
+from event_bus import EventBus
+from render_machine.script_output_store import ScriptOutputStore
+from run_control import RunControl
+
+CONFORMANCE_TESTS_SCRIPT_TYPE = "Conformance Tests"
+SNAPSHOT_FOLDER_PREFIX = "codeplain_regression_"
+
+
+@dataclass
+class RegressionTest:
+    module_name: str
+    frid: str
+    conformance_tests_folder_name: str
+
+
+def _create_build_folder_snapshots(build_folder: str, snapshots_root: str, count: int) -> list[str]:
+    # Every snapshot gets a distinct base name because test scripts derive their scratch folders from it
+    # (e.g. /tmp/python_<basename>), so workers sharing a base name would overwrite each other's copies.
+    build_folder_name = os.path.basename(os.path.normpath(build_folder))
+    snapshots = []
+    for i in range(count):
+        snapshot = os.path.join(snapshots_root, f"{build_folder_name}_{i}")
+        shutil.copytree(build_folder, snapshot, symlinks=True, ignore=shutil.ignore_patterns(".git"))
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def run_regression_tests(
+    conformance_tests_script: str,
+    build_folder: str,
+    regression_tests: list[RegressionTest],
+    workers: int,
+    timeout: Optional[int] = None,
+    run_control: Optional[RunControl] = None,
+    event_bus: Optional[EventBus] = None,
+    env: Optional[dict[str, str]] = None,
+    output_store: Optional[ScriptOutputStore] = None,
+) -> dict[tuple[str, str], tuple[int, str, Optional[str]]]:
+    """
+    Run the conformance tests of several functionalities concurrently, each worker against its own copy of the
+    build folder.
+
+    Returns the execute_script results keyed by (module name, FRID) for the tests up to and including the first
+    failing one in the given order. Tests after the first failure are not started once it is known, since the
+    implementation code is going to change before they are run again.
+    """
+    if len(regression_tests) == 0:
+        return {}
+
+    workers = min(workers, len(regression_tests))
+    snapshots_root = tempfile.mkdtemp(prefix=SNAPSHOT_FOLDER_PREFIX)
+    try:
+        free_snapshots: queue.Queue[str] = queue.Queue()
+        for snapshot in _create_build_folder_snapshots(build_folder, snapshots_root, workers):
+            free_snapshots.put(snapshot)
+
+        first_failure_index = len(regression_tests)
+        first_failure_lock = threading.Lock()
+
+        def _run_regression_test(index: int, regression_test: RegressionTest):
+            nonlocal first_failure_index
+            if run_control is not None:
+                run_control.raise_if_cancelled()
+            with first_failure_lock:
+                if index > first_failure_index:
+                    return None
+
+            snapshot = free_snapshots.get()
+            try:
+                result = render_utils.execute_script(
+                    conformance_tests_script,
+                    [snapshot, regression_test.conformance_tests_folder_name],
+                    CONFORMANCE_TESTS_SCRIPT_TYPE,
+                    frid=regression_test.frid,
+                    module=regression_test.module_name,
+                    timeout=timeout,
+                    run_control=run_control,
+                    event_bus=event_bus,
+                    env=env,
+                    output_store=output_store,
+                )
+            finally:
+                free_snapshots.put(snapshot)
+
+            if result[0] != 0:
+                with first_failure_lock:
+                    first_failure_index = min(first_failure_index, index)
+            return result
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="regression") as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, _run_regression_test, index, regression_test)
+                for index, regression_test in enumerate(regression_tests)
+            ]
+
+        results = {}
+        for regression_test, future in zip(regression_tests, futures):
+            result = future.result()
+            if result is None:
+                break
+            results[(regression_test.module_name, regression_test.frid)] = result
+            if result[0] != 0:
+                break
+        return results
+    finally:
+        shutil.rmtree(snapshots_root, ignore_errors=True)
@@ -0,0 +1,178 @@
+"""
+Client side of the persistent test runner protocol.
+
+A test script declares itself a persistent runner by containing PERSISTENT_RUNNER_MARKER in its first lines.
+Instead of being started for every test run, such a script is started once with SERVE_ARGUMENT. It listens on
+a localhost TCP port and prints `CODEPLAIN_TEST_RUNNER_PORT=<port>` as a line of its output. Every test run is
+then a connection to that port:
+
+- the client sends one JSON line: {"token": ..., "args": [...], "env": {...}, "cwd": ...}, where `args` are the
+  arguments the script would have been started with, `env` the environment variables to add for the run and
+  `cwd` the directory relative paths in `args` are relative to,
+- the runner answers with JSON lines {"output": "..."} while the tests run and a final {"exit_code": N}.
+
+The token is passed to the runner in the CODEPLAIN_TEST_RUNNER_TOKEN environment variable, so that only the
+client that started the runner can use it. Runners have to work without SERVE_ARGUMENT as well, running the
+tests once like any other test script.
+"""
+
+import atexit
+import json
+import os
+import queue
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import threading
+from typing import Callable, Optional
+
+from plain2code_exceptions import PersistentTestRunnerError
+
+PERSISTENT_RUNNER_MARKER = "codeplain-test-runner: persistent"
+SERVE_ARGUMENT = "--serve"
+PORT_LINE_PREFIX = "CODEPLAIN_TEST_RUNNER_PORT="
+TOKEN_ENV_VAR = "CODEPLAIN_TEST_RUNNER_TOKEN"
+STARTUP_TIMEOUT_SECONDS = 30
+
+# The marker has to be in this many first bytes of the script
+_MARKER_SEARCH_SIZE = 1024
+
+
+def is_persistent_runner_script(script_path: str) -> bool:
+    try:
+        with open(script_path, "rb") as f:
+            return PERSISTENT_RUNNER_MARKER.encode() in f.read(_MARKER_SEARCH_SIZE)
+    except OSError:
+        return False
+
+
+def _get_runner_command(script_path: str) -> list[str]:
+    if sys.platform == "win32":
+        if script_path.lower().endswith(".py"):
+            return ["python", script_path]
+        return ["powershell.exe", "-NoProfile", "-ExecutionPolicy", "Bypass", "-File", script_path]
+    return [script_path]
+
+
+class PersistentTestRunner:
+    """A running persistent test runner serving one test run at a time."""
+
+    def __init__(self, script_path: str):
+        self.script_path = script_path
+        self._token = secrets.token_hex(16)
+        self.process = subprocess.Popen(
+            _get_runner_command(script_path) + [SERVE_ARGUMENT],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, TOKEN_ENV_VAR: self._token},
+            start_new_session=(sys.platform != "win32"),
+        )
+        self.port = self._wait_for_port()
+
+    def _wait_for_port(self) -> int:
+        startup_output: list[str] = []
+        port_queue: queue.Queue[Optional[int]] = queue.Queue()
+
+        def _read_output() -> None:
+            port_reported = False
+            # The runner's own output after the port line is drained so it never blocks on a full pipe
+            for raw_line in iter(self.process.stdout.readline, b""):
+                if port_reported:
+                    continue
+                line = raw_line.decode("utf-8", errors="replace").strip()
+                if line.startswith(PORT_LINE_PREFIX):
+                    port_reported = True
+                    port_queue.put(int(line[len(PORT_LINE_PREFIX) :]))
+                else:
+                    startup_output.append(line)
+            if not port_reported:
+                port_queue.put(None)
+
+        threading.Thread(target=_read_output, daemon=True).start()
+        try:
+            port = port_queue.get(timeout=STARTUP_TIMEOUT_SECONDS)
+        except queue.Empty:
+            port = None
+
+        if port is None:
+            self.close()
+            output = "\n".join(startup_output[-20:])
+            raise PersistentTestRunnerError(
+                f"Persistent test runner {self.script_path} did not report its port. Runner output:\n{output}"
+            )
+        return port
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, args: list[str], env: Optional[dict[str, str]], on_output: Callable[[str], None]) -> int:
+        """Run the tests and return the exit code. The output is passed to `on_output` while the tests run."""
+        try:
+            with socket.create_connection(("127.0.0.1", self.port)) as connection:
+                request = {"token": self._token, "args": args, "env": env or {}, "cwd": os.getcwd()}
+                connection.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                with connection.makefile("r", encoding="utf-8") as responses:
+                    for response in responses:
+                        message = json.loads(response)
+                        if "output" in message:
+                            on_output(message["output"])
+                        elif "exit_code" in message:
+                            return message["exit_code"]
+        except (OSError, ValueError) as e:
+            raise PersistentTestRunnerError(f"Persistent test runner {self.script_path} failed: {e}") from e
+
+        raise PersistentTestRunnerError(
+            f"Persistent test runner {self.script_path} closed the connection before reporting the exit code."
+        )
+
+    def close(self) -> None:
+        if not self.is_alive():
+            return
+        if sys.platform != "win32":
+            try:
+                os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
+            except OSError:
+                self.process.terminate()
+        else:
+            self.process.terminate()
+
+
+class PersistentTestRunnerPool:
+    """
+    Idle persistent test runners, per script. A runner serves one test run at a time, so concurrent test runs
+    (e.g. parallel regression tests) each get their own runner.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle_runners: dict[str, list[PersistentTestRunner]] = {}
+
+    def acquire(self, script_path: str) -> PersistentTestRunner:
+        script_path = os.path.abspath(script_path)
+        with self._lock:
+            idle_runners = self._idle_runners.get(script_path, [])
+            while idle_runners:
+                runner = idle_runners.pop()
+                if runner.is_alive():
+                    return runner
+        return PersistentTestRunner(script_path)
+
+    def release(self, runner: PersistentTestRunner) -> None:
+        if not runner.is_alive():
+            return
+        with self._lock:
+            self._idle_runners.setdefault(runner.script_path, []).append(runner)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for idle_runners in self._idle_runners.values():
+                for runner in idle_runners:
+                    runner.close()
+            self._idle_runners.clear()
+
+
+runner_pool = PersistentTestRunnerPool()
+atexit.register(runner_pool.shutdown)
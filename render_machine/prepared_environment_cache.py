@@ -0,0 +1,108 @@
+import hashlib
+import os
+import shutil
+from typing import Optional
+
+PREPARED_ENVIRONMENTS_FOLDER_NAME = "prepared_environments"
+# Environment variable through which test scripts get the directory of the prepared testing environment
+PREPARED_ENVIRONMENT_DIR_ENV_VAR = "CODEPLAIN_PREPARED_ENVIRONMENT_DIR"
+MAX_PREPARED_ENVIRONMENTS = 3
+
+# Files declaring the dependencies the testing environment is prepared with
+DEPENDENCY_MANIFEST_FILE_NAMES = [
+    "package.json",
+    "package-lock.json",
+    "requirements.txt",
+    "pyproject.toml",
+    "go.mod",
+    "go.sum",
+    "pubspec.yaml",
+]
+IGNORED_FOLDER_NAMES = [".git", "node_modules", "__pycache__", ".venv", "venv"]
+
+_PREPARED_MARKER_FILE_NAME = ".prepared"
+
+
+def get_dependency_manifests_hash(build_folder: str) -> str:
+    manifests_hash = hashlib.sha256()
+    for root, dirs, files in os.walk(build_folder):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_FOLDER_NAMES)
+        for file_name in sorted(files):
+            if file_name not in DEPENDENCY_MANIFEST_FILE_NAMES:
+                continue
+            file_path = os.path.join(root, file_name)
+            manifests_hash.update(os.path.relpath(file_path, build_folder).replace(os.sep, "/").encode())
+            manifests_hash.update(b"\0")
+            with open(file_path, "rb") as f:
+                manifests_hash.update(hashlib.sha256(f.read()).digest())
+    return manifests_hash.hexdigest()
+
+
+def get_prepared_environment_key(build_folder: str, prepare_environment_script: Optional[str]) -> str:
+    key = hashlib.sha256()
+    key.update(get_dependency_manifests_hash(build_folder).encode())
+    key.update(os.path.abspath(build_folder).encode())
+    if prepare_environment_script is not None:
+        with open(prepare_environment_script, "rb") as f:
+            key.update(hashlib.sha256(f.read()).digest())
+    return key.hexdigest()
+
+
+class PreparedEnvironmentCache:
+    """
+    Directories of testing environments prepared by the prepare environment script, keyed by the dependency
+    manifests of the build folder.
+
+    The unit tests and conformance tests scripts get the directory of the environment too, so they can install the
+    dependencies there once per version of the manifests (see test_scripts/run_unittests_react.sh). An environment
+    counts as prepared once the prepare script succeeded for its key. At most MAX_PREPARED_ENVIRONMENTS are kept,
+    the least recently used ones are deleted. A cache without a folder is disabled: nothing is ever prepared and no
+    directories are created.
+
+    Reusing an environment skips the prepare script, so the cache is only safe for scripts that install the
+    dependencies into the environment directory and leave building the code to the test scripts. It is therefore
+    only enabled with --reuse-prepared-environment.
+    """
+
+    def __init__(self, cache_folder: Optional[str]):
+        self.cache_folder = cache_folder
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_folder is not None
+
+    def get_environment_dir(self, key: str) -> str:
+        """Return the directory of the environment with the given key, creating it if needed."""
+        assert self.cache_folder is not None  # only asked for when enabled
+        environment_dir = os.path.join(self.cache_folder, key[:16])
+        if not os.path.isdir(environment_dir):
+            os.makedirs(environment_dir)
+            self._evict(self.cache_folder, keep=key[:16])
+        # Touch the directory to mark the environment as the most recently used one
+        os.utime(environment_dir)
+        return environment_dir
+
+    def is_prepared(self, key: str) -> bool:
+        if self.cache_folder is None:
+            return False
+        return os.path.exists(os.path.join(self.cache_folder, key[:16], _PREPARED_MARKER_FILE_NAME))
+
+    def mark_prepared(self, key: str) -> None:
+        if self.cache_folder is None:
+            return
+
+        with open(os.path.join(self.get_environment_dir(key), _PREPARED_MARKER_FILE_NAME), "w", encoding="utf-8"):
+            pass
+
+    @staticmethod
+    def _evict(cache_folder: str, keep: str) -> None:
+        def _last_used(environment_name: str) -> float:
+            return os.path.getmtime(os.path.join(cache_folder, environment_name))
+
+        environment_names = sorted(
+            (name for name in os.listdir(cache_folder) if name != keep),
+            key=_last_used,
+            reverse=True,
+        )
+        for environment_name in environment_names[MAX_PREPARED_ENVIRONMENTS - 1 :]:
+            shutil.rmtree(os.path.join(cache_folder, environment_name), ignore_errors=True)
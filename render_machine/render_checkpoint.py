@@ -0,0 +1,287 @@
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+import git_utils
+from plain2code_console import console
+from plain2code_exceptions import RenderCheckpointError
+from plain_modules import PlainModule
+from render_machine.conformance_tests import ConformanceTests
+from render_machine.render_context import RenderContext
+from render_machine.render_types import (
+    AcceptanceTestPhase,
+    ConformanceTestsRunningContext,
+    ScriptExecutionHistory,
+    TestExecutionPhase,
+    UnitTestsRunningContext,
+)
+
+RENDER_CHECKPOINT_FILE_NAME = "render_checkpoint.json"
+RENDER_CHECKPOINT_VERSION = 3
+
+# Arguments of ConformanceTestsRunningContext.__init__, the other attributes are set after it is created
+_CONFORMANCE_TESTS_RUNNING_CONTEXT_ARGUMENTS = [
+    "current_testing_module_name",
+    "current_testing_frid",
+    "fix_attempts",
+    "conformance_tests_render_attempts",
+    "current_testing_frid_specifications",
+    "should_prepare_testing_environment",
+]
+
+
+@dataclass
+class RenderCheckpoint:
+    """The state of a module's render machine, saved at one of its state transitions."""
+
+    plain_module: PlainModule
+    state: str
+    data: dict
+
+
+def get_checkpoint_path(plain_module: PlainModule) -> str:
+    return os.path.join(plain_module.get_codeplain_folder(), RENDER_CHECKPOINT_FILE_NAME)
+
+
+def _get_git_repositories(plain_module: PlainModule) -> dict[str, str]:
+    return {
+        "code": plain_module.module_build_folder,
+        "tests": plain_module.module_conformance_tests_folder,
+    }
+
+
+def _get_git_heads(plain_module: PlainModule) -> dict[str, Optional[str]]:
+    return {name: git_utils.get_head_sha(repo_path) for name, repo_path in _get_git_repositories(plain_module).items()}
+
+
+def _get_working_tree_shas(plain_module: PlainModule, git_heads: dict[str, Optional[str]]) -> dict[str, Optional[str]]:
+    # An action that was interrupted leaves its changes uncommitted, HEAD alone doesn't show them
+    return {
+        name: git_utils.get_working_tree_sha(repo_path) if git_heads[name] is not None else None
+        for name, repo_path in _get_git_repositories(plain_module).items()
+    }
+
+
+def _conformance_tests_running_context_to_dict(
+    context: ConformanceTestsRunningContext, conformance_tests: ConformanceTests
+) -> dict:
+    data = dict(vars(context))
+    # Definitions that are the same as in their definition files are read from the files when resuming (None)
+    data["_conformance_tests_json"] = {
+        module_name: (
+            None
+            if conformance_tests.is_stored_conformance_tests_json(module_name, conformance_tests_json)
+            else conformance_tests_json
+        )
+        for module_name, conformance_tests_json in context._conformance_tests_json.items()
+    }
+    data["execution_phase"] = context.execution_phase.name
+    data["acceptance_test_phase"] = context.acceptance_test_phase.name
+    return data
+
+
+def _conformance_tests_running_context_from_dict(
+    data: dict, conformance_tests: ConformanceTests
+) -> ConformanceTestsRunningContext:
+    data = dict(data)
+    conformance_tests_json = data.pop("_conformance_tests_json")
+    context = ConformanceTestsRunningContext(
+        conformance_tests_json={},
+        **{name: data.pop(name) for name in _CONFORMANCE_TESTS_RUNNING_CONTEXT_ARGUMENTS},
+    )
+    context._conformance_tests_json = {
+        module_name: (
+            conformance_tests.get_conformance_tests_json(module_name)
+            if module_conformance_tests_json is None
+            else module_conformance_tests_json
+        )
+        for module_name, module_conformance_tests_json in conformance_tests_json.items()
+    }
+    for name, value in data.items():
+        setattr(context, name, value)
+    context.execution_phase = TestExecutionPhase[data["execution_phase"]]
+    context.acceptance_test_phase = AcceptanceTestPhase[data["acceptance_test_phase"]]
+    if context.test_that_triggered_code_change is not None:
+        context.test_that_triggered_code_change = tuple(context.test_that_triggered_code_change)
+    return context
+
+
+def save_checkpoint(render_context: RenderContext, previous_action_payload: Any, module_hashes: dict[str, str]) -> None:
+    """
+    Save the state of the render machine, so that the action of the current state can be resumed.
+
+    module_hashes are the hashes of the module (see PlainModule.get_hashes) the render started with.
+    """
+    frid_context = render_context.frid_context
+    unit_tests_running_context = render_context.unit_tests_running_context
+    conformance_tests_running_context = render_context.conformance_tests_running_context
+    git_heads = _get_git_heads(render_context.plain_module)
+    checkpoint = {
+        "version": RENDER_CHECKPOINT_VERSION,
+        "module_name": render_context.module_name,
+        "module_hashes": module_hashes,
+        "git_heads": git_heads,
+        "working_trees": _get_working_tree_shas(render_context.plain_module, git_heads),
+        "state": render_context.state,
+        "previous_action_payload": previous_action_payload,
+        "render_range": render_context.render_range,
+        "starting_frid": render_context.starting_frid,
+        "build_folder_changed_paths": sorted(render_context.build_folder_changed_paths),
+        "functional_requirements_render_attempts_failed_unit_during_conformance_tests": (
+            render_context.functional_requirements_render_attempts_failed_unit_during_conformance_tests
+        ),
+        "last_error_message": render_context.last_error_message,
+        "prepared_environment_key": render_context.prepared_environment_key,
+        "prepared_environment_dir": render_context.prepared_environment_dir,
+        "regression_test_results": [
+            [module_name, frid, *result]
+            for (module_name, frid), result in render_context.regression_test_results.items()
+        ],
+        "script_execution_history": asdict(render_context.script_execution_history),
+        "frid_context": (
+            {
+                "frid": frid_context.frid,
+                "functional_requirement_render_attempts": frid_context.functional_requirement_render_attempts,
+                "changed_files": sorted(frid_context.changed_files),
+                "refactoring_iteration": frid_context.refactoring_iteration,
+            }
+            if frid_context is not None
+            else None
+        ),
+        "unit_tests_running_context": (
+            {
+                "fix_attempts": unit_tests_running_context.fix_attempts,
+                "changed_files": sorted(unit_tests_running_context.changed_files),
+            }
+            if unit_tests_running_context is not None
+            else None
+        ),
+        "conformance_tests_running_context": (
+            _conformance_tests_running_context_to_dict(
+                conformance_tests_running_context, render_context.conformance_tests
+            )
+            if conformance_tests_running_context is not None
+            else None
+        ),
+    }
+
+    try:
+        serialized_checkpoint = json.dumps(checkpoint)
+    except (TypeError, ValueError) as e:
+        # The previous checkpoint is kept, resuming then repeats the transitions since
+        console.debug(f"Render checkpoint not saved in state {render_context.state}: {e}")
+        return
+
+    checkpoint_path = get_checkpoint_path(render_context.plain_module)
+    os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        mode="w", encoding="utf-8", dir=os.path.dirname(checkpoint_path), delete=False, suffix=".tmp"
+    ) as temp_file:
+        temp_file.write(serialized_checkpoint)
+    os.replace(temp_file.name, checkpoint_path)
+
+
+def delete_checkpoint(plain_module: PlainModule) -> None:
+    try:
+        os.remove(get_checkpoint_path(plain_module))
+    except FileNotFoundError:
+        pass
+
+
+def _load_checkpoint(plain_module: PlainModule) -> Optional[RenderCheckpoint]:
+    try:
+        with open(get_checkpoint_path(plain_module), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        raise RenderCheckpointError(
+            f"The render checkpoint of module '{plain_module.module_name}' is corrupted. "
+            "Please render the module without --resume."
+        )
+    return RenderCheckpoint(plain_module=plain_module, state=data.get("state"), data=data)
+
+
+def find_render_checkpoint(plain_module: PlainModule) -> RenderCheckpoint:
+    """
+    Find the checkpoint of the interrupted render of plain_module or one of its required modules.
+
+    The checkpoint is only valid if the specs of the module, the code of its required modules and the HEADs and
+    working trees of the module's git repositories are the same as when it was saved.
+    """
+    for module in plain_module.all_required_modules + [plain_module]:
+        checkpoint = _load_checkpoint(module)
+        if checkpoint is None:
+            continue
+
+        rerender_message = "Please render the module without --resume."
+        if checkpoint.data.get("version") != RENDER_CHECKPOINT_VERSION or checkpoint.data.get("module_name") != (
+            module.module_name
+        ):
+            raise RenderCheckpointError(
+                f"The render checkpoint of module '{module.module_name}' was saved by another version of the "
+                f"client. {rerender_message}"
+            )
+        if checkpoint.data["module_hashes"] != module.get_hashes():
+            raise RenderCheckpointError(
+                f"The specification of module '{module.module_name}' or its required modules changed since the "
+                f"render was interrupted. {rerender_message}"
+            )
+        git_heads = _get_git_heads(module)
+        if checkpoint.data["git_heads"] != git_heads or checkpoint.data["working_trees"] != _get_working_tree_shas(
+            module, git_heads
+        ):
+            raise RenderCheckpointError(
+                f"The git repositories of module '{module.module_name}' changed since the render was interrupted, "
+                f"or the interrupted step left uncommitted changes. {rerender_message}"
+            )
+        return checkpoint
+
+    raise RenderCheckpointError(
+        f"There is no interrupted render of module '{plain_module.module_name}' to resume. "
+        "Please render the module without --resume."
+    )
+
+
+def restore_checkpoint(render_context: RenderContext, checkpoint: RenderCheckpoint) -> Any:
+    """Restore the render context from the checkpoint and return the payload for the action of its state."""
+    data = checkpoint.data
+    render_context.render_range = data["render_range"]
+    render_context.starting_frid = data["starting_frid"]
+    render_context.build_folder_changed_paths = set(data["build_folder_changed_paths"])
+    render_context.functional_requirements_render_attempts_failed_unit_during_conformance_tests = data[
+        "functional_requirements_render_attempts_failed_unit_during_conformance_tests"
+    ]
+    render_context.last_error_message = data["last_error_message"]
+    render_context.prepared_environment_key = data["prepared_environment_key"]
+    render_context.prepared_environment_dir = data["prepared_environment_dir"]
+    render_context.regression_test_results = {
+        (module_name, frid): tuple(result) for module_name, frid, *result in data["regression_test_results"]
+    }
+    render_context.script_execution_history = ScriptExecutionHistory(**data["script_execution_history"])
+
+    if data["frid_context"] is not None:
+        frid_context = render_context.create_frid_context(data["frid_context"]["frid"])
+        frid_context.functional_requirement_render_attempts = data["frid_context"][
+            "functional_requirement_render_attempts"
+        ]
+        frid_context.changed_files = set(data["frid_context"]["changed_files"])
+        frid_context.refactoring_iteration = data["frid_context"]["refactoring_iteration"]
+        render_context.frid_context = frid_context
+        render_context.run_state.current_frid = frid_context.frid
+
+    if data["unit_tests_running_context"] is not None:
+        render_context.unit_tests_running_context = UnitTestsRunningContext(
+            fix_attempts=data["unit_tests_running_context"]["fix_attempts"],
+            changed_files=set(data["unit_tests_running_context"]["changed_files"]),
+        )
+
+    if data["conformance_tests_running_context"] is not None:
+        render_context.conformance_tests_running_context = _conformance_tests_running_context_from_dict(
+            data["conformance_tests_running_context"], render_context.conformance_tests
+        )
+
+    render_context.machine.set_state(checkpoint.state)
+    return data["previous_action_payload"]
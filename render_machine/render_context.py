@@ -1,6 +1,6 @@
-import threading
-from copy import deepcopy
-from typing import Callable, Optional
+import os
+import time
+from typing import Callable, Optional, TypeVar
 
 import file_utils
 import git_utils
@@ -11,7 +11,7 @@ from plain2code_console import RETRY_COLOR, console
 from plain2code_events import RenderContextSnapshot
 from plain2code_state import RunState
 from plain_modules import PlainModule
-from render_machine import triggers
+from render_machine import prepared_environment_cache, script_output_store, test_results_cache, triggers
 from render_machine.conformance_tests import CONFORMANCE_TESTS_DEFINITION_FILE_NAME, ConformanceTests
 from render_machine.render_types import (
     AcceptanceTestPhase,
@@ -21,11 +21,20 @@ from render_machine.render_types import (
     TestExecutionPhase,
     UnitTestsRunningContext,
 )
+from run_control import RunControl
 
 MAX_UNITTEST_FIX_ATTEMPTS = 20
 MAX_FUNCTIONAL_REQUIREMENT_RENDER_ATTEMPTS_FAILED_UNIT_DURING_CONFORMANCE_TESTS = 2
 
 
+_T = TypeVar("_T")
+
+
+def _reuse_if_equal(previous_part: _T, part: _T) -> _T:
+    """The part of the previous snapshot if it did not change, so that unchanged parts are shared."""
+    return previous_part if previous_part == part else part
+
+
 class RenderContext:
     def __init__(
         self,
@@ -46,8 +55,10 @@ class RenderContext:
         run_state: RunState,
         event_bus: EventBus,
         test_script_timeout: Optional[int] = None,
-        stop_event: Optional[threading.Event] = None,
-        enter_pause_event: Optional[threading.Event] = None,
+        regression_workers: int = 1,
+        use_test_cache: bool = True,
+        reuse_prepared_environment: bool = False,
+        run_control: Optional[RunControl] = None,
     ):
         self.codeplain_api: CodeplainAPI = codeplain_api
         self.memory_manager = memory_manager
@@ -69,11 +80,37 @@ class RenderContext:
         self.base_folder = base_folder
         self.run_state = run_state
         self.event_bus = event_bus
-        self.stop_event = stop_event
-        self.enter_pause_event = enter_pause_event
+        self.run_control = run_control if run_control is not None else RunControl()
         self.script_execution_history = ScriptExecutionHistory()
+        # Paths in the build folder written or deleted since its last commit, so only those need to be staged
+        self.build_folder_changed_paths: set[str] = set()
         self.starting_frid = None
         self.test_script_timeout = test_script_timeout
+        self.regression_workers = regression_workers
+        # Conformance test results of the parallel regression sweep, keyed by (module name, FRID)
+        self.regression_test_results: dict[tuple[str, str], tuple[int, str, Optional[str]]] = {}
+        self.test_results_cache = test_results_cache.TestResultsCache(
+            os.path.join(plain_module.get_codeplain_folder(), test_results_cache.TEST_RESULTS_CACHE_FILE_NAME)
+            if use_test_cache
+            else None
+        )
+        # Environment fingerprints of the test results, by the key of the prepared environment they were taken with
+        self._test_environment_fingerprints: dict[Optional[str], str] = {}
+        self.prepared_environment_cache = prepared_environment_cache.PreparedEnvironmentCache(
+            os.path.join(
+                plain_module.get_codeplain_folder(), prepared_environment_cache.PREPARED_ENVIRONMENTS_FOLDER_NAME
+            )
+            if use_test_cache and reuse_prepared_environment
+            else None
+        )
+        # Key and directory of the testing environment for the current dependency manifests of the build folder
+        self.prepared_environment_key: Optional[str] = None
+        self.prepared_environment_dir: Optional[str] = None
+        self.script_output_store = script_output_store.ScriptOutputStore(
+            os.path.join(plain_module.get_codeplain_folder(), script_output_store.SCRIPT_OUTPUTS_FOLDER_NAME),
+            f"{time.strftime('%Y%m%d-%H%M%S')}_{run_state.render_id[:8]}",
+        )
+        run_state.script_output_folders.append(self.script_output_store.render_folder)
 
         resources_list = []
         plain_spec.collect_linked_resources(plain_module.plain_source, resources_list, None, True)
@@ -121,18 +158,62 @@ class RenderContext:
         self.last_error_message = error_message
         self.machine.dispatch(triggers.HANDLE_ERROR)
 
-    def create_snapshot(self) -> RenderContextSnapshot:
-        return RenderContextSnapshot(
-            frid_context=deepcopy(self.frid_context) if self.frid_context else None,
+    def create_snapshot(self, previous: Optional[RenderContextSnapshot] = None) -> RenderContextSnapshot:
+        """Take an immutable snapshot of the render context, sharing the parts that did not change with previous."""
+        snapshot = RenderContextSnapshot(
+            frid_context=self.frid_context.snapshot() if self.frid_context else None,
             conformance_tests_running_context=(
-                deepcopy(self.conformance_tests_running_context) if self.conformance_tests_running_context else None
+                self.conformance_tests_running_context.snapshot() if self.conformance_tests_running_context else None
             ),
             unit_tests_running_context=(
-                deepcopy(self.unit_tests_running_context) if self.unit_tests_running_context else None
+                self.unit_tests_running_context.snapshot() if self.unit_tests_running_context else None
             ),
-            script_execution_history=deepcopy(self.script_execution_history),
+            script_execution_history=self.script_execution_history.snapshot(),
             module_name=self.module_name,
         )
+        if previous is None:
+            return snapshot
+        return RenderContextSnapshot(
+            frid_context=_reuse_if_equal(previous.frid_context, snapshot.frid_context),
+            conformance_tests_running_context=_reuse_if_equal(
+                previous.conformance_tests_running_context, snapshot.conformance_tests_running_context
+            ),
+            unit_tests_running_context=_reuse_if_equal(
+                previous.unit_tests_running_context, snapshot.unit_tests_running_context
+            ),
+            script_execution_history=_reuse_if_equal(
+                previous.script_execution_history, snapshot.script_execution_history
+            ),
+            module_name=_reuse_if_equal(previous.module_name, snapshot.module_name),
+        )
+
+    def get_test_environment_fingerprint(self) -> str:
+        if self.prepared_environment_key not in self._test_environment_fingerprints:
+            self._test_environment_fingerprints[self.prepared_environment_key] = (
+                test_results_cache.get_environment_fingerprint(
+                    self.prepare_environment_script, self.test_script_timeout, self.prepared_environment_key
+                )
+            )
+        return self._test_environment_fingerprints[self.prepared_environment_key]
+
+    def update_prepared_environment(self) -> None:
+        """Point to the prepared environment of the current dependency manifests of the build folder, if enabled."""
+        if not self.prepared_environment_cache.enabled:
+            return
+        self.prepared_environment_key = prepared_environment_cache.get_prepared_environment_key(
+            self.build_folder, self.prepare_environment_script
+        )
+        self.prepared_environment_dir = self.prepared_environment_cache.get_environment_dir(
+            self.prepared_environment_key
+        )
+
+    def get_test_script_env(self) -> Optional[dict[str, str]]:
+        if self.prepared_environment_dir is None:
+            return None
+        return {prepared_environment_cache.PREPARED_ENVIRONMENT_DIR_ENV_VAR: self.prepared_environment_dir}
+
+    def record_build_folder_changes(self, file_names):
+        self.build_folder_changed_paths.update(file_names)
 
     def get_required_modules_functionalities(self):
         required_modules_functionalities = {}
@@ -151,6 +232,11 @@ class RenderContext:
         else:
             frid = plain_spec.get_next_frid(self.plain_source_tree, self.frid_context.frid)
 
+        self.frid_context = self.create_frid_context(frid)
+        self.run_state.current_frid = frid
+        return
+
+    def create_frid_context(self, frid: str) -> FridContext:
         specifications, _ = plain_spec.get_specifications_for_frid(self.plain_source_tree, frid)
         functional_requirement_text = specifications[plain_spec.FUNCTIONAL_REQUIREMENTS][-1]
 
@@ -161,15 +247,13 @@ class RenderContext:
         for resource in resources_list:
             linked_resources[resource["target"]] = self.all_linked_resources[resource["target"]]
 
-        self.frid_context = FridContext(
+        return FridContext(
             frid=frid,
             specifications=specifications,
             functional_requirement_text=functional_requirement_text,
             linked_resources=linked_resources,
             functional_requirement_render_attempts=0,
         )
-        self.run_state.current_frid = frid
-        return
 
     def has_next_frid(self) -> bool:
         next_frid = plain_spec.get_next_frid(self.plain_source_tree, self.frid_context.frid)
@@ -322,6 +406,53 @@ class RenderContext:
 
     def finish_conformance_tests_processing(self):
         self.conformance_tests_running_context = None
+        self.regression_test_results.clear()
+
+    def should_run_regression_tests_in_parallel(self) -> bool:
+        return (
+            self.regression_workers > 1
+            and self.conformance_tests_running_context.execution_phase == TestExecutionPhase.RUNNING_REGRESSION
+        )
+
+    def get_pending_regression_tests(self) -> list[tuple[str, str, str]]:
+        """
+        List the (module name, FRID, conformance tests folder name) triples the regression walk still has to visit,
+        starting with the current test.
+
+        The order matches the one of get_next_conformance_tests_running_context: the required modules first, then
+        the FRIDs of this module up to (but excluding) the FRID being implemented. FRIDs without conformance tests
+        are left out since the walk skips them as well.
+        """
+        ctx = self.conformance_tests_running_context
+        module_names = [required_module.module_name for required_module in self.required_modules or []]
+        module_names.append(self.module_name)
+
+        pending_tests = []
+        for module_name in module_names[module_names.index(ctx.current_testing_module_name) :]:
+            if module_name == self.module_name or module_name == ctx.current_testing_module_name:
+                folder_names_by_frid = {
+                    frid: entry["folder_name"] for frid, entry in ctx.get_conformance_tests_json(module_name).items()
+                }
+            else:
+                folder_names_by_frid = self.conformance_tests.get_conformance_test_folder_names_by_frid(module_name)
+
+            if module_name == self.module_name:
+                frids = []
+                frid = plain_spec.get_first_frid(self.plain_source_tree)
+                while frid is not None and frid != ctx.frid_being_implemented:
+                    frids.append(frid)
+                    frid = plain_spec.get_next_frid(self.plain_source_tree, frid)
+            else:
+                frids = list(folder_names_by_frid.keys())
+
+            if module_name == ctx.current_testing_module_name:
+                frids = frids[frids.index(ctx.current_testing_frid) :]
+
+            pending_tests.extend(
+                (module_name, frid, folder_names_by_frid[frid]) for frid in frids if frid in folder_names_by_frid
+            )
+
+        return pending_tests
 
     # ========== Helper Methods for Conformance Test Execution ==========
 
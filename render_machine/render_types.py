@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from enum import Enum, auto
 from typing import Any, Optional
 
@@ -47,12 +47,34 @@ class FridContext:
     changed_files: set[str] = field(default_factory=set)
     refactoring_iteration: int = 0
 
+    def snapshot(self) -> "FridContextSnapshot":
+        return FridContextSnapshot(
+            frid=self.frid,
+            functional_requirement_text=self.functional_requirement_text,
+            functional_requirement_render_attempts=self.functional_requirement_render_attempts,
+        )
+
+
+@dataclass(frozen=True)
+class FridContextSnapshot:
+    frid: str
+    functional_requirement_text: str
+    functional_requirement_render_attempts: int
+
 
 @dataclass
 class UnitTestsRunningContext:
     fix_attempts: int
     changed_files: set[str] = field(default_factory=set)
 
+    def snapshot(self) -> "UnitTestsRunningContextSnapshot":
+        return UnitTestsRunningContextSnapshot(fix_attempts=self.fix_attempts)
+
+
+@dataclass(frozen=True)
+class UnitTestsRunningContextSnapshot:
+    fix_attempts: int
+
 
 class ConformanceTestsRunningContext:
     def __init__(
@@ -139,12 +161,53 @@ class ConformanceTestsRunningContext:
             "test_summary"
         ] = summary
 
+    def snapshot(self) -> "ConformanceTestsRunningContextSnapshot":
+        return ConformanceTestsRunningContextSnapshot(
+            current_testing_module_name=self.current_testing_module_name,
+            current_testing_frid=self.current_testing_frid,
+            fix_attempts=self.fix_attempts,
+            execution_phase=self.execution_phase,
+            acceptance_test_phase=self.acceptance_test_phase,
+            current_acceptance_test=self.get_current_acceptance_test(),
+        )
+
+
+@dataclass(frozen=True)
+class ConformanceTestsRunningContextSnapshot:
+    current_testing_module_name: str
+    current_testing_frid: Optional[str]
+    fix_attempts: int
+    execution_phase: TestExecutionPhase
+    acceptance_test_phase: AcceptanceTestPhase
+    current_acceptance_test: Optional[str]
+
+    def get_current_acceptance_test(self) -> Optional[str]:
+        """Get the current acceptance test text (raw, unformatted)."""
+        return self.current_acceptance_test
+
 
 @dataclass
 class ScriptExecutionHistory:
     latest_unit_test_output_path: Optional[str] = None
     latest_conformance_test_output_path: Optional[str] = None
     latest_testing_environment_output_path: Optional[str] = None
+    latest_unit_test_output_cached: bool = False
+    latest_conformance_test_output_cached: bool = False
+    latest_testing_environment_output_cached: bool = False
+    should_update_script_outputs: bool = False
+
+    def snapshot(self) -> "ScriptExecutionHistorySnapshot":
+        return ScriptExecutionHistorySnapshot(**asdict(self))
+
+
+@dataclass(frozen=True)
+class ScriptExecutionHistorySnapshot:
+    latest_unit_test_output_path: Optional[str] = None
+    latest_conformance_test_output_path: Optional[str] = None
+    latest_testing_environment_output_path: Optional[str] = None
+    latest_unit_test_output_cached: bool = False
+    latest_conformance_test_output_cached: bool = False
+    latest_testing_environment_output_cached: bool = False
     should_update_script_outputs: bool = False
 
 
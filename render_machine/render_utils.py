@@ -1,4 +1,8 @@
+import codecs
+import contextlib
+import io
 import os
+import queue
 import re
 import signal
 import subprocess
@@ -6,6 +10,7 @@ import sys
 import tempfile
 import threading
 import time
+from collections import deque
 from typing import Optional
 
 if sys.platform == "linux":
@@ -13,16 +18,81 @@ if sys.platform == "linux":
 
 import file_utils
 import plain_spec
+from concurrency_limit import ConcurrencyLimit
+from event_bus import EventBus
 from plain2code_console import MUTED_COLOR, RETRY_COLOR, SUCCESS_COLOR, console
-from plain2code_exceptions import RenderCancelledError
+from plain2code_events import TestScriptOutputEmitted
+from plain2code_exceptions import PersistentTestRunnerError, RenderCancelledError
+from plain2code_profiler import profiled
+from render_machine import persistent_test_runner
+from render_machine.script_output_store import ScriptOutputStore
+from run_control import RunControl
 
 SCRIPT_EXECUTION_TIMEOUT = 120
 TIMEOUT_ERROR_EXIT_CODE = 124
-POLL_INTERVAL_SECONDS = 0.2
 SIGTERM_GRACE_PERIOD_SECONDS = 0.2
 STDOUT_READ_TIMEOUT_SECONDS = 2
 F_SETPIPE_SIZE = 1031  # Linux-only constant
 PIPE_SIZE_KB = 1024  # 1MB
+# Characters of a script output kept in memory from its beginning and from its end
+SCRIPT_OUTPUT_HEAD_SIZE = 64 * 1024
+SCRIPT_OUTPUT_TAIL_SIZE = 192 * 1024
+PERSISTENT_RUNNER_FAILURE_EXIT_CODE = 1
+
+_STDOUT_CLOSED_EVENT = "stdout_closed"
+_PROCESS_EXITED_EVENT = "process_exited"
+_CANCELLED_EVENT = "cancelled"
+
+
+# Limits the test scripts running at the same time across all renders of the process (see `codeplain batch`)
+script_limit = ConcurrencyLimit()
+
+
+class ScriptOutputCapture:
+    """
+    Keeps the beginning and the end of a script output within a fixed budget.
+
+    The first `head_size` characters are kept as they arrive, the last `tail_size` characters in a ring buffer.
+    """
+
+    def __init__(self, head_size: int, tail_size: int):
+        self.head_size = head_size
+        self.tail_size = tail_size
+        self._head: list[str] = []
+        self._head_length = 0
+        self._tail: deque[str] = deque()
+        self._tail_length = 0
+        self.omitted_length = 0
+
+    def append(self, text: str) -> None:
+        if self._head_length < self.head_size:
+            head_part = text[: self.head_size - self._head_length]
+            self._head.append(head_part)
+            self._head_length += len(head_part)
+            text = text[len(head_part) :]
+        if not text:
+            return
+
+        self._tail.append(text)
+        self._tail_length += len(text)
+        while self._tail_length > self.tail_size:
+            excess = self._tail_length - self.tail_size
+            oldest = self._tail[0]
+            if len(oldest) <= excess:
+                self._tail.popleft()
+                dropped_length = len(oldest)
+            else:
+                self._tail[0] = oldest[excess:]
+                dropped_length = excess
+            self._tail_length -= dropped_length
+            self.omitted_length += dropped_length
+
+    def get_output(self, full_output_path: Optional[str] = None) -> str:
+        output = "".join(self._head)
+        if self.omitted_length > 0:
+            location = f" (the full output is stored in {full_output_path})" if full_output_path else ""
+            output += f"\n... {self.omitted_length} characters of output omitted{location} ...\n"
+        return output + "".join(self._tail)
 
 
 def revert_changes_for_frid(render_context):
@@ -86,100 +156,263 @@ def _sanitize_script_output(script_output: str) -> str:
     return parts[-1] if len(parts) > 1 else script_output
 
 
-def execute_script(  # noqa: C901
+def report_cached_script_result(
+    script: str,
+    script_output: str,
+    exit_code: int,
+    script_type: str,
+    frid: Optional[str] = None,
+    module: Optional[str] = None,
+    output_store: Optional[ScriptOutputStore] = None,
+) -> str:
+    """Log a test script outcome taken from the test results cache and store its output like execute_script does."""
+    stored_output = (
+        f"\n═════════════════════════ {script_type} Script Output ═════════════════════════\n"
+        f"{script_output}"
+        "\n══════════════════════════════════════════════════════════════════════\n"
+        f"{script_type} script {script} was not executed, the result (exit code {exit_code}) was taken from the cache.\n"
+    )
+    if output_store is not None:
+        temp_file_path = output_store.add(script_type, stored_output, exit_code, frid=frid, module=module)
+    else:
+        with tempfile.NamedTemporaryFile(
+            mode="w+", encoding="utf-8", delete=False, suffix=".script_output"
+        ) as temp_file:
+            temp_file.write(stored_output)
+            temp_file_path = temp_file.name
+
+    console.debug(f"{script_type} script output stored in: {temp_file_path.strip()}", color=MUTED_COLOR)
+
+    if frid is not None:
+        subject = f"The {script_type} script for functionality ID {frid} of module {module}"
+    else:
+        subject = f"The {script_type} script"
+    if exit_code != 0:
+        console.info(f"↻ {subject} has failed (cached result).", color=RETRY_COLOR)
+    else:
+        console.info(f"✓ {subject} has passed successfully (cached result).", color=SUCCESS_COLOR)
+
+    return temp_file_path
+
+
+@profiled("script", name=lambda script_type, **_: script_type)
+def execute_script(
     script: str,
     scripts_args: list[str],
     script_type: str,
     frid: Optional[str] = None,
     module: Optional[str] = None,
     timeout: Optional[int] = None,
-    stop_event: Optional[threading.Event] = None,
+    run_control: Optional[RunControl] = None,
+    event_bus: Optional[EventBus] = None,
+    env: Optional[dict[str, str]] = None,
+    output_store: Optional[ScriptOutputStore] = None,
+) -> tuple[int, str, Optional[str]]:
+    """
+    Run a test script and return its exit code, its (sanitized) output and the path of the file with its full output.
+
+    The full output is streamed to the output file while the script runs. The returned output is bounded: when the
+    script writes more than SCRIPT_OUTPUT_HEAD_SIZE + SCRIPT_OUTPUT_TAIL_SIZE characters, only its beginning and its
+    end are kept. If an event bus is given, the output lines are published on it as they arrive. Variables in `env`
+    are added to the environment the script runs in. With an output store, the output file is kept in the store,
+    otherwise it is a temporary file.
+
+    Scripts that declare themselves persistent test runners are run on an already started runner instead
+    (see persistent_test_runner). The script waits for a free slot of script_limit before it is started, and is
+    stopped with RenderCancelledError as soon as the render is cancelled on the run control.
+    """
+    with script_limit.slot(run_control):
+        return _execute_script(
+            script, scripts_args, script_type, frid, module, timeout, run_control, event_bus, env, output_store
+        )
+
+
+def _execute_script(  # noqa: C901
+    script: str,
+    scripts_args: list[str],
+    script_type: str,
+    frid: Optional[str],
+    module: Optional[str],
+    timeout: Optional[int],
+    run_control: Optional[RunControl],
+    event_bus: Optional[EventBus],
+    env: Optional[dict[str, str]],
+    output_store: Optional[ScriptOutputStore],
 ) -> tuple[int, str, Optional[str]]:
-    temp_file_path = None
     script_timeout = timeout if timeout is not None else SCRIPT_EXECUTION_TIMEOUT
 
     script_path = file_utils.add_current_path_if_no_path(script)
-    if sys.platform == "win32":
+    runner = None
+    if persistent_test_runner.is_persistent_runner_script(script_path):
+        try:
+            runner = persistent_test_runner.runner_pool.acquire(script_path)
+        except PersistentTestRunnerError as e:
+            console.warning(f"{e}\nRunning {script_type} script {script} without the persistent test runner.")
+
+    if runner is not None:
+        cmd = [script_path] + scripts_args
+    elif sys.platform == "win32":
         if not script_path.lower().endswith(".ps1"):
             raise ValueError(f"On Windows, only PowerShell (.ps1) scripts are supported, but got: {script_path}")
         cmd = ["powershell.exe", "-NoProfile", "-ExecutionPolicy", "Bypass", "-File", script_path] + scripts_args
     else:
         cmd = [script_path] + scripts_args
 
+    output_entry = None
+    if output_store is not None:
+        output_entry = output_store.create_entry(script_type, frid=frid, module=module)
+        output_file = open(output_entry.path, "w+", encoding="utf-8")
+        output_path = output_entry.path
+    else:
+        output_file = tempfile.NamedTemporaryFile(mode="w+", encoding="utf-8", delete=False, suffix=".script_output")
+        output_path = output_file.name
+    temp_file_path = output_file.name
+    output_file.write(f"\n═════════════════════════ {script_type} Script Output ═════════════════════════\n")
+    output_file.flush()
+
     start_time = time.time()
-    proc = subprocess.Popen(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-        start_new_session=(sys.platform != "win32"),
-    )
+    if runner is None:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=(sys.platform != "win32"),
+            env={**os.environ, **env} if env else None,
+        )
 
-    if sys.platform == "linux":
-        # Set the pipe size to 1MB to avoid buffer overflows
-        fcntl.fcntl(proc.stdout.fileno(), F_SETPIPE_SIZE, PIPE_SIZE_KB * 1024)  # 1MB
+        if sys.platform == "linux":
+            # Set the pipe size to 1MB to avoid buffer overflows
+            fcntl.fcntl(proc.stdout.fileno(), F_SETPIPE_SIZE, PIPE_SIZE_KB * 1024)  # 1MB
+    else:
+        # Stopping a test run on a runner means stopping the runner
+        proc = runner.process
 
     # Drain stdout in a background thread to prevent pipe buffer deadlock.
     # macOS has a 64KB pipe buffer; without continuous draining, scripts that produce
     # more output than that block on write and never exit, causing spurious timeouts.
-    output_chunks: list[str] = []
+    # The reader, the process waiter and the stop event watcher report to the events queue,
+    # so the loop below wakes up as soon as any of them has something to report.
+    output_capture = ScriptOutputCapture(SCRIPT_OUTPUT_HEAD_SIZE, SCRIPT_OUTPUT_TAIL_SIZE)
+    output_lock = threading.Lock()
+    events: queue.Queue[str] = queue.Queue()
+
+    # Output is read from the raw pipe, so whatever the script has written is captured right away
+    # and not held back until a full buffer is read. Decoding matches a text mode pipe.
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True)
+    partial_line = ""
+
+    def _handle_output(text: str, final: bool = False) -> None:
+        nonlocal partial_line
+        with output_lock:
+            output_capture.append(text)
+            if not output_file.closed:
+                output_file.write(text)
+                output_file.flush()
+
+        if event_bus is None:
+            return
+        lines = (partial_line + text).split("\n")
+        partial_line = "" if final else lines.pop()
+        lines = [line for line in lines if line]
+        if lines:
+            event_bus.publish(TestScriptOutputEmitted(script_type=script_type, frid=frid, module=module, lines=lines))
 
     def _drain_stdout() -> None:
         try:
-            for chunk in iter(lambda: proc.stdout.read(8192), ""):
-                output_chunks.append(chunk)
+            for data in iter(lambda: os.read(proc.stdout.fileno(), 8192), b""):
+                _handle_output(decoder.decode(data))
+            _handle_output(decoder.decode(b"", final=True), final=True)
         except (OSError, ValueError):
             pass
+        events.put(_STDOUT_CLOSED_EVENT)
+
+    def _wait_for_exit() -> None:
+        proc.wait()
+        events.put(_PROCESS_EXITED_EVENT)
+
+    runner_exit_code = None
+
+    def _run_on_runner() -> None:
+        nonlocal runner_exit_code
+        try:
+            runner_exit_code = runner.run(scripts_args, env, _handle_output)
+        except PersistentTestRunnerError as e:
+            # Like a script that crashed, e.g. because a test exited the interpreter
+            _handle_output(f"\n{e}\n")
+            runner_exit_code = PERSISTENT_RUNNER_FAILURE_EXIT_CODE
+        _handle_output("", final=True)
+        events.put(_STDOUT_CLOSED_EVENT)
+        events.put(_PROCESS_EXITED_EVENT)
+
+    def _close_output_file() -> None:
+        # The reader may still be running if child processes keep the pipe open, so later output is dropped.
+        with output_lock:
+            output_file.write("\n══════════════════════════════════════════════════════════════════════\n")
+            output_file.close()
 
-    reader = threading.Thread(target=_drain_stdout, daemon=True)
-    reader.start()
+    def _finish_output_file(exit_code: Optional[int]) -> None:
+        nonlocal output_entry
+        if output_entry is not None:
+            output_store.finish_entry(output_entry, exit_code)
+            output_entry = None
+
+    if runner is None:
+        reader = threading.Thread(target=_drain_stdout, daemon=True)
+        reader.start()
+        threading.Thread(target=_wait_for_exit, daemon=True).start()
+    else:
+        reader = threading.Thread(target=_run_on_runner, daemon=True)
+        reader.start()
+    # Cancelling the render stops the script right away
+    cancel_registration = contextlib.ExitStack()
+    if run_control is not None:
+        cancel_registration.enter_context(run_control.on_cancel(lambda: events.put(_CANCELLED_EVENT)))
 
     try:
-        while proc.poll() is None:
-            if time.time() - start_time >= script_timeout:
+        process_exited = False
+        stdout_closed = False
+        deadline = start_time + script_timeout
+        # Wait for the process to exit and for the reader to finish draining the remaining output.
+        # Child processes may keep the pipe open after the script exits, so after the exit the
+        # output is only waited for during a grace period.
+        while not (process_exited and stdout_closed):
+            try:
+                event = events.get(timeout=max(deadline - time.time(), 0))
+            except queue.Empty:
+                if process_exited:
+                    # Leave the reader to the child processes still holding the pipe. Closing stdout here
+                    # would block on the reader's pending read until they exit.
+                    break
                 _kill_process(proc)
                 reader.join(timeout=2)
-                partial_stdout = "".join(output_chunks)
-                exc = subprocess.TimeoutExpired(cmd, script_timeout)
-                exc.stdout = partial_stdout
-                raise exc
-            if stop_event is not None:
-                stop_event.wait(timeout=POLL_INTERVAL_SECONDS)
-                if stop_event.is_set():
-                    _kill_process(proc)
-                    raise RenderCancelledError()
-            else:
-                time.sleep(POLL_INTERVAL_SECONDS)
-
-        # Wait for the reader to finish draining remaining output.
-        # Close stdout if child processes keep the pipe open beyond the grace period.
-        reader.join(timeout=STDOUT_READ_TIMEOUT_SECONDS)
-        if reader.is_alive():
-            proc.stdout.close()
-            reader.join(timeout=1)
-        stdout = "".join(output_chunks)
-        elapsed_time = time.time() - start_time
+                raise subprocess.TimeoutExpired(cmd, script_timeout)
 
-        sanitized_script_output = _sanitize_script_output(stdout)
+            if event == _CANCELLED_EVENT:
+                _kill_process(proc)
+                raise RenderCancelledError()
+            if event == _PROCESS_EXITED_EVENT:
+                process_exited = True
+                deadline = time.time() + STDOUT_READ_TIMEOUT_SECONDS
+            elif event == _STDOUT_CLOSED_EVENT:
+                stdout_closed = True
 
-        with tempfile.NamedTemporaryFile(
-            mode="w+", encoding="utf-8", delete=False, suffix=".script_output"
-        ) as temp_file:
-            temp_file.write(f"\n═════════════════════════ {script_type} Script Output ═════════════════════════\n")
-            temp_file.write(sanitized_script_output)
-            temp_file.write("\n══════════════════════════════════════════════════════════════════════\n")
-            temp_file_path = temp_file.name
-            if proc.returncode != 0:
-                temp_file.write(f"{script_type} script {script} failed with exit code {proc.returncode}.\n")
+        elapsed_time = time.time() - start_time
+        exit_code = proc.returncode if runner is None else runner_exit_code
+        _close_output_file()
+        with open(temp_file_path, "a", encoding="utf-8") as temp_file:
+            if exit_code != 0:
+                temp_file.write(f"{script_type} script {script} failed with exit code {exit_code}.\n")
             else:
                 temp_file.write(f"{script_type} script {script} successfully passed.\n")
             temp_file.write(f"{script_type} script execution time: {elapsed_time:.2f} seconds.\n")
+        _finish_output_file(exit_code)
 
-        console.debug(f"{script_type} script output stored in: {temp_file_path.strip()}", color=MUTED_COLOR)
+        with output_lock:
+            sanitized_script_output = _sanitize_script_output(output_capture.get_output(output_path))
 
-        if proc.returncode != 0:
+        console.debug(f"{script_type} script output stored in: {output_path.strip()}", color=MUTED_COLOR)
+
+        if exit_code != 0:
             if frid is not None:
                 console.info(
                     f"↻ The {script_type} script for functionality ID {frid} of module {module} has failed. "
@@ -202,33 +435,35 @@ def execute_script(  # noqa: C901
             else:
                 console.info(f"✓ All {script_type} scripts have passed successfully.", color=SUCCESS_COLOR)
 
-        return proc.returncode, sanitized_script_output, temp_file_path
+        return exit_code, sanitized_script_output, output_path
 
     except RenderCancelledError:
         raise
-    except subprocess.TimeoutExpired as e:
-        with tempfile.NamedTemporaryFile(
-            mode="w+", encoding="utf-8", delete=False, suffix=".script_timeout"
-        ) as temp_file:
-            temp_file.write(f"{script_type} script {script} timed out after {script_timeout} seconds.")
-            if e.stdout:
-                decoded_output = e.stdout.decode("utf-8") if isinstance(e.stdout, bytes) else e.stdout
-                temp_file.write(f"{script_type} script partial output before the timeout:\n{decoded_output}")
-            else:
-                temp_file.write(f"{script_type} script did not produce any output before the timeout.")
-            temp_file_path = temp_file.name
+    except subprocess.TimeoutExpired:
+        _close_output_file()
+        with open(temp_file_path, "a", encoding="utf-8") as temp_file:
+            temp_file.write(f"{script_type} script {script} timed out after {script_timeout} seconds.\n")
+        _finish_output_file(TIMEOUT_ERROR_EXIT_CODE)
         console.warning(
-            f"The {script_type} script timed out after {script_timeout} seconds. {script_type} script output stored in: {temp_file_path}"
+            f"The {script_type} script timed out after {script_timeout} seconds. {script_type} script output stored in: {output_path}"
         )
 
         partial_output = ""
-        if e.stdout:
-            decoded = e.stdout.decode("utf-8") if isinstance(e.stdout, bytes) else e.stdout
-            sanitized = _sanitize_script_output(decoded)
-            if sanitized:
-                partial_output = f"\nPartial test script output:\n{sanitized}"
+        with output_lock:
+            sanitized = _sanitize_script_output(output_capture.get_output(output_path))
+        if sanitized:
+            partial_output = f"\nPartial test script output:\n{sanitized}"
         return (
             TIMEOUT_ERROR_EXIT_CODE,
             f"{script_type} script did not finish in {script_timeout} seconds.{partial_output}",
-            temp_file_path,
+            output_path,
         )
+    finally:
+        if not output_file.closed:
+            _close_output_file()
+        # A cancelled script's output is stored as well, without an exit code
+        _finish_output_file(None)
+        cancel_registration.close()
+        if runner is not None:
+            # A runner that was stopped is not reused
+            persistent_test_runner.runner_pool.release(runner)
@@ -0,0 +1,246 @@
+import contextlib
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+SCRIPT_OUTPUTS_FOLDER_NAME = "script_outputs"
+SCRIPT_OUTPUTS_INDEX_FILE_NAME = "index.jsonl"
+# Outputs of earlier renders are deleted once they are older than this. Once all outputs take more space than this,
+# the outputs of earlier renders are deleted first and then the compressed outputs of the current render.
+SCRIPT_OUTPUTS_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+SCRIPT_OUTPUTS_MAX_TOTAL_SIZE = 200 * 1024 * 1024
+
+# Number of the last lines of each latest test script output appended to the crash log
+CRASH_LOG_SCRIPT_OUTPUT_LINES = 100
+
+OUTPUT_SUFFIX = ".log"
+# Suffix added to an output once a later attempt of the same script replaces it as the latest one
+COMPRESSED_SUFFIX = ".gz"
+
+
+@dataclass
+class ScriptOutputEntry:
+    module: Optional[str]
+    frid: Optional[str]
+    script_type: str
+    attempt: int
+    path: str
+
+
+def _to_file_name_part(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", value).strip("_").lower()
+
+
+def _get_folder_size(folder: str) -> int:
+    size = 0
+    for root, _, files in os.walk(folder):
+        for file_name in files:
+            try:
+                size += os.path.getsize(os.path.join(root, file_name))
+            except OSError:
+                pass
+    return size
+
+
+def apply_retention(outputs_folder: str, keep: Optional[str] = None) -> int:
+    """
+    Delete the outputs of earlier renders that are too old or that do not fit in the size limit.
+
+    Returns the size of the outputs of the earlier renders that were kept.
+    """
+    if not os.path.isdir(outputs_folder):
+        return 0
+
+    render_folders = []
+    for name in os.listdir(outputs_folder):
+        folder = os.path.join(outputs_folder, name)
+        if name != keep and os.path.isdir(folder):
+            render_folders.append((os.path.getmtime(folder), folder))
+    render_folders.sort(reverse=True)
+
+    now = time.time()
+    total_size = _get_folder_size(os.path.join(outputs_folder, keep)) if keep is not None else 0
+    earlier_renders_size = 0
+    for modified_time, folder in render_folders:
+        folder_size = _get_folder_size(folder)
+        total_size += folder_size
+        if now - modified_time > SCRIPT_OUTPUTS_MAX_AGE_SECONDS or total_size > SCRIPT_OUTPUTS_MAX_TOTAL_SIZE:
+            shutil.rmtree(folder, ignore_errors=True)
+        else:
+            earlier_renders_size += folder_size
+    return earlier_renders_size
+
+
+def read_script_output(path: str) -> str:
+    """Read an output, also once it was compressed after its path was handed out."""
+    if not os.path.exists(path) and os.path.exists(path + COMPRESSED_SUFFIX):
+        path += COMPRESSED_SUFFIX
+    if path.endswith(COMPRESSED_SUFFIX):
+        with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def read_index(render_folder: str) -> list[dict]:
+    index_file_path = os.path.join(render_folder, SCRIPT_OUTPUTS_INDEX_FILE_NAME)
+    if not os.path.exists(index_file_path):
+        return []
+
+    entries = []
+    with open(index_file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A line cut short by a crash
+                continue
+    return entries
+
+
+class ScriptOutputStore:
+    """
+    Outputs of the test scripts run during a render, stored in a folder per render.
+
+    Outputs are indexed by (module, FRID, script type, attempt) in the render folder's index file. The latest output
+    of each (module, FRID, script type) stays plain text, since the TUI links to it and the fix payloads refer to it.
+    Earlier attempts are gzip-compressed once a later one finishes. Outputs of earlier renders are deleted according
+    to SCRIPT_OUTPUTS_MAX_AGE_SECONDS and SCRIPT_OUTPUTS_MAX_TOTAL_SIZE when the store is created, and the size limit
+    is enforced again whenever an output is finished.
+    """
+
+    def __init__(self, outputs_folder: str, render_name: str):
+        self.outputs_folder = outputs_folder
+        self.render_name = render_name
+        self.render_folder = os.path.join(outputs_folder, render_name)
+        self._lock = threading.Lock()
+        self._attempts: dict[tuple[Optional[str], Optional[str], str], int] = {}
+        self._latest_paths: dict[tuple[Optional[str], Optional[str], str], str] = {}
+        # Compressed outputs of this render, oldest first, with their sizes
+        self._compressed_outputs: deque[tuple[str, int]] = deque()
+        self._render_size = 0
+        self._earlier_renders_size = apply_retention(outputs_folder, keep=render_name)
+
+    def create_entry(
+        self, script_type: str, frid: Optional[str] = None, module: Optional[str] = None
+    ) -> ScriptOutputEntry:
+        with self._lock:
+            attempt = self._attempts.get((module, frid, script_type), 0) + 1
+            self._attempts[(module, frid, script_type)] = attempt
+
+        os.makedirs(self.render_folder, exist_ok=True)
+        name_parts = [module or "", f"frid_{frid}" if frid is not None else "", script_type, f"attempt_{attempt}"]
+        file_name = "__".join(_to_file_name_part(part) for part in name_parts if part)
+        return ScriptOutputEntry(
+            module=module,
+            frid=frid,
+            script_type=script_type,
+            attempt=attempt,
+            path=os.path.join(self.render_folder, file_name + OUTPUT_SUFFIX),
+        )
+
+    def finish_entry(self, entry: ScriptOutputEntry, exit_code: Optional[int]) -> str:
+        """
+        Add the output written to the entry's file to the index and compress the output it replaces as the latest one.
+        """
+        output_size = os.path.getsize(entry.path)
+        with self._lock:
+            replaced_path = self._latest_paths.get((entry.module, entry.frid, entry.script_type))
+            self._latest_paths[(entry.module, entry.frid, entry.script_type)] = entry.path
+            self._render_size += output_size
+        if replaced_path is not None:
+            self._compress(replaced_path)
+
+        index_entry = {
+            "module": entry.module,
+            "frid": entry.frid,
+            "script_type": entry.script_type,
+            "attempt": entry.attempt,
+            "exit_code": exit_code,
+            "path": os.path.basename(entry.path),
+            "timestamp": time.time(),
+        }
+        with self._lock:
+            with open(
+                os.path.join(self.render_folder, SCRIPT_OUTPUTS_INDEX_FILE_NAME), "a", encoding="utf-8"
+            ) as index_file:
+                index_line = json.dumps(index_entry) + "\n"
+                index_file.write(index_line)
+            self._render_size += len(index_line.encode())
+            self._apply_size_limit()
+        return entry.path
+
+    def _compress(self, path: str) -> None:
+        output_size = os.path.getsize(path)
+        with open(path, "rb") as source, gzip.open(path + COMPRESSED_SUFFIX, "wb") as destination:
+            shutil.copyfileobj(source, destination)
+        os.remove(path)
+        compressed_size = os.path.getsize(path + COMPRESSED_SUFFIX)
+        with self._lock:
+            self._compressed_outputs.append((path + COMPRESSED_SUFFIX, compressed_size))
+            self._render_size += compressed_size - output_size
+
+    def _apply_size_limit(self) -> None:
+        """Keep a long render within the size limit, deleting earlier renders first and then compressed outputs."""
+        # Called with the lock held
+        if self._earlier_renders_size + self._render_size <= SCRIPT_OUTPUTS_MAX_TOTAL_SIZE:
+            return
+        if self._earlier_renders_size > 0:
+            self._earlier_renders_size = apply_retention(self.outputs_folder, keep=self.render_name)
+        while self._compressed_outputs and (
+            self._earlier_renders_size + self._render_size > SCRIPT_OUTPUTS_MAX_TOTAL_SIZE
+        ):
+            path, size = self._compressed_outputs.popleft()
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            self._render_size -= size
+
+    def add(
+        self,
+        script_type: str,
+        output: str,
+        exit_code: Optional[int],
+        frid: Optional[str] = None,
+        module: Optional[str] = None,
+    ) -> str:
+        """Store an output that is already complete."""
+        entry = self.create_entry(script_type, frid, module)
+        with open(entry.path, "w", encoding="utf-8") as f:
+            f.write(output)
+        return self.finish_entry(entry, exit_code)
+
+
+def get_latest_outputs(render_folder: str) -> list[tuple[dict, str]]:
+    """The latest output of every script type in a render folder, with the paths of the output files."""
+    latest_entries: dict[str, dict] = {}
+    for index_entry in read_index(render_folder):
+        latest_entries[index_entry["script_type"]] = index_entry
+    return [
+        (index_entry, os.path.join(render_folder, index_entry["path"]))
+        for index_entry in sorted(latest_entries.values(), key=lambda index_entry: index_entry["timestamp"])
+    ]
+
+
+def append_latest_outputs_to_crash_log(filepath: str, render_folders: list[str]) -> None:
+    """Append the end of the latest output of every test script type of the given renders to the crash log."""
+    try:
+        with open(filepath, "a", encoding="utf-8") as f:
+            for render_folder in render_folders:
+                for index_entry, output_path in get_latest_outputs(render_folder):
+                    output_lines = read_script_output(output_path).splitlines()
+                    f.write(
+                        f"\n──── Latest {index_entry['script_type']} script output "
+                        f"(module: {index_entry['module']}, functionality: {index_entry['frid']}, "
+                        f"attempt: {index_entry['attempt']}, exit code: {index_entry['exit_code']}) ────\n"
+                        f"Full output: {output_path}\n"
+                    )
+                    f.write("\n".join(output_lines[-CRASH_LOG_SCRIPT_OUTPUT_LINES:]) + "\n")
+    except OSError:
+        pass
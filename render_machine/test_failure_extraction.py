@@ -0,0 +1,196 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import Callable
+
+# Upper bound on the size of the failure report sent to the fix endpoints
+MAX_FAILURE_REPORT_SIZE = 20_000
+# A failure is cut short to fit the report only if at least this much of it fits
+MIN_TRUNCATED_FAILURE_SIZE = 500
+
+# An extractor returns one text block per failing test, or an empty list if it does not recognize the output
+FailureExtractor = Callable[[str], list[str]]
+
+_UNITTEST_SEPARATOR = "=" * 70
+_UNITTEST_FAILURE_HEADER = re.compile(r"^(FAIL|ERROR): ", re.MULTILINE)
+_UNITTEST_FOOTER = re.compile(r"^-{70}\nRan \d+ tests? in ", re.MULTILINE)
+
+_PYTEST_SECTION_HEADER = re.compile(r"^=+ (FAILURES|ERRORS) =+$", re.MULTILINE)
+_PYTEST_SECTION_END = re.compile(r"^=+ .* =+$", re.MULTILINE)
+# Long underscore runs, unlike the "_ _ _ _" lines separating the frames of a single failure
+_PYTEST_TEST_HEADER = re.compile(r"^_{3,} .+ _{3,}$", re.MULTILINE)
+
+_GO_FAILURE_HEADER = re.compile(r"^\s*--- FAIL: ")
+_GO_PANIC_HEADER = re.compile(r"^panic: ")
+_GO_PANIC_END = re.compile(r"^(FAIL\s|exit status )")
+
+_JEST_FAILURE_HEADER = re.compile(r"^\s*● (?!Console\b)")
+_JEST_SUMMARY = re.compile(r"^(Test Suites|Tests|Snapshots|Time):\s")
+
+_JUNIT_XML = re.compile(r"<(testsuites?)\b.*?</\1>", re.DOTALL)
+
+# Stack frames of the test runner and of installed packages only rarely help fixing a failing test
+_IRRELEVANT_PYTHON_FRAME = re.compile(r'^\s*File ".*(site-packages|[/\\]lib[/\\]python[^/\\]*[/\\]unittest)[/\\]')
+_IRRELEVANT_JS_FRAME = re.compile(r"^\s*at .*(node_modules|node:internal)")
+
+
+def _drop_irrelevant_frames(block: str) -> str:
+    lines = block.split("\n")
+    relevant_lines = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if _IRRELEVANT_PYTHON_FRAME.match(line):
+            # Skip the frame together with the source line printed under it
+            i += 1
+            if i < len(lines) and lines[i].startswith("    ") and not lines[i].lstrip().startswith("File "):
+                i += 1
+            continue
+        if not _IRRELEVANT_JS_FRAME.match(line):
+            relevant_lines.append(line)
+        i += 1
+    return "\n".join(relevant_lines)
+
+
+def extract_unittest_failures(output: str) -> list[str]:
+    footer = _UNITTEST_FOOTER.search(output)
+    report = output[: footer.start()] if footer else output
+
+    failures = []
+    for block in report.split(_UNITTEST_SEPARATOR + "\n")[1:]:
+        if _UNITTEST_FAILURE_HEADER.match(block):
+            failures.append(block.strip())
+    return failures
+
+
+def extract_pytest_failures(output: str) -> list[str]:
+    failures = []
+    for section_header in _PYTEST_SECTION_HEADER.finditer(output):
+        section_end = _PYTEST_SECTION_END.search(output, section_header.end())
+        section = output[section_header.end() : section_end.start() if section_end else len(output)]
+
+        test_headers = list(_PYTEST_TEST_HEADER.finditer(section))
+        for header, next_header in zip(test_headers, test_headers[1:] + [None]):
+            failures.append(section[header.start() : next_header.start() if next_header else len(section)].strip())
+    return failures
+
+
+def extract_go_test_failures(output: str) -> list[str]:
+    failures = []
+    lines = output.split("\n")
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if _GO_FAILURE_HEADER.match(line):
+            # The messages of a failing test are indented deeper than its "--- FAIL" line
+            indentation = len(line) - len(line.lstrip())
+            block = [line]
+            i += 1
+            while i < len(lines) and lines[i].strip() and len(lines[i]) - len(lines[i].lstrip()) > indentation:
+                block.append(lines[i])
+                i += 1
+            failures.append("\n".join(block).strip())
+        elif _GO_PANIC_HEADER.match(line):
+            block = [line]
+            i += 1
+            while i < len(lines) and not _GO_PANIC_END.match(lines[i]):
+                block.append(lines[i])
+                i += 1
+            failures.append("\n".join(block).strip())
+        else:
+            i += 1
+    return failures
+
+
+def extract_jest_failures(output: str) -> list[str]:
+    failures = []
+    block: list[str] = []
+    for line in output.split("\n"):
+        if _JEST_FAILURE_HEADER.match(line) or _JEST_SUMMARY.match(line):
+            if block:
+                failures.append("\n".join(block).strip())
+            block = [line] if _JEST_FAILURE_HEADER.match(line) else []
+        elif block:
+            block.append(line)
+    if block:
+        failures.append("\n".join(block).strip())
+    return failures
+
+
+def extract_junit_xml_failures(output: str) -> list[str]:
+    failures = []
+    for xml_report in _JUNIT_XML.finditer(output):
+        try:
+            root = ET.fromstring(xml_report.group(0))
+        except ET.ParseError:
+            continue
+
+        for test_case in root.iter("testcase"):
+            for result in list(test_case):
+                if result.tag not in ("failure", "error"):
+                    continue
+                test_name = ".".join(name for name in (test_case.get("classname"), test_case.get("name")) if name)
+                message = result.get("message", "")
+                details = (result.text or "").strip()
+                failure = f"{result.tag.upper()}: {test_name}"
+                if message:
+                    failure += f"\n{message}"
+                if details and details != message:
+                    failure += f"\n{details}"
+                failures.append(failure)
+    return failures
+
+
+FAILURE_EXTRACTORS: list[FailureExtractor] = [
+    extract_junit_xml_failures,
+    extract_pytest_failures,
+    extract_unittest_failures,
+    extract_go_test_failures,
+    extract_jest_failures,
+]
+
+
+def register_failure_extractor(extractor: FailureExtractor) -> None:
+    """Add an extractor for another test output format. It is tried before the built-in ones."""
+    FAILURE_EXTRACTORS.insert(0, extractor)
+
+
+def _truncate(text: str, max_size: int) -> str:
+    if len(text) <= max_size:
+        return text
+    note = f"\n... {len(text) - max_size} characters omitted ...\n"
+    head_size = max(max_size - len(note), 0) // 2
+    tail_size = max(max_size - len(note) - head_size, 0)
+    return text[:head_size] + note + (text[-tail_size:] if tail_size > 0 else "")
+
+
+def extract_test_failures(output: str, max_size: int = MAX_FAILURE_REPORT_SIZE) -> str:
+    """
+    Reduce a test script output to its failing tests: their names, assertion messages and relevant stack frames.
+
+    The first extractor that recognizes the output is used. Output that none of them recognizes (e.g. a build error)
+    is returned as it is. Either way, the result is truncated to `max_size` characters.
+    """
+    failures: list[str] = []
+    for extractor in FAILURE_EXTRACTORS:
+        failures = [failure for failure in extractor(output) if failure]
+        if failures:
+            break
+
+    if not failures:
+        return _truncate(output, max_size)
+
+    # Some runners (e.g. jest) repeat the failures in a summary at the end of the output
+    failures = list(dict.fromkeys(_drop_irrelevant_frames(failure) for failure in failures))
+    report = f"{len(failures)} failing test(s):"
+    for index, failure in enumerate(failures):
+        remaining_failures = len(failures) - index - 1
+        note = f"\n\n... and {remaining_failures} more failing test(s)" if remaining_failures > 0 else ""
+        available_size = max_size - len(report) - len(note) - 2
+        if len(failure) <= available_size:
+            report += "\n\n" + failure
+            continue
+
+        if available_size >= MIN_TRUNCATED_FAILURE_SIZE:
+            return report + "\n\n" + _truncate(failure, available_size) + note
+        return report + f"\n\n... and {remaining_failures + 1} more failing test(s)"
+    return report
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import platform
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+import file_utils
+
+TEST_RESULTS_CACHE_FILE_NAME = "test_results_cache.json"
+MAX_CACHED_TEST_RESULTS = 500
+
+# Exit codes that describe the environment rather than the tested code (unrecoverable script error, timeout)
+NON_CACHEABLE_EXIT_CODES = [69, 124]
+
+
+@dataclass
+class CachedTestResult:
+    exit_code: int
+    output: str
+
+
+def get_file_hash(file_path: str) -> str:
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def get_folder_hash(folder: str) -> str:
+    files = file_utils.list_all_text_files(folder)
+    return _hash_key_parts(
+        [
+            [file_name, content]
+            for file_name, content in sorted(file_utils.get_existing_files_content(folder, files).items())
+        ]
+    )
+
+
+def get_environment_fingerprint(
+    prepare_environment_script: Optional[str],
+    test_script_timeout: Optional[int],
+    prepared_environment_key: Optional[str] = None,
+) -> str:
+    """
+    Hash of the parts of the environment outside of the build folder that test outcomes depend on.
+
+    With --reuse-prepared-environment, the test scripts run against the environment prepared for the dependency
+    manifests, so its key is part of the fingerprint.
+    """
+    return _hash_key_parts(
+        [
+            platform.platform(),
+            os.environ.get("PATH", ""),
+            get_file_hash(prepare_environment_script) if prepare_environment_script is not None else None,
+            test_script_timeout,
+            prepared_environment_key,
+        ]
+    )
+
+
+def get_conformance_tests_cache_key(
+    build_tree_sha: str, conformance_tests_folder_name: str, conformance_tests_script: str, environment_fingerprint: str
+) -> str:
+    return _hash_key_parts(
+        [
+            "conformance_tests",
+            build_tree_sha,
+            get_folder_hash(conformance_tests_folder_name),
+            os.path.abspath(conformance_tests_script),
+            get_file_hash(conformance_tests_script),
+            environment_fingerprint,
+        ]
+    )
+
+
+def get_unit_tests_cache_key(build_tree_sha: str, unittests_script: str, environment_fingerprint: str) -> str:
+    return _hash_key_parts(
+        [
+            "unit_tests",
+            build_tree_sha,
+            os.path.abspath(unittests_script),
+            get_file_hash(unittests_script),
+            environment_fingerprint,
+        ]
+    )
+
+
+def _hash_key_parts(key_parts: list) -> str:
+    return hashlib.sha256(json.dumps(key_parts).encode()).hexdigest()
+
+
+class TestResultsCache:
+    """
+    Persistent cache of test script outcomes, keyed by hashes of everything the outcome depends on.
+
+    The cache is stored as a JSON file and holds at most MAX_CACHED_TEST_RESULTS entries, evicting the least
+    recently used ones. A cache without a file path is disabled: it never hits and stores nothing.
+    """
+
+    def __init__(self, cache_file_path: Optional[str]):
+        self.cache_file_path = cache_file_path
+        self._entries: Optional[dict[str, dict]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.cache_file_path is not None
+
+    def _load(self) -> dict[str, dict]:
+        assert self.cache_file_path is not None  # only loaded when enabled
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.cache_file_path):
+                try:
+                    with open(self.cache_file_path, "r", encoding="utf-8") as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    # A damaged cache only costs re-running the tests
+                    self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        assert self.cache_file_path is not None  # only saved when enabled
+        cache_folder = os.path.dirname(self.cache_file_path)
+        os.makedirs(cache_folder, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            mode="w", encoding="utf-8", dir=cache_folder, delete=False, suffix=".tmp"
+        ) as temp_file:
+            json.dump(self._entries, temp_file)
+        os.replace(temp_file.name, self.cache_file_path)
+
+    def get(self, key: str) -> Optional[CachedTestResult]:
+        if not self.enabled:
+            return None
+
+        entries = self._load()
+        entry = entries.pop(key, None)
+        if entry is None:
+            return None
+
+        # Re-insert to mark the entry as the most recently used one
+        entries[key] = entry
+        return CachedTestResult(exit_code=entry["exit_code"], output=entry["output"])
+
+    def put(self, key: str, exit_code: int, output: str) -> None:
+        if not self.enabled or exit_code in NON_CACHEABLE_EXIT_CODES:
+            return
+
+        entries = self._load()
+        entries.pop(key, None)
+        entries[key] = {"exit_code": exit_code, "output": output}
+        while len(entries) > MAX_CACHED_TEST_RESULTS:
+            del entries[next(iter(entries))]
+        self._save()
@@ -0,0 +1,120 @@
+"""Pausing, resuming and cancelling a render.
+
+The TUI, signal handlers and the batch request a pause, a resume or the cancellation of a render on its RunControl.
+The render waits for them on a condition variable instead of polling, so a resume or a cancellation takes effect
+right away. Test scripts and API requests in flight are cancelled through the callbacks registered with on_cancel.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from plain2code_exceptions import RenderCancelledError
+
+
+class RunControl:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pause_requested = False
+        self._cancelled = False
+        self._cancel_callbacks: dict[int, Callable[[], None]] = {}
+        self._next_callback_id = 0
+
+    @property
+    def pause_requested(self) -> bool:
+        return self._pause_requested
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def pause(self) -> None:
+        """Request the render to pause at the next state transition."""
+        with self._condition:
+            self._pause_requested = True
+            self._condition.notify_all()
+
+    def resume(self) -> None:
+        with self._condition:
+            self._pause_requested = False
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        """Cancel the render. It can be called from a signal handler."""
+        with self._condition:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks = list(self._cancel_callbacks.values())
+            self._condition.notify_all()
+        for callback in callbacks:
+            callback()
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled:
+            raise RenderCancelledError()
+
+    def wait_while_paused(self) -> None:
+        """Wait until the render is resumed. Raises RenderCancelledError if it is cancelled."""
+        with self._condition:
+            while self._pause_requested and not self._cancelled:
+                self._condition.wait()
+        self.raise_if_cancelled()
+
+    def wait_for_cancel(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the render is cancelled or the timeout expires, and return whether it was cancelled."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._cancelled, timeout)
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], None]) -> Iterator[None]:
+        """
+        Call the callback when the render is cancelled while the block runs, right away if it already is.
+
+        The callback is called in the thread that cancels the render, so it must only wake up the block, e.g. by
+        putting an event in a queue or closing a connection.
+        """
+        with self._condition:
+            callback_id = self._next_callback_id
+            self._next_callback_id += 1
+            self._cancel_callbacks[callback_id] = callback
+            cancelled = self._cancelled
+        if cancelled:
+            callback()
+        try:
+            yield
+        finally:
+            with self._condition:
+                del self._cancel_callbacks[callback_id]
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call the function in a separate thread and return its result, or raise RenderCancelledError as soon as the
+        render is cancelled.
+
+        A cancelled call is abandoned: its thread keeps running until the function returns and its result is dropped.
+        It is meant for blocking calls that cannot be interrupted otherwise, like a request waiting for its response.
+        """
+        self.raise_if_cancelled()
+        outcome: dict[str, Any] = {}
+
+        def _call() -> None:
+            try:
+                result = func(*args, **kwargs)
+                with self._condition:
+                    outcome["result"] = result
+                    self._condition.notify_all()
+            except BaseException as e:
+                with self._condition:
+                    outcome["error"] = e
+                    self._condition.notify_all()
+
+        threading.Thread(target=_call, daemon=True).start()
+        with self._condition:
+            while not outcome and not self._cancelled:
+                self._condition.wait()
+        if "error" in outcome:
+            raise outcome["error"]
+        if "result" in outcome:
+            return outcome["result"]
+        raise RenderCancelledError()
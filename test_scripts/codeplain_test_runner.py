@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Server side of the codeplain persistent test runner protocol, shared by the persistent_test_runner_*.py scripts.
+
+Started with --serve, a runner listens on a localhost port, prints CODEPLAIN_TEST_RUNNER_PORT=<port> and serves
+test runs until it is stopped. Every connection is one test run: the client sends a JSON line with the token from
+the CODEPLAIN_TEST_RUNNER_TOKEN environment variable, the script arguments, the environment variables to add and
+its working directory, and the runner answers with {"output": ...} JSON lines and a final {"exit_code": ...}.
+
+Started without --serve, a runner runs the tests once, like the run_*.sh scripts.
+"""
+
+import atexit
+import codecs
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import traceback
+from typing import Callable, Optional
+
+SERVE_ARGUMENT = "--serve"
+PORT_LINE_PREFIX = "CODEPLAIN_TEST_RUNNER_PORT="
+TOKEN_ENV_VAR = "CODEPLAIN_TEST_RUNNER_TOKEN"
+UNRECOVERABLE_ERROR_EXIT_CODE = 69
+
+
+class TestRunOutput:
+    """Output of a test run, sent to the client or printed when the tests are run once."""
+
+    def __init__(self, write: Callable[[str], None]):
+        self._write = write
+
+    def write(self, text: str) -> int:
+        if text:
+            self._write(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def print(self, text: str = "") -> None:
+        self.write(text + "\n")
+
+    def run_command(self, cmd: list[str], cwd: str, env: Optional[dict[str, str]] = None) -> int:
+        """Run a command, streaming its output, and return its exit code."""
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                cwd=cwd,
+                env={**os.environ, **(env or {})},
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+            )
+        except OSError as e:
+            self.print(f"Error: Could not run {' '.join(cmd)}: {e}")
+            return UNRECOVERABLE_ERROR_EXIT_CODE
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for data in iter(lambda: os.read(proc.stdout.fileno(), 8192), b""):
+            self.write(decoder.decode(data))
+        self.write(decoder.decode(b"", final=True))
+        return proc.wait()
+
+
+# A test run gets the script arguments, the environment variables to add for the run, the working directory
+# relative paths in the arguments are relative to, and the output to write to. It returns the exit code.
+RunTests = Callable[[list[str], dict[str, str], str, TestRunOutput], int]
+
+
+def sync_folder(source: str, destination: str, keep: tuple[str, ...] = ()) -> None:
+    """
+    Make `destination` a copy of `source`, copying only the files that changed since the previous sync.
+
+    Hidden top-level entries of `source` are not copied (like `cp -R source/*`). Top-level entries of `destination`
+    named in `keep` (e.g. node_modules) are left as they are.
+    """
+    os.makedirs(destination, exist_ok=True)
+    top_level_names = [name for name in os.listdir(source) if not name.startswith(".")]
+
+    for name in os.listdir(destination):
+        if name in keep or name in top_level_names:
+            continue
+        _remove(os.path.join(destination, name))
+
+    for name in top_level_names:
+        source_path = os.path.join(source, name)
+        destination_path = os.path.join(destination, name)
+        if os.path.isdir(source_path):
+            _sync_tree(source_path, destination_path)
+        else:
+            _sync_file(source_path, destination_path)
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+def _sync_file(source_path: str, destination_path: str) -> None:
+    if os.path.isdir(destination_path) and not os.path.islink(destination_path):
+        shutil.rmtree(destination_path)
+    if os.path.exists(destination_path):
+        source_stat = os.stat(source_path)
+        destination_stat = os.stat(destination_path)
+        if source_stat.st_size == destination_stat.st_size and source_stat.st_mtime_ns == destination_stat.st_mtime_ns:
+            return
+    shutil.copy2(source_path, destination_path)
+
+
+def _sync_tree(source: str, destination: str) -> None:
+    if os.path.exists(destination) and not os.path.isdir(destination):
+        os.remove(destination)
+    os.makedirs(destination, exist_ok=True)
+
+    source_names = set(os.listdir(source))
+    for name in os.listdir(destination):
+        if name not in source_names:
+            _remove(os.path.join(destination, name))
+
+    for name in source_names:
+        source_path = os.path.join(source, name)
+        destination_path = os.path.join(destination, name)
+        if os.path.isdir(source_path) and not os.path.islink(source_path):
+            _sync_tree(source_path, destination_path)
+        else:
+            _sync_file(source_path, destination_path)
+
+
+_scratch_folders: set[str] = set()
+
+
+def get_scratch_folder(runner_name: str, build_folder: str) -> str:
+    """Folder the build folder is copied to. It is deleted when the runner stops."""
+    scratch_folder = os.path.join(tempfile.gettempdir(), f"codeplain_{runner_name}_{os.path.basename(build_folder)}")
+    if scratch_folder not in _scratch_folders:
+        _scratch_folders.add(scratch_folder)
+        atexit.register(shutil.rmtree, scratch_folder, True)
+    return scratch_folder
+
+
+def _send(connection: socket.socket, message: dict) -> None:
+    connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def _serve_test_run(connection: socket.socket, token: Optional[str], run_tests: RunTests) -> None:
+    with connection.makefile("r", encoding="utf-8") as requests:
+        request = json.loads(requests.readline() or "{}")
+    if token is None or request.get("token") != token:
+        return
+
+    output = TestRunOutput(lambda text: _send(connection, {"output": text}))
+    try:
+        exit_code = run_tests(request.get("args", []), request.get("env", {}), request.get("cwd", os.getcwd()), output)
+    except Exception:
+        output.write(traceback.format_exc())
+        exit_code = UNRECOVERABLE_ERROR_EXIT_CODE
+    _send(connection, {"exit_code": exit_code})
+
+
+def serve(run_tests: RunTests) -> None:
+    token = os.environ.get(TOKEN_ENV_VAR)
+    server = socket.create_server(("127.0.0.1", 0))
+    print(f"{PORT_LINE_PREFIX}{server.getsockname()[1]}", flush=True)
+
+    while True:
+        connection, _ = server.accept()
+        with connection:
+            try:
+                _serve_test_run(connection, token, run_tests)
+            except (OSError, ValueError):
+                # The client went away, e.g. because the test run timed out
+                pass
+
+
+def main(run_tests: RunTests) -> None:
+    # Stopping the runner still runs the atexit cleanup of its scratch folders
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    if sys.argv[1:2] == [SERVE_ARGUMENT]:
+        serve(run_tests)
+    else:
+        output = TestRunOutput(lambda text: print(text, end="", flush=True))
+        sys.exit(run_tests(sys.argv[1:], {}, os.getcwd(), output))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# codeplain-test-runner: persistent
+#
+# Runs Go unittests (one argument: <build_folder>) or Go conformance tests (two arguments:
+# <build_folder> <conformance_tests_folder>). The copy of the build folder is kept between test runs and only
+# updated, so the Go build cache stays warm and `go get` only runs again when go.mod or go.sum change.
+# Usable as --unittests-script or --conformance-tests-script.
+
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from codeplain_test_runner import (  # noqa: E402
+    UNRECOVERABLE_ERROR_EXIT_CODE,
+    TestRunOutput,
+    get_scratch_folder,
+    main,
+    sync_folder,
+)
+
+# Hash of the module files `go get` last ran for, per folder
+_fetched_dependencies: dict[str, str] = {}
+
+
+def _get_module_files_hash(folder: str) -> str:
+    module_files_hash = hashlib.sha256()
+    for file_name in ("go.mod", "go.sum"):
+        file_path = os.path.join(folder, file_name)
+        if os.path.exists(file_path):
+            with open(file_path, "rb") as f:
+                module_files_hash.update(file_name.encode() + b"\0" + f.read())
+    return module_files_hash.hexdigest()
+
+
+def _go_get(folder: str, env: dict[str, str], output: TestRunOutput) -> int:
+    module_files_hash = _get_module_files_hash(folder)
+    if _fetched_dependencies.get(folder) == module_files_hash:
+        return 0
+
+    output.print(f"Running go get in {folder}...")
+    exit_code = output.run_command(["go", "get"], cwd=folder, env=env)
+    if exit_code == 0:
+        _fetched_dependencies[folder] = module_files_hash
+    return exit_code
+
+
+def run_tests(args: list[str], env: dict[str, str], cwd: str, output: TestRunOutput) -> int:
+    if len(args) not in (1, 2):
+        output.print("Error: No build folder name provided.")
+        output.print("Usage: persistent_test_runner_golang.py <build_folder_name> [<conformance_tests_folder>]")
+        return UNRECOVERABLE_ERROR_EXIT_CODE
+
+    build_folder = os.path.join(cwd, args[0])
+    if not os.path.isdir(build_folder):
+        output.print(f"Error: Go build folder '{build_folder}' does not exist.")
+        return UNRECOVERABLE_ERROR_EXIT_CODE
+
+    scratch_folder = get_scratch_folder("go", build_folder)
+    sync_folder(build_folder, scratch_folder)
+
+    if len(args) == 1:
+        output.print(f"Running Golang unittests in {build_folder}...")
+        return output.run_command(["go", "test"], cwd=scratch_folder, env=env)
+
+    conformance_tests_folder = os.path.join(cwd, args[1])
+    if not os.path.isdir(conformance_tests_folder):
+        output.print(f"Error: Conformance tests folder '{conformance_tests_folder}' does not exist.")
+        return UNRECOVERABLE_ERROR_EXIT_CODE
+
+    exit_code = _go_get(scratch_folder, env, output)
+    if exit_code == 0 and os.path.exists(os.path.join(conformance_tests_folder, "go.mod")):
+        exit_code = _go_get(conformance_tests_folder, env, output)
+    if exit_code != 0:
+        return exit_code
+
+    output.print("Running Golang conformance tests...\n")
+    return output.run_command(
+        ["go", "run", os.path.join(conformance_tests_folder, "conformance_tests.go")], cwd=scratch_folder, env=env
+    )
+
+
+if __name__ == "__main__":
+    main(run_tests)
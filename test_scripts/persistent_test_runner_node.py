@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# codeplain-test-runner: persistent
+#
+# Runs Node (e.g. React) unittests with `npm test` (one argument: <build_folder>). The copy of the build folder,
+# including its node_modules, is kept between test runs and only updated, and `npm install` only runs again when
+# package.json or package-lock.json change. Usable as --unittests-script.
+
+import hashlib
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from codeplain_test_runner import (  # noqa: E402
+    UNRECOVERABLE_ERROR_EXIT_CODE,
+    TestRunOutput,
+    get_scratch_folder,
+    main,
+    sync_folder,
+)
+
+ANSI_ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;]*[mK]")
+
+# Hash of the package files `npm install` last ran for, per folder
+_installed_dependencies: dict[str, str] = {}
+
+
+def _get_package_files_hash(folder: str) -> str:
+    package_files_hash = hashlib.sha256()
+    for file_name in ("package.json", "package-lock.json"):
+        file_path = os.path.join(folder, file_name)
+        if os.path.exists(file_path):
+            with open(file_path, "rb") as f:
+                package_files_hash.update(file_name.encode() + b"\0" + f.read())
+    return package_files_hash.hexdigest()
+
+
+def run_tests(args: list[str], env: dict[str, str], cwd: str, output: TestRunOutput) -> int:
+    if len(args) != 1:
+        output.print("Error: No subfolder name provided.")
+        output.print("Usage: persistent_test_runner_node.py <subfolder_name>")
+        return UNRECOVERABLE_ERROR_EXIT_CODE
+
+    build_folder = os.path.join(cwd, args[0])
+    if not os.path.isdir(build_folder):
+        output.print(f"Error: Subfolder '{build_folder}' does not exist.")
+        return UNRECOVERABLE_ERROR_EXIT_CODE
+
+    scratch_folder = get_scratch_folder("node", build_folder)
+    # npm install may have updated package-lock.json, so it is kept as well
+    sync_folder(build_folder, scratch_folder, keep=("node_modules", "build", "package-lock.json"))
+
+    package_files_hash = _get_package_files_hash(build_folder)
+    if _installed_dependencies.get(scratch_folder) != package_files_hash:
+        exit_code = output.run_command(["npm", "install"], cwd=scratch_folder, env=env)
+        if exit_code != 0:
+            output.print("Error: Installing Node modules.")
+            return exit_code
+        _installed_dependencies[scratch_folder] = package_files_hash
+
+    output.print(f"Running React unittests in {build_folder}...")
+
+    def _write_colorless(text: str) -> None:
+        output.write(ANSI_ESCAPE_PATTERN.sub("", text))
+
+    colorless_output = TestRunOutput(_write_colorless)
+    exit_code = colorless_output.run_command(
+        ["npm", "test", "--", "--runInBand", "--silent", "--detectOpenHandles"], cwd=scratch_folder, env=env
+    )
+    if exit_code != 0:
+        output.print(f"Error: Tests failed with exit code {exit_code}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    main(run_tests)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# codeplain-test-runner: persistent
+#
+# Runs Python unittests (one argument: <build_folder>) or Python conformance tests (two arguments:
+# <build_folder> <conformance_tests_folder>) in a long-lived interpreter, so the interpreter start and the imports
+# of installed packages are paid once. Usable as --unittests-script or --conformance-tests-script.
+
+import contextlib
+import importlib
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from codeplain_test_runner import (  # noqa: E402
+    UNRECOVERABLE_ERROR_EXIT_CODE,
+    TestRunOutput,
+    get_scratch_folder,
+    main,
+    sync_folder,
+)
+
+# The build folder changes between test runs, so compiled files of an earlier run must never be picked up
+sys.dont_write_bytecode = True
+
+
+def _unload_modules_from(folders: list[str]) -> None:
+    """Forget the modules imported from the given folders, so the next test run imports their current code."""
+    for module_name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if module_file is None:
+            continue
+        module_file = os.path.abspath(module_file)
+        if any(module_file.startswith(folder + os.sep) for folder in folders):
+            del sys.modules[module_name]
+    importlib.invalidate_caches()
+
+
+def run_tests(args: list[str], env: dict[str, str], cwd: str, output: TestRunOutput) -> int:
+    if len(args) not in (1, 2):
+        output.print("Error: No build folder name provided.")
+        output.print("Usage: persistent_test_runner_python.py <build_folder_name> [<conformance_tests_folder>]")
+        return UNRECOVERABLE_ERROR_EXIT_CODE
+
+    build_folder = os.path.join(cwd, args[0])
+    conformance_tests_folder = os.path.join(cwd, args[1]) if len(args) == 2 else None
+    if not os.path.isdir(build_folder):
+        output.print(f"Error: Python build folder '{build_folder}' does not exist.")
+        return UNRECOVERABLE_ERROR_EXIT_CODE
+
+    scratch_folder = get_scratch_folder("python", build_folder)
+    sync_folder(build_folder, scratch_folder)
+
+    test_folders = [os.path.abspath(scratch_folder)]
+    if conformance_tests_folder is not None:
+        test_folders.append(os.path.abspath(conformance_tests_folder))
+        output.print("Running Python conformance tests...\n")
+    else:
+        output.print(f"Running Python unittests in {scratch_folder}...")
+
+    original_cwd = os.getcwd()
+    original_sys_path = list(sys.path)
+    original_environ = dict(os.environ)
+    os.chdir(scratch_folder)
+    sys.path.insert(0, scratch_folder)
+    os.environ.update(env)
+    _unload_modules_from(test_folders)
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            start_dir = conformance_tests_folder if conformance_tests_folder is not None else "."
+            tests = unittest.TestLoader().discover(start_dir)
+            result = unittest.TextTestRunner(stream=output, buffer=True).run(tests)
+    finally:
+        _unload_modules_from(test_folders)
+        os.environ.clear()
+        os.environ.update(original_environ)
+        sys.path[:] = original_sys_path
+        os.chdir(original_cwd)
+
+    if conformance_tests_folder is not None and result.testsRun == 0:
+        output.print("\nError: No unittests discovered.")
+        return 1
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == "__main__":
+    main(run_tests)
@@ -55,8 +55,30 @@ if (-not (Test-Path $NODE_SUBFOLDER)) {
 Push-Location $NODE_SUBFOLDER
 
 try {
-    # Install libraries
-    npm install
+    # Install libraries. With a prepared environment directory (--reuse-prepared-environment), they are installed
+    # there once per version of the dependency manifests and linked into the subfolder by later runs.
+    if ($env:CODEPLAIN_PREPARED_ENVIRONMENT_DIR) {
+        $PreparedNodeModules = Join-Path $env:CODEPLAIN_PREPARED_ENVIRONMENT_DIR "node_modules"
+        if (-not (Test-Path $PreparedNodeModules)) {
+            npm install
+            if ($LASTEXITCODE -eq 0) {
+                Move-Item -Path "node_modules" -Destination $PreparedNodeModules
+            }
+        }
+        if (Test-Path $PreparedNodeModules) {
+            if ($env:VERBOSE -eq "1") {
+                Write-Host "Using the Node modules in $PreparedNodeModules"
+            }
+            if (Test-Path "node_modules") {
+                Remove-Item -Path "node_modules" -Recurse -Force
+            }
+            # A junction needs no extra privileges on Windows
+            $LinkType = if ($IsWindows -or $env:OS -eq "Windows_NT") { "Junction" } else { "SymbolicLink" }
+            New-Item -ItemType $LinkType -Path "node_modules" -Target $PreparedNodeModules | Out-Null
+        }
+    } else {
+        npm install
+    }
 
     # Execute all React unittests in the subfolder
     Write-Host "Running React unittests in $BuildFolder..."
@@ -80,6 +102,11 @@ try {
     exit $TEST_EXIT_CODE
 } finally {
     Pop-Location
+    $NodeModulesLink = Get-Item -Path (Join-Path $NODE_SUBFOLDER "node_modules") -Force -ErrorAction SilentlyContinue
+    if ($NodeModulesLink -and $NodeModulesLink.LinkType) {
+        # Remove only the link, so the prepared Node modules are kept
+        $NodeModulesLink.Delete()
+    }
     if (Test-Path $NODE_SUBFOLDER) {
         Remove-Item -Path $NODE_SUBFOLDER -Recurse -Force -ErrorAction SilentlyContinue
     }
@@ -52,8 +52,23 @@ if [ $? -ne 0 ]; then
   exit $UNRECOVERABLE_ERROR_EXIT_CODE
 fi
 
-# Install libraries
-npm install
+# Install libraries. With a prepared environment directory (--reuse-prepared-environment), they are installed there
+# once per version of the dependency manifests and linked into the subfolder by later runs.
+if [ -n "${CODEPLAIN_PREPARED_ENVIRONMENT_DIR:-}" ]; then
+  PREPARED_NODE_MODULES="$CODEPLAIN_PREPARED_ENVIRONMENT_DIR/node_modules"
+  if [ ! -d "$PREPARED_NODE_MODULES" ] && npm install; then
+    mv node_modules "$PREPARED_NODE_MODULES"
+  fi
+  if [ -d "$PREPARED_NODE_MODULES" ]; then
+    if [ "${VERBOSE:-}" -eq 1 ] 2>/dev/null; then
+      printf "Using the Node modules in $PREPARED_NODE_MODULES\n"
+    fi
+    rm -rf node_modules
+    ln -s "$PREPARED_NODE_MODULES" node_modules
+  fi
+else
+  npm install
+fi
 
 # Execute all React unittests in the subfolder
 echo "Running React unittests in $1..."
@@ -392,3 +392,29 @@ def test_partial_render_start_non_fr_change_in_required_module_blocks():
 
     result = determine_partial_render_start(top_module)
     assert result is None
+
+
+# --- Duplicates and large specs ---
+
+
+def test_duplicate_functionalities_match_the_first_unmatched_occurrence():
+    module = FakeModule("mod", ["B", "A", "A", "C"], stored_frs=["A", "B", "A", "D"])
+    changes = _detect_module_changes(module)
+    assert changes == [
+        FunctionalityChange(module="mod", frid="1", change_type="moved", detail="2"),
+        FunctionalityChange(module="mod", frid="2", change_type="moved", detail="1"),
+        FunctionalityChange(module="mod", frid="4", change_type="edited"),
+    ]
+
+
+def test_partial_render_start_on_large_spec():
+    stored_frs = [f"Functionality {i}" for i in range(1000)]
+    current_frs = stored_frs[:600] + stored_frs[601:] + ["Functionality 600"]
+    module = FakeModule("mod", current_frs, stored_frs=stored_frs)
+
+    result = determine_partial_render_start(module)
+    assert result.frid == "601"
+
+    changes = _detect_module_changes(module)
+    assert len(changes) == 400
+    assert all(change.change_type == "moved" for change in changes)
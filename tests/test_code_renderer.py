@@ -0,0 +1,28 @@
+from transitions.extensions.diagrams import HierarchicalGraphMachine
+
+from render_machine.code_renderer import create_machine
+
+STATES = ["first", {"name": "second", "children": ["inner"], "initial": "inner"}]
+TRANSITIONS = [{"trigger": "advance", "source": "first", "dest": "second"}]
+
+
+class Model:
+    pass
+
+
+def test_plain_machine_is_created_without_graph_support():
+    model = Model()
+    machine = create_machine(False, model=model, states=STATES, transitions=TRANSITIONS, initial="first")
+
+    assert not isinstance(machine, HierarchicalGraphMachine)
+    assert not hasattr(model, "get_graph")
+    machine.dispatch("advance")
+    assert model.state == "second_inner"
+
+
+def test_graph_machine_is_created_for_the_diagram():
+    model = Model()
+    machine = create_machine(True, model=model, states=STATES, transitions=TRANSITIONS, initial="first")
+
+    assert isinstance(machine, HierarchicalGraphMachine)
+    assert hasattr(model, "get_graph")
@@ -0,0 +1,95 @@
+"""Tests for the in-memory conformance tests definitions of ``ConformanceTests``."""
+
+import json
+import os
+
+import pytest
+
+from render_machine.conformance_tests import CONFORMANCE_TESTS_DEFINITION_FILE_NAME, ConformanceTests
+
+
+@pytest.fixture
+def conformance_tests(tmp_path):
+    conformance_tests = ConformanceTests(str(tmp_path), CONFORMANCE_TESTS_DEFINITION_FILE_NAME)
+    os.makedirs(conformance_tests.get_module_conformance_tests_folder("m"))
+    return conformance_tests
+
+
+def _definition_file_path(conformance_tests):
+    return os.path.join(
+        conformance_tests.get_module_conformance_tests_folder("m"), CONFORMANCE_TESTS_DEFINITION_FILE_NAME
+    )
+
+
+def _write_definition(conformance_tests, definition):
+    with open(_definition_file_path(conformance_tests), "w") as f:
+        json.dump(definition, f)
+
+
+def test_definition_is_written_on_flush(conformance_tests):
+    tests_folder = conformance_tests.get_module_conformance_tests_folder("m")
+    definition = {"1": {"folder_name": os.path.join(tests_folder, "1_feature")}}
+
+    conformance_tests.dump_conformance_tests_json("m", definition)
+
+    assert not os.path.exists(_definition_file_path(conformance_tests))
+    assert conformance_tests.get_conformance_tests_json("m") == definition
+
+    conformance_tests.flush()
+
+    with open(_definition_file_path(conformance_tests)) as f:
+        assert json.load(f) == {"1": {"folder_name": "1_feature"}}
+    assert os.listdir(tests_folder) == [CONFORMANCE_TESTS_DEFINITION_FILE_NAME]
+
+
+def test_definition_is_read_again_only_when_the_file_changes(conformance_tests, monkeypatch):
+    _write_definition(conformance_tests, {"1": {"folder_name": "1_feature"}})
+    assert list(conformance_tests.get_conformance_tests_json("m")) == ["1"]
+
+    reads = []
+    resolve_folder_names = conformance_tests._resolve_folder_names
+    monkeypatch.setattr(
+        conformance_tests,
+        "_resolve_folder_names",
+        lambda module_name, definition: reads.append(module_name) or resolve_folder_names(module_name, definition),
+    )
+    conformance_tests.get_conformance_tests_json("m")
+    assert reads == []
+
+    # E.g. git reverting the definition
+    _write_definition(conformance_tests, {"1": {"folder_name": "1_feature"}, "2": {"folder_name": "2_feature"}})
+    assert list(conformance_tests.get_conformance_tests_json("m")) == ["1", "2"]
+    assert reads == ["m"]
+
+
+def test_returned_definitions_do_not_change_the_cached_one(conformance_tests):
+    _write_definition(conformance_tests, {"1": {"folder_name": "1_feature"}})
+
+    conformance_tests.get_conformance_tests_json("m").pop("1")
+
+    assert list(conformance_tests.get_conformance_tests_json("m")) == ["1"]
+
+
+def test_folder_names_by_frid(conformance_tests):
+    tests_folder = conformance_tests.get_module_conformance_tests_folder("m")
+    _write_definition(
+        conformance_tests, {"2": {"folder_name": "2_feature"}, "1": {"folder_name": "1_feature"}, "3": {}}
+    )
+
+    assert conformance_tests.get_conformance_test_folder_names_by_frid("m") == {
+        "2": os.path.join(tests_folder, "2_feature"),
+        "1": os.path.join(tests_folder, "1_feature"),
+    }
+
+
+def test_existing_folder_names_follow_the_tests_folder(conformance_tests):
+    tests_folder = conformance_tests.get_module_conformance_tests_folder("m")
+    os.makedirs(os.path.join(tests_folder, "1_feature"))
+    os.makedirs(os.path.join(tests_folder, ".required_module"))
+
+    assert conformance_tests.fetch_existing_conformance_test_folder_names("m") == ["1_feature"]
+
+    os.makedirs(os.path.join(tests_folder, "2_feature"))
+
+    assert sorted(conformance_tests.fetch_existing_conformance_test_folder_names("m")) == ["1_feature", "2_feature"]
+    assert conformance_tests.fetch_existing_conformance_test_folder_names("missing") == []
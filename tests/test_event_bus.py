@@ -0,0 +1,126 @@
+"""Tests for the asynchronous event bus, which delivers the render events to slow subscribers such as the TUI."""
+
+import threading
+import time
+
+import plain2code_events
+from event_bus import AsyncEventBus
+from plain2code_events import LogMessageEmitted, RenderCompleted, RenderStateUpdated
+from render_machine.states import States
+
+
+class _SlowSubscriber:
+    def __init__(self):
+        self.events = []
+        self.release = threading.Event()
+
+    def on_event(self, event):
+        self.release.wait()
+        self.events.append(event)
+
+    def on_other_event(self, event):
+        self.events.append(event)
+
+
+def _log_message(message):
+    return LogMessageEmitted(logger_name="codeplain", level="INFO", message=message, timestamp="00:00:00")
+
+
+def test_slow_subscriber_does_not_hold_up_the_publisher():
+    event_bus = AsyncEventBus()
+    subscriber = _SlowSubscriber()
+    event_bus.subscribe(LogMessageEmitted, subscriber.on_event)
+    event_bus.subscribe(RenderCompleted, subscriber.on_other_event)
+
+    start = time.monotonic()
+    for i in range(10):
+        event_bus.publish(_log_message(str(i)))
+    event_bus.publish(RenderCompleted(rendered_code_path="build"))
+    assert time.monotonic() - start < 0.5
+
+    subscriber.release.set()
+    assert event_bus.wait_until_delivered(timeout=5)
+    # The methods of an object are one subscriber, which receives the events in the order they were published
+    assert [getattr(event, "message", None) for event in subscriber.events] == [str(i) for i in range(10)] + [None]
+    metrics = event_bus.get_metrics()["_SlowSubscriber"]
+    assert metrics.published == metrics.delivered == 11
+    event_bus.close()
+
+
+def test_queued_events_are_coalesced():
+    event_bus = AsyncEventBus()
+    subscriber = _SlowSubscriber()
+    event_bus.subscribe(plain2code_events.TestScriptOutputEmitted, subscriber.on_event)
+
+    event_bus.publish(
+        plain2code_events.TestScriptOutputEmitted(script_type="Unit Tests", frid="1", module="module", lines=["w"])
+    )
+    time.sleep(0.1)  # the first output is being processed
+    event_bus.publish(
+        plain2code_events.TestScriptOutputEmitted(script_type="Unit Tests", frid="1", module="module", lines=["x"])
+    )
+    event_bus.publish(
+        plain2code_events.TestScriptOutputEmitted(script_type="Unit Tests", frid="1", module="module", lines=["y"])
+    )
+    event_bus.publish(
+        plain2code_events.TestScriptOutputEmitted(script_type="Unit Tests", frid="2", module="module", lines=["z"])
+    )
+
+    subscriber.release.set()
+    assert event_bus.wait_until_delivered(timeout=5)
+    assert [event.lines for event in subscriber.events] == [["w"], ["x", "y"], ["z"]]
+    assert event_bus.get_metrics()["_SlowSubscriber"].coalesced == 1
+    event_bus.close()
+
+
+def test_slow_subscriber_receives_every_render_state_transition():
+    implementing_frid = States.IMPLEMENTING_FRID.value
+    unit_tests = f"{implementing_frid}_{States.PROCESSING_UNIT_TESTS.value}"
+    states = [
+        f"{implementing_frid}_{States.READY_FOR_FRID_IMPLEMENTATION.value}",
+        f"{unit_tests}_{States.UNIT_TESTS_READY.value}",
+        f"{unit_tests}_{States.UNIT_TESTS_FAILED.value}",
+        f"{unit_tests}_{States.UNIT_TESTS_READY.value}",
+        f"{implementing_frid}_{States.STEP_COMPLETED.value}",
+        States.RENDER_COMPLETED.value,
+    ]
+    event_bus = AsyncEventBus()
+    subscriber = _SlowSubscriber()
+    event_bus.subscribe(RenderStateUpdated, subscriber.on_event)
+
+    previous_state = None
+    for number, state in enumerate(states):
+        event_bus.publish(RenderStateUpdated(state=state, previous_state=previous_state, changes={"number": number}))
+        previous_state = state
+
+    subscriber.release.set()
+    assert event_bus.wait_until_delivered(timeout=5)
+    assert [(event.previous_state, event.state) for event in subscriber.events] == list(zip([None] + states, states))
+    assert [event.changes for event in subscriber.events] == [{"number": number} for number in range(len(states))]
+    assert event_bus.get_metrics()["_SlowSubscriber"].coalesced == 0
+    event_bus.close()
+
+
+def test_full_queue_drops_droppable_events_and_holds_up_other_events():
+    event_bus = AsyncEventBus(max_queued_events=2)
+    subscriber = _SlowSubscriber()
+    event_bus.subscribe(LogMessageEmitted, subscriber.on_event)
+    event_bus.subscribe(RenderCompleted, subscriber.on_other_event)
+
+    event_bus.publish(_log_message("0"))
+    time.sleep(0.1)  # the first message is being processed
+    for i in range(1, 5):
+        event_bus.publish(_log_message(str(i)))
+    metrics = event_bus.get_metrics()["_SlowSubscriber"]
+    assert (metrics.queued, metrics.dropped) == (2, 2)
+
+    threading.Timer(0.2, subscriber.release.set).start()
+    start = time.monotonic()
+    event_bus.publish(RenderCompleted(rendered_code_path="build"))
+    assert time.monotonic() - start >= 0.1
+
+    assert event_bus.wait_until_delivered(timeout=5)
+    assert [getattr(event, "message", None) for event in subscriber.events] == ["0", "1", "2", None]
+    metrics = event_bus.get_metrics()["_SlowSubscriber"]
+    assert (metrics.blocked, metrics.max_queued) == (1, 2)
+    event_bus.close()
@@ -0,0 +1,127 @@
+"""Tests for running test scripts with render_utils.execute_script."""
+
+import stat
+import sys
+import threading
+import time
+
+import pytest
+
+import plain2code_events
+from event_bus import EventBus
+from plain2code_exceptions import RenderCancelledError
+from render_machine import render_utils
+from run_control import RunControl
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses POSIX shell scripts")
+
+
+def _make_script(tmp_path, body: str) -> str:
+    script = tmp_path / "script.sh"
+    script.write_text(f"#!/bin/sh\n{body}\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+def test_execute_script_returns_as_soon_as_the_script_exits(tmp_path):
+    script = _make_script(tmp_path, 'echo "hello $1"\nexit 3')
+
+    start = time.monotonic()
+    exit_code, output, output_path = render_utils.execute_script(script, ["world"], "Unit Tests")
+
+    assert time.monotonic() - start < 1
+    assert exit_code == 3
+    assert output.strip() == "hello world"
+    with open(output_path, encoding="utf-8") as f:
+        assert "hello world" in f.read()
+
+
+def test_execute_script_does_not_wait_for_background_children_beyond_grace_period(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_utils, "STDOUT_READ_TIMEOUT_SECONDS", 0.5)
+    script = _make_script(tmp_path, "sleep 30 &\necho done")
+
+    start = time.monotonic()
+    exit_code, output, _ = render_utils.execute_script(script, [], "Unit Tests")
+
+    assert time.monotonic() - start < 5
+    assert exit_code == 0
+    assert "done" in output
+
+
+def test_execute_script_times_out(tmp_path):
+    script = _make_script(tmp_path, "echo started\nsleep 30")
+
+    start = time.monotonic()
+    exit_code, output, _ = render_utils.execute_script(script, [], "Unit Tests", timeout=1)
+
+    assert time.monotonic() - start < 5
+    assert exit_code == render_utils.TIMEOUT_ERROR_EXIT_CODE
+    assert "did not finish in 1 seconds" in output
+    assert "started" in output
+
+
+def test_execute_script_is_cancelled_by_run_control(tmp_path):
+    script = _make_script(tmp_path, "sleep 30")
+    run_control = RunControl()
+    threading.Timer(0.3, run_control.cancel).start()
+
+    start = time.monotonic()
+    with pytest.raises(RenderCancelledError):
+        render_utils.execute_script(script, [], "Unit Tests", run_control=run_control)
+    assert time.monotonic() - start < 2
+
+    # A cancelled render cancels the next script right away
+    with pytest.raises(RenderCancelledError):
+        render_utils.execute_script(script, [], "Unit Tests", run_control=run_control)
+
+
+def test_execute_script_keeps_head_and_tail_of_long_output(tmp_path, monkeypatch):
+    monkeypatch.setattr(render_utils, "SCRIPT_OUTPUT_HEAD_SIZE", 20)
+    monkeypatch.setattr(render_utils, "SCRIPT_OUTPUT_TAIL_SIZE", 20)
+    script = _make_script(tmp_path, 'echo first line\nfor i in $(seq 1 1000); do echo "line $i"; done\necho last line')
+
+    exit_code, output, output_path = render_utils.execute_script(script, [], "Unit Tests")
+
+    assert exit_code == 0
+    assert output.startswith("first line\nline 1\n")
+    assert output.endswith("line 1000\nlast line\n")
+    assert "characters of output omitted" in output
+    assert output_path in output
+    assert "line 500\n" not in output
+    with open(output_path, encoding="utf-8") as f:
+        full_output = f.read()
+    assert "line 500\n" in full_output
+    assert "Unit Tests script execution time" in full_output
+
+
+def test_execute_script_publishes_output_lines(tmp_path):
+    script = _make_script(tmp_path, 'echo "one"\nprintf "two\\nthree"')
+    event_bus = EventBus()
+    published_lines = []
+    event_bus.subscribe(plain2code_events.TestScriptOutputEmitted, lambda event: published_lines.extend(event.lines))
+
+    render_utils.execute_script(script, [], "Conformance Tests", frid="1", module="module", event_bus=event_bus)
+
+    assert published_lines == ["one", "two", "three"]
+
+
+def test_script_output_capture_without_overflow():
+    capture = render_utils.ScriptOutputCapture(head_size=5, tail_size=5)
+    capture.append("abc")
+    capture.append("defgh")
+
+    assert capture.get_output() == "abcdefgh"
+    assert capture.omitted_length == 0
+
+    capture.append("ijkl")
+    assert capture.get_output() == "abcde\n... 2 characters of output omitted ...\nhijkl"
+
+
+def test_execute_script_passes_environment_variables(tmp_path):
+    script = _make_script(tmp_path, 'echo "prepared in $CODEPLAIN_PREPARED_ENVIRONMENT_DIR, path is set: ${PATH:+yes}"')
+
+    _, output, _ = render_utils.execute_script(
+        script, [], "Conformance Tests", env={"CODEPLAIN_PREPARED_ENVIRONMENT_DIR": "/tmp/env"}
+    )
+
+    assert output.strip() == "prepared in /tmp/env, path is set: yes"
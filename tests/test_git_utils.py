@@ -6,16 +6,27 @@ from textwrap import dedent
 import pytest
 from git import Repo
 
+import git_utils
 from git_utils import (
     BASE_FOLDER_COMMIT_MESSAGE,
     FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE,
+    GIT_BACKEND_GITPYTHON,
+    GIT_BACKEND_PERSISTENT,
     REFACTORED_CODE_COMMIT_MESSAGE,
+    _has_external_changes,
+    _open_repo,
     add_all_files_and_commit,
     diff,
+    forget_worktrees,
     get_last_rendered_functionality,
+    get_working_tree_sha,
+    has_commit_for_frid,
     init_git_repo,
+    is_dirty,
+    read_files_at_frid,
     revert_changes,
     revert_to_commit_with_frid,
+    set_git_backend,
 )
 from plain2code_exceptions import InvalidGitRepositoryError
 
@@ -508,3 +519,191 @@ def test_get_last_finished_frid_without_module_name(empty_repo):
 
     with pytest.raises(InvalidGitRepositoryError, match="Could not find module name in finished commit"):
         get_last_rendered_functionality(empty_repo)
+
+
+def test_has_commit_for_frid_filters_by_module_and_exact_frid(empty_repo):
+    """The commit index matches the frid exactly and filters by module name when provided."""
+    file_path = Path(empty_repo) / "a.txt"
+    file_path.write_text("v1")
+    add_all_files_and_commit(
+        empty_repo,
+        FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format("11"),
+        module_name="module_a",
+        frid="11",
+    )
+
+    assert has_commit_for_frid(empty_repo, "11")
+    assert has_commit_for_frid(empty_repo, "11", "module_a")
+    assert not has_commit_for_frid(empty_repo, "11", "module_b")
+    assert not has_commit_for_frid(empty_repo, "1")
+
+
+def test_commit_index_follows_commits_and_resets(empty_repo):
+    """The commit index is updated on commit and stays correct after resets and external commits."""
+    file_path = Path(empty_repo) / "a.txt"
+    for frid in ["1", "2", "3"]:
+        file_path.write_text(f"v{frid}")
+        add_all_files_and_commit(
+            empty_repo,
+            FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format(frid),
+            module_name="module_a",
+            frid=frid,
+        )
+        assert get_last_rendered_functionality(empty_repo) == ("module_a", frid)
+
+    revert_to_commit_with_frid(empty_repo, "1")
+    assert get_last_rendered_functionality(empty_repo) == ("module_a", "1")
+    assert not has_commit_for_frid(empty_repo, "2")
+
+    # A commit made outside of git_utils invalidates the cached index
+    repo = Repo(empty_repo)
+    file_path.write_text("external")
+    repo.index.add(["a.txt"])
+    repo.index.commit(FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format("2") + "\n\nModule name: module_b\n")
+    assert get_last_rendered_functionality(empty_repo) == ("module_b", "2")
+
+
+@pytest.fixture
+def persistent_backend():
+    set_git_backend(GIT_BACKEND_PERSISTENT)
+    yield
+    set_git_backend(GIT_BACKEND_GITPYTHON)
+
+
+def test_read_files_at_frid(temp_repo):
+    """Files of an earlier functionality are read from git without touching the working tree."""
+    file_path = Path(temp_repo) / "test.txt"
+    file_path.write_text("frid 1.2 content\n")
+    (Path(temp_repo) / "compiled.pyc").write_bytes(b"\x00\xff")
+    (Path(temp_repo) / "nested" / ".memory").mkdir(parents=True)
+    (Path(temp_repo) / "nested" / ".memory" / "memory.md").write_text("memory")
+    (Path(temp_repo) / "nested" / "source.txt").write_text("source")
+    add_all_files_and_commit(temp_repo, FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format("1.2"), None, "1.2")
+
+    assert read_files_at_frid(temp_repo, "1.1") == {"test.txt": "initial content\nline2\nline3\n"}
+    assert read_files_at_frid(temp_repo, "1.2") == {
+        "test.txt": "frid 1.2 content\n",
+        os.path.join("nested", "source.txt"): "source",
+    }
+    assert file_path.read_text() == "frid 1.2 content\n"
+
+
+def test_persistent_backend_reuses_repo_handle(persistent_backend, empty_repo):
+    """The persistent backend keeps one handle per repository until the repository is re-initialized."""
+    repo = _open_repo(empty_repo)
+    assert _open_repo(empty_repo) is repo
+
+    file_path = Path(empty_repo) / "a.txt"
+    file_path.write_text("v1")
+    add_all_files_and_commit(
+        empty_repo, FUNCTIONAL_REQUIREMENT_FINISHED_COMMIT_MESSAGE.format("1"), module_name="module_a", frid="1"
+    )
+    assert read_files_at_frid(empty_repo, "1") == {"a.txt": "v1"}
+    assert get_last_rendered_functionality(empty_repo) == ("module_a", "1")
+
+    init_git_repo(empty_repo, "module_b")
+    assert _open_repo(empty_repo) is not repo
+    assert get_last_rendered_functionality(empty_repo) == ("module_b", None)
+
+
+def test_add_changed_files_and_commit_stages_only_changed_paths(empty_repo, monkeypatch):
+    """Only the reported paths are staged while the working tree has no external changes."""
+    (Path(empty_repo) / "tracked.txt").write_text("v1")
+    (Path(empty_repo) / "deleted.txt").write_text("to be deleted")
+    add_all_files_and_commit(empty_repo, "First commit")
+
+    (Path(empty_repo) / "tracked.txt").write_text("v2")
+    (Path(empty_repo) / "deleted.txt").unlink()
+    (Path(empty_repo) / "new" / "added.txt").parent.mkdir()
+    (Path(empty_repo) / "new" / "added.txt").write_text("added")
+
+    changed_paths = ["tracked.txt", "deleted.txt", os.path.join("new", "added.txt")]
+    # Unknown working tree: git status tells whether only the reported paths changed
+    forget_worktrees()
+    assert not _has_external_changes(_open_repo(empty_repo), changed_paths)
+    assert _has_external_changes(_open_repo(empty_repo), ["tracked.txt", "deleted.txt"])
+
+    status_calls = []
+    monkeypatch.setattr(git_utils, "_get_status_paths", lambda repo: status_calls.append(repo) or set())
+    repo = add_all_files_and_commit(empty_repo, "Second commit", changed_paths=changed_paths)
+
+    tree = repo.head.commit.tree
+    assert tree["tracked.txt"].data_stream.read() == b"v2"
+    assert "deleted.txt" not in tree
+    assert tree["new/added.txt"].data_stream.read() == b"added"
+
+    (Path(empty_repo) / "tracked.txt").write_text("v3")
+    repo = add_all_files_and_commit(empty_repo, "Third commit", changed_paths=["tracked.txt"])
+    assert repo.head.commit.tree["tracked.txt"].data_stream.read() == b"v3"
+    # The first commit after forget_worktrees checks the status, the working tree is known from then on
+    assert len(status_calls) == 1
+
+
+def test_add_changed_files_and_commit_falls_back_after_external_edit(empty_repo):
+    """Files edited outside of the render before it started, without a commit, are staged too."""
+    (Path(empty_repo) / "edited.txt").write_text("v1")
+    add_all_files_and_commit(empty_repo, "First commit")
+
+    (Path(empty_repo) / "edited.txt").write_text("edited outside")
+    (Path(empty_repo) / "reported.txt").write_text("reported")
+    (Path(empty_repo) / "unreported.txt").write_text("not reported")
+    assert is_dirty(empty_repo)
+
+    forget_worktrees()
+    repo = add_all_files_and_commit(empty_repo, "Commit", changed_paths=["reported.txt"])
+
+    tree = repo.head.commit.tree
+    assert tree["edited.txt"].data_stream.read() == b"edited outside"
+    assert "reported.txt" in tree
+    assert "unreported.txt" in tree
+    assert not repo.is_dirty(untracked_files=True)
+
+
+def test_add_changed_files_and_commit_falls_back_after_external_commit(empty_repo):
+    """A commit made outside of git_utils makes the next commit stage the whole working tree."""
+    repo = Repo(empty_repo)
+    (Path(empty_repo) / "external.txt").write_text("external")
+    repo.index.add(["external.txt"])
+    repo.index.commit("External commit")
+
+    (Path(empty_repo) / "reported.txt").write_text("reported")
+    (Path(empty_repo) / "unreported.txt").write_text("not reported")
+    repo = add_all_files_and_commit(empty_repo, "Commit", changed_paths=["reported.txt"])
+
+    tree = repo.head.commit.tree
+    assert "reported.txt" in tree
+    assert "unreported.txt" in tree
+
+
+def test_add_changed_files_and_commit_falls_back_after_external_staging(empty_repo):
+    """Files staged outside of git_utils change the index, so the next commit checks the whole working tree."""
+    add_all_files_and_commit(empty_repo, "First commit")
+    (Path(empty_repo) / "staged.txt").write_text("staged outside")
+    Repo(empty_repo).git.add("staged.txt")
+
+    (Path(empty_repo) / "reported.txt").write_text("reported")
+    repo = add_all_files_and_commit(empty_repo, "Commit", changed_paths=["reported.txt"])
+
+    tree = repo.head.commit.tree
+    assert "reported.txt" in tree
+    assert "staged.txt" in tree
+
+
+def test_get_working_tree_sha_covers_uncommitted_changes(empty_repo):
+    """The working tree SHA follows uncommitted and untracked files without touching the index."""
+    (Path(empty_repo) / "a.txt").write_text("v1")
+    repo = add_all_files_and_commit(empty_repo, "First commit")
+    assert get_working_tree_sha(empty_repo) == repo.head.commit.tree.hexsha
+
+    (Path(empty_repo) / "a.txt").write_text("v2")
+    modified_sha = get_working_tree_sha(empty_repo)
+    assert modified_sha != repo.head.commit.tree.hexsha
+
+    (Path(empty_repo) / "untracked.txt").write_text("untracked")
+    assert get_working_tree_sha(empty_repo) != modified_sha
+    assert repo.untracked_files == ["untracked.txt"]
+    assert not repo.index.diff("HEAD")
+
+    (Path(empty_repo) / "untracked.txt").unlink()
+    (Path(empty_repo) / "a.txt").write_text("v1")
+    assert get_working_tree_sha(empty_repo) == repo.head.commit.tree.hexsha
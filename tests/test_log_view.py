@@ -0,0 +1,105 @@
+"""Tests for the TUI log view keeping a bounded history and drawing only the visible rows."""
+
+import asyncio
+
+from textual.app import App
+
+from tui.components import StructuredLogView
+
+
+class _LogViewApp(App):
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+
+    def compose(self):
+        yield StructuredLogView(max_entries=self.max_entries)
+
+
+def test_log_view_keeps_only_the_latest_entries():
+    async def scenario():
+        app = _LogViewApp(max_entries=3)
+        async with app.run_test() as pilot:
+            log_view = app.query_one(StructuredLogView)
+            log_view.add_log("codeplain", "INFO", "Rendering started\nwith two lines", "2026-01-01 10:00:00")
+            for number in range(4):
+                log_view.add_log("codeplain", "INFO", f"Message {number}", "2026-01-01 10:00:01")
+            await pilot.pause()
+
+            assert [entry.message for entry in log_view.entries] == ["Message 1", "Message 2", "Message 3"]
+            assert [row.plain for row in log_view._rows] == [
+                "▶ [10:00:01] Message 1",
+                "▶ [10:00:01] Message 2",
+                "▶ [10:00:01] Message 3",
+            ]
+            assert log_view.virtual_size.height == 3
+
+    asyncio.run(scenario())
+
+
+def test_log_view_filters_the_kept_entries():
+    async def scenario():
+        app = _LogViewApp(max_entries=10)
+        async with app.run_test() as pilot:
+            log_view = app.query_one(StructuredLogView)
+            log_view.add_log("codeplain", "DEBUG", "Debug message")
+            log_view.add_log("codeplain", "WARNING", "Warning message")
+            await pilot.pause()
+            assert [row.plain for row in log_view._rows] == ["▶ Warning message"]
+
+            log_view.filter_logs("DEBUG")
+            assert [row.plain for row in log_view._rows] == ["▶ Debug message", "▶ Warning message"]
+
+            log_view.filter_logs("ERROR")
+            assert list(log_view._rows) == []
+
+    asyncio.run(scenario())
+
+
+def test_log_view_follows_the_latest_logs_and_toggles_details():
+    async def scenario():
+        app = _LogViewApp(max_entries=1000)
+        async with app.run_test(size=(80, 20)) as pilot:
+            log_view = app.query_one(StructuredLogView)
+            for number in range(500):
+                log_view.add_log("codeplain", "INFO", f"Message {number}")
+            await pilot.pause()
+
+            assert log_view.is_vertical_scroll_end
+            visible_lines = [log_view.render_line(y).text.strip() for y in range(log_view.size.height)]
+            assert visible_lines[-1] == "▶ Message 499"
+
+            await pilot.click(StructuredLogView, offset=(2, log_view.size.height - 1))
+            assert [row.plain.strip() for row in log_view._rows][-3:] == [
+                "▼ Message 499",
+                "level: INFO",
+                "location: codeplain",
+            ]
+
+    asyncio.run(scenario())
+
+
+def test_log_view_wraps_the_rows_to_its_width():
+    async def scenario():
+        app = _LogViewApp(max_entries=10)
+        async with app.run_test(size=(40, 20)) as pilot:
+            log_view = app.query_one(StructuredLogView)
+            log_view.add_log("codeplain", "INFO", " ".join(f"word{number}" for number in range(12)), "2026-01-01 10:00")
+            await pilot.pause()
+
+            width = log_view.scrollable_content_region.width
+            assert len(log_view._rows) > 1
+            assert all(row.text.cell_len <= width for row in log_view._rows)
+            # The rows after the first are aligned with the message
+            assert all(row.plain.startswith(" " * len("▶ [10:00] ")) for row in list(log_view._rows)[1:])
+            assert " ".join(row.plain.strip() for row in log_view._rows) == "▶ [10:00] " + " ".join(
+                f"word{number}" for number in range(12)
+            )
+
+            await pilot.resize_terminal(120, 20)
+            await pilot.pause()
+            assert [row.plain for row in log_view._rows] == [
+                "▶ [10:00] " + " ".join(f"word{number}" for number in range(12))
+            ]
+
+    asyncio.run(scenario())
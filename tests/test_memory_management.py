@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+import memory_management
+from memory_management import CONFORMANCE_TEST_MEMORY_SUBFOLDER, MemoryManager
+
+
+def _write_memory(memory_folder, file_name, content):
+    file_path = os.path.join(memory_folder, CONFORMANCE_TEST_MEMORY_SUBFOLDER, file_name)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(content if isinstance(content, str) else json.dumps(content))
+
+
+@pytest.fixture
+def memory_folder(tmp_path):
+    memory_folder = str(tmp_path / ".memory")
+    _write_memory(
+        memory_folder,
+        "login.json",
+        {"frid": "1", "module": "auth", "resolution_status": "RESOLVED", "issue": "Login form timeout"},
+    )
+    _write_memory(
+        memory_folder,
+        "login_errors.json",
+        {"frid": "1.2", "module": "auth", "resolution_status": "RESOLVED", "issue": "Login error message"},
+    )
+    _write_memory(
+        memory_folder,
+        "checkout.json",
+        {"frid": "3", "module": "shop", "resolution_status": "RESOLVED", "issue": "Checkout total rounding"},
+    )
+    _write_memory(
+        memory_folder,
+        "other_auth.json",
+        {"frid": "7", "module": "auth", "resolution_status": "RESOLVED", "issue": "Password reset email"},
+    )
+    return memory_folder
+
+
+def test_relevant_memories_are_ranked_by_frid_and_module(memory_folder):
+    memory_manager = MemoryManager(None, memory_folder)
+
+    memory_files_content = memory_manager.fetch_relevant_memory_files("1", "auth")
+
+    assert list(memory_files_content) == ["login.json", "login_errors.json", "other_auth.json"]
+    assert json.loads(memory_files_content["login.json"])["issue"] == "Login form timeout"
+
+
+def test_memories_of_other_modules_are_only_relevant_through_keywords(memory_folder):
+    memory_manager = MemoryManager(None, memory_folder)
+
+    assert "checkout.json" not in memory_manager.fetch_relevant_memory_files("3", "auth")
+    assert "checkout.json" in memory_manager.fetch_relevant_memory_files("3", "auth", "The checkout total is wrong")
+
+
+def test_relevant_memories_are_capped(memory_folder, monkeypatch):
+    monkeypatch.setattr(memory_management, "MAX_RELEVANT_MEMORY_FILES", 2)
+
+    memory_files_content = MemoryManager(None, memory_folder).fetch_relevant_memory_files("1", "auth")
+
+    assert list(memory_files_content) == ["login.json", "login_errors.json"]
+
+
+def test_memory_files_are_only_parsed_again_when_they_change(memory_folder, monkeypatch):
+    MemoryManager(None, memory_folder).fetch_relevant_memory_files("1", "auth")
+    assert os.path.exists(os.path.join(memory_folder, memory_management.CONFORMANCE_TEST_MEMORY_INDEX_FILE_NAME))
+
+    memory_manager = MemoryManager(None, memory_folder)
+    indexed_files = []
+    index_file = memory_management.ConformanceTestMemoryIndex._index_file
+
+    def _index_file(self, file_name, stat):
+        indexed_files.append(file_name)
+        return index_file(self, file_name, stat)
+
+    monkeypatch.setattr(memory_management.ConformanceTestMemoryIndex, "_index_file", _index_file)
+    _write_memory(
+        memory_folder,
+        "login.json",
+        {"frid": "1", "module": "auth", "resolution_status": "RESOLVED", "issue": "Login form timeout again"},
+    )
+    memory_manager.fetch_relevant_memory_files("1", "auth")
+
+    assert indexed_files == ["login.json"]
+
+
+def test_origin_is_used_for_memories_that_do_not_name_their_functionality(memory_folder):
+    memory_manager = MemoryManager(None, memory_folder)
+    _write_memory(memory_folder, "new.json", {"resolution_status": "IN_PROGRESS", "issue": "Flaky retry"})
+    memory_manager.memory_index.set_origin(["new.json"], "9", "billing")
+
+    assert list(MemoryManager(None, memory_folder).fetch_relevant_memory_files("9", "billing")) == ["new.json"]
+
+
+def test_delete_unresolved_memory_files(memory_folder):
+    _write_memory(memory_folder, "unresolved.json", {"frid": "1", "module": "auth", "resolution_status": "OPEN"})
+    _write_memory(memory_folder, "invalid.json", "not json")
+    memory_manager = MemoryManager(None, memory_folder)
+
+    memory_manager.delete_unresolved_memory_files()
+
+    assert sorted(os.listdir(os.path.join(memory_folder, CONFORMANCE_TEST_MEMORY_SUBFOLDER))) == [
+        "checkout.json",
+        "login.json",
+        "login_errors.json",
+        "other_auth.json",
+    ]
+    assert "unresolved.json" not in memory_manager.fetch_relevant_memory_files("1", "auth")
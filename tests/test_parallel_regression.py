@@ -0,0 +1,75 @@
+"""Tests for running regression conformance tests in parallel against build folder snapshots."""
+
+import stat
+import sys
+
+import pytest
+
+from render_machine.parallel_regression import RegressionTest, run_regression_tests
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell script")
+
+# Fails when the conformance tests folder name contains "fail"; records the build folder it was given.
+CONFORMANCE_TESTS_SCRIPT = """#!/bin/sh
+echo "$1" >> "$(dirname "$0")/build_folders.txt"
+test -f "$1/main.py" || exit 2
+case "$2" in
+  *fail*) echo "tests in $2 failed"; exit 1 ;;
+esac
+echo "tests in $2 passed"
+"""
+
+
+@pytest.fixture
+def setup(tmp_path):
+    script = tmp_path / "run_conformance_tests.sh"
+    script.write_text(CONFORMANCE_TESTS_SCRIPT)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    build_folder = tmp_path / "build"
+    build_folder.mkdir()
+    (build_folder / "main.py").write_text("print('hello')\n")
+    (build_folder / ".git").mkdir()
+
+    return str(script), str(build_folder), tmp_path / "build_folders.txt"
+
+
+def test_run_regression_tests_returns_results_in_spec_order(setup):
+    script, build_folder, build_folders_log = setup
+    regression_tests = [
+        RegressionTest("module_a", "1", "tests/a_1"),
+        RegressionTest("module_b", "1", "tests/b_1"),
+        RegressionTest("module_b", "2", "tests/b_2"),
+    ]
+
+    results = run_regression_tests(script, build_folder, regression_tests, workers=2)
+
+    assert list(results.keys()) == [("module_a", "1"), ("module_b", "1"), ("module_b", "2")]
+    assert all(exit_code == 0 for exit_code, _, _ in results.values())
+    assert "tests in tests/b_2 passed" in results[("module_b", "2")][1]
+
+    # Workers run against their own snapshots, never against the build folder itself
+    used_build_folders = set(build_folders_log.read_text().split())
+    assert build_folder not in used_build_folders
+    assert 1 <= len(used_build_folders) <= 2
+
+
+def test_run_regression_tests_stops_at_first_failure(setup):
+    script, build_folder, _ = setup
+    regression_tests = [RegressionTest("module", str(frid), f"tests/{frid}") for frid in range(1, 4)]
+    regression_tests.insert(1, RegressionTest("module", "fail", "tests/fail"))
+    regression_tests.append(RegressionTest("module", "fail_later", "tests/fail_later"))
+
+    results = run_regression_tests(script, build_folder, regression_tests, workers=3)
+
+    assert list(results.keys()) == [("module", "1"), ("module", "fail")]
+    assert results[("module", "1")][0] == 0
+    exit_code, issue, log_file_path = results[("module", "fail")]
+    assert exit_code == 1
+    assert "tests in tests/fail failed" in issue
+    assert log_file_path is not None
+
+
+def test_run_regression_tests_without_tests(setup):
+    script, build_folder, _ = setup
+    assert run_regression_tests(script, build_folder, [], workers=4) == {}
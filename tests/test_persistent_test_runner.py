@@ -0,0 +1,97 @@
+"""Tests for running test scripts on persistent test runners."""
+
+import os
+import stat
+import sys
+
+import pytest
+
+from render_machine import persistent_test_runner, render_utils
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="runs the runner scripts through their shebang")
+
+PYTHON_RUNNER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_scripts", "persistent_test_runner_python.py"
+)
+
+TEST_CALC = """import unittest
+
+import calc
+
+
+class TestCalc(unittest.TestCase):
+    def test_add(self):
+        self.assertEqual(calc.add(1, 2), 3)
+"""
+
+
+@pytest.fixture
+def runner_pool(monkeypatch):
+    pool = persistent_test_runner.PersistentTestRunnerPool()
+    monkeypatch.setattr(persistent_test_runner, "runner_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def build_folder(tmp_path):
+    build_folder = tmp_path / "build"
+    build_folder.mkdir()
+    (build_folder / "calc.py").write_text("def add(a, b):\n    return a + b\n")
+    (build_folder / "test_calc.py").write_text(TEST_CALC)
+    return build_folder
+
+
+def test_runner_script_declares_itself_persistent(tmp_path):
+    script = tmp_path / "run_unittests.sh"
+    script.write_text("#!/bin/sh\necho hello\n")
+
+    assert persistent_test_runner.is_persistent_runner_script(PYTHON_RUNNER_SCRIPT)
+    assert not persistent_test_runner.is_persistent_runner_script(str(script))
+
+
+def test_unittests_run_on_the_same_runner(runner_pool, build_folder):
+    exit_code, output, _ = render_utils.execute_script(PYTHON_RUNNER_SCRIPT, [str(build_folder)], "Unit Tests")
+    assert exit_code == 0, output
+    assert "Ran 1 test" in output
+
+    runner = runner_pool.acquire(PYTHON_RUNNER_SCRIPT)
+    runner_pool.release(runner)
+
+    # The runner imports the current code of the build folder on every test run
+    (build_folder / "calc.py").write_text("def add(a, b):\n    return a - b\n")
+    exit_code, output, _ = render_utils.execute_script(PYTHON_RUNNER_SCRIPT, [str(build_folder)], "Unit Tests")
+    assert exit_code == 1
+    assert "AssertionError: -1 != 3" in output
+
+    assert runner_pool.acquire(PYTHON_RUNNER_SCRIPT) is runner
+
+
+def test_conformance_tests_run_on_runner(runner_pool, build_folder, tmp_path):
+    conformance_tests_folder = tmp_path / "conformance_tests"
+    conformance_tests_folder.mkdir()
+    (conformance_tests_folder / "test_conformance.py").write_text(TEST_CALC)
+    empty_tests_folder = tmp_path / "empty_tests"
+    empty_tests_folder.mkdir()
+
+    exit_code, output, _ = render_utils.execute_script(
+        PYTHON_RUNNER_SCRIPT, [str(build_folder), str(conformance_tests_folder)], "Conformance Tests"
+    )
+    assert exit_code == 0, output
+
+    exit_code, output, _ = render_utils.execute_script(
+        PYTHON_RUNNER_SCRIPT, [str(build_folder), str(empty_tests_folder)], "Conformance Tests"
+    )
+    assert exit_code == 1
+    assert "No unittests discovered" in output
+
+
+def test_runner_that_does_not_start_falls_back_to_running_the_script(runner_pool, tmp_path):
+    script = tmp_path / "run_unittests.sh"
+    script.write_text(f'#!/bin/sh\n# {persistent_test_runner.PERSISTENT_RUNNER_MARKER}\necho "ran with $*"\n')
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+
+    exit_code, output, _ = render_utils.execute_script(str(script), ["build"], "Unit Tests")
+
+    assert exit_code == 0
+    assert output.strip() == "ran with build"
@@ -0,0 +1,139 @@
+"""Tests for rendering a batch of specs in one process and for the concurrency limits it sets."""
+
+import contextvars
+import logging
+import threading
+import time
+
+import pytest
+
+import plain2code_batch
+from concurrency_limit import ConcurrencyLimit
+from plain2code_console import console
+from plain2code_exceptions import InvalidBatchManifestError, RenderCancelledError
+from run_control import RunControl
+
+PLAIN_SOURCE = """***implementation reqs***
+
+- Simple implementation requirement
+
+***functional specs***
+
+- Simple functionality
+"""
+
+
+@pytest.fixture
+def manifest_folder(tmp_path, monkeypatch):
+    for name in ["first", "second", "third"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / f"{name}.plain").write_text(PLAIN_SOURCE)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_load_manifest_reads_command_lines(tmp_path):
+    manifest_path = tmp_path / "batch.yaml"
+    manifest_path.write_text(
+        "specs:\n" "  - first/first.plain\n" "  - second/second.plain --render-from 2\n" "  - [third/third.plain, -v]\n"
+    )
+
+    assert plain2code_batch.load_manifest(str(manifest_path)) == [
+        ["first/first.plain"],
+        ["second/second.plain", "--render-from", "2"],
+        ["third/third.plain", "-v"],
+    ]
+
+    manifest_path.write_text("specs:\n  - {filename: first/first.plain}\n")
+    with pytest.raises(InvalidBatchManifestError):
+        plain2code_batch.load_manifest(str(manifest_path))
+
+
+def test_prepare_specs_rejects_specs_logging_to_the_same_file(manifest_folder):
+    with pytest.raises(InvalidBatchManifestError):
+        plain2code_batch.prepare_specs(
+            [
+                ["first/first.plain", "--log-file-name", "batch.log"],
+                ["second/second.plain", "--log-file-name", "batch.log"],
+            ]
+        )
+
+
+def test_concurrency_limit_bounds_running_blocks():
+    limit = ConcurrencyLimit()
+    limit.set_limit(2)
+    running = 0
+    max_running = 0
+    lock = threading.Lock()
+
+    def _run_block():
+        nonlocal running, max_running
+        with limit.slot():
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=_run_block) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max_running == 2
+    assert limit.waited_seconds > 0
+
+    run_control = RunControl()
+    threading.Timer(0.1, run_control.cancel).start()
+    with limit.slot(), limit.slot():
+        with pytest.raises(RenderCancelledError):
+            with limit.slot(run_control):
+                pass
+
+
+def test_batch_renders_specs_concurrently_with_their_own_logs(manifest_folder, monkeypatch):
+    rendering = 0
+    max_rendering = 0
+    lock = threading.Lock()
+
+    def _render(plain_module, args, run_state, event_bus, run_control=None):
+        nonlocal rendering, max_rendering
+        with lock:
+            rendering += 1
+            max_rendering = max(max_rendering, rendering)
+        logger = logging.getLogger(plain2code_batch.LOGGER_NAME)
+        logger.info(f"Rendering {plain_module.module_name}")
+        # Threads started by the render log to the render's log as well
+        worker = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(logger.info, f"Worker of {plain_module.module_name}"),
+        )
+        worker.start()
+        worker.join()
+        time.sleep(0.1)
+        with lock:
+            rendering -= 1
+        if plain_module.module_name == "third":
+            raise ValueError("Functionality too complex")
+        run_state.increment_rendered_functionalities()
+        run_state.set_render_succeeded(True)
+
+    monkeypatch.setattr(plain2code_batch, "render", _render)
+    monkeypatch.setattr(console, "quiet", True)
+    specs = plain2code_batch.prepare_specs(
+        [[f"{name}/{name}.plain", "--api-key", "key"] for name in ["first", "second", "third"]]
+        + [["missing/missing.plain", "--api-key", "key"]]
+    )
+
+    result = plain2code_batch.run_batch(specs, max_renders=2)
+
+    assert max_rendering == 2
+    assert [spec.status for spec in result.specs] == ["succeeded", "succeeded", "failed", "failed"]
+    assert result.specs[2].error_message == "Functionality too complex"
+    for name in ["first", "second", "third"]:
+        log = (manifest_folder / name / "codeplain.log").read_text()
+        assert f"Rendering {name}" in log
+        assert f"Worker of {name}" in log
+        assert all(f" {other}" not in log for other in ["first", "second", "third"] if other != name)
@@ -0,0 +1,164 @@
+"""Tests for the long-lived plain2code server, its thin client and the parsed plain files cache it enables."""
+
+import os
+import threading
+
+import pytest
+
+import plain2code_client
+import plain2code_server
+import plain_file
+
+PLAIN_SOURCE = """***implementation reqs***
+
+- Simple implementation requirement
+
+***functional specs***
+
+- {% include "functionality.md" %}
+"""
+
+
+@pytest.fixture
+def spec_folder(tmp_path):
+    spec_folder = tmp_path / "spec"
+    spec_folder.mkdir()
+    (spec_folder / "main.plain").write_text(PLAIN_SOURCE)
+    (spec_folder / "functionality.md").write_text("Simple functionality")
+    return spec_folder
+
+
+def _touch(path, content):
+    path.write_text(content)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_plain_file_is_parsed_again_only_when_its_files_change(tmp_path, spec_folder, monkeypatch):
+    template_folder = tmp_path / "templates"
+    template_folder.mkdir()
+    template_dirs = [str(spec_folder), str(template_folder)]
+
+    parses = []
+    parse_plain_source_file = plain_file._parse_plain_source_file
+    monkeypatch.setattr(
+        plain_file,
+        "_parse_plain_source_file",
+        lambda *args: parses.append(args) or parse_plain_source_file(*args),
+    )
+    parse_cache = plain_file.PlainFileParseCache()
+    parse_cache.enabled = True
+
+    _, plain_source, _ = parse_cache.parse("main.plain", template_dirs)
+    plain_source[plain_file.plain_spec.FUNCTIONAL_REQUIREMENTS].clear()
+    _, plain_source, _ = parse_cache.parse("main.plain", template_dirs)
+    assert plain_source[plain_file.plain_spec.FUNCTIONAL_REQUIREMENTS] == [{"markdown": "- Simple functionality"}]
+    assert len(parses) == 1
+
+    _touch(spec_folder / "functionality.md", "Edited functionality")
+    _, plain_source, _ = parse_cache.parse("main.plain", template_dirs)
+    assert plain_source[plain_file.plain_spec.FUNCTIONAL_REQUIREMENTS] == [{"markdown": "- Edited functionality"}]
+    assert len(parses) == 2
+
+    # A template in a folder with a lower precedence doesn't change anything, but it is looked up
+    _touch(template_folder / "functionality.md", "Shadowed functionality")
+    _, plain_source, _ = parse_cache.parse("main.plain", template_dirs)
+    assert plain_source[plain_file.plain_spec.FUNCTIONAL_REQUIREMENTS] == [{"markdown": "- Edited functionality"}]
+    assert len(parses) == 3
+    parse_cache.parse("main.plain", template_dirs)
+    assert len(parses) == 3
+
+
+def test_job_runs_in_the_working_directory_of_the_client(spec_folder):
+    messages = []
+
+    exit_code = plain2code_server.run_job(
+        {"argv": ["--dry-run", "main.plain"], "cwd": str(spec_folder), "env": dict(os.environ)}, messages.append
+    )
+
+    assert exit_code == 0
+    output = "".join(message["text"] for message in messages if message["type"] == plain2code_client.OUTPUT_MESSAGE)
+    assert "Rendering functionality 1:\n- Simple functionality" in output
+
+
+def test_invalid_arguments_end_the_job_with_an_error(spec_folder):
+    messages = []
+
+    exit_code = plain2code_server.run_job(
+        {"argv": ["--unknown-argument"], "cwd": str(spec_folder), "env": dict(os.environ)}, messages.append
+    )
+
+    assert exit_code == 2
+    assert "unrecognized arguments: --unknown-argument" in "".join(message["text"] for message in messages)
+
+
+def test_client_streams_the_messages_of_its_job(tmp_path):
+    socket_path = str(tmp_path / "plain2code.sock")
+    server = plain2code_server.create_server(socket_path)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.start()
+    try:
+        messages = list(plain2code_client.submit_job(["--version"], socket_path))
+        assert oct(os.stat(socket_path).st_mode & 0o777) == oct(0o600)
+    finally:
+        server.shutdown()
+        server.server_close()
+        server_thread.join()
+
+    assert messages[0]["type"] == plain2code_client.OUTPUT_MESSAGE
+    assert messages[0]["text"].startswith("codeplain version")
+    assert messages[-1] == {"type": plain2code_client.EXIT_MESSAGE, "code": 0}
+    assert not os.path.exists(socket_path)
+
+
+def test_tcp_server_runs_only_the_jobs_sent_with_its_token(tmp_path):
+    token_path = str(tmp_path / "plain2code_server.token")
+    server = plain2code_server.create_server(port=0, token_path=token_path)
+    port = server.server_address[1]
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.start()
+    try:
+        assert oct(os.stat(token_path).st_mode & 0o777) == oct(0o600)
+        messages = list(plain2code_client.submit_job(["--version"], port=port, token_path=token_path))
+
+        with plain2code_client.connect(None, port) as connection, connection.makefile("rwb") as connection_file:
+            plain2code_client.send_message(connection_file, {"argv": ["--version"], "cwd": os.getcwd(), "env": {}})
+            rejected_messages = list(plain2code_client.read_messages(connection_file))
+    finally:
+        server.shutdown()
+        server.server_close()
+        server_thread.join()
+
+    assert messages[-1] == {"type": plain2code_client.EXIT_MESSAGE, "code": 0}
+    assert rejected_messages == [
+        {"type": plain2code_client.OUTPUT_MESSAGE, "text": "Error: Invalid plain2code server token.\n"},
+        {"type": plain2code_client.EXIT_MESSAGE, "code": 1},
+    ]
+    assert not os.path.exists(token_path)
+
+
+def test_job_is_cancelled_when_its_client_disconnects(tmp_path, monkeypatch):
+    job_started = threading.Event()
+    job_cancelled = threading.Event()
+
+    def run(args, event_bus, run_control):
+        job_started.set()
+        if run_control.wait_for_cancel(timeout=10):
+            job_cancelled.set()
+
+    monkeypatch.setattr(plain2code_server.plain2code, "run", run)
+    socket_path = str(tmp_path / "plain2code.sock")
+    server = plain2code_server.create_server(socket_path)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.start()
+    try:
+        with plain2code_client.connect(socket_path) as connection, connection.makefile("rwb") as connection_file:
+            plain2code_client.send_message(
+                connection_file, {"argv": ["main.plain"], "cwd": str(tmp_path), "env": dict(os.environ)}
+            )
+            assert job_started.wait(timeout=10)
+        assert job_cancelled.wait(timeout=10)
+    finally:
+        server.shutdown()
+        server.server_close()
+        server_thread.join()
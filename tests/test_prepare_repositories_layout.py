@@ -246,6 +246,7 @@ def test_conformance_tests_json_stored_relative_read_absolute(tmp_build_folder):
     absolute_folder = os.path.join(tests_folder, "1_feature")
     json_in = {"1": {"folder_name": absolute_folder, "functional_requirement": "do a thing"}}
     conformance_tests.dump_conformance_tests_json("m", json_in)
+    conformance_tests.flush()
 
     # On disk: relative.
     with open(os.path.join(tests_folder, CONFORMANCE_TESTS_DEFINITION_FILE_NAME)) as f:
@@ -0,0 +1,118 @@
+"""Tests for the cache of prepared testing environments."""
+
+import os
+from types import SimpleNamespace
+
+import plain2code_arguments
+from render_machine import prepared_environment_cache
+from render_machine.prepared_environment_cache import (
+    PreparedEnvironmentCache,
+    get_dependency_manifests_hash,
+    get_prepared_environment_key,
+)
+from render_machine.render_context import RenderContext
+
+
+def test_dependency_manifests_hash_ignores_other_files(tmp_path):
+    (tmp_path / "package.json").write_text('{"dependencies": {"react": "18.0.0"}}')
+    (tmp_path / "backend").mkdir()
+    (tmp_path / "backend" / "requirements.txt").write_text("requests==2.31.0\n")
+    manifests_hash = get_dependency_manifests_hash(str(tmp_path))
+
+    (tmp_path / "app.js").write_text("console.log('hello');\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "package.json").write_text("{}")
+    assert get_dependency_manifests_hash(str(tmp_path)) == manifests_hash
+
+    (tmp_path / "backend" / "requirements.txt").write_text("requests==2.32.0\n")
+    assert get_dependency_manifests_hash(str(tmp_path)) != manifests_hash
+
+
+def test_prepared_environment_key_depends_on_script(tmp_path):
+    build_folder = tmp_path / "build"
+    build_folder.mkdir()
+    (build_folder / "go.mod").write_text("module example\n")
+    script = tmp_path / "prepare.sh"
+    script.write_text("#!/bin/sh\n")
+    key = get_prepared_environment_key(str(build_folder), str(script))
+
+    assert get_prepared_environment_key(str(build_folder), str(script)) == key
+    script.write_text("#!/bin/sh\necho preparing\n")
+    assert get_prepared_environment_key(str(build_folder), str(script)) != key
+    assert get_prepared_environment_key(str(build_folder), None) != key
+
+
+def test_environment_is_prepared_only_after_marking(tmp_path):
+    cache = PreparedEnvironmentCache(str(tmp_path / "environments"))
+    environment_dir = cache.get_environment_dir("a" * 64)
+
+    assert os.path.isdir(environment_dir)
+    assert not cache.is_prepared("a" * 64)
+    cache.mark_prepared("a" * 64)
+    assert cache.is_prepared("a" * 64)
+    assert not cache.is_prepared("b" * 64)
+
+
+def test_least_recently_used_environments_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(prepared_environment_cache, "MAX_PREPARED_ENVIRONMENTS", 2)
+    cache = PreparedEnvironmentCache(str(tmp_path))
+
+    for index, key in enumerate(["a" * 64, "b" * 64]):
+        cache.mark_prepared(key)
+        os.utime(cache.get_environment_dir(key), (index, index))
+    # Environments are evicted when a new one is created, prepared or not
+    environment_dir = cache.get_environment_dir("c" * 64)
+
+    assert not cache.is_prepared("a" * 64)
+    assert not os.path.exists(os.path.join(str(tmp_path), "a" * 16))
+    assert cache.is_prepared("b" * 64)
+    assert os.path.isdir(environment_dir)
+
+
+def test_disabled_cache(tmp_path):
+    cache = PreparedEnvironmentCache(None)
+
+    cache.mark_prepared("a" * 64)
+    assert not cache.enabled
+    assert not cache.is_prepared("a" * 64)
+
+
+def test_prepared_environments_are_only_reused_on_request():
+    """Reusing an environment skips the prepare script, which may build the code, so it is opt-in."""
+    parser = plain2code_arguments.create_parser()
+
+    assert not parser.parse_args(["module.plain"]).reuse_prepared_environment
+    assert parser.parse_args(["module.plain", "--reuse-prepared-environment"]).reuse_prepared_environment
+
+
+def _make_render_context(build_folder, cache_folder):
+    return SimpleNamespace(
+        build_folder=build_folder,
+        prepare_environment_script=None,
+        prepared_environment_cache=PreparedEnvironmentCache(cache_folder),
+        prepared_environment_key=None,
+        prepared_environment_dir=None,
+    )
+
+
+def test_test_scripts_get_the_environment_of_the_current_dependency_manifests(tmp_path):
+    """The unit tests run before any preparation, so they look up the environment of the manifests themselves."""
+    build_folder = tmp_path / "build"
+    build_folder.mkdir()
+    (build_folder / "package.json").write_text('{"dependencies": {"react": "18.0.0"}}')
+    render_context = _make_render_context(str(build_folder), str(tmp_path / "environments"))
+
+    RenderContext.update_prepared_environment(render_context)
+    environment_dir = render_context.prepared_environment_dir
+    assert os.path.isdir(environment_dir)
+    assert RenderContext.get_test_script_env(render_context) == {
+        prepared_environment_cache.PREPARED_ENVIRONMENT_DIR_ENV_VAR: environment_dir
+    }
+
+    (build_folder / "package.json").write_text('{"dependencies": {"react": "19.0.0"}}')
+    RenderContext.update_prepared_environment(render_context)
+    assert render_context.prepared_environment_dir != environment_dir
+
+    disabled_render_context = _make_render_context(str(build_folder), None)
+    RenderContext.update_prepared_environment(disabled_render_context)
+    assert RenderContext.get_test_script_env(disabled_render_context) is None
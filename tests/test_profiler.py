@@ -0,0 +1,77 @@
+"""Tests for the opt-in render profiler."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from plain2code_profiler import Profiler, profiled, profiler
+
+
+@pytest.fixture
+def started_profiler():
+    profiler.start()
+    yield profiler
+    profiler.stop()
+
+
+@profiled("script", name=lambda script_type, **_: script_type)
+def _run_script(script, script_type, timeout=None):
+    with profiler.span("inner", "test"):
+        return script
+
+
+def test_disabled_profiler_records_nothing():
+    disabled_profiler = Profiler()
+
+    assert disabled_profiler.span("a", "test") is disabled_profiler.span("b", "test")
+    with disabled_profiler.span("a", "test"):
+        pass
+    assert _run_script("script.sh", "Unit Tests") == "script.sh"
+    assert disabled_profiler.get_flame_summary() == []
+
+
+def test_flame_summary_is_per_frid_and_nested(started_profiler):
+    with started_profiler.span("RenderFunctionalRequirement", "action"):
+        with started_profiler.span("render_functional_requirement", "api"):
+            pass
+    started_profiler.current_frid = "1"
+    with started_profiler.span("RunUnitTests", "action"):
+        assert _run_script("script.sh", script_type="Unit Tests") == "script.sh"
+
+    flame_summary = started_profiler.get_flame_summary()
+
+    assert [frid_flame_summary.frid for frid_flame_summary in flame_summary] == [None, "1"]
+    assert [entry.path for entry in flame_summary[1].entries] == [
+        ("RunUnitTests",),
+        ("RunUnitTests", "Unit Tests"),
+        ("RunUnitTests", "Unit Tests", "inner"),
+    ]
+    run_unit_tests, unit_tests, inner = flame_summary[1].entries
+    assert run_unit_tests.total_seconds == pytest.approx(flame_summary[1].total_seconds)
+    assert run_unit_tests.total_seconds >= unit_tests.total_seconds >= inner.total_seconds
+    assert unit_tests.self_seconds == pytest.approx(unit_tests.total_seconds - inner.total_seconds)
+
+
+def test_trace_has_a_complete_event_per_span(started_profiler, tmp_path):
+    def _render_in_thread():
+        with started_profiler.span("regression", "script"):
+            time.sleep(0.05)
+
+    with started_profiler.span("RunConformanceTests", "action", module="module"):
+        thread = threading.Thread(target=_render_in_thread, name="regression-worker")
+        thread.start()
+        thread.join()
+
+    trace_path = tmp_path / "profile" / "trace.json"
+    started_profiler.write_trace(str(trace_path))
+
+    with open(trace_path) as f:
+        trace_events = json.load(f)["traceEvents"]
+    complete_events = {event["name"]: event for event in trace_events if event["ph"] == "X"}
+    assert complete_events.keys() == {"RunConformanceTests", "regression"}
+    assert complete_events["RunConformanceTests"]["args"] == {"frid": None, "module": "module"}
+    assert complete_events["regression"]["tid"] != complete_events["RunConformanceTests"]["tid"]
+    # The flame summary of a thread starts at the thread's own spans
+    assert ("regression",) in [entry.path for entry in started_profiler.get_flame_summary()[0].entries]
@@ -0,0 +1,205 @@
+"""Tests for saving and resuming the render machine checkpoints."""
+
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import git_utils
+import plain_spec
+from plain2code_exceptions import RenderCheckpointError
+from render_machine import render_checkpoint, render_types
+from render_machine.conformance_tests import CONFORMANCE_TESTS_DEFINITION_FILE_NAME, ConformanceTests
+from render_machine.render_types import (
+    AcceptanceTestPhase,
+    ConformanceTestsRunningContext,
+    FridContext,
+    ScriptExecutionHistory,
+    UnitTestsRunningContext,
+)
+
+STATE = "implementingFrid_processingConformanceTests_conformanceTestFailed"
+
+
+class _PlainModule:
+    def __init__(self, base_folder, module_name="module", required_modules=None):
+        self.module_name = module_name
+        self.module_build_folder = os.path.join(base_folder, module_name, "build")
+        self.module_conformance_tests_folder = os.path.join(base_folder, module_name, "tests")
+        self.all_required_modules = required_modules or []
+        self.codeplain_folder = os.path.join(base_folder, module_name, ".codeplain")
+        self.hashes = {"source_hash": "abc"}
+
+    def get_codeplain_folder(self):
+        return self.codeplain_folder
+
+    def get_hashes(self):
+        return dict(self.hashes)
+
+
+def _create_frid_context(frid):
+    return FridContext(
+        frid=frid,
+        specifications={plain_spec.FUNCTIONAL_REQUIREMENTS: ["Do a thing"]},
+        functional_requirement_text="Do a thing",
+        linked_resources={},
+    )
+
+
+def _make_render_context(plain_module):
+    return SimpleNamespace(
+        module_name=plain_module.module_name,
+        plain_module=plain_module,
+        state=None,
+        render_range=None,
+        starting_frid=None,
+        build_folder_changed_paths=set(),
+        functional_requirements_render_attempts_failed_unit_during_conformance_tests=0,
+        last_error_message=None,
+        prepared_environment_key=None,
+        prepared_environment_dir=None,
+        regression_test_results={},
+        script_execution_history=ScriptExecutionHistory(),
+        frid_context=None,
+        unit_tests_running_context=None,
+        conformance_tests_running_context=None,
+        run_state=SimpleNamespace(current_frid=None),
+        create_frid_context=_create_frid_context,
+        machine=SimpleNamespace(set_state=lambda state: None),
+        conformance_tests=ConformanceTests(
+            os.path.dirname(os.path.dirname(plain_module.module_build_folder)), CONFORMANCE_TESTS_DEFINITION_FILE_NAME
+        ),
+    )
+
+
+@pytest.fixture
+def plain_module(tmp_path):
+    plain_module = _PlainModule(str(tmp_path))
+    git_utils.init_git_repo(plain_module.module_build_folder)
+    return plain_module
+
+
+def test_resumed_render_context_matches_the_saved_one(plain_module):
+    render_context = _make_render_context(plain_module)
+    render_context.state = STATE
+    render_context.build_folder_changed_paths = {"b.py", "a.py"}
+    render_context.regression_test_results = {("module", "1"): (True, "output")}
+    render_context.script_execution_history.latest_unit_test_output_path = "unit_tests.log"
+    render_context.frid_context = _create_frid_context("2")
+    render_context.frid_context.functional_requirement_render_attempts = 3
+    render_context.frid_context.changed_files = {"a.py"}
+    render_context.unit_tests_running_context = UnitTestsRunningContext(fix_attempts=1, changed_files={"a.py"})
+    conformance_tests_running_context = ConformanceTestsRunningContext(
+        current_testing_module_name="module",
+        current_testing_frid="1",
+        fix_attempts=2,
+        conformance_tests_json={"1": {"folder_name": "1_feature"}},
+        conformance_tests_render_attempts=1,
+        current_testing_frid_specifications={plain_spec.ACCEPTANCE_TESTS: ["First"]},
+        should_prepare_testing_environment=False,
+        frid_being_implemented="2",
+    )
+    conformance_tests_running_context.execution_phase = render_types.TestExecutionPhase.RUNNING_REGRESSION
+    conformance_tests_running_context.acceptance_test_phase = AcceptanceTestPhase.IN_PROGRESS
+    conformance_tests_running_context.test_that_triggered_code_change = ("module", "1")
+    render_context.conformance_tests_running_context = conformance_tests_running_context
+    payload = {"conformance_tests_folder_name": "1_feature", "previous_output": "failed"}
+
+    render_checkpoint.save_checkpoint(render_context, payload, plain_module.get_hashes())
+
+    set_states = []
+    resumed_render_context = _make_render_context(plain_module)
+    resumed_render_context.machine = SimpleNamespace(set_state=set_states.append)
+    checkpoint = render_checkpoint.find_render_checkpoint(plain_module)
+
+    assert render_checkpoint.restore_checkpoint(resumed_render_context, checkpoint) == payload
+    assert set_states == [STATE]
+    assert resumed_render_context.build_folder_changed_paths == {"a.py", "b.py"}
+    assert resumed_render_context.regression_test_results == {("module", "1"): (True, "output")}
+    assert resumed_render_context.script_execution_history == render_context.script_execution_history
+    assert resumed_render_context.frid_context == render_context.frid_context
+    assert resumed_render_context.run_state.current_frid == "2"
+    assert resumed_render_context.unit_tests_running_context == render_context.unit_tests_running_context
+    assert vars(resumed_render_context.conformance_tests_running_context) == vars(conformance_tests_running_context)
+
+
+def test_checkpoint_is_not_resumed_after_changes(plain_module):
+    render_context = _make_render_context(plain_module)
+    render_context.state = STATE
+    render_checkpoint.save_checkpoint(render_context, None, plain_module.get_hashes())
+
+    git_utils.add_all_files_and_commit(plain_module.module_build_folder, "Manual change")
+    with pytest.raises(RenderCheckpointError, match="git repositories"):
+        render_checkpoint.find_render_checkpoint(plain_module)
+
+    # Changes left by an interrupted action aren't committed, HEAD stays the same
+    render_checkpoint.save_checkpoint(render_context, None, plain_module.get_hashes())
+    with open(os.path.join(plain_module.module_build_folder, "partial.py"), "w") as f:
+        f.write("def partial(")
+    with pytest.raises(RenderCheckpointError, match="git repositories"):
+        render_checkpoint.find_render_checkpoint(plain_module)
+    os.remove(os.path.join(plain_module.module_build_folder, "partial.py"))
+    assert render_checkpoint.find_render_checkpoint(plain_module).state == STATE
+
+    render_checkpoint.save_checkpoint(render_context, None, plain_module.get_hashes())
+    plain_module.hashes = {"source_hash": "changed"}
+    with pytest.raises(RenderCheckpointError, match="specification"):
+        render_checkpoint.find_render_checkpoint(plain_module)
+
+
+def test_checkpoint_of_required_module_is_found(tmp_path, plain_module):
+    module = _PlainModule(str(tmp_path), "main", required_modules=[plain_module])
+    with pytest.raises(RenderCheckpointError, match="no interrupted render"):
+        render_checkpoint.find_render_checkpoint(module)
+
+    render_context = _make_render_context(plain_module)
+    render_context.state = STATE
+    render_checkpoint.save_checkpoint(render_context, None, plain_module.get_hashes())
+    assert render_checkpoint.find_render_checkpoint(module).plain_module is plain_module
+
+    render_checkpoint.delete_checkpoint(plain_module)
+    assert not os.path.exists(render_checkpoint.get_checkpoint_path(plain_module))
+
+
+def test_payload_that_is_not_serializable_keeps_the_previous_checkpoint(plain_module):
+    render_context = _make_render_context(plain_module)
+    render_context.state = STATE
+    render_checkpoint.save_checkpoint(render_context, None, plain_module.get_hashes())
+
+    render_context.state = "renderInitialised"
+    render_checkpoint.save_checkpoint(render_context, object(), plain_module.get_hashes())
+
+    assert render_checkpoint.find_render_checkpoint(plain_module).state == STATE
+
+
+def test_stored_conformance_tests_definitions_are_not_saved_in_the_checkpoint(plain_module):
+    render_context = _make_render_context(plain_module)
+    render_context.state = STATE
+    conformance_tests_json = {"1": {"folder_name": os.path.join(plain_module.module_conformance_tests_folder, "1")}}
+    os.makedirs(plain_module.module_conformance_tests_folder)
+    render_context.conformance_tests.dump_conformance_tests_json("module", conformance_tests_json)
+    render_context.conformance_tests.flush()
+    render_context.conformance_tests_running_context = ConformanceTestsRunningContext(
+        current_testing_module_name="module",
+        current_testing_frid="1",
+        fix_attempts=0,
+        conformance_tests_json=render_context.conformance_tests.get_conformance_tests_json("module"),
+        conformance_tests_render_attempts=0,
+        current_testing_frid_specifications={},
+        should_prepare_testing_environment=False,
+    )
+    render_context.conformance_tests_running_context.set_conformance_tests_json("required", {"2": {}})
+
+    render_checkpoint.save_checkpoint(render_context, None, plain_module.get_hashes())
+
+    with open(render_checkpoint.get_checkpoint_path(plain_module), "r", encoding="utf-8") as f:
+        saved_context = json.load(f)["conformance_tests_running_context"]
+    assert saved_context["_conformance_tests_json"] == {"module": None, "required": {"2": {}}}
+
+    resumed_render_context = _make_render_context(plain_module)
+    checkpoint = render_checkpoint.find_render_checkpoint(plain_module)
+    render_checkpoint.restore_checkpoint(resumed_render_context, checkpoint)
+    resumed_context = resumed_render_context.conformance_tests_running_context
+    assert resumed_context.get_conformance_tests_json("module") == conformance_tests_json
+    assert resumed_context.get_conformance_tests_json("required") == {"2": {}}
@@ -0,0 +1,93 @@
+"""Tests for the immutable render context snapshots published with RenderStateUpdated events."""
+
+from types import SimpleNamespace
+
+import plain2code_events
+import plain_spec
+from render_machine.render_context import RenderContext
+from render_machine.render_types import (
+    AcceptanceTestPhase,
+    ConformanceTestsRunningContext,
+    FridContext,
+    ScriptExecutionHistory,
+)
+
+
+def _make_render_context():
+    return SimpleNamespace(
+        frid_context=FridContext(
+            frid="1",
+            specifications={plain_spec.FUNCTIONAL_REQUIREMENTS: ["Do a thing"]},
+            functional_requirement_text="Do a thing",
+            linked_resources={"resource.yaml": {"content": "x" * 1000}},
+        ),
+        conformance_tests_running_context=None,
+        unit_tests_running_context=None,
+        script_execution_history=ScriptExecutionHistory(),
+        module_name="module",
+    )
+
+
+def _create_snapshot(render_context, previous=None):
+    return RenderContext.create_snapshot(render_context, previous)
+
+
+def test_unchanged_parts_are_shared_with_the_previous_snapshot():
+    render_context = _make_render_context()
+    first_snapshot = _create_snapshot(render_context)
+    assert first_snapshot.get_changes(None) == {
+        "frid_context": first_snapshot.frid_context,
+        "conformance_tests_running_context": None,
+        "unit_tests_running_context": None,
+        "script_execution_history": first_snapshot.script_execution_history,
+        "module_name": "module",
+    }
+
+    render_context.script_execution_history.latest_unit_test_output_path = "unit_tests.log"
+    render_context.script_execution_history.should_update_script_outputs = True
+    second_snapshot = _create_snapshot(render_context, first_snapshot)
+
+    assert second_snapshot.frid_context is first_snapshot.frid_context
+    assert second_snapshot.get_changes(first_snapshot) == {
+        "script_execution_history": second_snapshot.script_execution_history
+    }
+    assert first_snapshot.script_execution_history.latest_unit_test_output_path is None
+
+
+def test_snapshots_do_not_follow_the_render_context():
+    render_context = _make_render_context()
+    render_context.conformance_tests_running_context = ConformanceTestsRunningContext(
+        current_testing_module_name="module",
+        current_testing_frid="1",
+        fix_attempts=0,
+        conformance_tests_json={},
+        conformance_tests_render_attempts=0,
+        current_testing_frid_specifications={plain_spec.ACCEPTANCE_TESTS: ["First", "Second"]},
+        should_prepare_testing_environment=True,
+    )
+    render_context.conformance_tests_running_context.acceptance_test_phase = AcceptanceTestPhase.IN_PROGRESS
+    render_context.conformance_tests_running_context.acceptance_tests_completed = 1
+    snapshot = _create_snapshot(render_context)
+
+    render_context.conformance_tests_running_context.acceptance_tests_completed = 2
+    render_context.frid_context.functional_requirement_render_attempts += 1
+
+    assert snapshot.conformance_tests_running_context.get_current_acceptance_test() == "First"
+    assert snapshot.frid_context.functional_requirement_render_attempts == 0
+    assert _create_snapshot(render_context, snapshot).get_changes(snapshot).keys() == {
+        "frid_context",
+        "conformance_tests_running_context",
+    }
+
+
+def test_changes_rebuild_the_snapshot():
+    render_context = _make_render_context()
+    first_snapshot = _create_snapshot(render_context)
+    render_context.module_name = "other_module"
+    render_context.frid_context = None
+    second_snapshot = _create_snapshot(render_context, first_snapshot)
+
+    snapshot = plain2code_events.RenderContextSnapshot().apply(first_snapshot.get_changes(None))
+    snapshot = snapshot.apply(second_snapshot.get_changes(first_snapshot))
+
+    assert snapshot == second_snapshot
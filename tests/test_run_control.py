@@ -0,0 +1,81 @@
+"""Tests for pausing, resuming and cancelling a render with its run control."""
+
+import threading
+import time
+
+import pytest
+
+from plain2code_exceptions import RenderCancelledError
+from run_control import RunControl
+
+# Resuming and cancelling wake up the waiting render right away, well within this time
+WAKE_UP_SECONDS = 0.2
+
+
+def _wait_in_thread(func):
+    outcome = {}
+
+    def _run():
+        try:
+            func()
+            outcome["result"] = "returned"
+        except RenderCancelledError:
+            outcome["result"] = "cancelled"
+        outcome["time"] = time.monotonic()
+
+    thread = threading.Thread(target=_run)
+    thread.start()
+    return thread, outcome
+
+
+def test_resume_and_cancel_wake_up_a_paused_render():
+    run_control = RunControl()
+    run_control.pause()
+    thread, outcome = _wait_in_thread(run_control.wait_while_paused)
+    time.sleep(0.1)
+    assert thread.is_alive()
+
+    resumed_at = time.monotonic()
+    run_control.resume()
+    thread.join()
+    assert outcome["result"] == "returned"
+    assert outcome["time"] - resumed_at < WAKE_UP_SECONDS
+
+    run_control.pause()
+    thread, outcome = _wait_in_thread(run_control.wait_while_paused)
+    cancelled_at = time.monotonic()
+    run_control.cancel()
+    thread.join()
+    assert outcome["result"] == "cancelled"
+    assert outcome["time"] - cancelled_at < WAKE_UP_SECONDS
+
+
+def test_cancel_calls_the_registered_callbacks():
+    run_control = RunControl()
+    cancelled = []
+    with run_control.on_cancel(lambda: cancelled.append("first")):
+        pass
+    with run_control.on_cancel(lambda: cancelled.append("second")):
+        run_control.cancel()
+        run_control.cancel()
+        with run_control.on_cancel(lambda: cancelled.append("third")):
+            pass
+
+    assert cancelled == ["second", "third"]
+
+
+def test_cancel_abandons_a_blocking_call():
+    run_control = RunControl()
+    assert run_control.call(lambda a, b: a + b, 1, b=2) == 3
+    with pytest.raises(ValueError):
+        run_control.call(int, "not a number")
+
+    release_call = threading.Event()
+    thread, outcome = _wait_in_thread(lambda: run_control.call(release_call.wait))
+    time.sleep(0.1)
+    cancelled_at = time.monotonic()
+    run_control.cancel()
+    thread.join()
+    assert outcome["result"] == "cancelled"
+    assert outcome["time"] - cancelled_at < WAKE_UP_SECONDS
+    release_call.set()
@@ -0,0 +1,122 @@
+"""Tests for the store of test script outputs."""
+
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from render_machine import render_utils, script_output_store
+from render_machine.script_output_store import (
+    ScriptOutputStore,
+    append_latest_outputs_to_crash_log,
+    get_latest_outputs,
+    read_index,
+    read_script_output,
+)
+
+
+def test_outputs_are_indexed_by_frid_script_type_and_attempt(tmp_path):
+    store = ScriptOutputStore(str(tmp_path / "script_outputs"), "render")
+
+    first_path = store.add("Unit Tests", "first run\n", 1, frid="1.2", module="my_module")
+    second_path = store.add("Unit Tests", "second run\n", 0, frid="1.2", module="my_module")
+    conformance_path = store.add("Conformance Tests", "conformance run\n", 0, frid="1.2", module="my_module")
+
+    assert os.path.basename(first_path) == "my_module__frid_1.2__unit_tests__attempt_1.log"
+    assert os.path.basename(second_path) == "my_module__frid_1.2__unit_tests__attempt_2.log"
+    assert os.path.basename(conformance_path) == "my_module__frid_1.2__conformance_tests__attempt_1.log"
+    # The latest output of each script stays plain text, the replaced ones are compressed
+    with open(second_path, encoding="utf-8") as f:
+        assert f.read() == "second run\n"
+    assert not os.path.exists(first_path)
+    assert os.path.exists(first_path + ".gz")
+    assert read_script_output(first_path) == "first run\n"
+    assert os.path.exists(conformance_path)
+
+    index = read_index(store.render_folder)
+    assert [(entry["script_type"], entry["attempt"], entry["exit_code"]) for entry in index] == [
+        ("Unit Tests", 1, 1),
+        ("Unit Tests", 2, 0),
+        ("Conformance Tests", 1, 0),
+    ]
+    assert [entry["attempt"] for entry, _ in get_latest_outputs(store.render_folder)] == [2, 1]
+
+
+def test_retention_deletes_old_and_oversized_renders(tmp_path, monkeypatch):
+    outputs_folder = tmp_path / "script_outputs"
+    for name, age_seconds in [("old", 30 * 24 * 3600), ("older_recent", 120), ("recent", 60)]:
+        render_folder = outputs_folder / name
+        render_folder.mkdir(parents=True)
+        (render_folder / "output.log.gz").write_bytes(b"x" * 1000)
+        modified_time = time.time() - age_seconds
+        os.utime(render_folder, (modified_time, modified_time))
+    monkeypatch.setattr(script_output_store, "SCRIPT_OUTPUTS_MAX_TOTAL_SIZE", 1500)
+
+    ScriptOutputStore(str(outputs_folder), "current")
+
+    assert sorted(os.listdir(outputs_folder)) == ["recent"]
+
+
+def test_size_limit_is_enforced_during_a_long_render(tmp_path, monkeypatch):
+    outputs_folder = tmp_path / "script_outputs"
+    earlier_render_folder = outputs_folder / "earlier"
+    earlier_render_folder.mkdir(parents=True)
+    (earlier_render_folder / "output.log.gz").write_bytes(b"x" * 1000)
+    monkeypatch.setattr(script_output_store, "SCRIPT_OUTPUTS_MAX_TOTAL_SIZE", 5000)
+    store = ScriptOutputStore(str(outputs_folder), "current")
+    assert earlier_render_folder.exists()
+
+    # Random output, so that compressing it does not make it small
+    paths = [store.add("Unit Tests", os.urandom(500).hex(), 1, frid="1", module="module") for _ in range(10)]
+    latest_conformance_path = store.add("Conformance Tests", "conformance run\n", 0, frid="1", module="module")
+
+    assert not earlier_render_folder.exists()
+    output_sizes = [
+        os.path.getsize(os.path.join(store.render_folder, name)) for name in os.listdir(store.render_folder)
+    ]
+    assert sum(output_sizes) <= 5000
+    assert read_script_output(paths[-1]) != ""
+    assert read_script_output(latest_conformance_path) == "conformance run\n"
+    assert not os.path.exists(paths[0] + ".gz")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses a POSIX shell script")
+def test_execute_script_stores_output(tmp_path):
+    script = tmp_path / "script.sh"
+    script.write_text("#!/bin/sh\necho hello\nexit 2\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    store = ScriptOutputStore(str(tmp_path / "script_outputs"), "render")
+
+    exit_code, output, output_path = render_utils.execute_script(
+        str(script), [], "Unit Tests", frid="1", module="module", output_store=store
+    )
+
+    assert exit_code == 2
+    assert output.strip() == "hello"
+    assert output_path.endswith(".log")
+    with open(output_path, encoding="utf-8") as f:
+        stored_output = f.read()
+    assert "hello" in stored_output
+    assert "failed with exit code 2" in stored_output
+    assert read_index(store.render_folder)[0]["exit_code"] == 2
+
+
+def test_crash_log_gets_latest_script_outputs(tmp_path):
+    store = ScriptOutputStore(str(tmp_path / "script_outputs"), "render")
+    store.add("Unit Tests", "old failure\n", 1, frid="1", module="module")
+    store.add("Unit Tests", "".join(f"line {i}\n" for i in range(500)), 1, frid="1", module="module")
+    crash_log = tmp_path / "crash.log"
+    crash_log.write_text("log records\n")
+
+    append_latest_outputs_to_crash_log(str(crash_log), [store.render_folder])
+
+    crash_log_content = crash_log.read_text()
+    assert crash_log_content.startswith("log records\n")
+    assert "Latest Unit Tests script output (module: module, functionality: 1, attempt: 2, exit code: 1)" in (
+        crash_log_content
+    )
+    assert "line 499" in crash_log_content
+    assert "line 10\n" not in crash_log_content
+    assert "old failure" not in crash_log_content
@@ -0,0 +1,170 @@
+"""Tests for reducing test script outputs to their failing tests."""
+
+from render_machine import test_failure_extraction
+from render_machine.test_failure_extraction import extract_test_failures
+
+UNITTEST_OUTPUT = """Running Python unittests in build...
+.F.E
+======================================================================
+ERROR: test_divide (test_calc.TestCalc.test_divide)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "/build/test_calc.py", line 12, in test_divide
+    calc.divide(1, 0)
+ZeroDivisionError: division by zero
+
+======================================================================
+FAIL: test_add (test_calc.TestCalc.test_add)
+----------------------------------------------------------------------
+Traceback (most recent call last):
+  File "/build/test_calc.py", line 8, in test_add
+    self.assertEqual(calc.add(1, 2), 4)
+  File "/usr/lib/python3.12/unittest/case.py", line 885, in assertEqual
+    assertion_func(first, second, msg=msg)
+AssertionError: 3 != 4
+
+----------------------------------------------------------------------
+Ran 4 tests in 0.001s
+
+FAILED (failures=1, errors=1)
+"""
+
+PYTEST_OUTPUT = """============================= test session starts ==============================
+collected 3 items
+
+test_calc.py .F.                                                         [100%]
+
+=================================== FAILURES ===================================
+___________________________________ test_add ___________________________________
+
+    def test_add():
+>       assert add(1, 2) == 4
+E       assert 3 == 4
+_ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _ _
+
+test_calc.py:5: AssertionError
+=========================== short test summary info ============================
+FAILED test_calc.py::test_add - assert 3 == 4
+========================= 1 failed, 2 passed in 0.02s ==========================
+"""
+
+GO_TEST_OUTPUT = """Running Golang unittests in build...
+--- FAIL: TestAdd (0.00s)
+    calc_test.go:10: expected 4, got 3
+--- FAIL: TestSub (0.00s)
+    calc_test.go:18: expected 1, got -1
+FAIL
+exit status 1
+FAIL\tcalc\t0.002s
+"""
+
+JEST_OUTPUT = """FAIL src/calc.test.js
+  ● calc › adds numbers
+
+    expect(received).toBe(expected)
+
+    Expected: 4
+    Received: 3
+
+      at Object.<anonymous> (src/calc.test.js:5:23)
+      at Promise.then.completed (node_modules/jest-circus/build/utils.js:298:28)
+
+Test Suites: 1 failed, 1 total
+Tests:       1 failed, 2 passed, 3 total
+"""
+
+JUNIT_XML_OUTPUT = """Running tests...
+<?xml version="1.0" encoding="UTF-8"?>
+<testsuites>
+  <testsuite name="calc" tests="2" failures="1">
+    <testcase classname="calc.CalcTest" name="testAdd">
+      <failure message="expected 4 but was 3">at calc.CalcTest.testAdd(CalcTest.java:10)</failure>
+    </testcase>
+    <testcase classname="calc.CalcTest" name="testSub"/>
+  </testsuite>
+</testsuites>
+"""
+
+
+def test_extract_unittest_failures():
+    report = extract_test_failures(UNITTEST_OUTPUT)
+
+    assert report.startswith("2 failing test(s):")
+    assert "ERROR: test_divide" in report
+    assert "ZeroDivisionError: division by zero" in report
+    assert "FAIL: test_add" in report
+    assert "AssertionError: 3 != 4" in report
+    # Frames of the test runner itself are dropped
+    assert "unittest/case.py" not in report
+    assert "Ran 4 tests" not in report
+
+
+def test_extract_pytest_failures():
+    report = extract_test_failures(PYTEST_OUTPUT)
+
+    assert report.startswith("1 failing test(s):")
+    assert "test_add" in report
+    assert "E       assert 3 == 4" in report
+    assert "test_calc.py:5: AssertionError" in report
+    assert "test session starts" not in report
+
+
+def test_extract_go_test_failures():
+    report = extract_test_failures(GO_TEST_OUTPUT)
+
+    assert report.startswith("2 failing test(s):")
+    assert "--- FAIL: TestAdd (0.00s)\n    calc_test.go:10: expected 4, got 3" in report
+    assert "--- FAIL: TestSub (0.00s)\n    calc_test.go:18: expected 1, got -1" in report
+    assert "exit status" not in report
+
+
+def test_extract_jest_failures():
+    report = extract_test_failures(JEST_OUTPUT)
+
+    assert report.startswith("1 failing test(s):")
+    assert "● calc › adds numbers" in report
+    assert "Received: 3" in report
+    assert "src/calc.test.js:5:23" in report
+    assert "node_modules" not in report
+    assert "Test Suites" not in report
+
+
+def test_extract_junit_xml_failures():
+    report = extract_test_failures(JUNIT_XML_OUTPUT)
+
+    assert report == (
+        "1 failing test(s):\n\nFAILURE: calc.CalcTest.testAdd\nexpected 4 but was 3\n"
+        "at calc.CalcTest.testAdd(CalcTest.java:10)"
+    )
+
+
+def test_unrecognized_output_is_kept():
+    output = "main.go:3:2: undefined: foo\n"
+
+    assert extract_test_failures(output) == output
+
+
+def test_report_is_capped():
+    failures = "".join(
+        f"{'=' * 70}\nFAIL: test_{i} (test_module.TestCase.test_{i})\n{'-' * 70}\nAssertionError: {'x' * 300}\n\n"
+        for i in range(100)
+    )
+    report = extract_test_failures(f"{failures}{'-' * 70}\nRan 100 tests in 0.1s\n", max_size=2_000)
+
+    assert len(report) <= 2_000
+    assert report.startswith("100 failing test(s):")
+    assert "FAIL: test_0 " in report
+    assert "more failing test(s)" in report
+
+    assert len(extract_test_failures("x" * 5_000, max_size=1_000)) <= 1_000
+
+
+def test_registered_extractor_is_tried_first(monkeypatch):
+    monkeypatch.setattr(test_failure_extraction, "FAILURE_EXTRACTORS", list(test_failure_extraction.FAILURE_EXTRACTORS))
+    test_failure_extraction.register_failure_extractor(
+        lambda output: [line for line in output.split("\n") if line.startswith("not ok")]
+    )
+
+    report = extract_test_failures(f"ok 1 - adds\nnot ok 2 - subtracts\n{GO_TEST_OUTPUT}")
+
+    assert report == "1 failing test(s):\n\nnot ok 2 - subtracts"
@@ -0,0 +1,101 @@
+"""Tests for the persistent test results cache."""
+
+from render_machine import test_results_cache
+from render_machine.test_results_cache import get_conformance_tests_cache_key, get_unit_tests_cache_key
+
+
+def test_cache_persists_results(tmp_path):
+    cache_file_path = str(tmp_path / ".codeplain" / test_results_cache.TEST_RESULTS_CACHE_FILE_NAME)
+    cache = test_results_cache.TestResultsCache(cache_file_path)
+    assert cache.get("key") is None
+
+    cache.put("passed", 0, "all good")
+    cache.put("failed", 1, "1 test failed")
+
+    reloaded_cache = test_results_cache.TestResultsCache(cache_file_path)
+    assert reloaded_cache.get("passed") == test_results_cache.CachedTestResult(exit_code=0, output="all good")
+    assert reloaded_cache.get("failed") == test_results_cache.CachedTestResult(exit_code=1, output="1 test failed")
+
+
+def test_cache_skips_environment_errors(tmp_path):
+    cache = test_results_cache.TestResultsCache(str(tmp_path / "cache.json"))
+    for exit_code in test_results_cache.NON_CACHEABLE_EXIT_CODES:
+        cache.put(f"key-{exit_code}", exit_code, "environment problem")
+        assert cache.get(f"key-{exit_code}") is None
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(test_results_cache, "MAX_CACHED_TEST_RESULTS", 2)
+    cache = test_results_cache.TestResultsCache(str(tmp_path / "cache.json"))
+    cache.put("a", 0, "")
+    cache.put("b", 0, "")
+    assert cache.get("a") is not None
+    cache.put("c", 0, "")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_disabled_cache(tmp_path):
+    cache = test_results_cache.TestResultsCache(None)
+    cache.put("key", 0, "output")
+    assert not cache.enabled
+    assert cache.get("key") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_damaged_cache_file_is_ignored(tmp_path):
+    cache_file_path = tmp_path / "cache.json"
+    cache_file_path.write_text("{not json")
+    cache = test_results_cache.TestResultsCache(str(cache_file_path))
+    assert cache.get("key") is None
+    cache.put("key", 0, "output")
+    assert test_results_cache.TestResultsCache(str(cache_file_path)).get("key").output == "output"
+
+
+def test_conformance_tests_cache_key_changes_with_inputs(tmp_path):
+    tests_folder = tmp_path / "tests" / "frid_1"
+    tests_folder.mkdir(parents=True)
+    (tests_folder / "test_feature.py").write_text("assert True\n")
+    script = tmp_path / "run_conformance_tests.sh"
+    script.write_text("#!/bin/sh\n")
+
+    def key(build_tree_sha="tree", environment_fingerprint="env"):
+        return get_conformance_tests_cache_key(build_tree_sha, str(tests_folder), str(script), environment_fingerprint)
+
+    original_key = key()
+    assert key() == original_key
+    assert key(build_tree_sha="other tree") != original_key
+    assert key(environment_fingerprint="other env") != original_key
+
+    (tests_folder / "test_feature.py").write_text("assert False\n")
+    changed_tests_key = key()
+    assert changed_tests_key != original_key
+
+    script.write_text("#!/bin/sh\nexit 0\n")
+    assert key() != changed_tests_key
+
+
+def test_unit_tests_cache_key_changes_with_inputs(tmp_path):
+    script = tmp_path / "run_unittests.sh"
+    script.write_text("#!/bin/sh\n")
+
+    original_key = get_unit_tests_cache_key("tree", str(script), "env")
+    assert get_unit_tests_cache_key("tree", str(script), "env") == original_key
+    assert get_unit_tests_cache_key("other tree", str(script), "env") != original_key
+    assert get_unit_tests_cache_key("tree", str(script), "other env") != original_key
+
+    script.write_text("#!/bin/sh\nexit 0\n")
+    assert get_unit_tests_cache_key("tree", str(script), "env") != original_key
+
+
+def test_environment_fingerprint_covers_the_prepared_environment(tmp_path):
+    script = tmp_path / "prepare_environment.sh"
+    script.write_text("#!/bin/sh\n")
+    fingerprint = test_results_cache.get_environment_fingerprint(str(script), 120)
+
+    assert test_results_cache.get_environment_fingerprint(str(script), 120) == fingerprint
+    prepared_fingerprint = test_results_cache.get_environment_fingerprint(str(script), 120, "a" * 64)
+    assert prepared_fingerprint != fingerprint
+    assert test_results_cache.get_environment_fingerprint(str(script), 120, "b" * 64) != prepared_fingerprint
@@ -0,0 +1,101 @@
+"""Tests for the progress timers of the TUI being advanced by one ticker per app."""
+
+import asyncio
+
+from textual.app import App
+from textual.containers import VerticalScroll
+
+from tui import ticker as tui_ticker
+from tui.components import ProgressItem, SubstateLine
+from tui.models import Substate
+from tui.ticker import Ticker, get_ticker
+
+# The tests tick the ticker themselves, so its timer must not fire while they run
+NEVER_FIRING_INTERVAL_SECONDS = 3600.0
+
+
+class _ProgressApp(App):
+    CSS = """
+    ProgressItem, ProgressItem Vertical, ProgressItem Horizontal, SubstateLine {
+        height: auto;
+    }
+    """
+
+    def compose(self):
+        with VerticalScroll():
+            yield ProgressItem("Implementing functionality", id="progress")
+
+
+def _create_app() -> _ProgressApp:
+    app = _ProgressApp()
+    tui_ticker._tickers[app] = Ticker(app, interval=NEVER_FIRING_INTERVAL_SECONDS)
+    return app
+
+
+def _substates(count: int) -> list[Substate]:
+    return [Substate(f"Conformance test {number}", children=[Substate("Running")]) for number in range(count)]
+
+
+def _line_text(line: SubstateLine) -> str:
+    return str(line.query_one(".substate-line-text").content)
+
+
+def test_substate_lines_share_the_ticker_of_the_app():
+    async def scenario():
+        app = _create_app()
+        async with app.run_test(size=(80, 20)) as pilot:
+            progress_item = app.query_one(ProgressItem)
+            await progress_item.set_substates(_substates(20))
+            await pilot.pause()
+
+            ticker = get_ticker(app)
+            lines = list(app.query(SubstateLine))
+            assert ticker.subscriber_count == len(lines) == 40
+            assert len([timer for timer in app._timers if timer._callback == ticker.tick]) == 1
+
+            ticker.tick()
+            ticker.tick()
+            await pilot.pause()
+            assert all(line._seconds_elapsed == 2 for line in lines)
+            assert "(2s)" in _line_text(lines[0])
+            # Lines scrolled out of view are only updated once they are visible
+            assert "(0s)" in _line_text(lines[-1])
+
+            await progress_item.update_status(ProgressItem.PAUSED)
+            ticker.tick()
+            assert all(line._seconds_elapsed == 2 for line in lines)
+
+            await progress_item.clear_substates()
+            await pilot.pause()
+            assert ticker.subscriber_count == 0
+            assert ticker._timer is None
+
+    asyncio.run(scenario())
+
+
+def test_hidden_substate_lines_catch_up_once_visible():
+    async def scenario():
+        app = _create_app()
+        async with app.run_test(size=(80, 20)) as pilot:
+            progress_item = app.query_one(ProgressItem)
+            await progress_item.set_substates(_substates(1))
+            await pilot.pause()
+            ticker = get_ticker(app)
+            line = app.query_one(SubstateLine)
+
+            app.query_one(VerticalScroll).display = False
+            await pilot.pause()
+            ticker.tick()
+            assert "(0s)" in _line_text(line)
+
+            app.query_one(VerticalScroll).display = True
+            await pilot.pause()
+            ticker.tick()
+            assert line._seconds_elapsed == 2
+            assert "(2s)" in _line_text(line)
+
+            line.stop_progress_timer()
+            ticker.tick()
+            assert line._seconds_elapsed == 2
+
+    asyncio.run(scenario())
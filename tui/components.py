@@ -1,16 +1,28 @@
+from collections import deque
+from dataclasses import dataclass
 from enum import Enum
 from typing import Literal, Optional
 
+from rich.cells import cell_len
 from rich.markup import escape
-from textual.containers import Horizontal, Vertical, VerticalScroll
+from rich.text import Text
+from textual import events
+from textual.containers import Horizontal, Vertical
+from textual.dom import NoScreen
+from textual.errors import NoWidget
+from textual.geometry import Size
 from textual.message import Message
-from textual.timer import Timer
+from textual.scroll_view import ScrollView
+from textual.selection import Selection
+from textual.strip import Strip
 from textual.widgets import Button, Static
 
+from plain2code_arguments import DEFAULT_TUI_LOG_HISTORY
 from plain2code_utils import format_duration_hms
 
 from .models import Substate
 from .spinner import Spinner
+from .ticker import Ticker, get_ticker
 
 
 class CustomFooter(Horizontal):
@@ -109,6 +121,10 @@ class CustomFooter(Horizontal):
                 self.add_class("footer-state-default")
 
 
+# Appended to a script output path when the outcome was taken from the test results cache
+CACHED_SCRIPT_OUTPUT_SUFFIX = " (cached result)"
+
+
 class ScriptOutputType(str, Enum):
     UNIT_TEST_OUTPUT_TEXT = "Unit tests output: "
     CONFORMANCE_TEST_OUTPUT_TEXT = "Conformance tests output: "
@@ -160,7 +176,7 @@ class TUIComponents(str, Enum):
 
 
 class SubstateLine(Horizontal):
-    """A single substate row with an attached timer."""
+    """A single substate row with an attached timer, advanced by the ticker of the app."""
 
     def __init__(self, text: str, indent: str, progress_status: str, **kwargs):
         super().__init__(**kwargs)
@@ -168,35 +184,45 @@ class SubstateLine(Horizontal):
         self.indent = indent
         self._progress_status = progress_status
         self._line_widget: Static | None = None
-        self._timer: Timer | None = None
+        self._ticker: Ticker | None = None
         self._seconds_elapsed = 0
+        self._shown_line = ""
+        # Whether the shown timer is behind, because the line was not visible when the timer advanced
+        self._is_stale = False
 
     def compose(self):
-        self._line_widget = Static(self._format_line(), classes="substate-line-text")
+        self._shown_line = self._format_line()
+        self._line_widget = Static(self._shown_line, classes="substate-line-text")
         yield self._line_widget
 
     def on_mount(self) -> None:
         self._refresh_timer()
-        self._timer = self.set_interval(1, self._add_second)
-        if self._progress_status == ProgressItem.PAUSED:
-            self._timer.pause()
+        self._ticker = get_ticker(self.app)
+        self._ticker.subscribe(self._add_second)
+
+    def on_unmount(self) -> None:
+        self.stop_progress_timer()
 
     def set_progress_status(self, progress_status: str) -> None:
         self._progress_status = progress_status
-        if self._timer is None:
-            return
-        if progress_status == ProgressItem.PAUSED:
-            self._timer.pause()
-        else:
-            self._timer.resume()
 
     def stop_progress_timer(self) -> None:
-        if self._timer is not None:
-            self._timer.stop()
+        if self._ticker is not None:
+            self._ticker.unsubscribe(self._add_second)
+            self._ticker = None
 
     def _add_second(self) -> None:
-        self._seconds_elapsed += 1
-        self._refresh_timer()
+        if self._progress_status != ProgressItem.PAUSED:
+            self._seconds_elapsed += 1
+            self._is_stale = True
+        if self._is_stale and self._is_visible():
+            self._refresh_timer()
+
+    def _is_visible(self) -> bool:
+        try:
+            return bool(self.screen.find_widget(self).visible_region)
+        except (NoScreen, NoWidget):
+            return False
 
     def _format_timer(self) -> str:
         return format_duration_hms(self._seconds_elapsed)
@@ -208,7 +234,11 @@ class SubstateLine(Horizontal):
     def _refresh_timer(self) -> None:
         try:
             if self._line_widget:
-                self._line_widget.update(self._format_line())
+                line = self._format_line()
+                # The line only needs a new layout if the length of the timer changed, e.g. from 9s to 10s
+                self._line_widget.update(line, layout=len(line) != len(self._shown_line))
+                self._shown_line = line
+                self._is_stale = False
         except Exception:
             pass
 
@@ -378,6 +408,9 @@ class RenderingInfoBox(Vertical):
 class TestScriptsContainer(Vertical):
     """Container with ASCII border for test script outputs."""
 
+    # Number of the latest output lines of the running test script shown below the script rows
+    LIVE_OUTPUT_LINES = 5
+
     def __init__(
         self,
         show_unit_test: bool = True,
@@ -395,6 +428,9 @@ class TestScriptsContainer(Vertical):
         self.unit_widget: Static | None = None
         self.conformance_widget: Static | None = None
         self.testing_widget: Static | None = None
+        self.live_output_title = ""
+        self.live_output_lines: deque[str] = deque(maxlen=self.LIVE_OUTPUT_LINES)
+        self.live_output_widget: Static | None = None
 
     def update_unit_test(self, text: str) -> None:
         """Update unit test output and refresh."""
@@ -411,6 +447,35 @@ class TestScriptsContainer(Vertical):
         self.testing_env_text = text
         self._refresh_content()
 
+    def append_live_output(self, script_type: str, frid: Optional[str], lines: list[str]) -> None:
+        """Show the latest output lines of the running test script."""
+        title = f"{script_type} output" + (f" (functionality {frid})" if frid is not None else "") + ":"
+        if title != self.live_output_title:
+            self.live_output_title = title
+            self.live_output_lines.clear()
+        self.live_output_lines.extend(lines)
+        self._refresh_live_output()
+
+    def clear_live_output(self) -> None:
+        """Hide the live output once the test script has finished."""
+        self.live_output_title = ""
+        self.live_output_lines.clear()
+        self._refresh_live_output()
+
+    def _refresh_live_output(self) -> None:
+        if self.live_output_widget is None:
+            return
+        if not self.live_output_lines:
+            self.live_output_widget.display = False
+            return
+        # Script output may contain ANSI escape codes and square brackets, so it is not parsed as markup
+        live_output = Text(self.live_output_title)
+        for line in self.live_output_lines:
+            live_output.append("\n")
+            live_output.append_text(Text.from_ansi(line))
+        self.live_output_widget.update(live_output)
+        self.live_output_widget.display = True
+
     def _refresh_content(self) -> None:
         """Refresh the test script rows."""
         if self.unit_widget is not None:
@@ -422,6 +487,7 @@ class TestScriptsContainer(Vertical):
         if self.testing_widget is not None:
             self.testing_widget.update(self.testing_env_text)
             self.testing_widget.display = self.show_testing_env
+        self._refresh_live_output()
 
     def on_mount(self) -> None:
         """Initialize the box on mount."""
@@ -436,6 +502,8 @@ class TestScriptsContainer(Vertical):
             yield self.unit_widget
             yield self.conformance_widget
             yield self.testing_widget
+            self.live_output_widget = Static("", classes="test-script-live-output")
+            yield self.live_output_widget
 
 
 class FRIDProgress(Vertical):
@@ -495,86 +563,53 @@ class FRIDProgress(Vertical):
                 )
 
 
-class LogEntry(Vertical):
-    """A single log entry that can be expanded to show details."""
-
-    SUCCESS_KEYWORDS = ["completed", "success", "successfully", "passed", "done", "✓"]
+@dataclass
+class LogRecordEntry:
+    """A log record kept by the StructuredLogView."""
 
-    def __init__(
-        self,
-        logger_name: str,
-        level: str,
-        message: str,
-        timestamp: str = "",
-        log_color: Optional[str] = None,
-        **kwargs,
-    ):
-        super().__init__(**kwargs)
-        self.logger_name = logger_name
-        self.level = level
-        self.message = message
-        self.timestamp = timestamp
-        self.log_color = log_color
-        self.is_expanded = False
-        self.classes = f"log-entry log-{level.lower()}"
+    index: int
+    logger_name: str
+    level: str
+    message: str
+    timestamp: str = ""
+    log_color: Optional[str] = None
 
-    def compose(self):
-        # Main row: just the message with a clickable indicator
-        with Horizontal(classes="log-main-row"):
-            # Expandable indicator
-            yield Static("▶", classes="log-expand-indicator")
 
-            time_part = self.timestamp.split()[-1] if self.timestamp else ""
-            time_prefix = f"[#888888][{time_part}][/#888888] " if time_part else ""
-            indent_spaces = len(f"[{time_part}] ") if time_part else 0
+@dataclass
+class _LogRow:
+    """A row of the StructuredLogView: a line of a log record, of its details, or a spacer, wrapped to the view."""
 
-            # Log messages are plain text; escape them so square brackets in
-            # interpolated content (error texts, file names) don't parse as markup.
-            message_body = escape(self.message)
-            if self.log_color:
-                message_body = f"[{self.log_color}]{message_body}[/{self.log_color}]"
-            elif any(keyword in self.message.lower() for keyword in self.SUCCESS_KEYWORDS):
-                # Fallback for messages emitted without an explicit color.
-                message_body = f"[green]✓[/green] {message_body}"
+    entry_index: int
+    text: Text
 
-            if indent_spaces and "\n" in message_body:
-                message_body = message_body.replace("\n", "\n" + " " * indent_spaces)
+    @property
+    def plain(self) -> str:
+        return self.text.plain
 
-            yield Static(f"{time_prefix}{message_body}", classes="log-col-message")
 
-        # Details row (hidden by default) - vertical layout
-        with Vertical(id=f"log-details-{id(self)}", classes="log-details-row"):
-            location = self.logger_name
-            if len(location) > 20:
-                location = location[:20] + "..."
-            yield Static(f"  [#888]level:[/#888] {self.level}", classes="log-details-text")
-            yield Static(f"  [#888]location:[/#888] {location}", classes="log-details-text")
+class StructuredLogView(ScrollView):
+    """
+    Scrollable view of the latest log records.
 
-    def on_mount(self) -> None:
-        """Hide details on mount."""
-        try:
-            details = self.query_one(f"#log-details-{id(self)}")
-            details.display = False
-        except Exception:
-            pass
+    The records are kept in a ring buffer of at most max_entries records and the view draws only the rows that are
+    visible, so it stays responsive however many records a long render logs. The rows are wrapped to the width of the
+    view, again when it is resized. Clicking a record shows its details.
+    """
 
-    def on_click(self) -> None:
-        """Toggle details visibility on click, unless text is selected."""
-        if self.screen.get_selected_text():
-            return
-        try:
-            details = self.query_one(f"#log-details-{id(self)}")
-            indicator = self.query_one(".log-expand-indicator", Static)
-
-            self.is_expanded = not self.is_expanded
-            details.display = self.is_expanded
-            indicator.update("▼" if self.is_expanded else "▶")
-        except Exception:
-            pass
+    # The rows are wrapped to the width without the scrollbar, it does not change when the scrollbar appears
+    DEFAULT_CSS = """
+    StructuredLogView {
+        scrollbar-gutter: stable;
+    }
+    """
 
+    ALLOW_SELECT = True
 
-class StructuredLogView(VerticalScroll):
-    """A scrollable container for log entries displayed as a table."""
+    SUCCESS_KEYWORDS = ["completed", "success", "successfully", "passed", "done", "✓"]
+    EXPAND_INDICATOR = "▶ "
+    COLLAPSE_INDICATOR = "▼ "
+    DETAILS_INDENT = 13
+    MAX_LOCATION_LENGTH = 20
 
     # Log level hierarchy (lower number = lower priority)
     LOG_LEVELS = {
@@ -584,9 +619,17 @@ class StructuredLogView(VerticalScroll):
         "ERROR": 3,
     }
 
-    def __init__(self, **kwargs):
+    def __init__(self, max_entries: int = DEFAULT_TUI_LOG_HISTORY, **kwargs):
         super().__init__(**kwargs)
         self.min_level = "INFO"  # By default, show INFO and above
+        self.entries: deque[LogRecordEntry] = deque(maxlen=max_entries)
+        self._next_entry_index = 0
+        self._expanded_entry_indexes: set[int] = set()
+        # The rows of the shown entries, in the order of the entries
+        self._rows: deque[_LogRow] = deque()
+        self._width = 0
+        # Width the rows are wrapped to, 0 until the view is laid out
+        self._wrap_width = 0
 
     def _should_show_log(self, level: str) -> bool:
         """Check if log should be shown based on minimum level."""
@@ -594,35 +637,152 @@ class StructuredLogView(VerticalScroll):
         min_priority = self.LOG_LEVELS.get(self.min_level, 0)
         return log_priority >= min_priority
 
-    async def add_log(
-        self, logger_name: str, level: str, message: str, timestamp: str = "", log_color: Optional[str] = None
-    ):
-        """Add a new log entry."""
-        # Check if this is a success message that should have spacing before it
-        is_success_message = any(keyword in message.lower() for keyword in LogEntry.SUCCESS_KEYWORDS)
-
-        # Add empty line before success messages
-        if is_success_message:
-            spacer = Static("", classes="log-spacer")
-            await self.mount(spacer)
+    def _wrap(self, entry_index: int, prefix: Text, body: Text) -> list[_LogRow]:
+        """Wrap the body to the view, the rows after the first are indented by the width of the prefix."""
+        body_width = self._wrap_width - prefix.cell_len
+        if body_width <= 0:
+            return [_LogRow(entry_index, prefix + body)]
+
+        indent = Text(" " * prefix.cell_len)
+        return [
+            _LogRow(entry_index, (prefix if line_number == 0 else indent) + line)
+            for line_number, line in enumerate(body.wrap(self.app.console, body_width, overflow="fold"))
+        ]
+
+    def _get_rows(self, entry: LogRecordEntry) -> list[_LogRow]:
+        rows = []
+        # Add an empty line before success messages
+        if any(keyword in entry.message.lower() for keyword in self.SUCCESS_KEYWORDS):
+            rows.append(_LogRow(entry.index, Text()))
+
+        is_expanded = entry.index in self._expanded_entry_indexes
+        indicator = self.COLLAPSE_INDICATOR if is_expanded else self.EXPAND_INDICATOR
+        time_part = entry.timestamp.split()[-1] if entry.timestamp else ""
+        time_prefix = f"[{time_part}] " if time_part else ""
+        indent = Text(" " * (len(indicator) + len(time_prefix)))
+
+        for line_number, line in enumerate(entry.message.split("\n")):
+            # Log messages are plain text; escape them so square brackets in
+            # interpolated content (error texts, file names) don't parse as markup.
+            line_body = escape(line)
+            if entry.log_color:
+                line_body = f"[{entry.log_color}]{line_body}[/{entry.log_color}]"
+            elif line_number == 0 and rows:
+                # Fallback for messages emitted without an explicit color.
+                line_body = f"[green]✓[/green] {line_body}"
 
-        entry = LogEntry(logger_name, level, message, timestamp, log_color=log_color)
+            if line_number == 0:
+                prefix = Text(f"{indicator}{time_prefix}", style="#888888")
+                rows.extend(self._wrap(entry.index, prefix, Text.from_markup(line_body)))
+            else:
+                rows.extend(self._wrap(entry.index, indent, Text.from_markup(line_body)))
+
+        if is_expanded:
+            location = entry.logger_name
+            if len(location) > self.MAX_LOCATION_LENGTH:
+                location = location[: self.MAX_LOCATION_LENGTH] + "..."
+            details_indent = Text(" " * self.DETAILS_INDENT)
+            for name, value in [("level", entry.level), ("location", location)]:
+                rows.extend(
+                    self._wrap(
+                        entry.index, details_indent, Text.from_markup(f"[#888888]{name}:[/#888888] {escape(value)}")
+                    )
+                )
+        return rows
 
-        # Only show if level is >= minimum level
-        if not self._should_show_log(level):
-            entry.display = False
+    def _update_virtual_size(self) -> None:
+        self.virtual_size = Size(self._width, len(self._rows))
 
-        await self.mount(entry)
-        # Auto-scroll to bottom to show latest logs
-        self.scroll_end(animate=False)
+    def _rebuild_rows(self) -> None:
+        self._rows = deque(
+            row for entry in self.entries if self._should_show_log(entry.level) for row in self._get_rows(entry)
+        )
+        self._width = max((cell_len(row.plain) for row in self._rows), default=0)
+        self._update_virtual_size()
+        self.refresh()
+
+    def add_log(self, logger_name: str, level: str, message: str, timestamp: str = "", log_color: Optional[str] = None):
+        """Add a new log entry, dropping the oldest one if the view keeps max_entries entries already."""
+        is_scrolled_to_end = self.is_vertical_scroll_end
+        if len(self.entries) == self.entries.maxlen:
+            dropped_entry = self.entries.popleft()
+            self._expanded_entry_indexes.discard(dropped_entry.index)
+            while self._rows and self._rows[0].entry_index == dropped_entry.index:
+                self._rows.popleft()
+
+        entry = LogRecordEntry(self._next_entry_index, logger_name, level, message, timestamp, log_color)
+        self._next_entry_index += 1
+        self.entries.append(entry)
+        if self._should_show_log(level):
+            rows = self._get_rows(entry)
+            self._rows.extend(rows)
+            self._width = max([self._width] + [cell_len(row.plain) for row in rows])
+        self._update_virtual_size()
+        self.refresh()
+
+        # Keep showing the latest logs, unless the user scrolled up to read older ones. Forced, as the scrollbar of the
+        # first rows that do not fit is only shown after the next layout.
+        if is_scrolled_to_end:
+            self.scroll_end(animate=False, immediate=True, x_axis=False, force=True)
 
     def filter_logs(self, min_level: str):
-        """Show/hide logs based on minimum level."""
+        """Show only the logs of at least the given level."""
         self.min_level = min_level
+        self._rebuild_rows()
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        row_index = scroll_y + y
+        rich_style = self.rich_style
+        width = self.size.width
+        if row_index >= len(self._rows):
+            return Strip.blank(width, rich_style)
+
+        text = self._rows[row_index].text.copy()
+        text.stylize_before(rich_style)
+        selection = self.text_selection
+        if selection is not None:
+            span = selection.get_span(row_index)
+            if span is not None:
+                start, end = span
+                text.stylize(
+                    self.screen.get_component_rich_style("screen--selection"),
+                    start,
+                    len(text) if end == -1 else end,
+                )
+
+        strip = Strip(text.render(self.app.console), text.cell_len)
+        return strip.crop_extend(scroll_x, scroll_x + width, rich_style).apply_offsets(scroll_x, row_index)
+
+    def on_resize(self, event: events.Resize) -> None:
+        wrap_width = self.scrollable_content_region.width
+        if wrap_width != self._wrap_width:
+            self._wrap_width = wrap_width
+            self._rebuild_rows()
+
+    def get_selection(self, selection: Selection) -> tuple[str, str] | None:
+        return selection.extract("\n".join(row.plain for row in self._rows)), "\n"
+
+    def selection_updated(self, selection: Selection | None) -> None:
+        self.refresh()
 
-        # Update visibility of all existing log entries
-        for entry in self.query(LogEntry):
-            entry.display = self._should_show_log(entry.level)
+    def on_click(self, event: events.Click) -> None:
+        """Toggle the details of the clicked log entry, unless text is selected."""
+        if self.screen.get_selected_text():
+            return
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        row_index = self.scroll_offset.y + offset.y
+        if row_index >= len(self._rows):
+            return
+
+        entry_index = self._rows[row_index].entry_index
+        if entry_index in self._expanded_entry_indexes:
+            self._expanded_entry_indexes.remove(entry_index)
+        else:
+            self._expanded_entry_indexes.add(entry_index)
+        self._rebuild_rows()
 
 
 class LogFilterChanged(Message):
@@ -1,4 +1,3 @@
-import threading
 from typing import Callable, Optional
 
 from textual.app import App, ComposeResult
@@ -8,6 +7,7 @@ from textual.css.query import NoMatches
 from textual.widgets import ContentSwitcher, Static
 
 from event_bus import EventBus
+from plain2code_arguments import DEFAULT_TUI_LOG_HISTORY
 from plain2code_events import (
     LogMessageEmitted,
     RenderCompleted,
@@ -18,9 +18,11 @@ from plain2code_events import (
     RenderModuleStarted,
     RenderPaused,
     RenderStateUpdated,
+    TestScriptOutputEmitted,
 )
 from plain2code_state import RunState
 from render_machine.states import States
+from run_control import RunControl
 from tui.widget_helpers import (
     display_module_name,
     display_usage_summary,
@@ -53,6 +55,7 @@ from .state_handlers import (
     StateHandler,
     UnitTestsHandler,
 )
+from .ticker import Ticker, get_ticker
 
 
 class Plain2CodeTUI(App):
@@ -68,8 +71,6 @@ class Plain2CodeTUI(App):
         ("ctrl+l", "toggle_logs", "Toggle Logs"),
     ]
 
-    USAGE_REFRESH_INTERVAL_SECONDS = 1.0
-
     def __init__(
         self,
         event_bus: EventBus,
@@ -80,9 +81,10 @@ class Plain2CodeTUI(App):
         conformance_tests_script: str,
         prepare_environment_script: str,
         state_machine_version: str,
-        enter_pause_event: threading.Event | None = None,
+        run_control: RunControl | None = None,
         on_cancel: Callable[[], None] | None = None,
         default_log_level: str = "INFO",
+        log_history: int = DEFAULT_TUI_LOG_HISTORY,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -92,7 +94,7 @@ class Plain2CodeTUI(App):
         # Live credit-usage line. The elapsed render time is read from the shared
         # run_state.get_live_render_time(); the TUI only owns the refresh cadence and
         # freezes it while paused so the line is never sampled inside the pause loop.
-        self._usage_timer = None
+        self._usage_ticker: Ticker | None = None
         self._usage_paused = False
         self._on_ready = on_ready
         self.render_id = render_id
@@ -100,10 +102,13 @@ class Plain2CodeTUI(App):
         self.conformance_tests_script: Optional[str] = conformance_tests_script
         self.prepare_environment_script: Optional[str] = prepare_environment_script
         self.state_machine_version = state_machine_version
-        self.enter_pause_event = enter_pause_event
+        self.run_control = run_control
         self._on_cancel = on_cancel
         self.default_log_level = default_log_level
+        self.log_history = log_history
         self._render_finished = False
+        # Render context as last reported by RenderStateUpdated events, which only carry the changed fields
+        self._render_context_snapshot = RenderContextSnapshot()
 
         # Initialize state handlers
         self._state_handlers: dict[str, StateHandler] = {
@@ -140,9 +145,11 @@ class Plain2CodeTUI(App):
         self.event_bus.subscribe(RenderModuleFailed, self.on_render_module_failed)
         self.event_bus.subscribe(LogMessageEmitted, self.on_log_message_emitted)
         self.event_bus.subscribe(RenderPaused, self.on_render_paused)
+        self.event_bus.subscribe(TestScriptOutputEmitted, self.on_test_script_output_emitted)
 
-        # Live credit-usage line: refresh functionalities / used credits / render time each second.
-        self._usage_timer = self.set_interval(self.USAGE_REFRESH_INTERVAL_SECONDS, self._refresh_usage_summary)
+        # Live credit-usage line: refresh functionalities / used credits / render time on every tick.
+        self._usage_ticker = get_ticker(self)
+        self._usage_ticker.subscribe(self._refresh_usage_summary)
 
         if self.default_log_level != "INFO":
             try:
@@ -194,21 +201,21 @@ class Plain2CodeTUI(App):
             with Vertical(id=TUIComponents.LOG_VIEW.value):
                 yield LogLevelFilter(id=TUIComponents.LOG_FILTER.value)
                 yield Static("", classes="filter-spacer")
-                yield StructuredLogView(id=TUIComponents.LOG_WIDGET.value)
+                yield StructuredLogView(max_entries=self.log_history, id=TUIComponents.LOG_WIDGET.value)
         yield CustomFooter(render_id=self.render_id)
 
     def _refresh_usage_summary(self) -> None:
         """Refresh the live credit-usage line while the render is in progress.
 
-        Runs on the main (event-loop) thread via the interval timer. While paused
+        Runs on the main (event-loop) thread via the ticker. While paused
         the line is left untouched so it is never sampled inside the pause loop.
-        Once the render has finished it stops the timer from here — cancelling it
+        Once the render has finished it unsubscribes from here — unsubscribing
         from the background render thread that publishes completion is not safe.
         """
         if self._render_finished:
-            if self._usage_timer is not None:
-                self._usage_timer.stop()
-                self._usage_timer = None
+            if self._usage_ticker is not None:
+                self._usage_ticker.unsubscribe(self._refresh_usage_summary)
+                self._usage_ticker = None
             return
         if self._usage_paused:
             return
@@ -221,7 +228,7 @@ class Plain2CodeTUI(App):
         render machine does not always finalize its accumulated render time before a
         failure propagates, so the live value is captured onto the run state here.
         That keeps the in-TUI line and the post-exit console summary in agreement on
-        every terminal path. The live timer stops on its own next tick; the
+        every terminal path. The live refresh stops on its own next tick; the
         ``_render_finished`` guard blocks any overwrite.
         """
         self.run_state.render_time_accumulated = self.run_state.get_live_render_time()
@@ -273,6 +280,13 @@ class Plain2CodeTUI(App):
                 self, "WARNING", f"Error adding log message from {event.logger_name}: {type(e).__name__}: {e}"
             )
 
+    def on_test_script_output_emitted(self, event: TestScriptOutputEmitted):
+        try:
+            container = self.query_one(f"#{TUIComponents.TEST_SCRIPTS_CONTAINER.value}", TestScriptsContainer)
+            self.call_later(container.append_live_output, event.script_type, event.frid, event.lines)
+        except Exception as e:
+            log_to_widget(self, "WARNING", f"Error showing {event.script_type} script output: {type(e).__name__}: {e}")
+
     def on_log_filter_changed(self, event: LogFilterChanged):
         """Handle log filter changes from LogLevelFilter widget."""
         try:
@@ -283,6 +297,8 @@ class Plain2CodeTUI(App):
 
     def on_render_state_updated(self, event: RenderStateUpdated):
         """Update TUI based on the current state machine state."""
+        self._render_context_snapshot = self._render_context_snapshot.apply(event.changes)
+
         # 1. Parse current and previous state
         segments = event.state.split("_")
         if len(segments) < 2:
@@ -291,7 +307,7 @@ class Plain2CodeTUI(App):
 
         # 3. Route to appropriate handler based on top-level state
         if segments[0] == States.IMPLEMENTING_FRID.value:
-            self._handle_frid_state(segments, event.snapshot, previous_state_segments)
+            self._handle_frid_state(segments, self._render_context_snapshot, previous_state_segments)
 
     def _handle_frid_state(
         self, segments: list[str], snapshot: RenderContextSnapshot, previous_state_segments: list[str]
@@ -353,19 +369,19 @@ class Plain2CodeTUI(App):
 
     def action_pause(self) -> None:
         """Handle ctrl+p: request the render machine to pause."""
-        if not self._render_finished and self.enter_pause_event is not None:
-            if self.enter_pause_event.is_set():
+        if not self._render_finished and self.run_control is not None:
+            if self.run_control.pause_requested:
                 transition_frid_progress(self, ProgressItem.PAUSED, ProgressItem.PROCESSING)
                 transition_frid_progress(self, ProgressItem.PAUSING, ProgressItem.PROCESSING)
                 footer = self.screen.query_one(CustomFooter)
                 footer.update_footer_state("rendering")
-                self.enter_pause_event.clear()
+                self.run_control.resume()
                 self._usage_paused = False
             else:
                 transition_frid_progress(self, ProgressItem.PROCESSING, ProgressItem.PAUSING)
                 footer = self.screen.query_one(CustomFooter)
                 footer.update_footer_state("pausing")
-                self.enter_pause_event.set()
+                self.run_control.pause()
 
     def action_enter_exit(self) -> None:
         """Handle enter: exit the TUI only after rendering has finished."""
@@ -8,7 +8,7 @@ from render_machine.render_types import AcceptanceTestPhase
 from render_machine.states import States
 
 from . import components as tui_components
-from .components import ProgressItem, ScriptOutputType, TestScriptsContainer, TUIComponents
+from .components import CACHED_SCRIPT_OUTPUT_SUFFIX, ProgressItem, ScriptOutputType, TestScriptsContainer, TUIComponents
 from .models import Substate
 from .widget_helpers import (
     display_error_message,
@@ -263,17 +263,29 @@ class ScriptOutputsHandler(StateHandler):
     def handle(self, _segments: list[str], snapshot: RenderContextSnapshot, previous_state_segments: list[str]) -> None:
         # Update test scripts container
         container = self.tui.query_one(f"#{TUIComponents.TEST_SCRIPTS_CONTAINER.value}", TestScriptsContainer)
+        # Queued behind the live output lines the test script published while it was running
+        self.tui.call_later(container.clear_live_output)
 
         if any(segment == States.UNIT_TESTS_READY.value for segment in previous_state_segments):
             if snapshot.script_execution_history.latest_unit_test_output_path:
+                cached_suffix = (
+                    CACHED_SCRIPT_OUTPUT_SUFFIX
+                    if snapshot.script_execution_history.latest_unit_test_output_cached
+                    else ""
+                )
                 container.update_unit_test(
-                    f"{ScriptOutputType.UNIT_TEST_OUTPUT_TEXT.value}{snapshot.script_execution_history.latest_unit_test_output_path}"
+                    f"{ScriptOutputType.UNIT_TEST_OUTPUT_TEXT.value}{snapshot.script_execution_history.latest_unit_test_output_path}{cached_suffix}"
                 )
 
         if len(previous_state_segments) > 2 and previous_state_segments[2] == States.CONFORMANCE_TEST_GENERATED.value:
             if snapshot.script_execution_history.latest_testing_environment_output_path:
+                cached_suffix = (
+                    CACHED_SCRIPT_OUTPUT_SUFFIX
+                    if snapshot.script_execution_history.latest_testing_environment_output_cached
+                    else ""
+                )
                 container.update_testing_env(
-                    f"{ScriptOutputType.TESTING_ENVIRONMENT_OUTPUT_TEXT.value}{snapshot.script_execution_history.latest_testing_environment_output_path}"
+                    f"{ScriptOutputType.TESTING_ENVIRONMENT_OUTPUT_TEXT.value}{snapshot.script_execution_history.latest_testing_environment_output_path}{cached_suffix}"
                 )
 
         if (
@@ -281,8 +293,13 @@ class ScriptOutputsHandler(StateHandler):
             and previous_state_segments[2] == States.CONFORMANCE_TEST_ENV_PREPARED.value
         ):
             if snapshot.script_execution_history.latest_conformance_test_output_path:
+                cached_suffix = (
+                    CACHED_SCRIPT_OUTPUT_SUFFIX
+                    if snapshot.script_execution_history.latest_conformance_test_output_cached
+                    else ""
+                )
                 container.update_conformance_test(
-                    f"{ScriptOutputType.CONFORMANCE_TEST_OUTPUT_TEXT.value}{snapshot.script_execution_history.latest_conformance_test_output_path}"
+                    f"{ScriptOutputType.CONFORMANCE_TEST_OUTPUT_TEXT.value}{snapshot.script_execution_history.latest_conformance_test_output_path}{cached_suffix}"
                 )
 
 
@@ -0,0 +1,57 @@
+"""A single timer per TUI app that drives all the timers shown by its widgets."""
+
+from typing import Callable
+from weakref import WeakKeyDictionary
+
+from textual.app import App
+from textual.timer import Timer
+
+TICK_INTERVAL_SECONDS = 1.0
+
+_tickers: "WeakKeyDictionary[App, Ticker]" = WeakKeyDictionary()
+
+
+class Ticker:
+    """
+    Calls its subscribers once per interval from one interval timer of the app.
+
+    A timer per widget fires at its own moment, so every widget showing a timer repaints the screen on its own. The
+    ticker calls all its subscribers in one batched update instead, which repaints the screen once per interval
+    however many timers are shown.
+    """
+
+    def __init__(self, app: App, interval: float = TICK_INTERVAL_SECONDS):
+        self._app = app
+        self._interval = interval
+        # Ordered, so subscribers are called in the order they subscribed
+        self._subscribers: dict[Callable[[], None], None] = {}
+        self._timer: Timer | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Call the callback on every tick. The timer of the app runs only while the ticker has subscribers."""
+        self._subscribers[callback] = None
+        if self._timer is None:
+            self._timer = self._app.set_interval(self._interval, self.tick)
+
+    def unsubscribe(self, callback: Callable[[], None]) -> None:
+        self._subscribers.pop(callback, None)
+        if not self._subscribers and self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def tick(self) -> None:
+        with self._app.batch_update():
+            for callback in list(self._subscribers):
+                callback()
+
+
+def get_ticker(app: App) -> Ticker:
+    """The ticker of the app, created on first use."""
+    ticker = _tickers.get(app)
+    if ticker is None:
+        ticker = _tickers[app] = Ticker(app)
+    return ticker